@@ -18,9 +18,17 @@ app_root = Path(__file__).parent
 sys.path.insert(0, str(app_root))
 
 from src.battlelog_matcher import BattlelogMatcher, CharacterNormalizer
-from src.character import UNKNOWN_CHARACTER, CharacterRecognizer
+from src.character import (
+    UNKNOWN_CHARACTER,
+    BackgroundRecognizer,
+    CharacterRecognizer,
+    LocalCharacterClassifier,
+    PayloadEncoder,
+    RecognitionCache,
+)
 from src.detection import (
     MatchDetection,
+    ParallelMatchScanner,
     ResultScreenDetector,
     TemplateMatcher,
     get_available_profiles,
@@ -30,7 +38,9 @@ from src.firestore import FirestoreClient
 from src.sf6_battlelog import BattlelogCacheManager, BattlelogCollector, BattlelogSiteClient
 from src.storage import R2Uploader
 from src.utils.logger import setup_logger
-from src.video import VideoDownloader
+from src.utils.metrics import PipelineMetrics, PrometheusExporter, timed_stage
+from src.utils.profiler import PROFILERS, StageProfiler
+from src.video import DETECTION_FORMAT_SORT, StreamingDownload, VideoDownloader, detection_format
 from src.youtube import YouTubeChapterUpdater
 
 # ロガー初期化
@@ -40,12 +50,13 @@ logger = setup_logger()
 class SF6ChapterProcessor:
     """SF6チャプター処理のメインクラス"""
 
-    def __init__(self, detection_profile: str = "production"):
+    def __init__(self, detection_profile: str = "production", profile: str | None = None):
         """
         初期化
 
         Args:
             detection_profile: 検出パラメータのプロファイル名 (production/test/legacy)
+            profile: 検出・認識の段階のプロファイラ (cprofile/sampling、None で無効)
         """
         # アプリケーションルートディレクトリ（ローカル: packages/local/, Docker: /app/）
         self.app_root = Path(__file__).parent
@@ -64,6 +75,23 @@ class SF6ChapterProcessor:
         # R2アップロードを有効にするかどうか（環境変数で制御）
         self.enable_r2 = os.environ.get("ENABLE_R2", "false").lower() in ("true", "1", "yes")
 
+        # ダウンロード中に検出を開始するかどうか（環境変数で制御）
+        self.streaming_detection = os.environ.get("STREAMING_DETECTION", "false").lower() in ("true", "1", "yes")
+
+        # 検出と並行してキャラクター認識を行うかどうか（検出したフレームを小さなバッチで先に認識）
+        self.recognition_overlap = os.environ.get("RECOGNITION_OVERLAP", "true").lower() in ("true", "1", "yes")
+
+        # 常駐モードで処理済み動画の計測値を Prometheus 形式で公開するポート（未設定で無効、run_forever で開始）
+        metrics_port = os.environ.get("METRICS_PORT")
+        self.metrics_port = int(metrics_port) if metrics_port else None
+        self.metrics_exporter: PrometheusExporter | None = None
+
+        # 検出・認識の段階のプロファイリング（結果は動画ごとの中間ファイルディレクトリに保存）
+        self.profiler = StageProfiler(profile)
+        if self.profiler.enabled:
+            # プロファイラは呼び出し元のスレッドのみを計測するため、認識は検出の完了後にこのスレッドで行う
+            self.recognition_overlap = False
+
         # モジュール初期化
         self.firestore = FirestoreClient()
         self.downloader = VideoDownloader(download_dir=self.download_dir)
@@ -81,9 +109,35 @@ class SF6ChapterProcessor:
             recognize_frame_offset=self.detection_params.recognize_frame_offset,
             recognize_frame_offset_alt=self.detection_params.recognize_frame_offset_alt,
             recognize_frame_offset_threshold=self.detection_params.recognize_frame_offset_threshold,
+            scan_mode=self.detection_params.scan_mode,
+            lookahead_buffer_max_mb=self.detection_params.lookahead_buffer_max_mb,
+            frame_source=self.detection_params.frame_source,
+            prefilter_scale=self.detection_params.prefilter_scale,
+            prefilter_threshold=self.detection_params.prefilter_threshold,
+            adaptive_stride=self.detection_params.adaptive_stride,
+            adaptive_dense_threshold=self.detection_params.adaptive_dense_threshold,
+            min_match_duration_sec=self.detection_params.min_match_duration_sec,
+            result_min_delay_sec=self.detection_params.result_min_delay_sec,
+            result_check_interval_sec=self.detection_params.result_check_interval_sec,
+            result_signal_threshold=self.detection_params.result_signal_threshold,
+            reference_height=self.detection_params.reference_height,
             result_detector=None,  # Will be set after result_detector initialization
         )
-        self.recognizer = CharacterRecognizer(aliases_path=str(self.app_root / "config" / "character_aliases.json"))
+        # 区間分割による並列走査（matcher への result_detector 設定後もそのまま参照される）
+        self.scanner = ParallelMatchScanner(
+            self.matcher,
+            workers=self.profiler.scan_workers(self.detection_params.parallel_workers),
+            segment_overlap_sec=self.detection_params.parallel_segment_overlap_sec,
+        )
+        self.recognizer = CharacterRecognizer(
+            aliases_path=str(self.app_root / "config" / "character_aliases.json"),
+            cache=create_recognition_cache(),
+            cluster_distance=float(os.environ.get("RECOGNITION_CLUSTER_DISTANCE", "0")),
+            local_classifier=create_local_classifier(),
+            batch_chunk_size=int(os.environ.get("RECOGNITION_BATCH_SIZE", "18")),
+            max_concurrency=int(os.environ.get("RECOGNITION_MAX_CONCURRENCY", "4")),
+            payload_encoder=create_payload_encoder(),
+        )
         self.youtube_updater = YouTubeChapterUpdater()
 
         # R2Uploaderはenable_r2がTrueの場合のみ初期化
@@ -92,6 +146,8 @@ class SF6ChapterProcessor:
         # Battlelog 設定
         self.sf6_player_id = os.environ.get("SF6_PLAYER_ID")
         self.battlelog_cache_db = os.environ.get("BATTLELOG_CACHE_DB", "./battlelog_cache.db")
+        # Battlelog のリプレイのキャッシュ（動画間で共有し、close() で閉じる。Battlelog 未設定時は作成しない）
+        self.battlelog_cache = BattlelogCacheManager(db_path=self.battlelog_cache_db) if self.sf6_player_id else None
 
         # キャラクター正規化とマッチング（Battlelog マッピング用）
         aliases_path = self.app_root / "config" / "character_aliases.json"
@@ -107,41 +163,74 @@ class SF6ChapterProcessor:
             self.matcher.result_detector = self.result_detector
 
     def _detect_and_recognize(
-        self, video_id: str, video_path: str, message_data: dict[str, Any], video_intermediate_dir: Path
+        self,
+        video_id: str,
+        video_path: str,
+        message_data: dict[str, Any],
+        video_intermediate_dir: Path,
+        stream: StreamingDownload | None = None,
     ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
         """
         動画から対戦を検出し、キャラクター認識を実行
 
+        Args:
+            stream: ダウンロード中の動画（指定時はダウンロードと並行して検出）
+
         Returns:
             (matches, chapters) のタプル
         """
-        # 2. テンプレートマッチングで対戦シーンを検出
-        logger.info("[2/6] Detecting match scenes...")
-        detections = self.matcher.detect_matches(
-            video_path=video_path,
-            crop_region=self.detection_params.crop_region,
-        )
-        logger.info("Found %d matches", len(detections))
-        self._save_detection_summary(video_id, video_intermediate_dir, detections)
+        with BackgroundRecognizer(
+            self.recognizer,
+            flush_frames=int(os.environ.get("RECOGNITION_FLUSH_FRAMES", "18")),
+            flush_interval_sec=float(os.environ.get("RECOGNITION_FLUSH_SEC", "60")),
+        ) as background:
+            # 確定した検出ごとにフレームを認識キューに追加（RECOGNITION_OVERLAP=false では走査後にまとめて認識）
+            on_detection = (lambda d: background.submit(d.frame_number, d.frame)) if self.recognition_overlap else None
+
+            # 2. テンプレートマッチングで対戦シーンを検出
+            logger.info("[2/6] Detecting match scenes...")
+            if stream is not None:
+                with timed_stage("detection"), self.profiler.profile("detection", video_intermediate_dir):
+                    detections = self.matcher.scan_stream(
+                        stream,
+                        crop_region=self.detection_params.crop_region,
+                        duration_sec=stream.duration,
+                        on_detection=on_detection,
+                    ).detections
+                # 検出と並行したダウンロードのうち、検出の完了後に待った時間をダウンロードの段階に計上
+                with timed_stage("download"):
+                    stream.wait()
+                logger.info("Downloaded: %s", video_path)
+            else:
+                with timed_stage("detection"), self.profiler.profile("detection", video_intermediate_dir):
+                    detections = self.scanner.detect_matches(
+                        video_path=video_path,
+                        crop_region=self.detection_params.crop_region,
+                        on_detection=on_detection,
+                    )
+            logger.info("Found %d matches", len(detections))
+            self._save_detection_summary(video_id, video_intermediate_dir, detections)
 
-        if not detections:
-            logger.info("No matches found, skipping video")
-            return [], []
+            if not detections:
+                logger.info("No matches found, skipping video")
+                return [], []
 
-        # 3. Gemini APIでキャラクター認識（ADR-042: バッチ送信で1リクエストにまとめる）
-        logger.info("[3/6] Recognizing characters (batch mode)...")
-        matches: list[dict[str, Any]] = []
-        chapters: list[dict[str, Any]] = []
+            # 3. Gemini APIでキャラクター認識（ADR-042: バッチ送信で1リクエストにまとめる）
+            # RECOGNITION_OVERLAP が有効な場合は検出中に大半のフレームを認識済みで、残りの認識のみを待つ
+            logger.info("[3/6] Recognizing characters (batch mode)...")
+            matches: list[dict[str, Any]] = []
+            chapters: list[dict[str, Any]] = []
 
-        # フレームを先に全件保存
-        frame_paths: list[Path] = []
-        for i, detection in enumerate(detections, 1):
-            frame_path = video_intermediate_dir / f"frame_{i:03d}_{int(detection.timestamp)}s.png"
-            self.matcher.save_detection_frame(detection, str(frame_path))
-            frame_paths.append(frame_path)
+            # フレームを先に全件保存
+            frame_paths: list[Path] = []
+            for i, detection in enumerate(detections, 1):
+                frame_path = video_intermediate_dir / f"frame_{i:03d}_{int(detection.timestamp)}s.png"
+                self.matcher.save_detection_frame(detection, str(frame_path))
+                frame_paths.append(frame_path)
 
-        # バッチ認識
-        recognition_results = self.recognizer.recognize_from_frames([d.frame for d in detections])
+            # バッチ認識（検出中に認識を開始したフレームはその完了を待つ）
+            with timed_stage("recognition"), self.profiler.profile("recognition", video_intermediate_dir):
+                recognition_results = background.results([(d.frame_number, d.frame) for d in detections])
 
         for i, (detection, frame_path, (normalized, raw)) in enumerate(
             zip(detections, frame_paths, recognition_results, strict=True), 1
@@ -180,6 +269,7 @@ class SF6ChapterProcessor:
                     "title": f"{normalized.get('1p')} VS {normalized.get('2p')}",
                     "matchId": match_id,
                     "winner_side": detection.winner_side,
+                    "winner_confidence": detection.winner_confidence,
                 }
                 chapters.append(chapter)
                 logger.info("  %s at %.1fs", chapter["title"], detection.timestamp)
@@ -219,9 +309,10 @@ class SF6ChapterProcessor:
                         match["player1"]["result"] = "loss"
                         match["player2"]["result"] = "win"
                     logger.info(
-                        "Set result from RESULT detection for matchId=%s: winner_side=%s",
+                        "Set result from RESULT detection for matchId=%s: winner_side=%s (confidence=%s)",
                         match_id,
                         winner_side,
+                        chapter.get("winner_confidence"),
                     )
 
     def _save_to_storage(
@@ -298,6 +389,9 @@ class SF6ChapterProcessor:
         """
         動画処理のメインフロー
 
+        段階ごとの計測値を中間ファイルディレクトリの metrics.json に保存し、
+        Prometheus エクスポーターが有効なら累計に加算する。
+
         Args:
             message_data: Pub/Subメッセージデータ
         """
@@ -311,11 +405,33 @@ class SF6ChapterProcessor:
         logger.info("Title: %s", message_data.get("title", "N/A"))
         logger.info("=" * 60)
 
+        metrics = PipelineMetrics(video_id)
+        with metrics.activate():
+            status = self._process_video(video_id, message_data)
+        metrics.finish(status)
+
+        metrics.log_summary()
+        video_intermediate_dir = self.intermediate_dir / video_id
+        if video_intermediate_dir.exists():
+            try:
+                metrics.save(video_intermediate_dir / "metrics.json")
+            except OSError:
+                logger.exception("Failed to save metrics: %s", video_id)
+        if self.metrics_exporter:
+            self.metrics_exporter.observe(metrics)
+
+    def _process_video(self, video_id: str, message_data: dict[str, Any]) -> str:
+        """
+        動画1本の処理（process_video から計測対象を設定して呼び出す）
+
+        Returns:
+            処理結果（"skipped" / "no_matches" / "completed" / "failed"）
+        """
         # 0. Firestoreで処理済みかチェック
         if self.firestore.is_completed(video_id):
             logger.info("Video already completed, skipping")
             logger.info("=" * 60)
-            return
+            return "skipped"
 
         self.firestore.update_status(video_id, FirestoreClient.STATUS_PROCESSING)
         video_intermediate_dir = self.intermediate_dir / video_id
@@ -323,35 +439,60 @@ class SF6ChapterProcessor:
 
         try:
             # 1. 動画ダウンロード
-            logger.info("[1/6] Downloading video...")
-            video_path = self.downloader.download(video_id)
-            logger.info("Downloaded: %s", video_path)
+            # 検出用プロファイル: 最小の高さを満たす最小の映像のみのフォーマット（テンプレート・領域は自動で拡大縮小）
+            download_options: dict[str, Any] = {}
+            if self.detection_params.download_min_height > 0:
+                download_options = {
+                    "format_option": detection_format(self.detection_params.download_min_height),
+                    "format_sort": DETECTION_FORMAT_SORT,
+                }
+
+            stream = None
+            if self.streaming_detection:
+                # ダウンロードをバックグラウンドで開始し、ダウンロード済みの範囲から検出
+                logger.info("[1/6] Downloading video (streaming detection)...")
+                with timed_stage("download"):
+                    stream = self.downloader.start_streaming_download(video_id, **download_options)
+                video_path = stream.path
+            else:
+                logger.info("[1/6] Downloading video...")
+                with timed_stage("download"):
+                    video_path = self.downloader.download(video_id, **download_options)
+                logger.info("Downloaded: %s", video_path)
 
             # 2-3. 検出・認識
-            matches, chapters = self._detect_and_recognize(video_id, video_path, message_data, video_intermediate_dir)
+            matches, chapters = self._detect_and_recognize(
+                video_id, video_path, message_data, video_intermediate_dir, stream=stream
+            )
             if not matches:
                 logger.info("No matches found, skipping video")
-                return
+                return "no_matches"
 
             # 4. YouTube チャプター更新
             logger.info("[4/6] Updating YouTube chapters...")
-            self.youtube_updater.update_video_description(video_id, chapters)
+            with timed_stage("youtube"):
+                self.youtube_updater.update_video_description(video_id, chapters)
 
             # 4.5. Battlelog マッピング
-            chapters_with_result = self._run_battlelog_matching(video_id, chapters, message_data.get("publishedAt", ""))
+            with timed_stage("battlelog"):
+                chapters_with_result = self._run_battlelog_matching(
+                    video_id, chapters, message_data.get("publishedAt", "")
+                )
 
             # マッチ結果を反映
             self._apply_match_results(matches, chapters_with_result)
 
             # 4.6. Battlelog Parquet 更新（キャッシュ更新後に自動実行）
             if self.sf6_player_id:
-                _update_battlelog_parquet(
-                    battlelog_cache_db=self.battlelog_cache_db,
-                    r2_uploader=self.r2_uploader,
-                )
+                with timed_stage("battlelog"):
+                    _update_battlelog_parquet(
+                        battlelog_cache_db=self.battlelog_cache_db,
+                        r2_uploader=self.r2_uploader,
+                    )
 
             # 5-6. ストレージ保存
-            video_data = self._save_to_storage(video_id, message_data, chapters_with_result, matches)
+            with timed_stage("upload"):
+                video_data = self._save_to_storage(video_id, message_data, chapters_with_result, matches)
 
             # 最終結果を保存
             self._save_final_results(video_id, video_intermediate_dir, video_data, matches, chapters_with_result)
@@ -368,11 +509,24 @@ class SF6ChapterProcessor:
                 logger.info("   - Uploaded to R2")
             else:
                 logger.info("   - Saved locally to ./output/")
+            return "completed"
 
         except Exception as e:
             self.firestore.update_status(video_id, FirestoreClient.STATUS_FAILED, error_message=str(e))
             logger.error("")
             logger.exception("❌ Error processing video %s", video_id)
+            return "failed"
+
+    def close(self) -> None:
+        """Battlelog のキャッシュの接続を閉じる"""
+        if self.battlelog_cache:
+            self.battlelog_cache.close()
+
+    def __enter__(self) -> "SF6ChapterProcessor":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
 
     def run_once(self) -> None:
         """Firestoreのqueued動画を取得して処理（1回実行）"""
@@ -394,6 +548,10 @@ class SF6ChapterProcessor:
         poll_interval_sec = int(os.environ.get("POLL_INTERVAL_SEC", "300"))
         logger.info("Starting Firestore polling mode (interval: %ds)...", poll_interval_sec)
 
+        if self.metrics_port:
+            self.metrics_exporter = PrometheusExporter()
+            self.metrics_exporter.serve(self.metrics_port)
+
         while True:
             try:
                 self.run_once()
@@ -504,10 +662,12 @@ class SF6ChapterProcessor:
     async def _fetch_battlelog_replays(self, player_id: str, build_id: str, auth_cookie: str):
         """
         Battlelog からリプレイリストを取得（キャッシング付き）
+
+        リプレイは照合のみに使うため、キャッシュ済みのものは照合に使う項目のみで読み込む。
+        キャッシュは動画間で共有する self.battlelog_cache を使う（SF6_PLAYER_ID 設定時のみ呼び出される）。
         """
-        cache_manager = BattlelogCacheManager(db_path=self.battlelog_cache_db)
-        collector = BattlelogCollector(build_id=build_id, auth_cookie=auth_cookie, cache=cache_manager)
-        replays = await collector.get_replay_list_incremental(player_id=player_id)
+        collector = BattlelogCollector(build_id=build_id, auth_cookie=auth_cookie, cache=self.battlelog_cache)
+        replays = await collector.get_replay_list_incremental(player_id=player_id, summary=True)
         logger.info(f"  Fetched {len(replays)} replays from Battlelog (cached + new)")
         return replays
 
@@ -821,6 +981,7 @@ def _initialize_result_screen_detector(app_root: Path, detection_params) -> "Res
             win_threshold=detection_params.result_detection.win_threshold,
             result_screen_search_region=detection_params.result_detection.result_screen_search_region,
             win_text_search_region=detection_params.result_detection.win_text_search_region,
+            reference_height=detection_params.reference_height,
         )
         logger.info("✅ ResultScreenDetector initialized with config parameters")
         return detector
@@ -845,6 +1006,73 @@ def get_intermediate_dir(video_id: str) -> Path:
     return video_dir
 
 
+def create_recognition_cache() -> RecognitionCache | None:
+    """
+    環境変数の設定から認識結果キャッシュを作成
+
+    - RECOGNITION_CACHE_DB: SQLite データベースのパス（デフォルト: 中間ファイルディレクトリの
+      recognition_cache.db、空文字でキャッシュ無効）
+    - RECOGNITION_CACHE_MAX_MB: キャッシュの合計サイズの上限（MB、デフォルト: 64）
+
+    Returns:
+        RecognitionCache（無効の場合は None）
+    """
+    default_db = Path(os.environ.get("INTERMEDIATE_DIR", "./intermediate")) / "recognition_cache.db"
+    db_path = os.environ.get("RECOGNITION_CACHE_DB", str(default_db))
+    if not db_path:
+        return None
+    max_mb = float(os.environ.get("RECOGNITION_CACHE_MAX_MB", "64"))
+    return RecognitionCache(db_path=db_path, max_bytes=int(max_mb * 1024 * 1024))
+
+
+def create_local_classifier() -> LocalCharacterClassifier | None:
+    """
+    環境変数の設定からキャラクター名のローカル認識器を作成
+
+    - RECOGNITION_TEMPLATE_BANK: キャラクター名テンプレートの .npz（デフォルト: template/character_names.npz、
+      ファイルがない場合はローカル認識を行わない）
+    - RECOGNITION_LOCAL_MIN_CONFIDENCE: ローカル認識の結果を採用する余裕のスコアの下限（デフォルト: テンプレートに保存した
+      build_name_template_bank.py --holdout-every の評価で選んだ下限。ない場合はローカル認識の結果を採用しない）
+
+    Returns:
+        LocalCharacterClassifier（テンプレートがない場合は None）
+    """
+    default_bank = Path(__file__).parent / "template" / "character_names.npz"
+    bank_path = Path(os.environ.get("RECOGNITION_TEMPLATE_BANK", str(default_bank)))
+    if not bank_path.is_file():
+        logger.info("Character name template bank not found (%s). Local recognition disabled.", bank_path)
+        return None
+    min_confidence_env = os.environ.get("RECOGNITION_LOCAL_MIN_CONFIDENCE")
+    min_confidence = float(min_confidence_env) if min_confidence_env else None
+    return LocalCharacterClassifier.from_file(bank_path, min_confidence=min_confidence)
+
+
+def create_payload_encoder() -> PayloadEncoder:
+    """
+    環境変数の設定から Gemini API に送信する切り抜き画像のエンコーダを作成
+
+    - RECOGNITION_PAYLOAD_MAX_WIDTH: 送信する画像の幅の上限（デフォルト: 0 で縮小しない）
+    - RECOGNITION_PAYLOAD_COLOR: color / gray / binary（デフォルト: color）
+    - RECOGNITION_PAYLOAD_FORMAT: jpeg / webp / png（デフォルト: png）
+    - RECOGNITION_PAYLOAD_QUALITY: JPEG / WebP の品質（デフォルト: 90）
+    - RECOGNITION_PAYLOAD_MOSAIC_ROWS: バッチ送信で1枚の画像に縦に並べる切り抜き画像の数（デフォルト: 0 でまとめない）
+
+    Returns:
+        PayloadEncoder
+    """
+    color = os.environ.get("RECOGNITION_PAYLOAD_COLOR", "color").lower()
+    if color not in ("color", "gray", "binary"):
+        raise ValueError(f"RECOGNITION_PAYLOAD_COLOR must be color, gray or binary, got {color!r}")
+    return PayloadEncoder(
+        max_width=int(os.environ.get("RECOGNITION_PAYLOAD_MAX_WIDTH", "0")),
+        grayscale=color != "color",
+        binarize=color == "binary",
+        image_format=os.environ.get("RECOGNITION_PAYLOAD_FORMAT", "png").lower(),
+        quality=int(os.environ.get("RECOGNITION_PAYLOAD_QUALITY", "90")),
+        mosaic_rows=int(os.environ.get("RECOGNITION_PAYLOAD_MOSAIC_ROWS", "0")),
+    )
+
+
 def save_detection_results(
     video_id: str, detections: list[MatchDetection], video_path: str, chapters: list[dict[str, Any]] | None = None
 ) -> Path:
@@ -1032,6 +1260,7 @@ def save_recognition_results(
             "raw": raw,
             "confidence": detection.confidence,
             "winner_side": detection.winner_side,
+            "winner_confidence": detection.winner_confidence,
         }
         chapters.append(chapter)
 
@@ -1084,7 +1313,11 @@ def test_download(video_id: str) -> str:
 
 
 def test_detection(
-    video_id: str, video_path: str, save_intermediate: bool = True, detection_profile: str = "test"
+    video_id: str,
+    video_path: str,
+    save_intermediate: bool = True,
+    detection_profile: str = "test",
+    profile: str | None = None,
 ) -> list[MatchDetection]:
     """
     対戦シーン検出のテスト
@@ -1094,6 +1327,7 @@ def test_detection(
         video_path: 動画ファイルのパス
         save_intermediate: 中間ファイルに保存するか
         detection_profile: 検出パラメータのプロファイル名 (production/test/legacy)
+        profile: 検出のプロファイラ (cprofile/sampling、None で無効)
 
     Returns:
         検出結果リスト
@@ -1123,10 +1357,29 @@ def test_detection(
         recognize_frame_offset=params.recognize_frame_offset,
         recognize_frame_offset_alt=params.recognize_frame_offset_alt,
         recognize_frame_offset_threshold=params.recognize_frame_offset_threshold,
+        scan_mode=params.scan_mode,
+        lookahead_buffer_max_mb=params.lookahead_buffer_max_mb,
+        frame_source=params.frame_source,
+        prefilter_scale=params.prefilter_scale,
+        prefilter_threshold=params.prefilter_threshold,
+        adaptive_stride=params.adaptive_stride,
+        adaptive_dense_threshold=params.adaptive_dense_threshold,
+        min_match_duration_sec=params.min_match_duration_sec,
+        result_min_delay_sec=params.result_min_delay_sec,
+        result_check_interval_sec=params.result_check_interval_sec,
+        result_signal_threshold=params.result_signal_threshold,
+        reference_height=params.reference_height,
         result_detector=result_detector,
     )
 
-    detections = matcher.detect_matches(video_path=video_path, crop_region=params.crop_region)
+    profiler = StageProfiler(profile)
+    scanner = ParallelMatchScanner(
+        matcher,
+        workers=profiler.scan_workers(params.parallel_workers),
+        segment_overlap_sec=params.parallel_segment_overlap_sec,
+    )
+    with profiler.profile("detection", get_intermediate_dir(video_id) if video_id else None):
+        detections = scanner.detect_matches(video_path=video_path, crop_region=params.crop_region)
     logger.info("✅ Found %d matches", len(detections))
     for i, det in enumerate(detections, 1):
         logger.info("   %d. %.1fs (confidence: %.3f)", i, det.timestamp, det.confidence)
@@ -1143,6 +1396,7 @@ def test_recognition(
     detections: list[MatchDetection] | None = None,
     from_intermediate: bool = False,
     save_intermediate: bool = True,
+    profile: str | None = None,
 ) -> list[tuple[dict[str, str], dict[str, str]]]:
     """
     キャラクター認識のテスト
@@ -1152,6 +1406,7 @@ def test_recognition(
         detections: 検出結果リスト（from_intermediate=Falseの場合は必須）
         from_intermediate: 中間ファイルから検出結果を読み込むか
         save_intermediate: 中間ファイルに保存するか
+        profile: 認識のプロファイラ (cprofile/sampling、None で無効)
 
     Returns:
         認識結果リスト
@@ -1169,10 +1424,20 @@ def test_recognition(
 
     logger.info("[TEST] Recognizing characters from %d frames (batch mode)", len(detections))
     app_root = Path(__file__).parent
-    recognizer = CharacterRecognizer(aliases_path=str(app_root / "config" / "character_aliases.json"))
+    recognizer = CharacterRecognizer(
+        aliases_path=str(app_root / "config" / "character_aliases.json"),
+        cache=create_recognition_cache(),
+        cluster_distance=float(os.environ.get("RECOGNITION_CLUSTER_DISTANCE", "0")),
+        local_classifier=create_local_classifier(),
+        batch_chunk_size=int(os.environ.get("RECOGNITION_BATCH_SIZE", "18")),
+        max_concurrency=int(os.environ.get("RECOGNITION_MAX_CONCURRENCY", "4")),
+        payload_encoder=create_payload_encoder(),
+    )
 
     # ADR-042: バッチ送信で1リクエストにまとめる
-    results = recognizer.recognize_from_frames([d.frame for d in detections])
+    profiler = StageProfiler(profile)
+    with profiler.profile("recognition", get_intermediate_dir(video_id) if video_id else None):
+        results = recognizer.recognize_from_frames([d.frame for d in detections])
     for i, (normalized, raw) in enumerate(results, 1):
         logger.info("   %d/%d: ✅ %s VS %s", i, len(detections), normalized.get("1p"), normalized.get("2p"))
         logger.info("      (raw: %s vs %s)", raw.get("1p"), raw.get("2p"))
@@ -1237,6 +1502,7 @@ def test_chapters(
                 "title": f"{normalized.get('1p')} VS {normalized.get('2p')}",
                 "matchId": match_id,
                 "winner_side": detection.winner_side,
+                "winner_confidence": detection.winner_confidence,
             }
             chapters.append(chapter)
 
@@ -1432,6 +1698,7 @@ def test_r2_upload(
                 "title": f"{normalized.get('1p')} VS {normalized.get('2p')}",
                 "matchId": f"{video_id}_{int(detection.timestamp)}",
                 "winner_side": detection.winner_side,  # RESULT検出結果を含める
+                "winner_confidence": detection.winner_confidence,
             }
             chapters.append(chapter)
 
@@ -1471,14 +1738,14 @@ def test_r2_upload(
     sf6_player_id = os.environ.get("SF6_PLAYER_ID")
     battlelog_cache_db = os.environ.get("BATTLELOG_CACHE_DB", "./battlelog_cache.db")
 
-    _processor = SF6ChapterProcessor()
-    chapters_with_result = _processor._run_battlelog_matching(video_id, chapters, video_info["publishedAt"])
+    with SF6ChapterProcessor() as _processor:
+        chapters_with_result = _processor._run_battlelog_matching(video_id, chapters, video_info["publishedAt"])
 
-    # 再認識でタイトルが変更されたチャプターを chapters.json に反映
-    update_chapters_titles_from_rerecognition(video_id, chapters_with_result)
+        # 再認識でタイトルが変更されたチャプターを chapters.json に反映
+        update_chapters_titles_from_rerecognition(video_id, chapters_with_result)
 
-    # 対戦データに Battlelog 情報を統合
-    _processor._apply_match_results(matches, chapters_with_result)
+        # 対戦データに Battlelog 情報を統合
+        _processor._apply_match_results(matches, chapters_with_result)
 
     chapter_map = {ch.get("matchId"): ch for ch in chapters_with_result}
     for match in matches:
@@ -1584,6 +1851,15 @@ def main():
         help=f"Detection parameters profile ({'/'.join(available_profiles)})",
     )
 
+    parser.add_argument(
+        "--profile",
+        choices=PROFILERS,
+        help=(
+            "Profile the detection and recognition stages and save the results to intermediate/<video_id>/ "
+            "(scans serially and recognizes after detection)"
+        ),
+    )
+
     args = parser.parse_args()
 
     # テストモード
@@ -1618,19 +1894,23 @@ def main():
             if not video_path:
                 # video_pathが指定されていない場合、video_idから自動取得（既存ファイル優先）
                 video_path = test_download(args.video_id)
-            detections = test_detection(args.video_id, video_path, detection_profile=args.detection_profile)
+            detections = test_detection(
+                args.video_id, video_path, detection_profile=args.detection_profile, profile=args.profile
+            )
 
         if args.test_step in ["recognize", "all"]:
             # --from-intermediateが指定されている場合は中間ファイルから読み込み
             if args.from_intermediate:
-                results = test_recognition(args.video_id, from_intermediate=True)
+                results = test_recognition(args.video_id, from_intermediate=True, profile=args.profile)
             else:
                 # 検出結果がない場合は、detectステップから実行
                 if not detections:
                     if not video_path:
                         video_path = test_download(args.video_id)
-                    detections = test_detection(args.video_id, video_path, detection_profile=args.detection_profile)
-                results = test_recognition(args.video_id, detections=detections)
+                    detections = test_detection(
+                        args.video_id, video_path, detection_profile=args.detection_profile, profile=args.profile
+                    )
+                results = test_recognition(args.video_id, detections=detections, profile=args.profile)
 
         if args.test_step in ["chapters", "all"]:
             # --from-intermediateが指定されている場合は中間ファイルから読み込み
@@ -1641,8 +1921,10 @@ def main():
                 if not detections or not results:
                     if not video_path:
                         video_path = test_download(args.video_id)
-                    detections = test_detection(args.video_id, video_path, detection_profile=args.detection_profile)
-                    results = test_recognition(args.video_id, detections=detections)
+                    detections = test_detection(
+                        args.video_id, video_path, detection_profile=args.detection_profile, profile=args.profile
+                    )
+                    results = test_recognition(args.video_id, detections=detections, profile=args.profile)
                 test_chapters(args.video_id, detections, results)
 
             # chaptersステップではデフォルトでR2アップロードも実行（--no-r2で無効化）
@@ -1661,19 +1943,20 @@ def main():
                 if not detections or not results:
                     if not video_path:
                         video_path = test_download(args.video_id)
-                    detections = test_detection(args.video_id, video_path, detection_profile=args.detection_profile)
-                    results = test_recognition(args.video_id, detections=detections)
+                    detections = test_detection(
+                        args.video_id, video_path, detection_profile=args.detection_profile, profile=args.profile
+                    )
+                    results = test_recognition(args.video_id, detections=detections, profile=args.profile)
                 test_r2_upload(args.video_id, detections, results)
 
         return
 
     # 通常モード
-    processor = SF6ChapterProcessor(detection_profile=args.detection_profile)
-
-    if args.mode == "once":
-        processor.run_once()
-    else:
-        processor.run_forever()
+    with SF6ChapterProcessor(detection_profile=args.detection_profile, profile=args.profile) as processor:
+        if args.mode == "once":
+            processor.run_once()
+        else:
+            processor.run_forever()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Battlelog キャッシュ（BattlelogCacheManager）のベンチマーク
+
+合成した対戦ログ（Battlelog の replay と同じ構造）を一時ディレクトリの SQLite に保存し、
+10万件以上のキャッシュで以下のスループットを計測する。
+
+- 保存: 1ページ（10件）ごとの cache_replays（増分取得と同じ単位）、重複のみのページの保存
+- 検索: キャッシュ境界の判定（has_reached_cache_boundary）、プレイヤーごとの uploaded_at 集合・対戦ログ
+  （全項目・列に展開した項目のみ）の取得、キャッシュ全体の列の射影（get_replay_rows）
+- 比較用: 1件ごとに接続・コミットする旧実装の保存と、プレイヤーの uploaded_at 全件を読み込む旧実装の境界判定
+  （--legacy-sample 件・ページのみ計測）
+
+Usage:
+    python scripts/benchmark_battlelog_cache.py [--replays 100000] [--players 100] [--legacy-sample 2000]
+        [--output PATH]
+"""
+
+import argparse
+import json
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.sf6_battlelog.cache import BattlelogCacheManager
+from src.utils.logger import setup_logger
+
+logger = setup_logger()
+
+PAGE_SIZE = 10  # Battlelog の1ページの対戦ログ数
+FIRST_UPLOADED_AT = 1_700_000_000
+CHARACTERS = ["Ryu", "Ken", "Luke", "Jamie", "JP", "Ed", "Manon", "Marisa", "Juri", "Cammy"]
+
+
+def synthetic_replay(index: int, rng: random.Random) -> dict[str, Any]:
+    """Battlelog の replay と同じ構造の合成データ"""
+
+    def player_info(short_id: int) -> dict[str, Any]:
+        character_id = rng.randrange(len(CHARACTERS))
+        return {
+            "player": {"short_id": short_id, "fighter_id": f"fighter{short_id}", "platform_name": "Steam"},
+            "character_id": character_id,
+            "character_name": CHARACTERS[character_id],
+            "character_tool_name": CHARACTERS[character_id].lower(),
+            "battle_input_type": rng.choice([0, 1]),
+            "league_point": rng.randrange(0, 35000),
+            "league_rank": rng.randrange(1, 37),
+            "master_rating": rng.randrange(1000, 2000),
+            "round_results": [rng.choice([0, 1, 2, 3, 5, 6]) for _ in range(rng.choice([2, 3]))],
+        }
+
+    return {
+        "replay_id": f"R{index:09d}",
+        "uploaded_at": FIRST_UPLOADED_AT + index * 60,
+        "views": rng.randrange(100),
+        "replay_battle_type": rng.choice([1, 3, 4]),
+        "replay_battle_type_name": "Ranked Match",
+        "player1_info": player_info(1_000_000_000 + rng.randrange(10**6)),
+        "player2_info": player_info(1_000_000_000 + rng.randrange(10**6)),
+    }
+
+
+def _throughput(name: str, count: int, func: Callable[[], None]) -> dict[str, Any]:
+    """func の実行時間を計測（count は処理した件数）"""
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    result = {"name": name, "count": count, "sec": elapsed, "per_sec": count / elapsed if elapsed > 0 else 0.0}
+    logger.info("  %-40s %8d in %7.3fs  %12.0f /s", name, count, elapsed, result["per_sec"])
+    return result
+
+
+def _legacy_cache_replay(db_path: Path, player_id: str, replay: dict[str, Any]) -> None:
+    """旧実装: 1件ごとに接続を開いて INSERT・コミット"""
+    conn = sqlite3.connect(str(db_path))
+    try:
+        conn.execute(
+            "INSERT INTO replay_cache (player_id, uploaded_at, replay_data) VALUES (?, ?, ?)",
+            (player_id, str(replay["uploaded_at"]), json.dumps(replay, ensure_ascii=False)),
+        )
+        conn.commit()
+    except sqlite3.IntegrityError:
+        pass
+    finally:
+        conn.close()
+
+
+def _legacy_boundary(db_path: Path, player_id: str, page: list[dict[str, Any]]) -> bool:
+    """旧実装: プレイヤーの uploaded_at を全件読み込んでページと比較"""
+    conn = sqlite3.connect(str(db_path))
+    try:
+        rows = conn.execute("SELECT uploaded_at FROM replay_cache WHERE player_id = ?", (player_id,))
+        cached = {str(row[0]) for row in rows}
+    finally:
+        conn.close()
+    return {str(r["uploaded_at"]) for r in page} <= cached
+
+
+def run_benchmark(num_replays: int, num_players: int, legacy_sample: int, work_dir: Path) -> list[dict[str, Any]]:
+    """ベンチマークを実行して計測結果を返す"""
+    rng = random.Random(0)
+    players = [str(1_000_000_000 + i) for i in range(num_players)]
+    per_player = -(-num_replays // num_players)
+    replays = {
+        player_id: [synthetic_replay(p * per_player + i, rng) for i in range(per_player)]
+        for p, player_id in enumerate(players)
+    }
+    pages = [
+        (player_id, player_replays[start : start + PAGE_SIZE])
+        for player_id, player_replays in replays.items()
+        for start in range(0, len(player_replays), PAGE_SIZE)
+    ]
+    total = sum(len(page) for _, page in pages)
+    logger.info("Benchmark: %d replays, %d players, %d pages", total, num_players, len(pages))
+
+    results = []
+    db_path = work_dir / "battlelog_cache.db"
+    with BattlelogCacheManager(db_path=str(db_path)) as cache:
+
+        def insert_pages() -> None:
+            for player_id, page in pages:
+                cache.cache_replays(player_id, page)
+
+        def insert_duplicates() -> None:
+            for player_id, page in pages:
+                cache.cache_replays(player_id, page)
+
+        def boundary_checks() -> None:
+            for player_id, page in pages:
+                cache.has_reached_cache_boundary(player_id, page)
+
+        results.append(_throughput("cache_replays (10/page)", total, insert_pages))
+        results.append(_throughput("cache_replays (duplicates)", total, insert_duplicates))
+        results.append(_throughput("has_reached_cache_boundary (pages)", len(pages), boundary_checks))
+        results.append(
+            _throughput(
+                "get_cached_uploaded_at_set (replays)",
+                total,
+                lambda: [cache.get_cached_uploaded_at_set(player_id) for player_id in players],
+            )
+        )
+        results.append(
+            _throughput(
+                "get_cached_replays (replays)",
+                total,
+                lambda: [cache.get_cached_replays(player_id) for player_id in players],
+            )
+        )
+        results.append(
+            _throughput(
+                "get_cached_replays summary (replays)",
+                total,
+                lambda: [cache.get_cached_replays(player_id, summary=True) for player_id in players],
+            )
+        )
+        results.append(_throughput("get_replay_rows (replays)", total, cache.get_replay_rows))
+        stats = cache.get_cache_stats()
+        logger.info("  Cache: %d records, %.1f MB", stats["total_records"], stats["db_size_bytes"] / 1024 / 1024)
+
+    if legacy_sample > 0:
+        sample_pages = pages[: max(1, legacy_sample // PAGE_SIZE)]
+        sample = [(player_id, replay) for player_id, page in sample_pages for replay in page]
+
+        # 旧実装の保存は WAL を使わない新しいデータベースに、境界判定は上で作成したキャッシュに対して行う
+        legacy_db = work_dir / "legacy_cache.db"
+        BattlelogCacheManager(db_path=str(legacy_db)).close()
+        with sqlite3.connect(str(legacy_db)) as conn:
+            conn.execute("PRAGMA journal_mode=DELETE")
+
+        results.append(
+            _throughput(
+                "legacy cache_replay (1 row/connection)",
+                len(sample),
+                lambda: [_legacy_cache_replay(legacy_db, player_id, replay) for player_id, replay in sample],
+            )
+        )
+        results.append(
+            _throughput(
+                "legacy boundary check (full set)",
+                len(sample_pages),
+                lambda: [_legacy_boundary(db_path, player_id, page) for player_id, page in sample_pages],
+            )
+        )
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Battlelog キャッシュのベンチマーク")
+    parser.add_argument("--replays", type=int, default=100_000, help="キャッシュする対戦ログ数")
+    parser.add_argument("--players", type=int, default=100, help="プレイヤー数")
+    parser.add_argument("--legacy-sample", type=int, default=2000, help="旧実装で計測する対戦ログ数（0 で計測しない）")
+    parser.add_argument("--output", help="計測結果の JSON の出力先")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        results = run_benchmark(args.replays, args.players, args.legacy_sample, Path(work_dir))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        logger.info("Saved %s", args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+対戦シーン検出のベンチマーク
+
+template/ のテンプレート画像をノイズ・ゲームプレイ風の背景に既知の時刻で合成した動画を生成し
+（または正解データ付きの録画動画を指定し）、検出処理全体を実行して以下を計測する。
+
+- 走査速度（動画のフレーム数 / 走査時間）
+- 段階ごとの処理時間（decode, preprocess, match, post_check, result。ScanStats を参照）
+- ピークメモリ使用量（最大RSS、ffmpeg などの子プロセスは別に集計）
+- 正解データに対する Round 1 検出の precision / recall と勝敗判定の正解率
+
+段階ごとの処理時間を計測するため、区間分割の並列走査は行わずに1プロセスで走査する。
+最大RSSはケースごとに新しいプロセスで計測する。
+
+正解データ（JSON）の形式:
+    {"matches": [{"timestamp": 5.0, "winner_side": "player1"}, ...]}
+    （中間ファイルの detection_summary.json の "detections" も読み込み可能）
+
+Usage:
+    python scripts/benchmark_detection.py [--profile production] [--backgrounds noise,gameplay]
+        [--heights 720,1080] [--matches 3] [--match-duration 75] [--frame-source opencv]
+        [--video PATH --ground-truth PATH] [--output PATH] [--baseline PATH]
+"""
+
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import cv2
+import numpy as np
+
+from src.detection import DetectionParams, ResultScreenDetector, TemplateMatcher, load_detection_params
+from src.utils.logger import setup_logger
+
+logger = setup_logger()
+
+BACKGROUNDS = ("noise", "gameplay")
+
+# 合成位置（テンプレートを作成した 1080p 動画での左上座標、production プロファイルの検索領域内）
+# Round 1 は除外テンプレートの照合スコアが reject_threshold を下回る位置（検索領域の右下）に置く
+ROUND1_POSITION = (1250, 390)
+REJECT_POSITION = (1100, 300)  # Round 1 と同時に表示する除外テンプレート（誤検知のおとり）
+RESULT_POSITION = (60, 60)
+WIN_POSITIONS = {"player1": (830, 830), "player2": (1020, 830)}
+REFERENCE_HEIGHT = 1080
+
+# 対戦ごとのタイムライン（対戦開始からの秒数、表示時間）
+ROUND1_AT = (5.0, 1.5)
+DECOY_AT = (-8.0, 1.5)  # 対戦終了の8秒前（min_match_duration_sec 経過後）
+RESULT_AT = (-4.0, 2.0)  # 対戦終了の4秒前
+
+
+@dataclass
+class GroundTruthMatch:
+    """正解データの対戦"""
+
+    timestamp: float  # Round 1画面の表示開始時刻（秒）
+    winner_side: str | None = None  # "player1" | "player2" | None（勝敗を評価しない）
+
+
+@dataclass
+class BenchmarkCase:
+    """ベンチマークの対象動画"""
+
+    name: str
+    video_path: str
+    ground_truth: list[GroundTruthMatch]
+
+
+def _load_template(name: str, scale: float) -> np.ndarray:
+    """テンプレート画像を読み込み、動画の解像度に縮小"""
+    image = cv2.imread(str(project_root / "template" / name), cv2.IMREAD_COLOR)
+    if image is None:
+        raise FileNotFoundError(f"Template image not found: {name}")
+    if scale == 1.0:
+        return image
+    height, width = image.shape[:2]
+    return cv2.resize(image, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA)
+
+
+def _paste(frame: np.ndarray, image: np.ndarray, position: tuple[int, int], scale: float) -> None:
+    """基準解像度の座標に画像を合成"""
+    x, y = round(position[0] * scale), round(position[1] * scale)
+    h, w = image.shape[:2]
+    frame[y : y + h, x : x + w] = image
+
+
+class _BackgroundRenderer:
+    """合成動画の背景フレームを生成"""
+
+    def __init__(self, kind: str, width: int, height: int, seed: int):
+        if kind not in BACKGROUNDS:
+            raise ValueError(f"background must be one of {BACKGROUNDS}, got {kind}")
+        self.kind = kind
+        self.width = width
+        self.height = height
+        self.rng = np.random.default_rng(seed)
+        # ノイズはフレームごとに生成すると遅いため、少数のパターンをずらして使う
+        self._noise = self.rng.integers(0, 256, (4, height, width, 3), dtype=np.uint8)
+        # ステージ: 縦方向のグラデーションに背景の模様を重ねる
+        # （細かいノイズはエッジ抽出前のブラーで消えるため、8倍に拡大したノイズを使う）
+        gradient = np.linspace(30, 110, height, dtype=np.float32)[:, None, None] * np.array([1.0, 0.8, 0.6])
+        coarse = self.rng.integers(0, 256, (height // 8 + 1, width // 8 + 1, 3)).astype(np.float32)
+        texture = cv2.resize(coarse, (width, height), interpolation=cv2.INTER_CUBIC) - 128
+        self._stage = np.clip(gradient + texture, 0, 255).astype(np.uint8)
+
+    def render(self, t: float, index: int) -> np.ndarray:
+        if self.kind == "noise":
+            return np.roll(self._noise[index % len(self._noise)], shift=(index * 7) % self.width, axis=1)
+
+        # ゲームプレイ風: グラデーションのステージ、左右に動くキャラクター、体力ゲージ、エフェクト
+        frame = self._stage.copy()
+        w, h = self.width, self.height
+        for i, phase in enumerate((0.0, 2.0)):
+            x = int(w * (0.3 + 0.4 * i + 0.15 * np.sin(0.7 * t + phase)))
+            y = int(h * (0.65 + 0.05 * np.sin(2.3 * t + phase)))
+            color = (60 + 150 * i, 90, 200 - 120 * i)
+            cv2.ellipse(frame, (x, y), (w // 20, h // 5), 0, 0, 360, color, -1)
+        gauge = int(w * 0.35 * (0.5 + 0.5 * np.cos(0.05 * t)))
+        cv2.rectangle(frame, (w // 20, h // 20), (w // 20 + gauge, h // 12), (40, 200, 240), -1)
+        cv2.rectangle(frame, (w - w // 20 - gauge, h // 20), (w - w // 20, h // 12), (40, 200, 240), -1)
+        for _ in range(6):
+            cx, cy = int(self.rng.integers(0, w)), int(self.rng.integers(h // 4, h))
+            cv2.circle(frame, (cx, cy), int(self.rng.integers(4, h // 20)), (255, 255, 255), -1)
+        return frame
+
+
+def generate_synthetic_video(
+    path: Path,
+    background: str,
+    height: int = 720,
+    fps: float = 30.0,
+    matches: int = 3,
+    match_duration_sec: float = 75.0,
+    seed: int = 0,
+) -> list[GroundTruthMatch]:
+    """
+    テンプレート画像を既知の時刻に合成した動画を生成
+
+    各対戦は Round 1画面で始まり、終盤に Round 1 と除外テンプレートを同時に表示するおとり
+    （検出されてはならない）と、勝者側に Win を表示した RESULT画面を含む。
+
+    Args:
+        path: 出力先（mp4）
+        background: 背景の種類（"noise" / "gameplay"）
+        height: 動画の高さ（幅は 16:9）
+        fps: フレームレート
+        matches: 対戦数
+        match_duration_sec: 1対戦の長さ（秒、min_match_duration_sec と おとり・RESULT画面の表示時間を含む長さ）
+        seed: 乱数シード（勝者側・背景）
+
+    Returns:
+        正解データ
+    """
+    width = round(height * 16 / 9 / 2) * 2
+    scale = height / REFERENCE_HEIGHT
+    round1 = _load_template("round1_2026_new_monitor.png", scale)
+    reject = _load_template("reject_0-2_template.png", scale)
+    result = _load_template("result_template.png", scale)
+    win = _load_template("win_template.png", scale)
+
+    rng = np.random.default_rng(seed)
+    renderer = _BackgroundRenderer(background, width, height, seed)
+    truth = [
+        GroundTruthMatch(
+            timestamp=i * match_duration_sec + ROUND1_AT[0],
+            winner_side=str(rng.choice(list(WIN_POSITIONS))),
+        )
+        for i in range(matches)
+    ]
+
+    def showing(t: float, offset: float, duration: float) -> GroundTruthMatch | None:
+        match_index = int(t // match_duration_sec)
+        if match_index >= matches:
+            return None
+        start = match_index * match_duration_sec + (offset if offset >= 0 else match_duration_sec + offset)
+        return truth[match_index] if start <= t < start + duration else None
+
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    try:
+        for index in range(int(matches * match_duration_sec * fps)):
+            t = index / fps
+            frame = renderer.render(t, index)
+            if showing(t, *ROUND1_AT):
+                _paste(frame, round1, ROUND1_POSITION, scale)
+            if showing(t, *DECOY_AT):
+                _paste(frame, round1, ROUND1_POSITION, scale)
+                _paste(frame, reject, REJECT_POSITION, scale)
+            match = showing(t, *RESULT_AT)
+            if match:
+                _paste(frame, result, RESULT_POSITION, scale)
+                _paste(frame, win, WIN_POSITIONS[match.winner_side], scale)
+            writer.write(frame)
+    finally:
+        writer.release()
+
+    with open(path.with_suffix(".truth.json"), "w", encoding="utf-8") as f:
+        json.dump({"matches": [asdict(m) for m in truth]}, f, indent=2)
+    return truth
+
+
+def load_ground_truth(path: Path) -> list[GroundTruthMatch]:
+    """
+    正解データを読み込み
+
+    Args:
+        path: 正解データの JSON（"matches" または detection_summary.json 形式の "detections"）
+
+    Returns:
+        正解データ
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    entries = data["matches"] if "matches" in data else data["detections"]
+    return [
+        GroundTruthMatch(
+            timestamp=float(entry["timestamp"]),
+            winner_side=entry.get("winner_side") or entry.get("result_detection", {}).get("winner_side"),
+        )
+        for entry in entries
+    ]
+
+
+def evaluate(
+    detections: list[tuple[float, str | None]], truth: list[GroundTruthMatch], tolerance_sec: float
+) -> dict[str, Any]:
+    """
+    検出結果を正解データと照合
+
+    正解の時刻から tolerance_sec 以内の最も近い検出を1対1で対応付ける。
+
+    Args:
+        detections: (検出時刻, 勝者側) のリスト
+        truth: 正解データ
+        tolerance_sec: 対応付ける時刻の差の上限（秒）
+
+    Returns:
+        precision / recall / 勝敗判定の正解率と対応付けの詳細
+    """
+    unmatched = list(range(len(detections)))
+    true_positives = 0
+    winner_total = 0
+    winner_correct = 0
+    timing_errors = []
+    for match in truth:
+        candidates = [i for i in unmatched if abs(detections[i][0] - match.timestamp) <= tolerance_sec]
+        if not candidates:
+            continue
+        best = min(candidates, key=lambda i: abs(detections[i][0] - match.timestamp))
+        unmatched.remove(best)
+        true_positives += 1
+        timing_errors.append(detections[best][0] - match.timestamp)
+        if match.winner_side is not None:
+            winner_total += 1
+            winner_correct += detections[best][1] == match.winner_side
+
+    return {
+        "precision": true_positives / len(detections) if detections else 1.0,
+        "recall": true_positives / len(truth) if truth else 1.0,
+        "winner_accuracy": winner_correct / winner_total if winner_total else None,
+        "true_positives": true_positives,
+        "false_positives": len(unmatched),
+        "false_negatives": len(truth) - true_positives,
+        "max_timing_error_sec": max((abs(e) for e in timing_errors), default=0.0),
+    }
+
+
+def build_matcher(params: DetectionParams, frame_source: str | None = None) -> TemplateMatcher:
+    """検出パラメータから TemplateMatcher を作成（main.py と同じ構成）"""
+    result_detector = None
+    rd = params.result_detection
+    if rd.enabled and rd.result_template_paths and rd.win_template_paths:
+        result_detector = ResultScreenDetector(
+            result_template_paths=[str(project_root / rd.result_template_paths[0])],
+            win_template_paths=[str(project_root / rd.win_template_paths[0])],
+            result_threshold=rd.result_threshold,
+            win_threshold=rd.win_threshold,
+            result_screen_search_region=rd.result_screen_search_region,
+            win_text_search_region=rd.win_text_search_region,
+            reference_height=params.reference_height,
+        )
+
+    return TemplateMatcher(
+        template_path=str(project_root / params.template_path),
+        threshold=params.threshold,
+        min_interval_sec=params.min_interval_sec,
+        reject_templates=[str(project_root / p) for p in params.reject_templates],
+        reject_threshold=params.reject_threshold,
+        search_region=params.search_region,
+        post_check_frames=params.post_check_frames,
+        post_check_reject_limit=params.post_check_reject_limit,
+        frame_interval=params.frame_interval,
+        recognize_frame_offset=params.recognize_frame_offset,
+        recognize_frame_offset_alt=params.recognize_frame_offset_alt,
+        recognize_frame_offset_threshold=params.recognize_frame_offset_threshold,
+        scan_mode=params.scan_mode,
+        lookahead_buffer_max_mb=params.lookahead_buffer_max_mb,
+        frame_source=frame_source or params.frame_source,
+        prefilter_scale=params.prefilter_scale,
+        prefilter_threshold=params.prefilter_threshold,
+        adaptive_stride=params.adaptive_stride,
+        adaptive_dense_threshold=params.adaptive_dense_threshold,
+        min_match_duration_sec=params.min_match_duration_sec,
+        result_min_delay_sec=params.result_min_delay_sec,
+        result_check_interval_sec=params.result_check_interval_sec,
+        result_signal_threshold=params.result_signal_threshold,
+        reference_height=params.reference_height,
+        result_detector=result_detector,
+    )
+
+
+def _run_case(case: BenchmarkCase, profile: str, frame_source: str | None, tolerance_sec: float) -> dict[str, Any]:
+    """1つの動画を走査して計測結果を返す（ケースごとの新しいプロセスで実行）"""
+    params = load_detection_params(profile=profile)
+    matcher = build_matcher(params, frame_source)
+    _, total_frames = matcher.probe_video(case.video_path)
+
+    started = time.perf_counter()
+    segment = matcher.scan_segment(case.video_path, crop_region=params.crop_region)
+    elapsed = time.perf_counter() - started
+
+    stats = segment.stats
+    detections = [(d.timestamp, d.winner_side) for d in segment.detections]
+    stage_seconds = stats.stage_seconds()
+    return {
+        "case": case.name,
+        "video_path": case.video_path,
+        "frame_source": matcher.frame_source,
+        "frames": total_frames,
+        "elapsed_sec": elapsed,
+        "fps": total_frames / elapsed if elapsed > 0 else 0.0,
+        "stage_sec": {**stage_seconds, "other": max(0.0, stats.scan_sec - sum(stage_seconds.values()))},
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "peak_rss_children_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+        "stats": asdict(stats),
+        "detections": [{"timestamp": t, "winner_side": w} for t, w in detections],
+        **evaluate(detections, case.ground_truth, tolerance_sec),
+    }
+
+
+def _log_report(report: dict[str, Any]) -> None:
+    logger.info(
+        "[%s] %.1f fps (%d frames in %.2fs), precision=%.3f, recall=%.3f, winner_accuracy=%s, peak RSS=%.0fMB",
+        report["case"],
+        report["fps"],
+        report["frames"],
+        report["elapsed_sec"],
+        report["precision"],
+        report["recall"],
+        "n/a" if report["winner_accuracy"] is None else f"{report['winner_accuracy']:.3f}",
+        report["peak_rss_mb"],
+    )
+    logger.info(
+        "[%s] stage time: %s",
+        report["case"],
+        ", ".join(f"{stage}={sec:.2f}s" for stage, sec in report["stage_sec"].items()),
+    )
+
+
+def _compare_with_baseline(reports: list[dict[str, Any]], baseline: dict[str, dict[str, Any]]) -> list[str]:
+    """
+    過去の計測結果と比較して走査速度の変化をログ出力し、検出精度が下がった項目を返す
+
+    Args:
+        reports: 今回の計測結果
+        baseline: ケース名ごとの過去の計測結果
+
+    Returns:
+        検出精度が下がった項目（"ケース名: 指標名"）のリスト
+    """
+    regressions = []
+    for report in reports:
+        previous = baseline.get(report["case"])
+        if previous is None:
+            continue
+        logger.info(
+            "[%s] fps %.1f -> %.1f (x%.2f), peak RSS %.0fMB -> %.0fMB",
+            report["case"],
+            previous["fps"],
+            report["fps"],
+            report["fps"] / previous["fps"] if previous["fps"] else 0.0,
+            previous["peak_rss_mb"],
+            report["peak_rss_mb"],
+        )
+        for metric in ("precision", "recall", "winner_accuracy"):
+            if (previous[metric] or 0.0) > (report[metric] or 0.0):
+                logger.warning(
+                    "[%s] %s regressed: %.3f -> %.3f", report["case"], metric, previous[metric], report[metric] or 0.0
+                )
+                regressions.append(f"{report['case']}: {metric}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="対戦シーン検出のベンチマーク")
+    parser.add_argument("--profile", default="production", help="検出パラメータのプロファイル名")
+    parser.add_argument(
+        "--frame-source", choices=["opencv", "ffmpeg"], help="フレーム供給元（省略時はプロファイルの設定）"
+    )
+    parser.add_argument(
+        "--backgrounds", default=",".join(BACKGROUNDS), help="合成動画の背景（カンマ区切り、空文字で合成動画なし）"
+    )
+    parser.add_argument("--heights", default="720,1080", help="合成動画の高さ（カンマ区切り）")
+    parser.add_argument("--matches", type=int, default=3, help="合成動画の対戦数")
+    parser.add_argument("--match-duration", type=float, default=75.0, help="合成動画の1対戦の長さ（秒）")
+    parser.add_argument("--seed", type=int, default=0, help="合成動画の乱数シード")
+    parser.add_argument("--video", action="append", default=[], help="録画動画のパス（複数指定可）")
+    parser.add_argument("--ground-truth", action="append", default=[], help="録画動画の正解データ（--video と同じ順）")
+    parser.add_argument("--tolerance", type=float, default=2.0, help="正解と対応付ける時刻の差の上限（秒）")
+    parser.add_argument("--work-dir", help="合成動画の出力先（省略時は一時ディレクトリ）")
+    parser.add_argument("--output", help="計測結果の JSON の出力先")
+    parser.add_argument(
+        "--baseline",
+        help="比較する過去の計測結果の JSON（precision / recall / 勝敗判定の正解率が下がったら終了コード 1）",
+    )
+    args = parser.parse_args()
+
+    if len(args.video) != len(args.ground_truth):
+        parser.error("--video and --ground-truth must be given the same number of times")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        work_dir = Path(args.work_dir or tmp_dir)
+        work_dir.mkdir(parents=True, exist_ok=True)
+
+        cases = []
+        heights = [int(h) for h in args.heights.split(",") if h]
+        for background in filter(None, args.backgrounds.split(",")):
+            for height in heights:
+                path = work_dir / f"synthetic_{background}_{height}p.mp4"
+                logger.info("Generating synthetic video: %s", path)
+                truth = generate_synthetic_video(
+                    path,
+                    background,
+                    height=height,
+                    matches=args.matches,
+                    match_duration_sec=args.match_duration,
+                    seed=args.seed,
+                )
+                cases.append(BenchmarkCase(f"synthetic-{background}-{height}p", str(path), truth))
+        for video, ground_truth in zip(args.video, args.ground_truth, strict=True):
+            cases.append(BenchmarkCase(Path(video).name, video, load_ground_truth(Path(ground_truth))))
+
+        reports = []
+        context = multiprocessing.get_context("spawn")
+        for case in cases:
+            with context.Pool(1) as pool:
+                report = pool.apply(_run_case, (case, args.profile, args.frame_source, args.tolerance))
+            _log_report(report)
+            reports.append(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"profile": args.profile, "cases": reports}, f, ensure_ascii=False, indent=2)
+        logger.info("Saved benchmark report: %s", args.output)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = {r["case"]: r for r in json.load(f)["cases"]}
+        return 1 if _compare_with_baseline(reports, baseline) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
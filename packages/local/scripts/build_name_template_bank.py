@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+キャラクター名テンプレートの作成
+
+中間ファイルディレクトリ（intermediate/<動画ID>/）の chapters.json のうち Battlelog と照合できた
+（matched: true）チャプターのタイトルを正解として、対応する切り抜き画像（frame_NNN_<秒>s.png）を
+左半分（1p）・右半分（2p）に分割し、キャラクターごとのテンプレートを作成して1つの .npz に保存する。
+LocalCharacterClassifier（RECOGNITION_TEMPLATE_BANK）で読み込む。
+
+- テンプレート: キャラクター・side ごとの切り抜き画像の画素ごとの中央値をキャラクター名の周囲に切り詰めたもの
+  （src/character/local_classifier.py の build_template を参照）
+- 特徴ベクトル: 切り抜き画像ごとの縮小グレースケール画像（float16、近傍探索などの別の認識器向け）
+
+Battlelog のキャラクターの左右がタイトルと一致しないチャプターは使用しない。
+--holdout-every N を指定すると N 枚に1枚をテンプレート作成から除外し、作成したテンプレートで
+ローカル認識した採用の下限ごとの採用率・正解率を表示する。採用した切り抜き画像の正解率が
+--target-accuracy 以上になる最小の下限をテンプレートに保存し、LocalCharacterClassifier の採用の下限に使う
+（select_min_confidence を参照）。--holdout-every なしで作成したテンプレートではローカル認識の結果を採用しない。
+
+Usage:
+    python scripts/build_name_template_bank.py [--intermediate-dir ./intermediate]
+        [--output template/character_names.npz] [--min-samples 3] [--max-samples 30] [--holdout-every 0]
+        [--target-accuracy 0.99]
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import cv2
+import numpy as np
+
+from src.battlelog_matcher import BattlelogMatcher, CharacterNormalizer
+from src.character.clustering import thumbnail
+from src.character.local_classifier import (
+    SIDES,
+    LocalCharacterClassifier,
+    NameTemplateBank,
+    build_template,
+    select_min_confidence,
+    split_sides,
+)
+from src.utils.logger import setup_logger
+
+logger = setup_logger()
+
+
+@dataclass
+class ConfirmedCrop:
+    """Battlelog で確定したキャラクター名の切り抜き画像"""
+
+    path: Path
+    characters: dict[str, str]  # 1p/2p → 正規名
+
+
+def _confirmed_characters(
+    chapter: dict[str, Any], matcher: BattlelogMatcher, valid_characters: set[str]
+) -> dict[str, str] | None:
+    """Battlelog と照合できたチャプターの左右のキャラクター名（使用しない場合は None）"""
+    if not chapter.get("matched"):
+        return None
+    extracted = matcher.extract_chapter_characters(chapter.get("title", ""))
+    if not extracted:
+        return None
+    normalize = matcher.normalizer.normalize
+    characters = {"1p": normalize(extracted[0]), "2p": normalize(extracted[1])}
+    if not all(name in valid_characters for name in characters.values()):
+        return None
+
+    # Battlelog の左右とタイトルの左右が一致しない場合（照合はキャラクターの組のみ）は使用しない
+    battlelog_1p = chapter.get("player1_character")
+    battlelog_2p = chapter.get("player2_character")
+    confirmed = (characters["1p"], characters["2p"])
+    if battlelog_1p and battlelog_2p and (normalize(battlelog_1p), normalize(battlelog_2p)) != confirmed:
+        return None
+    return characters
+
+
+def collect_confirmed_crops(intermediate_dir: Path, aliases_path: Path) -> list[ConfirmedCrop]:
+    """
+    中間ファイルディレクトリから Battlelog で確定した切り抜き画像を収集
+
+    Args:
+        intermediate_dir: 中間ファイルディレクトリ（動画IDごとのサブディレクトリを含む）
+        aliases_path: character_aliases.json のパス
+
+    Returns:
+        確定した切り抜き画像のリスト（動画ID・開始時刻の順）
+    """
+    with open(aliases_path, encoding="utf-8") as f:
+        valid_characters = {data["canonical"] for data in json.load(f)["characters"].values()}
+    matcher = BattlelogMatcher(normalizer=CharacterNormalizer(aliases_file=str(aliases_path)))
+
+    crops: list[ConfirmedCrop] = []
+    for chapters_path in sorted(intermediate_dir.glob("*/chapters.json")):
+        with open(chapters_path, encoding="utf-8") as f:
+            chapters = json.load(f).get("chapters", [])
+        for chapter in chapters:
+            characters = _confirmed_characters(chapter, matcher, valid_characters)
+            if characters is None:
+                continue
+            start_time = chapter.get("startTime", 0)
+            frame_path = next(chapters_path.parent.glob(f"frame_*_{start_time}s.png"), None)
+            if frame_path is not None:
+                crops.append(ConfirmedCrop(path=frame_path, characters=characters))
+    return crops
+
+
+def build_bank(
+    crops: list[tuple[np.ndarray, dict[str, str]]],
+    crop_size: tuple[int, int],
+    min_samples: int,
+    max_samples: int,
+) -> NameTemplateBank:
+    """
+    切り抜き画像からキャラクター名テンプレートを作成
+
+    Args:
+        crops: (crop_size に揃えた切り抜き画像, 1p/2p → 正規名) のリスト
+        crop_size: 切り抜き画像の大きさ (width, height)
+        min_samples: テンプレートを作成する切り抜き画像数の下限（キャラクター・side ごと）
+        max_samples: テンプレート作成に使う切り抜き画像数の上限（新しいものを優先）
+
+    Returns:
+        NameTemplateBank
+    """
+    halves: dict[str, dict[str, list[np.ndarray]]] = {side: defaultdict(list) for side in SIDES}
+    for image, characters in crops:
+        for side, half in split_sides(image).items():
+            halves[side][characters[side]].append(cv2.cvtColor(half, cv2.COLOR_BGR2GRAY))
+
+    bank = NameTemplateBank(crop_size=crop_size)
+    for side in SIDES:
+        bank.templates[side] = []
+        feature_labels: list[str] = []
+        vectors: list[np.ndarray] = []
+        for name in sorted(halves[side]):
+            samples = halves[side][name][-max_samples:]
+            feature_labels += [name] * len(samples)
+            vectors += [thumbnail(sample).ravel().astype(np.float16) for sample in samples]
+            if len(samples) >= min_samples:
+                bank.templates[side].append((name, build_template(samples)))
+        if vectors:
+            bank.features[side] = (feature_labels, np.stack(vectors))
+    return bank
+
+
+def evaluate(
+    bank: NameTemplateBank, crops: list[tuple[np.ndarray, dict[str, str]]], target_accuracy: float
+) -> float | None:
+    """
+    除外した切り抜き画像をローカル認識し、採用の下限ごとの採用率・正解率を表示
+
+    Returns:
+        採用した切り抜き画像の正解率が target_accuracy 以上になる最小の採用の下限（ない場合は None）
+    """
+    classifier = LocalCharacterClassifier(bank, min_confidence=0.0)
+    scores: list[float] = []
+    correct: list[bool] = []
+    for image, characters in crops:
+        result = classifier.classify(image)
+        scores.append(min(result.confidence.values()) if all(result.characters.values()) else 0.0)
+        correct.append(result.characters == characters)
+        if not correct[-1]:
+            logger.debug("  Wrong: %s → %s %s", characters, result.characters, result.confidence)
+
+    total = max(1, len(crops))
+    logger.info("Held-out evaluation: %d crops", len(crops))
+    for threshold in (0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 0.99):
+        accepted = [ok for score, ok in zip(scores, correct, strict=True) if score >= threshold]
+        logger.info(
+            "  min_confidence=%.2f | accepted %d (%.1f%%) | correct %d/%d accepted (%.1f%%)",
+            threshold,
+            len(accepted),
+            100 * len(accepted) / total,
+            sum(accepted),
+            len(accepted),
+            100 * sum(accepted) / max(1, len(accepted)),
+        )
+
+    min_confidence = select_min_confidence(scores, correct, target_accuracy)
+    if min_confidence is None:
+        logger.warning(
+            "No min_confidence reaches %.1f%% accuracy. Local results will not be accepted", 100 * target_accuracy
+        )
+    else:
+        logger.info("Selected min_confidence=%.2f (accuracy >= %.1f%%)", min_confidence, 100 * target_accuracy)
+    return min_confidence
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="キャラクター名テンプレートの作成")
+    parser.add_argument(
+        "--intermediate-dir",
+        default=os.environ.get("INTERMEDIATE_DIR", "./intermediate"),
+        help="中間ファイルディレクトリ",
+    )
+    parser.add_argument(
+        "--output", default=str(project_root / "template" / "character_names.npz"), help="テンプレートの出力先"
+    )
+    parser.add_argument(
+        "--aliases", default=str(project_root / "config" / "character_aliases.json"), help="キャラクター名の正規化設定"
+    )
+    parser.add_argument("--min-samples", type=int, default=3, help="テンプレートを作成する切り抜き画像数の下限")
+    parser.add_argument("--max-samples", type=int, default=30, help="テンプレート作成に使う切り抜き画像数の上限")
+    parser.add_argument("--holdout-every", type=int, default=0, help="N 枚に1枚を評価用に除外（0 で評価しない）")
+    parser.add_argument(
+        "--target-accuracy", type=float, default=0.99, help="採用の下限を選ぶ、採用した切り抜き画像の正解率の下限"
+    )
+    args = parser.parse_args()
+
+    confirmed = collect_confirmed_crops(Path(args.intermediate_dir), Path(args.aliases))
+    images = [(cv2.imread(str(crop.path)), crop.characters) for crop in confirmed]
+    images = [(image, characters) for image, characters in images if image is not None]
+    if not images:
+        logger.error("No Battlelog-confirmed crops found in %s", args.intermediate_dir)
+        return 1
+
+    # 最も多い大きさに揃える（解像度の異なる動画の切り抜き画像は拡大・縮小）
+    crop_size = Counter((image.shape[1], image.shape[0]) for image, _ in images).most_common(1)[0][0]
+    images = [
+        (image if (image.shape[1], image.shape[0]) == crop_size else cv2.resize(image, crop_size), characters)
+        for image, characters in images
+    ]
+
+    holdout: list[tuple[np.ndarray, dict[str, str]]] = []
+    if args.holdout_every > 0:
+        holdout = images[args.holdout_every - 1 :: args.holdout_every]
+        images = [item for i, item in enumerate(images, 1) if i % args.holdout_every != 0]
+
+    bank = build_bank(images, crop_size, args.min_samples, args.max_samples)
+    if holdout:
+        bank.min_confidence = evaluate(bank, holdout, args.target_accuracy)
+    bank.save(args.output)
+
+    logger.info("Saved %s (crop size %dx%d, %d confirmed crops)", args.output, *crop_size, len(images))
+    counts = {side: Counter(characters[side] for _, characters in images) for side in SIDES}
+    for name in sorted(set(counts["1p"]) | set(counts["2p"])):
+        logger.info("  %-12s 1p=%3d  2p=%3d", name, counts["1p"][name], counts["2p"][name])
+    missing = {side: sorted(set(counts[side]) - {label for label, _ in bank.templates[side]}) for side in SIDES}
+    for side in SIDES:
+        if missing[side]:
+            logger.info("  %s: fewer than %d crops (no template): %s", side, args.min_samples, ", ".join(missing[side]))
+    if bank.min_confidence is None:
+        logger.warning(
+            "No min_confidence saved. Local results are not accepted unless RECOGNITION_LOCAL_MIN_CONFIDENCE is set"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
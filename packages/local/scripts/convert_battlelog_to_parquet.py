@@ -2,7 +2,8 @@
 """
 battlelog_cache.db → battlelog_replays.parquet 変換スクリプト
 
-SQLiteキャッシュから全リプレイデータを読み込み、Parquetファイルに変換する。
+SQLiteキャッシュの列に展開された項目（スキーマ v2）を読み込み、Parquetファイルに変換する。
+リプレイの JSON は展開しない。
 生成されたParquetはR2にアップロードしてWeb UIのマッチアップチャートで使用する。
 
 Usage:
@@ -10,7 +11,6 @@ Usage:
 """
 
 import argparse
-import json
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
@@ -22,7 +22,7 @@ sys.path.insert(0, str(project_root))
 import pyarrow as pa
 import pyarrow.parquet as pq
 
-from src.sf6_battlelog.cache import BattlelogCacheManager
+from src.sf6_battlelog.cache import BattlelogCacheManager, extract_replay_columns
 from src.utils.logger import get_logger
 
 logger = get_logger()
@@ -64,69 +64,66 @@ def get_battlelog_replays_schema() -> pa.Schema:
     ])
 
 
-def determine_match_result(p1_round_results: list[int], p2_round_results: list[int]) -> str:
+def determine_match_result(p1_round_wins: int, p2_round_wins: int) -> str:
     """
     P1視点の勝敗を判定
 
     round_results の各値は勝利方法ID（0=LOSS, 1=WIN, 2=Chip KO, 3=Time Up,
     4=DRAW, 5=Overdrive KO, 6=Super Art KO, 7=Critical Art KO, 8=Perfect）。
-    0より大きい値をそのラウンドの勝利としてカウントする。
+    0より大きい値をそのラウンドの勝利としてカウントした数（キャッシュの round_wins 列）で比較する。
     """
-    p1_wins = sum(1 for v in p1_round_results if v > 0)
-    p2_wins = sum(1 for v in p2_round_results if v > 0)
-
-    if p1_wins > p2_wins:
+    if p1_round_wins > p2_round_wins:
         return "win"
-    elif p1_wins < p2_wins:
+    elif p1_round_wins < p2_round_wins:
         return "loss"
     else:
         return "draw"
 
 
-def convert_replay_to_row(replay: dict) -> dict | None:
-    """リプレイデータを Parquet 行に変換"""
+def convert_cached_row_to_row(cached: dict) -> dict | None:
+    """キャッシュの列（BattlelogCacheManager.get_replay_rows の1行）を Parquet 行に変換"""
     try:
-        p1 = replay.get("player1_info", {})
-        p2 = replay.get("player2_info", {})
-
-        p1_round = p1.get("round_results", [])
-        p2_round = p2.get("round_results", [])
+        battle_type = cached["battle_type"] if cached["battle_type"] is not None else 0
 
-        uploaded_at_ts = replay.get("uploaded_at")
-        if uploaded_at_ts is None:
-            logger.warning("replay missing uploaded_at, skipping: %s", replay.get("replay_id"))
-            return None
-
-        battle_type = replay.get("replay_battle_type", 0)
-
-        return {
-            "replay_id": replay.get("replay_id", ""),
-            "uploaded_at": datetime.fromtimestamp(int(uploaded_at_ts), tz=timezone.utc),
+        row = {
+            "replay_id": cached["replay_id"] or "",
+            "uploaded_at": datetime.fromtimestamp(int(cached["uploaded_at"]), tz=timezone.utc),
             "battle_type": battle_type,
             "battle_type_name": BATTLE_TYPE_NAMES.get(battle_type, str(battle_type)),
-            "p1_character_id": p1.get("character_id", 0),
-            "p1_character_name": p1.get("character_name", ""),
-            "p1_input_type": p1.get("battle_input_type", 0),
-            "p1_league_point": p1.get("league_point", 0),
-            "p1_league_rank": p1.get("league_rank", 0),
-            "p1_master_rating": p1.get("master_rating", 0),
-            "p1_short_id": p1.get("player", {}).get("short_id", 0),
-            "p1_fighter_id": p1.get("player", {}).get("fighter_id", ""),
-            "p1_round_results": json.dumps(p1_round),
-            "p2_character_id": p2.get("character_id", 0),
-            "p2_character_name": p2.get("character_name", ""),
-            "p2_input_type": p2.get("battle_input_type", 0),
-            "p2_league_point": p2.get("league_point", 0),
-            "p2_league_rank": p2.get("league_rank", 0),
-            "p2_master_rating": p2.get("master_rating", 0),
-            "p2_short_id": p2.get("player", {}).get("short_id", 0),
-            "p2_fighter_id": p2.get("player", {}).get("fighter_id", ""),
-            "p2_round_results": json.dumps(p2_round),
-            "match_result": determine_match_result(p1_round, p2_round),
         }
+        for side in ("p1", "p2"):
+            for name, default in (
+                ("character_id", 0),
+                ("character_name", ""),
+                ("input_type", 0),
+                ("league_point", 0),
+                ("league_rank", 0),
+                ("master_rating", 0),
+                ("short_id", 0),
+                ("fighter_id", ""),
+                ("round_results", "[]"),
+            ):
+                value = cached[f"{side}_{name}"]
+                row[f"{side}_{name}"] = default if value is None else value
+        row["match_result"] = determine_match_result(cached["p1_round_wins"], cached["p2_round_wins"])
+        return row
+    except Exception:
+        logger.exception("Failed to convert replay: %s", cached.get("replay_id"))
+        return None
+
+
+def convert_replay_to_row(replay: dict) -> dict | None:
+    """リプレイデータを Parquet 行に変換"""
+    uploaded_at_ts = replay.get("uploaded_at")
+    if uploaded_at_ts is None:
+        logger.warning("replay missing uploaded_at, skipping: %s", replay.get("replay_id"))
+        return None
+    try:
+        columns = extract_replay_columns(replay)
     except Exception:
         logger.exception("Failed to convert replay: %s", replay.get("replay_id"))
         return None
+    return convert_cached_row_to_row({"uploaded_at": uploaded_at_ts, **columns})
 
 
 def convert_battlelog_to_parquet(
@@ -139,18 +136,18 @@ def convert_battlelog_to_parquet(
     Returns:
         変換されたレコード数
     """
-    cache = BattlelogCacheManager(db_path=db_path)
-    replays = cache.get_all_cached_replays()
+    with BattlelogCacheManager(db_path=db_path) as cache:
+        cached_rows = cache.get_replay_rows()
 
-    if not replays:
+    if not cached_rows:
         logger.warning("No cached replays found in %s", db_path)
         return 0
 
-    logger.info("Converting %d replays to Parquet...", len(replays))
+    logger.info("Converting %d replays to Parquet...", len(cached_rows))
 
     rows = []
-    for replay in replays:
-        row = convert_replay_to_row(replay)
+    for cached in cached_rows:
+        row = convert_cached_row_to_row(cached)
         if row:
             rows.append(row)
 
@@ -145,54 +145,54 @@ def test_cache_with_collector(
 
         # 2. キャッシュマネージャーを初期化
         print("\n2. キャッシュマネージャーを初期化...")
-        cache = BattlelogCacheManager(db_path="./test_battlelog_cache.db")
-        stats_before = cache.get_cache_stats()
-        print(f"   初期状態: {stats_before['total_records']} 件のレコード")
-
-        # 3. BattlelogCollector を初期化
-        print("\n3. BattlelogCollector を初期化...")
-        collector = BattlelogCollector(
-            build_id=build_id,
-            auth_cookie=auth_cookie,
-            cache=cache,
-        )
-        print("   ✓ 初期化成功")
-
-        # 4. 初回実行（キャッシュなし）
-        print("\n4. 初回実行（API から取得）...")
-        print(f"   対象: player_id={player_id}, page=1")
-        replays_1st = asyncio.run(
-            collector.get_replay_list(player_id=player_id, page=1)
-        )
-        print(f"   ✓ {len(replays_1st)} 件取得")
-
-        stats_after_1st = cache.get_cache_stats()
-        print(f"   キャッシュ状態: {stats_after_1st['total_records']} 件のレコード")
-        print(f"   （新規追加: {stats_after_1st['total_records'] - stats_before['total_records']} 件）")
-
-        # 5. 2回目実行（キャッシュあり）
-        print("\n5. 2回目実行（キャッシュ + API）...")
-        print(f"   対象: player_id={player_id}, page=1")
-        import time
-        start_time = time.time()
-        replays_2nd = asyncio.run(
-            collector.get_replay_list(player_id=player_id, page=1)
-        )
-        elapsed = time.time() - start_time
-        print(f"   ✓ {len(replays_2nd)} 件取得（{elapsed:.2f}秒）")
-
-        stats_after_2nd = cache.get_cache_stats()
-        print(f"   キャッシュ状態: {stats_after_2nd['total_records']} 件のレコード")
-        print(f"   （新規追加: {stats_after_2nd['total_records'] - stats_after_1st['total_records']} 件）")
-
-        # 6. 結果出力
-        if replays_1st:
-            print("\n6. サンプルレプレイ（最初の1件）...")
-            sample = replays_1st[0]
-            if output_format == "json":
-                print(json.dumps(sample, ensure_ascii=False, indent=2))
-            else:
-                print_pretty(sample)
+        with BattlelogCacheManager(db_path="./test_battlelog_cache.db") as cache:
+            stats_before = cache.get_cache_stats()
+            print(f"   初期状態: {stats_before['total_records']} 件のレコード")
+
+            # 3. BattlelogCollector を初期化
+            print("\n3. BattlelogCollector を初期化...")
+            collector = BattlelogCollector(
+                build_id=build_id,
+                auth_cookie=auth_cookie,
+                cache=cache,
+            )
+            print("   ✓ 初期化成功")
+
+            # 4. 初回実行（キャッシュなし）
+            print("\n4. 初回実行（API から取得）...")
+            print(f"   対象: player_id={player_id}, page=1")
+            replays_1st = asyncio.run(
+                collector.get_replay_list(player_id=player_id, page=1)
+            )
+            print(f"   ✓ {len(replays_1st)} 件取得")
+
+            stats_after_1st = cache.get_cache_stats()
+            print(f"   キャッシュ状態: {stats_after_1st['total_records']} 件のレコード")
+            print(f"   （新規追加: {stats_after_1st['total_records'] - stats_before['total_records']} 件）")
+
+            # 5. 2回目実行（キャッシュあり）
+            print("\n5. 2回目実行（キャッシュ + API）...")
+            print(f"   対象: player_id={player_id}, page=1")
+            import time
+            start_time = time.time()
+            replays_2nd = asyncio.run(
+                collector.get_replay_list(player_id=player_id, page=1)
+            )
+            elapsed = time.time() - start_time
+            print(f"   ✓ {len(replays_2nd)} 件取得（{elapsed:.2f}秒）")
+
+            stats_after_2nd = cache.get_cache_stats()
+            print(f"   キャッシュ状態: {stats_after_2nd['total_records']} 件のレコード")
+            print(f"   （新規追加: {stats_after_2nd['total_records'] - stats_after_1st['total_records']} 件）")
+
+            # 6. 結果出力
+            if replays_1st:
+                print("\n6. サンプルレプレイ（最初の1件）...")
+                sample = replays_1st[0]
+                if output_format == "json":
+                    print(json.dumps(sample, ensure_ascii=False, indent=2))
+                else:
+                    print_pretty(sample)
 
     except Exception as e:
         logger.error(f"Integration test failed: {e}", exc_info=True)
@@ -239,9 +239,9 @@ def main() -> None:
     # テスト1: 基本操作
     if not args.skip_basic:
         try:
-            cache = BattlelogCacheManager(db_path="./test_battlelog_cache_basic.db")
-            test_cache_basic_operations(cache)
-            cache.clear_cache()  # テスト用DBをクリア
+            with BattlelogCacheManager(db_path="./test_battlelog_cache_basic.db") as cache:
+                test_cache_basic_operations(cache)
+                cache.clear_cache()  # テスト用DBをクリア
         except Exception as e:
             logger.error(f"Basic operations test failed: {e}", exc_info=True)
 
@@ -1,5 +1,20 @@
 """キャラクター認識モジュール"""
 
+from .background import BackgroundRecognizer
+from .cache import RecognitionCache, perceptual_hash
+from .local_classifier import LocalCharacterClassifier, LocalRecognition, NameTemplateBank
+from .payload import EncodedImage, PayloadEncoder
 from .recognizer import UNKNOWN_CHARACTER, CharacterRecognizer
 
-__all__ = ["CharacterRecognizer", "UNKNOWN_CHARACTER"]
+__all__ = [
+    "BackgroundRecognizer",
+    "CharacterRecognizer",
+    "EncodedImage",
+    "LocalCharacterClassifier",
+    "LocalRecognition",
+    "NameTemplateBank",
+    "PayloadEncoder",
+    "RecognitionCache",
+    "UNKNOWN_CHARACTER",
+    "perceptual_hash",
+]
@@ -0,0 +1,173 @@
+"""
+対戦シーンの検出と並行したキャラクター認識
+
+動画の走査が終わってからまとめて認識すると、Gemini API の待ち時間（Flex PayGo は最大30分）が
+そのまま処理時間に加わる。BackgroundRecognizer は走査中に検出したフレームをキューで受け取り、
+フレーム数（flush_frames）または最初のフレームを受け取ってからの経過時間（flush_interval_sec）が
+しきい値に達するたびに小さなバッチとしてバックグラウンドで認識する（producer/consumer）。
+走査の完了時には大半のフレームの認識が終わっており、残りのフレームの認識のみを待つ。
+
+フレームはキー（フレーム番号）で管理する。区間分割の並列走査では、重なり区間の重複を除去した検出が
+全区間の走査の完了後に投入される。
+"""
+
+import contextvars
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+from ..utils.logger import get_logger
+from ..utils.metrics import record
+from .cache import RecognitionResult
+from .recognizer import CharacterRecognizer
+
+logger = get_logger()
+
+# キューの終端
+_STOP = object()
+
+
+class BackgroundRecognizer:
+    """検出と並行して小さなバッチでキャラクター認識を行うワーカー"""
+
+    def __init__(
+        self,
+        recognizer: CharacterRecognizer,
+        flush_frames: int = 18,
+        flush_interval_sec: float = 60.0,
+        max_batches_in_flight: int = 2,
+    ):
+        """
+        Args:
+            recognizer: キャラクター認識器（recognize_from_frames をワーカースレッドから呼び出す）
+            flush_frames: この枚数のフレームが溜まったらバッチとして認識する
+            flush_interval_sec: 最初のフレームを受け取ってからこの秒数が経ったら溜まった分を認識する
+            max_batches_in_flight: 同時に認識するバッチ数の上限（Flex PayGo の待ち中も次のバッチを送信できるように）
+        """
+        if flush_frames < 1:
+            raise ValueError(f"flush_frames must be at least 1, got {flush_frames}")
+        if flush_interval_sec <= 0:
+            raise ValueError(f"flush_interval_sec must be positive, got {flush_interval_sec}")
+        if max_batches_in_flight < 1:
+            raise ValueError(f"max_batches_in_flight must be at least 1, got {max_batches_in_flight}")
+
+        self.recognizer = recognizer
+        self.flush_frames = flush_frames
+        self.flush_interval_sec = flush_interval_sec
+
+        self._queue: queue.Queue = queue.Queue()
+        self._submitted: set[int] = set()
+        self._batches: list[tuple[list[int], Future]] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        # 計測値の記録先（ContextVar）をワーカースレッドに引き継ぐ
+        self._context = contextvars.copy_context()
+        self._executor = ThreadPoolExecutor(max_workers=max_batches_in_flight, thread_name_prefix="recognition")
+        self._collector = threading.Thread(target=self._collect, name="recognition-collector", daemon=True)
+        self._collector.start()
+
+    def __enter__(self) -> "BackgroundRecognizer":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def submit(self, key: int, frame: np.ndarray | None) -> None:
+        """
+        フレームを認識キューに追加（同じキーのフレームは1回のみ、results() の後は無視）
+
+        Args:
+            key: フレームのキー（フレーム番号）
+            frame: キャラクター名の切り抜き画像（None は無視）
+        """
+        if frame is None or self._closed or key in self._submitted:
+            return
+        self._submitted.add(key)
+        self._queue.put((key, frame))
+
+    def _collect(self) -> None:
+        """キューからフレームを受け取り、しきい値に達したらバッチとして認識を開始"""
+        pending: list[tuple[int, np.ndarray]] = []
+        deadline: float | None = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._dispatch(pending)
+                return
+            if item is not None:
+                pending.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval_sec
+
+            if len(pending) >= self.flush_frames or (deadline is not None and time.monotonic() >= deadline):
+                self._dispatch(pending)
+                pending = []
+                deadline = None
+
+    def _dispatch(self, items: list[tuple[int, np.ndarray]]) -> None:
+        if not items:
+            return
+        logger.info("Background recognition: %d frames", len(items))
+        frames = [frame for _, frame in items]
+        future = self._executor.submit(self._context.copy().run, self.recognizer.recognize_from_frames, frames)
+        with self._lock:
+            self._batches.append(([key for key, _ in items], future))
+
+    def _stop(self) -> None:
+        """キューを閉じ、溜まっているフレームの認識を開始させてから collector を終了"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._collector.join()
+
+    def results(self, items: list[tuple[int, np.ndarray]]) -> list[RecognitionResult]:
+        """
+        フレームの認識結果を返す（バックグラウンドの認識の完了を待つ）
+
+        バックグラウンドで認識していないフレーム（未投入・認識の失敗）は、このスレッドでまとめて認識する。
+
+        Args:
+            items: (キー, フレーム) のリスト
+
+        Returns:
+            各フレームの (正規化済み結果, 生の認識結果) リスト（入力順）
+        """
+        self._stop()
+
+        with self._lock:
+            batches = list(self._batches)
+        keys_needed = {key for key, _ in items}
+        completed = sum(1 for keys, future in batches if future.done() for key in keys if key in keys_needed)
+        recognized: dict[int, RecognitionResult] = {}
+        for keys, future in batches:
+            try:
+                recognized.update(zip(keys, future.result(), strict=True))
+            except Exception:
+                logger.exception("Background recognition failed for %d frames", len(keys))
+
+        missing = [(key, frame) for key, frame in items if key not in recognized]
+        if missing:
+            results = self.recognizer.recognize_from_frames([frame for _, frame in missing])
+            recognized.update(zip([key for key, _ in missing], results, strict=True))
+
+        logger.info(
+            "Recognition overlapped with detection: %d/%d frames recognized before detection finished",
+            completed,
+            len(items),
+        )
+        record("recognition", overlapped_frames=completed)
+        return [recognized[key] for key, _ in items]
+
+    def close(self) -> None:
+        """ワーカーを終了（実行中のバッチの完了は待たない）"""
+        self._stop()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,203 @@
+"""
+RecognitionCache - SQLite ベースのキャラクター認識結果キャッシュ
+
+同じ動画の再処理（修復・テストモード・ADR-033 の再認識）で同じキャラクター名の切り抜き画像を
+Gemini API に再送しないよう、認識結果をキャッシュする。
+キャッシュキーは切り抜き画像の知覚ハッシュ + モデル名 + プロンプトのバージョンの組み合わせ。
+合計サイズが上限を超えたら最終参照が古いものから削除する（LRU）。
+"""
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+# 知覚ハッシュの格子（キャラクター名の表示領域は横長のため横方向を細かくする）
+HASH_WIDTH = 128
+HASH_HEIGHT = 8
+
+RecognitionResult = tuple[dict[str, str], dict[str, str]]
+
+
+def perceptual_hash(image: np.ndarray, hash_width: int = HASH_WIDTH, hash_height: int = HASH_HEIGHT) -> str:
+    """
+    画像の知覚ハッシュ（difference hash、16進文字列）
+
+    グレースケール画像を (hash_width + 1) x hash_height に縮小し、横に隣接する画素の輝度の大小を
+    ビット列にする。再エンコードや解像度の違いによる小さな差はハッシュに影響しにくい。
+
+    Args:
+        image: 入力画像 (BGR または グレースケール)
+        hash_width: 横方向のビット数
+        hash_height: 縦方向のビット数
+
+    Returns:
+        hash_width * hash_height ビットのハッシュ
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image
+    small = cv2.resize(gray, (hash_width + 1, hash_height), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return np.packbits(bits).tobytes().hex()
+
+
+class RecognitionCache:
+    """SQLite ベースのキャラクター認識結果キャッシュ（サイズ上限付き LRU）"""
+
+    DB_SCHEMA_VERSION = 1
+
+    def __init__(self, db_path: str = "./recognition_cache.db", max_bytes: int = 64 * 1024 * 1024):
+        """
+        キャッシュを初期化
+
+        Args:
+            db_path: SQLite データベースのパス
+            max_bytes: キャッシュの合計サイズの上限（バイト、キーと認識結果の JSON の長さの合計）
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._init_db()
+
+    def _init_db(self) -> None:
+        """データベースを初期化（テーブル作成）"""
+        conn = sqlite3.connect(str(self.db_path))
+        try:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS recognition_cache (
+                    image_hash TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL,
+                    cached_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (image_hash, model, prompt_version)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON recognition_cache(last_access)")
+            conn.commit()
+        finally:
+            conn.close()
+        logger.debug("Recognition cache initialized: %s", self.db_path)
+
+    def get_many(self, image_hashes: list[str], model: str, prompt_version: str) -> dict[str, RecognitionResult]:
+        """
+        キャッシュから認識結果を取得し、ヒットしたエントリの最終参照時刻を更新
+
+        Args:
+            image_hashes: 切り抜き画像の知覚ハッシュ
+            model: モデル名
+            prompt_version: プロンプトのバージョン
+
+        Returns:
+            ハッシュ → (正規化済み結果, 生の認識結果)（ヒットしたもののみ）
+
+        Raises:
+            sqlite3.Error: データベースエラー
+        """
+        unique_hashes = list(dict.fromkeys(image_hashes))
+        if not unique_hashes:
+            return {}
+
+        conn = sqlite3.connect(str(self.db_path))
+        try:
+            placeholders = ",".join("?" * len(unique_hashes))
+            rows = conn.execute(
+                f"""
+                SELECT image_hash, result FROM recognition_cache
+                WHERE model = ? AND prompt_version = ? AND image_hash IN ({placeholders})
+                """,
+                (model, prompt_version, *unique_hashes),
+            ).fetchall()
+            found: dict[str, RecognitionResult] = {}
+            for image_hash, result_json in rows:
+                result = json.loads(result_json)
+                found[image_hash] = (result["normalized"], result["raw"])
+
+            if found:
+                conn.executemany(
+                    """
+                    UPDATE recognition_cache SET last_access = ?
+                    WHERE image_hash = ? AND model = ? AND prompt_version = ?
+                    """,
+                    [(time.time(), image_hash, model, prompt_version) for image_hash in found],
+                )
+                conn.commit()
+        finally:
+            conn.close()
+
+        hits = sum(1 for image_hash in image_hashes if image_hash in found)
+        self.hits += hits
+        self.misses += len(image_hashes) - hits
+        return found
+
+    def put_many(self, entries: dict[str, RecognitionResult], model: str, prompt_version: str) -> None:
+        """
+        認識結果をキャッシュに保存し、合計サイズが上限を超えたら最終参照が古いものから削除
+
+        Args:
+            entries: ハッシュ → (正規化済み結果, 生の認識結果)
+            model: モデル名
+            prompt_version: プロンプトのバージョン
+
+        Raises:
+            sqlite3.Error: データベースエラー
+        """
+        if not entries:
+            return
+
+        now = time.time()
+        rows = []
+        for image_hash, (normalized, raw) in entries.items():
+            result_json = json.dumps({"normalized": normalized, "raw": raw}, ensure_ascii=False)
+            rows.append((image_hash, model, prompt_version, result_json, len(image_hash) + len(result_json), now))
+
+        conn = sqlite3.connect(str(self.db_path))
+        try:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO recognition_cache
+                    (image_hash, model, prompt_version, result, size, last_access)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            self._evict(conn)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """合計サイズが max_bytes 以下になるまで最終参照が古いエントリを削除"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM recognition_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = []
+        for rowid, size in conn.execute("SELECT rowid, size FROM recognition_cache ORDER BY last_access, rowid"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((rowid,))
+            total -= size
+        conn.executemany("DELETE FROM recognition_cache WHERE rowid = ?", evicted)
+        logger.info("Evicted %d entries from recognition cache (%d bytes remaining)", len(evicted), total)
+
+    def stats(self) -> dict[str, int]:
+        """キャッシュのエントリ数・合計サイズ"""
+        conn = sqlite3.connect(str(self.db_path))
+        try:
+            entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM recognition_cache").fetchone()
+        finally:
+            conn.close()
+        return {"entries": entries, "bytes": total}
@@ -0,0 +1,83 @@
+"""
+キャラクター名の切り抜き画像の近似重複クラスタリング
+
+長い配信では同じ組み合わせの対戦が続き、ほぼ同じ切り抜き画像が何枚も認識対象になる。
+縮小画像の画素の差で近似重複をまとめ、代表の1枚のみを Gemini API に送信して結果を全員に割り当てる。
+
+距離は縮小したグレースケール画像の差の列ごとの平均を、文字1つ分程度の幅の窓で平均した最大値。
+画像全体の平均ではキャラクター名の一部（1文字）の違いが薄まるため、局所的な差の最大値を使う。
+"""
+
+import cv2
+import numpy as np
+
+# 縮小率（1568x94 の切り抜き画像 → 196x11）
+THUMBNAIL_SCALE = 8
+
+# 差を平均する窓の幅（縮小画像の列数、元画像で約32ピクセル = 文字1つ分程度）
+WINDOW_COLUMNS = 4
+
+
+def thumbnail(image: np.ndarray) -> np.ndarray:
+    """
+    距離計算用の縮小グレースケール画像（0.0-1.0）
+
+    Args:
+        image: 入力画像 (BGR または グレースケール)
+
+    Returns:
+        1/THUMBNAIL_SCALE に縮小した float32 画像
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image
+    height, width = gray.shape[:2]
+    size = (max(1, width // THUMBNAIL_SCALE), max(1, height // THUMBNAIL_SCALE))
+    return cv2.resize(gray, size, interpolation=cv2.INTER_AREA).astype(np.float32) / 255.0
+
+
+def crop_distance(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    縮小画像同士の距離（0.0: 同一 〜 1.0）
+
+    Args:
+        a: thumbnail() の結果
+        b: thumbnail() の結果
+
+    Returns:
+        列ごとの差の平均を WINDOW_COLUMNS 列の窓で平均した最大値（大きさが異なる場合は 1.0）
+    """
+    if a.shape != b.shape:
+        return 1.0
+    profile = np.abs(a - b).mean(axis=0)
+    window = min(WINDOW_COLUMNS, len(profile))
+    return float(np.convolve(profile, np.full(window, 1.0 / window), mode="valid").max())
+
+
+def cluster_near_duplicates(frames: list[np.ndarray], max_distance: float) -> list[int]:
+    """
+    近似重複の切り抜き画像をまとめ、各画像の代表の index を返す
+
+    先頭から順に、既存の代表との距離が max_distance 以下ならそのクラスタに加え、それ以外は新しい代表にする。
+    比較は代表とのみ行うため、少しずつ異なる画像が連鎖して1つのクラスタになることはない。
+
+    Args:
+        frames: 切り抜き画像のリスト
+        max_distance: 同じクラスタとみなす距離の上限（0 以下でクラスタリングしない）
+
+    Returns:
+        各画像の代表の index（代表自身は自分の index）
+    """
+    if max_distance <= 0:
+        return list(range(len(frames)))
+
+    thumbnails = [thumbnail(frame) for frame in frames]
+    representatives: list[int] = []
+    assignments: list[int] = []
+    for i, thumb in enumerate(thumbnails):
+        for rep in representatives:
+            if crop_distance(thumbnails[rep], thumb) <= max_distance:
+                assignments.append(rep)
+                break
+        else:
+            representatives.append(i)
+            assignments.append(i)
+    return assignments
@@ -0,0 +1,283 @@
+"""
+テンプレートマッチングによるキャラクター名のローカル認識（Gemini API の前段）
+
+キャラクター名の表示領域は固定のフォント・位置で、キャラクターは character_aliases.json の
+有効なキャラクター名に限られる。過去に確定したキャラクター名の切り抜き画像から作成した
+キャラクターごとのテンプレート（NameTemplateBank）と、切り抜き画像の左半分（1p）・右半分（2p）を
+それぞれ照合し、左右とも照合の余裕のスコアが採用の下限以上の場合のみ認識結果として採用する。
+それ以外のフレームは Gemini API で認識する。
+
+余裕のスコア（utils.scoring.margin_score）は較正した確率ではないため、採用の下限は
+scripts/build_name_template_bank.py --holdout-every で実際の切り抜き画像を認識した正解率から求め、
+テンプレートと一緒に保存する（select_min_confidence を参照）。下限のないテンプレートではローカル認識の結果を採用しない。
+
+照合は Round 1 検出と同じエッジ画像の TM_CCOEFF_NORMED（TemplateBank）で行う。
+切り抜き画像はテンプレート作成時の大きさに縮小・拡大してから照合する。
+
+テンプレートは scripts/build_name_template_bank.py で中間ファイルの確定済みの切り抜き画像から作成する
+（build_template を参照）。
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from ..detection.preprocessing import preprocess_for_matching
+from ..detection.template_bank import TemplateBank
+from ..utils.logger import get_logger
+from ..utils.scoring import margin_score
+
+logger = get_logger()
+
+SIDES = ("1p", "2p")
+
+# テンプレートをキャラクター名の周囲に切り詰める際の余白（ピクセル）
+TEMPLATE_MARGIN = 24
+
+
+def split_sides(crop: np.ndarray) -> dict[str, np.ndarray]:
+    """キャラクター名の切り抜き画像を左半分（1p）・右半分（2p）に分割"""
+    half = crop.shape[1] // 2
+    return {"1p": crop[:, :half], "2p": crop[:, crop.shape[1] - half :]}
+
+
+def build_template(halves: list[np.ndarray]) -> np.ndarray:
+    """
+    同じキャラクター名の切り抜き画像（同じ side・同じ大きさ）からテンプレートを作成
+
+    画素ごとの中央値で背景の違いを打ち消し（キャラクター名は固定の位置・フォントのため残る）、
+    エッジのある範囲（キャラクター名）の周囲 TEMPLATE_MARGIN ピクセルに切り詰める。
+    切り詰めることで表示位置の数ピクセルのずれも照合できる。
+
+    Args:
+        halves: 切り抜き画像の左半分または右半分 (BGR または グレースケール)
+
+    Returns:
+        グレースケールのテンプレート
+    """
+    grays = [cv2.cvtColor(h, cv2.COLOR_BGR2GRAY) if len(h.shape) == 3 else h for h in halves]
+    template = np.median(np.stack(grays), axis=0).astype(np.uint8)
+
+    edges = preprocess_for_matching(template)
+    rows = np.flatnonzero(edges.any(axis=1))
+    cols = np.flatnonzero(edges.any(axis=0))
+    if len(rows) == 0:
+        return template
+    y1, y2 = max(0, rows[0] - TEMPLATE_MARGIN), min(template.shape[0], rows[-1] + 1 + TEMPLATE_MARGIN)
+    x1, x2 = max(0, cols[0] - TEMPLATE_MARGIN), min(template.shape[1], cols[-1] + 1 + TEMPLATE_MARGIN)
+    return template[y1:y2, x1:x2].copy()
+
+
+@dataclass
+class NameTemplateBank:
+    """キャラクターごとのキャラクター名テンプレート（グレースケール）"""
+
+    crop_size: tuple[int, int]  # テンプレートを作成した切り抜き画像の大きさ (width, height)
+    templates: dict[str, list[tuple[str, np.ndarray]]] = field(default_factory=dict)  # 1p/2p → [(キャラクター名, 画像)]
+    # 1p/2p → (キャラクター名のリスト, 切り抜き画像ごとの特徴ベクトル)。近傍探索などの別の認識器向け（任意）
+    features: dict[str, tuple[list[str], np.ndarray]] = field(default_factory=dict)
+    # ホールドアウト評価の正解率から求めた採用の下限（select_min_confidence、None で未評価）
+    min_confidence: float | None = None
+
+    def characters(self) -> set[str]:
+        """テンプレートのあるキャラクター名"""
+        return {label for entries in self.templates.values() for label, _ in entries}
+
+    def save(self, path: str | Path) -> None:
+        """
+        .npz 形式で保存
+
+        テンプレートは大きさが異なるため、最大の大きさにゼロ埋めして side ごとに1つの配列にまとめ、
+        元の大きさ（sizes_<side>）・キャラクター名（labels_<side>）と一緒に保存する。
+        特徴ベクトルは features_<side>（切り抜き画像数 × 次元）・feature_labels_<side> に、
+        採用の下限は min_confidence に保存する。
+        """
+        arrays: dict[str, np.ndarray] = {"crop_size": np.array(self.crop_size, dtype=np.int32)}
+        if self.min_confidence is not None:
+            arrays["min_confidence"] = np.array(self.min_confidence, dtype=np.float64)
+        for side in SIDES:
+            entries = self.templates.get(side, [])
+            height = max((image.shape[0] for _, image in entries), default=0)
+            width = max((image.shape[1] for _, image in entries), default=0)
+            stacked = np.zeros((len(entries), height, width), dtype=np.uint8)
+            for i, (_, image) in enumerate(entries):
+                stacked[i, : image.shape[0], : image.shape[1]] = image
+            arrays[f"templates_{side}"] = stacked
+            arrays[f"sizes_{side}"] = np.array([image.shape[:2] for _, image in entries], dtype=np.int32).reshape(-1, 2)
+            arrays[f"labels_{side}"] = np.array([label for label, _ in entries], dtype=np.str_)
+            if side in self.features:
+                feature_labels, vectors = self.features[side]
+                arrays[f"features_{side}"] = vectors
+                arrays[f"feature_labels_{side}"] = np.array(feature_labels, dtype=np.str_)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "NameTemplateBank":
+        """
+        save() で保存した .npz を読み込み
+
+        Raises:
+            FileNotFoundError: ファイルが見つからない場合
+        """
+        with np.load(path) as data:
+            width, height = (int(v) for v in data["crop_size"])
+            templates: dict[str, list[tuple[str, np.ndarray]]] = {}
+            features: dict[str, tuple[list[str], np.ndarray]] = {}
+            for side in SIDES:
+                stacked = data[f"templates_{side}"]
+                templates[side] = [
+                    (str(label), stacked[i, :h, :w].copy())
+                    for i, (label, (h, w)) in enumerate(zip(data[f"labels_{side}"], data[f"sizes_{side}"], strict=True))
+                ]
+                if f"features_{side}" in data:
+                    feature_labels = [str(label) for label in data[f"feature_labels_{side}"]]
+                    features[side] = (feature_labels, data[f"features_{side}"])
+            min_confidence = float(data["min_confidence"]) if "min_confidence" in data else None
+        return cls(crop_size=(width, height), templates=templates, features=features, min_confidence=min_confidence)
+
+
+@dataclass
+class LocalRecognition:
+    """ローカル認識の結果"""
+
+    characters: dict[str, str]  # 1p/2p → キャラクター名（テンプレートなしの場合は空文字）
+    confidence: dict[str, float]  # 1p/2p → 照合の余裕のスコア (0.0-1.0、較正していない)
+    accepted: bool  # 左右とも余裕のスコアが min_confidence 以上か
+
+
+class LocalCharacterClassifier:
+    """キャラクター名テンプレートとの照合によるローカル認識器"""
+
+    def __init__(
+        self,
+        bank: NameTemplateBank,
+        min_confidence: float | None = None,
+        score_threshold: float = 0.5,
+        margin_threshold: float = 0.1,
+    ):
+        """
+        Args:
+            bank: キャラクター名テンプレート
+            min_confidence: 認識結果として採用する余裕のスコアの下限（左右とも）。
+                None でテンプレートに保存した下限を使い、それもない場合はローカル認識の結果を採用しない
+            score_threshold: 最もスコアの高いキャラクターのスコアの閾値
+            margin_threshold: 2番目にスコアの高いキャラクターとのスコアの差の閾値
+        """
+        if min_confidence is None:
+            min_confidence = bank.min_confidence
+        if min_confidence is not None and not 0.0 <= min_confidence <= 1.0:
+            raise ValueError(f"min_confidence must be between 0.0 and 1.0, got {min_confidence}")
+
+        self.crop_size = bank.crop_size
+        self.min_confidence = min_confidence
+        self.score_threshold = score_threshold
+        self.margin_threshold = margin_threshold
+
+        # side ごとにエッジ画像のテンプレートを一括照合する
+        self._labels: dict[str, list[str]] = {}
+        self._banks: dict[str, TemplateBank] = {}
+        for side in SIDES:
+            entries = bank.templates.get(side, [])
+            self._labels[side] = [label for label, _ in entries]
+            self._banks[side] = TemplateBank([preprocess_for_matching(image) for _, image in entries])
+
+        logger.info(
+            "Local character classifier: %d characters, %d/%d templates (min_confidence=%s)",
+            len(bank.characters()),
+            len(self._labels["1p"]),
+            len(self._labels["2p"]),
+            min_confidence,
+        )
+        if min_confidence is None:
+            logger.warning(
+                "Template bank has no evaluated min_confidence. Local results are not accepted "
+                "(rebuild with build_name_template_bank.py --holdout-every or set RECOGNITION_LOCAL_MIN_CONFIDENCE)"
+            )
+
+    @classmethod
+    def from_file(cls, path: str | Path, **kwargs: float | None) -> "LocalCharacterClassifier":
+        """NameTemplateBank の .npz ファイルから作成"""
+        return cls(NameTemplateBank.load(path), **kwargs)
+
+    def margin_score(self, best_score: float, second_score: float) -> float:
+        """
+        1つの side の照合の余裕のスコア（0.0-1.0）
+
+        最もスコアの高いキャラクターのスコアの閾値からの余裕と、2番目のキャラクターとの差の閾値からの余裕の
+        うち小さい方を utils.scoring.margin_score で変換する（余裕 0 で 0.5）。
+        """
+        return margin_score(min(best_score - self.score_threshold, best_score - second_score - self.margin_threshold))
+
+    def _classify_side(self, side: str, image: np.ndarray) -> tuple[str, float]:
+        labels = self._labels[side]
+        if not labels:
+            return "", 0.0
+
+        # キャラクターごとの最大スコア（複数テンプレートの最大値）
+        best_by_label: dict[str, float] = {}
+        for label, score in zip(labels, self._banks[side].max_scores(preprocess_for_matching(image)), strict=True):
+            best_by_label[label] = max(best_by_label.get(label, -1.0), float(score))
+        ranked = sorted(best_by_label.items(), key=lambda item: item[1], reverse=True)
+        best_label, best_score = ranked[0]
+        second_score = ranked[1][1] if len(ranked) > 1 else 0.0
+        return best_label, self.margin_score(best_score, second_score)
+
+    def classify(self, crop: np.ndarray) -> LocalRecognition:
+        """
+        キャラクター名の切り抜き画像を左右それぞれテンプレートと照合
+
+        Args:
+            crop: キャラクター名の切り抜き画像 (BGR)
+
+        Returns:
+            LocalRecognition
+        """
+        if (crop.shape[1], crop.shape[0]) != self.crop_size:
+            crop = cv2.resize(crop, self.crop_size, interpolation=cv2.INTER_AREA)
+
+        characters: dict[str, str] = {}
+        confidence: dict[str, float] = {}
+        for side, image in split_sides(crop).items():
+            characters[side], confidence[side] = self._classify_side(side, image)
+
+        accepted = self.min_confidence is not None and all(
+            characters[side] and confidence[side] >= self.min_confidence for side in SIDES
+        )
+        logger.debug(
+            "Local recognition: 1p=%s (%.3f) | 2p=%s (%.3f) | accepted=%s",
+            characters["1p"],
+            confidence["1p"],
+            characters["2p"],
+            confidence["2p"],
+            accepted,
+        )
+        return LocalRecognition(characters=characters, confidence=confidence, accepted=accepted)
+
+
+def select_min_confidence(scores: list[float], correct: list[bool], target_accuracy: float = 0.99) -> float | None:
+    """
+    ホールドアウト評価の結果から採用の下限を選択
+
+    下限を 0.50 から 0.01 刻みで上げたとき、それ以上のすべての下限で採用した切り抜き画像の正解率が
+    target_accuracy 以上になる最小の下限を返す（採用数が最も多くなる）。
+
+    Args:
+        scores: 切り抜き画像ごとの左右の余裕のスコアの小さい方
+        correct: 切り抜き画像ごとに左右とも正解したか
+        target_accuracy: 採用した切り抜き画像の正解率の下限
+
+    Returns:
+        採用の下限（どの下限でも正解率を満たさない・採用がない場合は None）
+    """
+    selected: float | None = None
+    for threshold in np.round(np.arange(0.99, 0.495, -0.01), 2):
+        accepted = [ok for score, ok in zip(scores, correct, strict=True) if score >= threshold]
+        if not accepted:
+            continue
+        if sum(accepted) / len(accepted) < target_accuracy:
+            break
+        selected = float(threshold)
+    return selected
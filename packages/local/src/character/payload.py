@@ -0,0 +1,156 @@
+"""
+Gemini API に送信するキャラクター名の切り抜き画像のエンコード
+
+切り抜き画像（1080p で 1568x94）は大部分が平坦なバナーで、フル解像度の RGB のまま送信すると
+アップロード量も画像トークンも必要以上に大きい。Gemini は 384x384 を超える画像を 768x768 のタイルに
+分割してタイルごとに課金するため、幅を TILE_SIZE 以下に縮小すると切り抜き画像1枚が1タイルに収まる
+（1568x94 → 768x46）。縮小した画像をグレースケール（任意で2値化）にして JPEG / WebP で圧縮できる。
+既定は従来と同じフル解像度のカラー PNG（縮小・グレースケールでの認識精度を実配信の切り抜き画像で確認するまで）。
+
+mosaic_rows を指定すると、複数の切り抜き画像を縦に並べ左端に番号（バッチの index）を書いた
+1枚の画像にまとめる（タイル1枚に複数フレームを詰める）。
+"""
+
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+# Gemini の画像タイルの大きさ（ピクセル）
+TILE_SIZE = 768
+
+# モザイク画像の番号欄の幅・行の間隔（ピクセル）
+LABEL_WIDTH = 48
+ROW_GAP = 4
+
+# 形式 → (拡張子, MIME タイプ, 品質のパラメータ)
+FORMATS: dict[str, tuple[str, str, int | None]] = {
+    "jpeg": (".jpg", "image/jpeg", cv2.IMWRITE_JPEG_QUALITY),
+    "webp": (".webp", "image/webp", cv2.IMWRITE_WEBP_QUALITY),
+    "png": (".png", "image/png", None),
+}
+
+
+@dataclass
+class EncodedImage:
+    """エンコード済みの送信画像"""
+
+    data: bytes
+    mime_type: str
+    frames: int  # 含まれる切り抜き画像の数（モザイク画像は行数）
+
+
+class PayloadEncoder:
+    """キャラクター名の切り抜き画像を送信用に縮小・圧縮するエンコーダ"""
+
+    def __init__(
+        self,
+        max_width: int = 0,
+        grayscale: bool = False,
+        binarize: bool = False,
+        image_format: str = "png",
+        quality: int = 90,
+        mosaic_rows: int = 0,
+    ):
+        """
+        Args:
+            max_width: 送信する画像の幅の上限（これより広い切り抜き画像は縦横比を保って縮小、0 で縮小しない）
+            grayscale: グレースケールにするか
+            binarize: 大津の2値化を行うか（グレースケールにしてから2値化する）
+            image_format: 画像形式（jpeg / webp / png）
+            quality: JPEG / WebP の品質（1-100）
+            mosaic_rows: バッチ送信で1枚の画像に縦に並べる切り抜き画像の数（0 でまとめない）
+        """
+        if image_format not in FORMATS:
+            raise ValueError(f"image_format must be one of {sorted(FORMATS)}, got {image_format!r}")
+        if not 1 <= quality <= 100:
+            raise ValueError(f"quality must be between 1 and 100, got {quality}")
+
+        self.max_width = max_width
+        self.grayscale = grayscale or binarize
+        self.binarize = binarize
+        self.image_format = image_format
+        self.quality = quality
+        self.mosaic_rows = mosaic_rows
+
+    @property
+    def cache_key(self) -> str:
+        """送信する画像の設定（認識結果キャッシュのキーに含め、設定が変わったら認識し直す）"""
+        color = "binary" if self.binarize else "gray" if self.grayscale else "color"
+        quality = f"q{self.quality}" if FORMATS[self.image_format][2] is not None else ""
+        return f"w{self.max_width}-{color}-{self.image_format}{quality}-m{self.mosaic_rows}"
+
+    def prepare(self, frame: np.ndarray, max_width: int | None = None) -> np.ndarray:
+        """
+        切り抜き画像を縮小・グレースケール化（エンコード前の画像）
+
+        Args:
+            frame: 切り抜き画像 (BGR)
+            max_width: 幅の上限（省略時は self.max_width）
+
+        Returns:
+            BGR またはグレースケールの画像
+        """
+        max_width = self.max_width if max_width is None else max_width
+        height, width = frame.shape[:2]
+        if 0 < max_width < width:
+            size = (max_width, max(1, round(height * max_width / width)))
+            frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+        if self.grayscale and len(frame.shape) == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self.binarize:
+            _, frame = cv2.threshold(frame, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        return frame
+
+    def encode(self, frame: np.ndarray) -> EncodedImage:
+        """切り抜き画像1枚をエンコード"""
+        return self._encode_image(self.prepare(frame), frames=1)
+
+    def encode_batch(self, frames: list[np.ndarray]) -> list[EncodedImage]:
+        """
+        バッチ送信の切り抜き画像をエンコード
+
+        mosaic_rows が 0 の場合は1枚ずつ、それ以外は mosaic_rows 枚ずつ番号付きのモザイク画像にまとめる。
+        番号はバッチ内の index（1始まり）。
+        """
+        if self.mosaic_rows <= 0:
+            return [self.encode(frame) for frame in frames]
+
+        encoded: list[EncodedImage] = []
+        for start in range(0, len(frames), self.mosaic_rows):
+            rows = frames[start : start + self.mosaic_rows]
+            encoded.append(self._encode_image(self._mosaic(rows, first_index=start + 1), frames=len(rows)))
+        return encoded
+
+    def _mosaic(self, frames: list[np.ndarray], first_index: int) -> np.ndarray:
+        """切り抜き画像を縦に並べ、各行の左端に番号を書いたモザイク画像"""
+        max_width = self.max_width - LABEL_WIDTH if self.max_width > 0 else 0
+        images = [self.prepare(frame, max_width) for frame in frames]
+        if not self.grayscale:
+            # グレースケールの切り抜き画像（前処理済み）が混ざる場合は BGR に揃える
+            images = [image if len(image.shape) == 3 else cv2.cvtColor(image, cv2.COLOR_GRAY2BGR) for image in images]
+
+        width = LABEL_WIDTH + max(image.shape[1] for image in images)
+        height = sum(image.shape[0] for image in images) + ROW_GAP * (len(images) - 1)
+        mosaic = np.zeros((height, width) if self.grayscale else (height, width, 3), dtype=np.uint8)
+
+        y = 0
+        for i, image in enumerate(images):
+            row_height, row_width = image.shape[:2]
+            mosaic[y : y + row_height, LABEL_WIDTH : LABEL_WIDTH + row_width] = image
+            label = str(first_index + i)
+            scale = row_height / 50
+            (text_width, text_height), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, scale, 2)
+            origin = ((LABEL_WIDTH - text_width) // 2, y + (row_height + text_height) // 2)
+            cv2.putText(mosaic, label, origin, cv2.FONT_HERSHEY_SIMPLEX, scale, (255, 255, 255), 2)
+            y += row_height + ROW_GAP
+        return mosaic
+
+    def _encode_image(self, image: np.ndarray, frames: int) -> EncodedImage:
+        extension, mime_type, quality_param = FORMATS[self.image_format]
+        params = [quality_param, self.quality] if quality_param is not None else []
+        ok, buffer = cv2.imencode(extension, image, params)
+        if not ok:
+            raise ValueError(f"Failed to encode image as {self.image_format}")
+        return EncodedImage(data=buffer.tobytes(), mime_type=mime_type, frames=frames)
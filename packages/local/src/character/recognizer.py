@@ -3,9 +3,13 @@ Gemini APIを使用したキャラクター認識（Vertex AI経由）
 画像からSF6のキャラクター名を認識
 """
 
+import asyncio
+import hashlib
 import json
 import os
-import time
+import random
+import sqlite3
+from collections.abc import Callable
 from typing import Any
 
 import cv2
@@ -16,16 +20,29 @@ from PIL import Image
 
 from ..auth import get_oauth_credentials
 from ..utils.logger import get_logger
+from ..utils.metrics import record
+from .cache import RecognitionCache, RecognitionResult, perceptual_hash
+from .clustering import cluster_near_duplicates
+from .local_classifier import LocalCharacterClassifier
+from .payload import EncodedImage, PayloadEncoder
 
 logger = get_logger()
 
 # 認識できなかった場合の定数
 UNKNOWN_CHARACTER = "UNKNOWN"
 
+# プロンプトのバージョン（プロンプト・レスポンススキーマを変更したら更新し、認識結果キャッシュを無効化する）
+PROMPT_VERSION = "adr042-1"
+
 # ADR-042: Vertex AI Flex PayGo のリトライ/タイムアウト設定
 _FLEX_TIMEOUT_MS = 1_800_000  # 30分（Vertex AI Flex PayGo の最大タイムアウト）
 _FLEX_MAX_RETRIES = 3
 _FLEX_BASE_DELAY_SEC = 5
+_BACKOFF_JITTER = 0.5  # バックオフの待機時間を ±50% の範囲でばらつかせる
+
+# バッチ送信を分割する枚数（ADR-042 の検証で全件一致した18枚）・同時に送信するリクエスト数の既定値
+DEFAULT_BATCH_CHUNK_SIZE = 18
+DEFAULT_MAX_CONCURRENCY = 4
 
 # ADR-042: Vertex AI Flex PayGo を使うためのリクエストヘッダー
 # 公式: https://docs.cloud.google.com/vertex-ai/docs/flex-paygo
@@ -48,6 +65,12 @@ class CharacterRecognizer:
         project_id: str | None = None,
         location: str = "global",
         use_flex: bool = True,
+        cache: RecognitionCache | None = None,
+        cluster_distance: float = 0.0,
+        local_classifier: LocalCharacterClassifier | None = None,
+        batch_chunk_size: int = DEFAULT_BATCH_CHUNK_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        payload_encoder: PayloadEncoder | None = None,
     ):
         """
         Args:
@@ -62,7 +85,18 @@ class CharacterRecognizer:
             use_flex: Vertex AI Flex PayGo を使うかどうか（ADR-042）
                 - True: Flex PayGo（50% off、~30分まで待機、sheddable）。Standard へ自動フォールバックする。
                 - False: Standard PayGo のみで実行
+            cache: 認識結果キャッシュ（None でキャッシュしない）。ヒットしたフレームは API に送信しない
+            cluster_distance: 近似重複とみなす切り抜き画像の距離の上限（clustering.crop_distance、0 で無効）。
+                近似重複のフレームは代表の1枚のみ API に送信し、結果を共有する
+            local_classifier: キャラクター名テンプレートとの照合によるローカル認識器（None で無効）。
+                左右とも余裕のスコアが採用の下限以上のフレームは API に送信しない
+            batch_chunk_size: バッチ送信1リクエストあたりの最大フレーム数（0 で全フレームを1リクエスト）
+            max_concurrency: 同時に送信するリクエスト数の上限（チャンク・個別送信のフォールバックで共有）
+            payload_encoder: 送信する切り抜き画像のエンコーダ（None で既定のフル解像度のカラー PNG）
         """
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+
         # OAuth2認証を使用（Vertex AI経由、YouTube APIと共通）
         project_id = project_id or os.environ.get("GOOGLE_CLOUD_PROJECT")
         if not project_id:
@@ -93,6 +127,16 @@ class CharacterRecognizer:
         self.valid_characters: list[str] = []
         self._load_aliases(aliases_path)
 
+        # 認識結果キャッシュのキー（有効なキャラクター名が変わったら別のキーになる）
+        self.cache = cache
+        self.cluster_distance = cluster_distance
+        self.local_classifier = local_classifier
+        self.batch_chunk_size = batch_chunk_size
+        self.max_concurrency = max_concurrency
+        self.payload_encoder = payload_encoder or PayloadEncoder()
+        characters_digest = hashlib.sha1(",".join(self.valid_characters).encode("utf-8")).hexdigest()[:12]
+        self.prompt_version = f"{PROMPT_VERSION}-{characters_digest}"
+
     def _build_client(self, extra_headers: dict[str, str] | None) -> genai.Client:
         """Vertex AI 用の genai.Client を構築する（Flex/Standard で別インスタンスを使う）"""
         headers: dict[str, str] = {}
@@ -172,60 +216,192 @@ class CharacterRecognizer:
             return code in (429, 503)
         return False
 
-    def _generate_with_retry(
+    def _to_parts(self, images: list[EncodedImage]) -> list[genai.types.Part]:
+        """エンコード済みの画像を API の Part に変換し、送信バイト数を記録"""
+        record(
+            "recognition",
+            payload_bytes=sum(len(image.data) for image in images),
+            payload_frames=sum(image.frames for image in images),
+        )
+        return [genai.types.Part.from_bytes(data=image.data, mime_type=image.mime_type) for image in images]
+
+    async def _generate(
         self,
+        client: genai.Client,
         contents: list[Any],
         config: genai.types.GenerateContentConfig,
+        semaphore: asyncio.Semaphore,
+    ) -> Any:
+        """同時リクエスト数を semaphore で制限して API を呼び出す"""
+        async with semaphore:
+            return await client.aio.models.generate_content(
+                model=self.model_name,
+                contents=contents,
+                config=config,
+            )
+
+    async def _generate_with_retry(
+        self,
+        contents: list[Any],
+        config: genai.types.GenerateContentConfig,
+        semaphore: asyncio.Semaphore,
     ) -> Any:
         """
         ADR-042: Flex PayGo 用のリトライ + Standard フォールバック付き API 呼び出し
 
         1. Flex クライアント（ヘッダー付き）で実行
-        2. 503/429 のときは指数バックオフでリトライ
+        2. 503/429 のときはジッター付き指数バックオフでリトライ
+           （待機中は semaphore を解放するため、他のチャンク・個別送信は待たずに進む）
         3. リトライ枯渇したら Standard クライアントで再試行
         """
         # use_flex=False のときは Standard で一発実行
         if self.flex_client is None:
-            return self.standard_client.models.generate_content(
-                model=self.model_name,
-                contents=contents,
-                config=config,
-            )
+            record("recognition", api_calls=1)
+            return await self._generate(self.standard_client, contents, config, semaphore)
 
         # Flex リトライ
         last_exc: Exception | None = None
         for attempt in range(_FLEX_MAX_RETRIES):
             try:
-                return self.flex_client.models.generate_content(
-                    model=self.model_name,
-                    contents=contents,
-                    config=config,
-                )
+                record("recognition", api_calls=1, retries=1 if attempt > 0 else 0)
+                return await self._generate(self.flex_client, contents, config, semaphore)
             except Exception as exc:
                 if not self._is_retryable_error(exc):
                     raise
                 last_exc = exc
                 if attempt < _FLEX_MAX_RETRIES - 1:
-                    delay = _FLEX_BASE_DELAY_SEC * (2**attempt)
+                    # 同時に混雑したリクエストが同じタイミングで再送しないようジッターを加える
+                    jitter = random.uniform(1 - _BACKOFF_JITTER, 1 + _BACKOFF_JITTER)
+                    delay = _FLEX_BASE_DELAY_SEC * (2**attempt) * jitter
                     logger.warning(
-                        "Flex PayGo busy (attempt %d/%d): %s. Retrying in %ds...",
+                        "Flex PayGo busy (attempt %d/%d): %s. Retrying in %.1fs...",
                         attempt + 1,
                         _FLEX_MAX_RETRIES,
                         exc,
                         delay,
                     )
-                    time.sleep(delay)
+                    await asyncio.sleep(delay)
 
         # Standard フォールバック
         logger.warning(
             "Flex PayGo retries exhausted (last error: %s). Falling back to Standard PayGo.",
             last_exc,
         )
-        return self.standard_client.models.generate_content(
-            model=self.model_name,
-            contents=contents,
-            config=config,
+        record("recognition", api_calls=1, standard_fallbacks=1)
+        return await self._generate(self.standard_client, contents, config, semaphore)
+
+    def _recognize_local_first(
+        self,
+        frames: list[np.ndarray],
+        recognize: Callable[[list[np.ndarray]], list[RecognitionResult]],
+    ) -> list[RecognitionResult]:
+        """
+        ローカル認識器で認識し、採用しなかったフレームのみ認識結果キャッシュ → recognize で認識
+
+        ローカル認識の結果は生の認識結果にも正規名を入れる（テンプレートのキャラクター名は正規名）。
+        """
+        if self.local_classifier is None or not frames:
+            return self._recognize_cached(frames, recognize)
+
+        results: list[RecognitionResult | None] = []
+        pending: list[int] = []
+        for i, frame in enumerate(frames):
+            local = self.local_classifier.classify(frame)
+            if local.accepted and all(self.is_valid_character(name) for name in local.characters.values()):
+                results.append((dict(local.characters), dict(local.characters)))
+            else:
+                results.append(None)
+                pending.append(i)
+
+        accepted = len(frames) - len(pending)
+        logger.info(
+            "Local recognition: %d/%d frames accepted, %d sent to Gemini (min_confidence=%s)",
+            accepted,
+            len(frames),
+            len(pending),
+            self.local_classifier.min_confidence,
+        )
+        record("recognition", local_hits=accepted, local_fallbacks=len(pending))
+
+        if pending:
+            fallback = self._recognize_cached([frames[i] for i in pending], recognize)
+            for i, result in zip(pending, fallback, strict=True):
+                results[i] = result
+        return [result for result in results if result is not None]
+
+    def _cache_version(self) -> str:
+        """認識結果キャッシュのキーのバージョン（プロンプトと送信する画像の設定）"""
+        return f"{self.prompt_version}-{self.payload_encoder.cache_key}"
+
+    def _recognize_cached(
+        self,
+        frames: list[np.ndarray],
+        recognize: Callable[[list[np.ndarray]], list[RecognitionResult]],
+    ) -> list[RecognitionResult]:
+        """
+        認識結果キャッシュを引き、ヒットしなかったフレームのみ recognize で認識してキャッシュに保存
+
+        同じ知覚ハッシュのフレームは1回だけ認識し、近似重複のフレームはまとめて代表のみ認識する。
+        UNKNOWN を含む結果はキャッシュしない（再試行の余地を残す）。
+        キャッシュの読み書きに失敗した場合はキャッシュなしで認識する。
+        """
+        if self.cache is None or not frames:
+            return self._recognize_clustered(frames, recognize)
+
+        hashes = [perceptual_hash(frame) for frame in frames]
+        try:
+            cached = self.cache.get_many(hashes, self.model_name, self._cache_version())
+        except sqlite3.Error:
+            logger.exception("Recognition cache lookup failed. Recognizing without cache.")
+            return self._recognize_clustered(frames, recognize)
+
+        misses: dict[str, np.ndarray] = {}
+        for image_hash, frame in zip(hashes, frames, strict=True):
+            if image_hash not in cached:
+                misses.setdefault(image_hash, frame)
+        hit_count = sum(1 for image_hash in hashes if image_hash in cached)
+        logger.info("Recognition cache: %d hits, %d misses", hit_count, len(hashes) - hit_count)
+        record("recognition", cache_hits=hit_count, cache_misses=len(hashes) - hit_count)
+
+        if misses:
+            recognized = dict(zip(misses, self._recognize_clustered(list(misses.values()), recognize), strict=True))
+            cacheable = {
+                image_hash: result
+                for image_hash, result in recognized.items()
+                if UNKNOWN_CHARACTER not in result[0].values()
+            }
+            try:
+                self.cache.put_many(cacheable, self.model_name, self._cache_version())
+            except sqlite3.Error:
+                logger.exception("Failed to store %d recognition results in cache", len(cacheable))
+            cached.update(recognized)
+
+        return [cached[image_hash] for image_hash in hashes]
+
+    def _recognize_clustered(
+        self,
+        frames: list[np.ndarray],
+        recognize: Callable[[list[np.ndarray]], list[RecognitionResult]],
+    ) -> list[RecognitionResult]:
+        """
+        近似重複のフレームをまとめ、各クラスタの代表のみを recognize で認識して結果をクラスタ全体に割り当てる
+
+        cluster_distance が 0 以下の場合はまとめずに全フレームを認識する。
+        """
+        assignments = cluster_near_duplicates(frames, self.cluster_distance)
+        representatives = sorted(set(assignments))
+        if len(representatives) == len(frames):
+            return recognize(frames)
+
+        logger.info(
+            "Near-duplicate clustering: %d frames -> %d representatives (max_distance=%.3f)",
+            len(frames),
+            len(representatives),
+            self.cluster_distance,
         )
+        record("recognition", clustered_frames=len(frames) - len(representatives))
+        recognized = dict(zip(representatives, recognize([frames[i] for i in representatives]), strict=True))
+        return [recognized[rep] for rep in assignments]
 
     # ---------------------------------------------------------------------
     # 個別認識（ADR-033 再認識フローや単発テストで使用）
@@ -261,7 +437,7 @@ class CharacterRecognizer:
         save_debug_image: str | None = None,
     ) -> tuple[dict[str, str], dict[str, str]]:
         """
-        フレーム画像からキャラクターを認識（1リクエスト）
+        フレーム画像からキャラクターを認識（1リクエスト、ローカル認識・認識結果キャッシュで確定した場合は送信しない）
 
         Args:
             frame: OpenCV形式のフレーム（BGR）
@@ -270,11 +446,22 @@ class CharacterRecognizer:
         Returns:
             (正規化済み結果, 生の認識結果)のタプル
         """
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        pil_image = Image.fromarray(frame_rgb)
-
         if save_debug_image:
-            pil_image.save(save_debug_image)
+            Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)).save(save_debug_image)
+
+        return self._recognize_local_first([frame], lambda misses: [self._recognize_single(f) for f in misses])[0]
+
+    def _recognize_single(self, frame: np.ndarray) -> tuple[dict[str, str], dict[str, str]]:
+        """1フレームを1リクエストで認識（キャッシュなし）"""
+        return asyncio.run(self._recognize_single_async(frame, asyncio.Semaphore(1)))
+
+    async def _recognize_single_async(
+        self,
+        frame: np.ndarray,
+        semaphore: asyncio.Semaphore,
+    ) -> tuple[dict[str, str], dict[str, str]]:
+        """1フレームを1リクエストで認識（キャッシュなし、非同期）"""
+        image = self.payload_encoder.encode(frame)
 
         prompt = self._build_single_prompt()
         config_kwargs = self._build_base_config_kwargs()
@@ -289,11 +476,14 @@ class CharacterRecognizer:
         config = genai.types.GenerateContentConfig(**config_kwargs)
 
         logger.debug(
-            "Calling Gemini API (model=%s, tier=%s) for single frame",
+            "Calling Gemini API (model=%s, tier=%s) for single frame (%d bytes)",
             self.model_name,
             "flex" if self.use_flex else "standard",
+            len(image.data),
+        )
+        response = await self._generate_with_retry(
+            contents=[prompt, *self._to_parts([image])], config=config, semaphore=semaphore
         )
-        response = self._generate_with_retry(contents=[prompt, pil_image], config=config)
         raw_result = json.loads(response.text)
 
         normalized_result = {
@@ -317,6 +507,8 @@ class CharacterRecognizer:
         前処理を適用してからキャラクターを再認識（ADR-033）
 
         ADR-042: 再認識は対象が 1〜数フレームに限定されるためバッチ化せず個別送信のまま維持する。
+        ローカル認識・近似重複のまとめ・認識結果キャッシュは使わず、必ず Gemini API で認識する
+        （ローカル認識はエッジで照合するため、前処理後の画像にも元の画像と同じ結果を返す）。
 
         Args:
             frame: OpenCV形式のフレーム（BGR）
@@ -328,18 +520,29 @@ class CharacterRecognizer:
         from ..detection.preprocessing import preprocess_for_recognition
 
         preprocessed = preprocess_for_recognition(frame, method=method)
-        return self.recognize_from_frame(preprocessed)
+        return self._recognize_single(preprocessed)
 
     # ---------------------------------------------------------------------
     # バッチ認識（ADR-042）
     # ---------------------------------------------------------------------
 
-    def _build_batch_prompt(self, num_images: int) -> str:
-        """ADR-042: バッチ送信用プロンプト（検証Notebookで100%一致を達成したもの）"""
+    def _build_batch_prompt(self, num_images: int, mosaic: bool = False) -> str:
+        """
+        ADR-042: バッチ送信用プロンプト（検証Notebookで100%一致を達成したもの）
+
+        mosaic=True の場合は、複数の切り抜き画像を縦に並べ左端に番号を書いたモザイク画像（PayloadEncoder）用の説明にする。
+        """
         char_list = ", ".join(self.valid_characters)
+        if mosaic:
+            order = (
+                f"画像には image 1 から image {num_images} までが1行ずつ縦に並んでおり、"
+                "各行の左端の番号がその行の image の番号です。\n"
+            )
+        else:
+            order = f"画像は image 1 から image {num_images} までの順番で提示されます。\n"
         return (
             "あなたはOCR専門家です。以下の複数画像はそれぞれストリートファイター6のラウンド開始画面です。\n"
-            f"画像は image 1 から image {num_images} までの順番で提示されます。\n"
+            f"{order}"
             "各画像について、画面上部左のキャラクター名を1p、右側のキャラクター名を2pとして認識してください。\n\n"
             "【重要】文字数を必ず確認してください:\n"
             "- 'JP' は2文字のみです。絶対に 'JAMIE'（5文字）ではありません。\n"
@@ -354,9 +557,13 @@ class CharacterRecognizer:
         frames: list[np.ndarray],
     ) -> list[tuple[dict[str, str], dict[str, str]]]:
         """
-        複数フレームを1リクエストで一括認識（ADR-042）
+        複数フレームをまとめて一括認識（ADR-042）
 
-        バッチ送信が失敗 or 一部 index が欠損した場合は、該当フレームのみ個別送信にフォールバックする。
+        ローカル認識器で採用したフレーム・認識結果キャッシュにヒットしたフレームは送信せず、
+        残りのフレームのみ送信する。
+        近似重複のフレーム（同じ組み合わせの連戦など）は代表の1枚のみ送信し、結果を共有する。
+        送信するフレームは batch_chunk_size 枚ごとのチャンクに分け、最大 max_concurrency リクエストを並行して送信する。
+        バッチ送信が失敗 or 一部 index が欠損した場合は、該当フレームのみ個別送信（並行）にフォールバックする。
 
         Args:
             frames: OpenCV形式のフレームリスト
@@ -364,20 +571,65 @@ class CharacterRecognizer:
         Returns:
             各フレームの (正規化済み結果, 生の認識結果) リスト（入力順）
         """
+        return self._recognize_local_first(frames, self._recognize_frames_uncached)
+
+    def _recognize_frames_uncached(
+        self,
+        frames: list[np.ndarray],
+    ) -> list[tuple[dict[str, str], dict[str, str]]]:
+        """複数フレームをチャンクごとのバッチ送信で一括認識（キャッシュなし）"""
         if not frames:
             return []
+        return asyncio.run(self._recognize_frames_async(frames))
+
+    async def _recognize_frames_async(
+        self,
+        frames: list[np.ndarray],
+    ) -> list[tuple[dict[str, str], dict[str, str]]]:
+        """フレームを batch_chunk_size 枚ごとのチャンクに分け、並行してバッチ送信"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        chunk_size = self.batch_chunk_size if self.batch_chunk_size > 0 else len(frames)
+        chunks = [frames[i : i + chunk_size] for i in range(0, len(frames), chunk_size)]
+        if len(chunks) > 1:
+            logger.info(
+                "Splitting %d frames into %d batches of up to %d frames (max %d concurrent requests)",
+                len(frames),
+                len(chunks),
+                chunk_size,
+                self.max_concurrency,
+            )
+        record("recognition", batch_chunks=len(chunks))
+
+        chunk_results = await asyncio.gather(
+            *(self._recognize_chunk(chunk, semaphore, offset=i * chunk_size) for i, chunk in enumerate(chunks))
+        )
+        return [result for results in chunk_results for result in results]
+
+    async def _recognize_chunk(
+        self,
+        frames: list[np.ndarray],
+        semaphore: asyncio.Semaphore,
+        offset: int = 0,
+    ) -> list[tuple[dict[str, str], dict[str, str]]]:
+        """
+        1チャンクを1リクエストで一括認識
 
+        Args:
+            frames: チャンクのフレームリスト
+            semaphore: 同時リクエスト数の制限
+            offset: チャンクの先頭フレームの位置（ログ用）
+        """
         num = len(frames)
 
         # バッチ送信を試行
         try:
-            batch_raw = self._call_batch_api(frames)
+            batch_raw = await self._call_batch_api(frames, semaphore)
         except Exception:
             logger.exception(
                 "Batch recognition failed entirely. Falling back to individual recognition for all %d frames.",
                 num,
             )
-            return self._recognize_individually(frames)
+            return await self._recognize_individually(frames, semaphore, [offset + i for i in range(1, num + 1)])
 
         # index でレスポンスを正規化（1始まり）
         results_by_index: dict[int, dict[str, str]] = {}
@@ -400,9 +652,9 @@ class CharacterRecognizer:
                 "2p": self.normalize_character_name(raw["2p"]),
             }
             if normalized["1p"] == UNKNOWN_CHARACTER:
-                logger.warning("Batch index=%d: failed to recognize 1p, raw=%s", i, raw["1p"])
+                logger.warning("Batch index=%d: failed to recognize 1p, raw=%s", offset + i, raw["1p"])
             if normalized["2p"] == UNKNOWN_CHARACTER:
-                logger.warning("Batch index=%d: failed to recognize 2p, raw=%s", i, raw["2p"])
+                logger.warning("Batch index=%d: failed to recognize 2p, raw=%s", offset + i, raw["2p"])
             results.append((normalized, raw))
 
         # 欠損 index は個別送信でフォールバック
@@ -410,29 +662,25 @@ class CharacterRecognizer:
             logger.warning(
                 "Batch response missing %d index(es): %s. Falling back to individual recognition.",
                 len(missing_indices),
-                missing_indices,
+                [offset + idx for idx in missing_indices],
             )
-            for idx in missing_indices:
-                try:
-                    results[idx - 1] = self.recognize_from_frame(frames[idx - 1])
-                except Exception:
-                    logger.exception("Individual fallback failed for index=%d", idx)
-                    results[idx - 1] = (
-                        {"1p": UNKNOWN_CHARACTER, "2p": UNKNOWN_CHARACTER},
-                        {"1p": "", "2p": ""},
-                    )
+            fallbacks = await self._recognize_individually(
+                [frames[idx - 1] for idx in missing_indices],
+                semaphore,
+                [offset + idx for idx in missing_indices],
+            )
+            for idx, result in zip(missing_indices, fallbacks, strict=True):
+                results[idx - 1] = result
 
         return results
 
-    def _call_batch_api(self, frames: list[np.ndarray]) -> dict[str, Any]:
+    async def _call_batch_api(self, frames: list[np.ndarray], semaphore: asyncio.Semaphore) -> dict[str, Any]:
         """バッチ送信本体。レスポンス JSON を辞書で返す（リトライ/フォールバックは _generate_with_retry に委譲）"""
-        pil_images = []
-        for frame in frames:
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            pil_images.append(Image.fromarray(frame_rgb))
+        images = self.payload_encoder.encode_batch(frames)
+        payload_bytes = sum(len(image.data) for image in images)
 
-        prompt = self._build_batch_prompt(len(frames))
-        contents = [prompt, *pil_images]
+        prompt = self._build_batch_prompt(len(frames), mosaic=self.payload_encoder.mosaic_rows > 0)
+        contents = [prompt, *self._to_parts(images)]
 
         config_kwargs = self._build_base_config_kwargs()
         config_kwargs["response_schema"] = {
@@ -456,32 +704,43 @@ class CharacterRecognizer:
         config = genai.types.GenerateContentConfig(**config_kwargs)
 
         logger.info(
-            "Calling Gemini batch API: %d frames in 1 request (model=%s, tier=%s)",
+            "Calling Gemini batch API: %d frames in 1 request (%d images, %.0f bytes/frame, model=%s, tier=%s)",
             len(frames),
+            len(images),
+            payload_bytes / len(frames),
             self.model_name,
             "flex" if self.use_flex else "standard",
         )
-        response = self._generate_with_retry(contents=contents, config=config)
+        response = await self._generate_with_retry(contents=contents, config=config, semaphore=semaphore)
         return json.loads(response.text)
 
-    def _recognize_individually(
+    async def _recognize_individually(
         self,
         frames: list[np.ndarray],
+        semaphore: asyncio.Semaphore,
+        frame_numbers: list[int],
     ) -> list[tuple[dict[str, str], dict[str, str]]]:
-        """全フレームを個別送信で処理（バッチ送信が完全失敗した時のフォールバック）"""
-        results: list[tuple[dict[str, str], dict[str, str]]] = []
-        for i, frame in enumerate(frames, 1):
+        """
+        フレームを個別送信で並行して処理（バッチ送信の失敗・index 欠損時のフォールバック）
+
+        Args:
+            frames: フレームリスト
+            semaphore: 同時リクエスト数の制限
+            frame_numbers: 各フレームの番号（ログ用、1始まり）
+        """
+
+        async def recognize(frame: np.ndarray, number: int) -> tuple[dict[str, str], dict[str, str]]:
             try:
-                results.append(self.recognize_from_frame(frame))
+                return await self._recognize_single_async(frame, semaphore)
             except Exception:
-                logger.exception("Individual fallback failed for frame %d", i)
-                results.append(
-                    (
-                        {"1p": UNKNOWN_CHARACTER, "2p": UNKNOWN_CHARACTER},
-                        {"1p": "", "2p": ""},
-                    )
+                logger.exception("Individual fallback failed for frame %d", number)
+                return (
+                    {"1p": UNKNOWN_CHARACTER, "2p": UNKNOWN_CHARACTER},
+                    {"1p": "", "2p": ""},
                 )
-        return results
+
+        pairs = zip(frames, frame_numbers, strict=True)
+        return list(await asyncio.gather(*(recognize(frame, number) for frame, number in pairs)))
 
     # ---------------------------------------------------------------------
     # 旧 API 互換: recognize_batch は recognize_from_frames に委譲
@@ -492,7 +751,7 @@ class CharacterRecognizer:
         frames: list[np.ndarray],
     ) -> list[tuple[dict[str, str], dict[str, str]]]:
         """
-        複数フレームを認識（ADR-042 以降は内部的に1リクエストにまとめて送信）
+        複数フレームを認識（ADR-042 以降は内部的にバッチ送信にまとめて送信）
 
         後方互換のためのエイリアス。新規実装は recognize_from_frames を直接使うことを推奨。
         """
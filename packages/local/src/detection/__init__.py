@@ -1,14 +1,20 @@
 """対戦シーン検出モジュール"""
 
 from .config import DetectionParams, get_available_profiles, load_detection_params
-from .matcher import MatchDetection, TemplateMatcher
+from .matcher import MatchDetection, ScanStats, SegmentScanResult, TemplateMatcher
+from .parallel import ParallelMatchScanner
 from .result_detector import ResultDetection, ResultScreenDetector
+from .template_bank import TemplateBank
 
 __all__ = [
     "TemplateMatcher",
     "MatchDetection",
+    "SegmentScanResult",
+    "ScanStats",
+    "ParallelMatchScanner",
     "ResultScreenDetector",
     "ResultDetection",
+    "TemplateBank",
     "DetectionParams",
     "load_detection_params",
     "get_available_profiles",
@@ -45,6 +45,21 @@ class DetectionParams:
     recognize_frame_offset_threshold: float  # 動的オフセット選択の閾値（標準偏差の差分）
     result_detection: ResultDetectionParams  # RESULT画面検出パラメータ
     profile: str  # 使用したプロファイル名
+    scan_mode: str = "grab"  # 走査モード（"read": 全フレームデコード / "grab": 対象フレームのみデコード）
+    lookahead_buffer_max_mb: float = 512.0  # 後続フレームチェック用の先読みバッファのメモリ上限（MB）
+    frame_source: str = "opencv"  # フレーム供給元（"opencv": cv2.VideoCapture / "ffmpeg": ffmpeg パイプ）
+    prefilter_scale: float = 0.5  # プレフィルタ（縮小画像での粗いマッチング）の縮小率
+    prefilter_threshold: float = 0.0  # プレフィルタの閾値（0 で無効）
+    adaptive_stride: int = 0  # 適応的走査の疎な走査間隔（フレーム数、frame_interval の倍数、0 で無効）
+    adaptive_dense_threshold: float = 0.2  # 密な走査に切り替える粗いマッチングのスコア
+    min_match_duration_sec: float = 0.0  # Round 1検出後にRound 1マッチングを行わない最小対戦時間（秒、0 で無効）
+    result_min_delay_sec: float = 0.0  # Round 1検出後にRESULT画面の検出を行わない時間（秒、0 で無効）
+    result_check_interval_sec: float = 0.0  # RESULT画面の検出間隔（秒、0 で走査対象フレームごと）
+    result_signal_threshold: float = 0.0  # バナー領域の輝度ヒストグラムの変化でRESULT画面を密に検出する閾値（0 で無効）
+    parallel_workers: int = 1  # 区間分割走査のワーカープロセス数（0: 使用できるCPUコア数, 1: 並列化しない）
+    parallel_segment_overlap_sec: float = 10.0  # 区間分割走査の区間の重なり幅（秒）
+    reference_height: int | None = None  # テンプレート・各領域を作成した動画の高さ（None で拡大縮小しない）
+    download_min_height: int = 0  # 検出用ダウンロードの最小の高さ（この高さ以上で最小のフォーマット、0 で最高画質）
 
     def to_dict(self) -> dict[str, Any]:
         """辞書形式に変換"""
@@ -63,6 +78,21 @@ class DetectionParams:
             "recognize_frame_offset": self.recognize_frame_offset,
             "recognize_frame_offset_alt": self.recognize_frame_offset_alt,
             "recognize_frame_offset_threshold": self.recognize_frame_offset_threshold,
+            "scan_mode": self.scan_mode,
+            "lookahead_buffer_max_mb": self.lookahead_buffer_max_mb,
+            "frame_source": self.frame_source,
+            "prefilter_scale": self.prefilter_scale,
+            "prefilter_threshold": self.prefilter_threshold,
+            "adaptive_stride": self.adaptive_stride,
+            "adaptive_dense_threshold": self.adaptive_dense_threshold,
+            "min_match_duration_sec": self.min_match_duration_sec,
+            "result_min_delay_sec": self.result_min_delay_sec,
+            "result_check_interval_sec": self.result_check_interval_sec,
+            "result_signal_threshold": self.result_signal_threshold,
+            "parallel_workers": self.parallel_workers,
+            "parallel_segment_overlap_sec": self.parallel_segment_overlap_sec,
+            "reference_height": self.reference_height,
+            "download_min_height": self.download_min_height,
         }
 
     def log_params(self) -> None:
@@ -84,6 +114,21 @@ class DetectionParams:
         logger.info("    recognize_frame_offset:   %d", self.recognize_frame_offset)
         logger.info("    recognize_frame_offset_alt: %d", self.recognize_frame_offset_alt)
         logger.info("    recognize_frame_offset_threshold: %.1f", self.recognize_frame_offset_threshold)
+        logger.info("    scan_mode:                %s", self.scan_mode)
+        logger.info("    lookahead_buffer_max_mb:  %.0f", self.lookahead_buffer_max_mb)
+        logger.info("    frame_source:             %s", self.frame_source)
+        logger.info("    prefilter_scale:          %.2f", self.prefilter_scale)
+        logger.info("    prefilter_threshold:      %.2f", self.prefilter_threshold)
+        logger.info("    adaptive_stride:          %d", self.adaptive_stride)
+        logger.info("    adaptive_dense_threshold: %.2f", self.adaptive_dense_threshold)
+        logger.info("    min_match_duration_sec:   %.1f", self.min_match_duration_sec)
+        logger.info("    result_min_delay_sec:     %.1f", self.result_min_delay_sec)
+        logger.info("    result_check_interval_sec: %.1f", self.result_check_interval_sec)
+        logger.info("    result_signal_threshold:  %.2f", self.result_signal_threshold)
+        logger.info("    parallel_workers:         %d", self.parallel_workers)
+        logger.info("    parallel_segment_overlap_sec: %.1f", self.parallel_segment_overlap_sec)
+        logger.info("    reference_height:         %s", self.reference_height)
+        logger.info("    download_min_height:      %d", self.download_min_height)
         logger.info("  [Result Detection]")
         logger.info("    enabled:                  %s", self.result_detection.enabled)
         if self.result_detection.enabled:
@@ -190,6 +235,21 @@ def load_detection_params(profile: str = "production", config_path: str | None =
         recognize_frame_offset_threshold=float(params_dict.get("recognize_frame_offset_threshold", 5.0)),
         result_detection=result_detection,
         profile=profile,
+        scan_mode=str(params_dict.get("scan_mode", "grab")),
+        lookahead_buffer_max_mb=float(params_dict.get("lookahead_buffer_max_mb", 512.0)),
+        frame_source=str(params_dict.get("frame_source", "opencv")),
+        prefilter_scale=float(params_dict.get("prefilter_scale", 0.5)),
+        prefilter_threshold=float(params_dict.get("prefilter_threshold", 0.0)),
+        adaptive_stride=int(params_dict.get("adaptive_stride", 0)),
+        adaptive_dense_threshold=float(params_dict.get("adaptive_dense_threshold", 0.2)),
+        min_match_duration_sec=float(params_dict.get("min_match_duration_sec", 0.0)),
+        result_min_delay_sec=float(params_dict.get("result_min_delay_sec", 0.0)),
+        result_check_interval_sec=float(params_dict.get("result_check_interval_sec", 0.0)),
+        result_signal_threshold=float(params_dict.get("result_signal_threshold", 0.0)),
+        parallel_workers=int(params_dict.get("parallel_workers", 1)),
+        parallel_segment_overlap_sec=float(params_dict.get("parallel_segment_overlap_sec", 10.0)),
+        reference_height=int(params_dict["reference_height"]) if params_dict.get("reference_height") else None,
+        download_min_height=int(params_dict.get("download_min_height", 0)),
     )
 
     # パラメータの妥当性チェック
@@ -256,6 +316,56 @@ def _validate_params(params: DetectionParams) -> None:
     if params.recognize_frame_offset_alt < 0:
         raise ValueError(f"recognize_frame_offset_alt must be non-negative, got {params.recognize_frame_offset_alt}")
 
+    if params.scan_mode not in ("read", "grab"):
+        raise ValueError(f"scan_mode must be 'read' or 'grab', got {params.scan_mode}")
+
+    if params.lookahead_buffer_max_mb <= 0:
+        raise ValueError(f"lookahead_buffer_max_mb must be positive, got {params.lookahead_buffer_max_mb}")
+
+    if params.frame_source not in ("opencv", "ffmpeg"):
+        raise ValueError(f"frame_source must be 'opencv' or 'ffmpeg', got {params.frame_source}")
+
+    if not 0.0 < params.prefilter_scale <= 1.0:
+        raise ValueError(f"prefilter_scale must be in (0, 1], got {params.prefilter_scale}")
+
+    if not 0.0 <= params.prefilter_threshold <= 1.0:
+        raise ValueError(f"prefilter_threshold must be between 0.0 and 1.0, got {params.prefilter_threshold}")
+
+    if params.adaptive_stride < 0 or params.adaptive_stride % params.frame_interval != 0:
+        raise ValueError(
+            f"adaptive_stride must be 0 or a multiple of frame_interval ({params.frame_interval}), "
+            f"got {params.adaptive_stride}"
+        )
+
+    if not 0.0 <= params.adaptive_dense_threshold <= 1.0:
+        raise ValueError(f"adaptive_dense_threshold must be between 0.0 and 1.0, got {params.adaptive_dense_threshold}")
+
+    if params.min_match_duration_sec < 0:
+        raise ValueError(f"min_match_duration_sec must be non-negative, got {params.min_match_duration_sec}")
+
+    if params.result_min_delay_sec < 0:
+        raise ValueError(f"result_min_delay_sec must be non-negative, got {params.result_min_delay_sec}")
+
+    if params.result_check_interval_sec < 0:
+        raise ValueError(f"result_check_interval_sec must be non-negative, got {params.result_check_interval_sec}")
+
+    if not 0.0 <= params.result_signal_threshold <= 1.0:
+        raise ValueError(f"result_signal_threshold must be between 0.0 and 1.0, got {params.result_signal_threshold}")
+
+    if params.parallel_workers < 0:
+        raise ValueError(f"parallel_workers must be non-negative, got {params.parallel_workers}")
+
+    if params.parallel_segment_overlap_sec < 0:
+        raise ValueError(
+            f"parallel_segment_overlap_sec must be non-negative, got {params.parallel_segment_overlap_sec}"
+        )
+
+    if params.reference_height is not None and params.reference_height <= 0:
+        raise ValueError(f"reference_height must be positive, got {params.reference_height}")
+
+    if params.download_min_height < 0:
+        raise ValueError(f"download_min_height must be non-negative, got {params.download_min_height}")
+
     if params.recognize_frame_offset_threshold < 0:
         raise ValueError(
             f"recognize_frame_offset_threshold must be non-negative, got {params.recognize_frame_offset_threshold}"
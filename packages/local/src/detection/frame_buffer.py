@@ -0,0 +1,220 @@
+"""
+先読みリングバッファ付きのフレームリーダー
+
+Round 1候補検出時の後続フレームチェックや認識用オフセットフレームの選択で
+cap.set(CAP_PROP_POS_FRAMES) によるシークを行うと、H.264/VP9 ではキーフレームからの
+再デコードが発生して非常に遅い。先読みしたフレームをメモリ上に保持し、
+シークなしで前方のフレームを参照できるようにする。
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from ..utils.logger import get_logger
+from .preprocessing import FramePreprocessContext
+
+if TYPE_CHECKING:
+    from .frame_source import FfmpegFrameSource, OpenCVFrameSource
+
+logger = get_logger()
+
+
+@dataclass
+class BufferedFrame:
+    """バッファ内のフレーム"""
+
+    frame_number: int
+    frame: np.ndarray | None  # デコード済みフレーム（grab のみの場合は None）
+    origin: tuple[int, int] = (0, 0)  # frame の左上が元フレーム上のどこに当たるか (x, y)
+    scale: float = 1.0  # 動画の解像度 / テンプレートの基準解像度（前処理コンテキストに渡す）
+    frame_downscale: float = 1.0  # 元フレームの座標 / frame の座標（フレーム供給元で縮小済みの場合）
+    _context: FramePreprocessContext | None = field(default=None, repr=False)
+
+    @property
+    def context(self) -> FramePreprocessContext:
+        """前処理コンテキスト（遅延生成、後続フレームチェックと走査で共有）"""
+        if self._context is None:
+            self._context = FramePreprocessContext(self.frame, self.origin, self.scale, self.frame_downscale)
+        return self._context
+
+
+class FrameLookaheadBuffer:
+    """
+    フレーム供給元を逐次読み込みしつつ、前方フレームを先読みして保持するリーダー
+
+    next() で先頭から順にフレームを取り出し、peek() で前方のフレームを先読みする。
+    先読みしたフレームはバッファに保持され、後続の next() でそのまま再利用される。
+    バッファは max_frames 件を上限とし、それを超える先読みは行わない。
+    供給元がフレームを間引いている場合（frame_step > 1）、フレーム番号は frame_step ずつ進む。
+    """
+
+    def __init__(
+        self,
+        source: "OpenCVFrameSource | FfmpegFrameSource",
+        start_frame: int,
+        max_frames: int,
+        context_scale: float = 1.0,
+    ):
+        """
+        Args:
+            source: フレーム供給元（start_frame の位置から読み込み可能な状態）
+            start_frame: 次に読み込まれるフレーム番号
+            max_frames: バッファに保持する最大フレーム数
+            context_scale: フレームの前処理コンテキストの倍率（動画の解像度 / テンプレートの基準解像度）
+        """
+        if max_frames < 1:
+            raise ValueError(f"max_frames must be at least 1, got {max_frames}")
+
+        self.source = source
+        self.frame_step = source.frame_step
+        self.max_frames = max_frames
+        self.context_scale = context_scale
+        self._buffer: deque[BufferedFrame] = deque()
+        self._next_frame_number = start_frame  # next() で次に返すフレーム番号
+        self._read_frame_number = start_frame  # 供給元から次に読み込まれるフレーム番号
+        self._eof = False
+
+        self.decoded_frames = 0
+        self.skipped_frames = 0
+        self.seeks = 0
+
+    @staticmethod
+    def capacity_for(source: "OpenCVFrameSource | FfmpegFrameSource", max_mb: float) -> int:
+        """
+        メモリ上限からバッファに保持できるフレーム数を算出
+
+        Args:
+            source: フレーム供給元
+            max_mb: バッファのメモリ上限（MB）
+
+        Returns:
+            保持可能なフレーム数（最低1）
+        """
+        return max(1, int(max_mb * 1024 * 1024) // source.frame_bytes)
+
+    @property
+    def next_frame_number(self) -> int:
+        """next() で次に返されるフレーム番号"""
+        return self._next_frame_number
+
+    def frame_numbers(self, start_frame: int, num_frames: int) -> range:
+        """
+        [start_frame, start_frame + num_frames) のうち供給元から取得可能なフレーム番号
+
+        Args:
+            start_frame: 開始フレーム番号
+            num_frames: フレーム数
+
+        Returns:
+            フレーム番号の range
+        """
+        offset = (start_frame - self._next_frame_number) % self.frame_step
+        first = start_frame if offset == 0 else start_frame + self.frame_step - offset
+        return range(first, start_frame + num_frames, self.frame_step)
+
+    def seek(self, frame_number: int) -> None:
+        """
+        次に取り出すフレームを移動
+
+        移動先が先読み済みの範囲内なら、手前のフレームだけを破棄して供給元のシークを省く。
+        それ以外は先読み済みのフレームをすべて破棄して供給元をシークする。
+
+        Args:
+            frame_number: 次に next() で返すフレーム番号
+        """
+        if self._next_frame_number <= frame_number < self._read_frame_number:
+            offset, remainder = divmod(frame_number - self._next_frame_number, self.frame_step)
+            if remainder == 0:
+                for _ in range(offset):
+                    self._buffer.popleft()
+                self._next_frame_number = frame_number
+                return
+
+        self._buffer.clear()
+        self.source.seek(frame_number)
+        self._next_frame_number = frame_number
+        self._read_frame_number = frame_number
+        self._eof = False
+        self.seeks += 1
+
+    def next(self, decode: bool = True) -> BufferedFrame | None:
+        """
+        次のフレームを取り出す
+
+        Args:
+            decode: フレームをデコードするか（False の場合は grab のみ）。
+                先読み済みのフレームは常にデコード済みで返る。
+
+        Returns:
+            BufferedFrame、動画終端の場合は None
+        """
+        if self._buffer:
+            entry = self._buffer.popleft()
+            self._next_frame_number += self.frame_step
+            return entry
+
+        if self._eof:
+            return None
+
+        if decode:
+            ret, frame = self.source.read()
+        else:
+            ret = self.source.grab()
+            frame = None
+        if not ret:
+            self._eof = True
+            return None
+
+        if decode:
+            self.decoded_frames += 1
+        else:
+            self.skipped_frames += 1
+
+        entry = BufferedFrame(
+            frame_number=self._next_frame_number,
+            frame=frame,
+            origin=self.source.origin,
+            scale=self.context_scale,
+            frame_downscale=self.source.downscale,
+        )
+        self._read_frame_number += self.frame_step
+        self._next_frame_number += self.frame_step
+        return entry
+
+    def peek(self, frame_number: int) -> BufferedFrame | None:
+        """
+        前方のフレームを先読みして参照する（シークなし）
+
+        Args:
+            frame_number: 参照するフレーム番号（next() で未取得のもの）
+
+        Returns:
+            BufferedFrame、動画終端・バッファ上限超過・間引きにより供給されないフレームの場合は None
+        """
+        offset, remainder = divmod(frame_number - self._next_frame_number, self.frame_step)
+        if remainder != 0 or offset < 0 or offset >= self.max_frames:
+            return None
+
+        while self._read_frame_number <= frame_number:
+            if self._eof:
+                return None
+            ret, frame = self.source.read()
+            if not ret:
+                self._eof = True
+                return None
+            self.decoded_frames += 1
+            self._buffer.append(
+                BufferedFrame(
+                    frame_number=self._read_frame_number,
+                    frame=frame,
+                    origin=self.source.origin,
+                    scale=self.context_scale,
+                    frame_downscale=self.source.downscale,
+                )
+            )
+            self._read_frame_number += self.frame_step
+
+        return self._buffer[offset]
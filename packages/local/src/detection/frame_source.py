@@ -0,0 +1,383 @@
+"""
+対戦シーン検出用のフレーム供給元（デコーダーバックエンド）
+
+- "opencv": cv2.VideoCapture でフル解像度のBGRフレームをデコード（従来動作）
+- "ffmpeg": ffmpeg サブプロセスで切り抜き・グレースケール化・基準解像度への縮小・フレーム間引きを行い、
+  生バイト列をパイプ経由で np.frombuffer によりコピーなしで NumPy 配列化する。
+  ダウンロード中のファイル（GrowingFile）を入力とする場合は、追記済みの範囲を ffmpeg の
+  標準入力へ逐次送り込み、未着の範囲ではダウンロードを待つ
+
+どちらも read() / grab() / seek() / release() と以下の属性を持つ:
+- frame_step: 1回の read() で進むフレーム数（間引き間隔）
+- origin: 供給フレームの左上が元フレーム上のどこに当たるか (x, y)
+- downscale: 元フレームの座標 / 供給フレームの座標（供給元で縮小済みの倍率）
+- width / height: 元動画のフレームサイズ
+- frame_bytes: 供給フレーム1枚あたりのバイト数
+- has_full_frames: 元フレーム全体のBGR画像を供給するか
+- random_access: read_full_frame() で任意のフレームを即座に取得できるか
+  （ダウンロード中のファイルではダウンロード完了まで取得できない）
+"""
+
+import contextlib
+import shutil
+import subprocess
+import threading
+import time
+from typing import Protocol
+
+import cv2
+import numpy as np
+
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+FRAME_SOURCES = ("opencv", "ffmpeg")
+
+# ダウンロード中のファイルを ffmpeg へ送り込む単位
+_FEED_CHUNK_BYTES = 1024 * 1024
+
+
+class GrowingFile(Protocol):
+    """ダウンロード中に追記されていく動画ファイル"""
+
+    path: str
+    fps: float
+    width: int
+    height: int
+
+    def is_finished(self) -> bool:
+        """ダウンロードが終了したか（失敗を含む）"""
+        ...
+
+
+def _feed_growing_file(growing_file: GrowingFile, stdin, poll_interval_sec: float) -> None:
+    """
+    ダウンロード中のファイルを追記された分から順に ffmpeg の標準入力へ書き込む
+
+    追記済みの範囲をすべて送ったらダウンロードの進行を待ち（ダウンロードの先端でブロック）、
+    ダウンロード終了後に残りを送って標準入力を閉じる。
+    """
+    try:
+        while not growing_file.is_finished() and not _path_exists(growing_file.path):
+            time.sleep(poll_interval_sec)
+        if not _path_exists(growing_file.path):
+            return
+
+        with open(growing_file.path, "rb") as f:
+            while True:
+                # 読み込み前に終了を確認（終了後に空読みなら全データ送信済み）
+                finished = growing_file.is_finished()
+                chunk = f.read(_FEED_CHUNK_BYTES)
+                if chunk:
+                    stdin.write(chunk)
+                elif finished:
+                    break
+                else:
+                    time.sleep(poll_interval_sec)
+    except (BrokenPipeError, ValueError, OSError):
+        # ffmpeg プロセスが終了済み（release() による停止など）
+        pass
+    finally:
+        with contextlib.suppress(OSError):
+            stdin.close()
+
+
+def _path_exists(path: str) -> bool:
+    try:
+        with open(path, "rb"):
+            return True
+    except OSError:
+        return False
+
+
+def union_region(regions: list[tuple[int, int, int, int] | None], width: int, height: int) -> tuple[int, int, int, int]:
+    """
+    複数の領域をすべて含む最小の矩形を算出（None が含まれる場合はフレーム全体）
+
+    Args:
+        regions: 領域 (x1, y1, x2, y2) のリスト
+        width: フレーム幅
+        height: フレーム高さ
+
+    Returns:
+        外接矩形 (x1, y1, x2, y2)
+    """
+    if not regions or any(region is None for region in regions):
+        return (0, 0, width, height)
+    x1 = max(0, min(r[0] for r in regions))
+    y1 = max(0, min(r[1] for r in regions))
+    x2 = min(width, max(r[2] for r in regions))
+    y2 = min(height, max(r[3] for r in regions))
+    return (x1, y1, x2, y2)
+
+
+class OpenCVFrameSource:
+    """cv2.VideoCapture によるフル解像度BGRフレームの供給元"""
+
+    has_full_frames = True
+    random_access = True
+    frame_step = 1
+    origin = (0, 0)
+    downscale = 1.0
+
+    def __init__(self, video_path: str, start_frame: int = 0):
+        """
+        Args:
+            video_path: 動画ファイルのパス
+            start_frame: 読み込み開始フレーム番号
+        """
+        self.cap = cv2.VideoCapture(video_path)
+        if not self.cap.isOpened():
+            raise OSError(f"Cannot open video: {video_path}")
+        if start_frame > 0:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.frame_bytes = max(1, self.width * self.height * 3)
+
+    def read(self) -> tuple[bool, np.ndarray | None]:
+        return self.cap.read()
+
+    def grab(self) -> bool:
+        return self.cap.grab()
+
+    def seek(self, frame_number: int) -> None:
+        """次に読み込むフレームを指定フレームに移動"""
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+
+    def read_full_frame(self, frame_number: int) -> np.ndarray | None:
+        """指定フレームのBGR画像を取得（先読みバッファで賄えるため通常は使用しない）"""
+        return None
+
+    def release(self) -> None:
+        self.cap.release()
+
+
+class FfmpegFrameSource:
+    """ffmpeg パイプによる切り抜き済みグレースケールフレームの供給元"""
+
+    has_full_frames = False
+
+    def __init__(
+        self,
+        video_path: str,
+        fps: float,
+        width: int,
+        height: int,
+        start_frame: int = 0,
+        crop_region: tuple[int, int, int, int] | None = None,
+        frame_step: int = 1,
+        downscale: float = 1.0,
+        ffmpeg_path: str = "ffmpeg",
+        growing_file: GrowingFile | None = None,
+        poll_interval_sec: float = 0.5,
+    ):
+        """
+        Args:
+            video_path: 動画ファイルのパス
+            fps: 動画のフレームレート（開始位置の秒換算に使用）
+            width: 元動画のフレーム幅
+            height: 元動画のフレーム高さ
+            start_frame: 読み込み開始フレーム番号
+            crop_region: 切り抜き領域 (x1, y1, x2, y2)、None でフレーム全体
+            frame_step: フレーム間引き間隔（frame_step フレームごとに1枚を出力）
+            downscale: 切り抜いた領域の縮小率の逆数（1 で縮小しない）。テンプレートの基準解像度より
+                高い解像度の動画を基準解像度に縮小して出力し、パイプの転送量と前処理の画素数を減らす
+            ffmpeg_path: ffmpeg 実行ファイルのパス
+            growing_file: ダウンロード中のファイル（指定時は先頭から標準入力経由で読み込む）
+            poll_interval_sec: ダウンロードの先端で追記を待つ間隔（秒）
+
+        Raises:
+            FileNotFoundError: ffmpeg が見つからない場合
+        """
+        if shutil.which(ffmpeg_path) is None:
+            raise FileNotFoundError(f"ffmpeg not found: {ffmpeg_path}")
+        if frame_step < 1:
+            raise ValueError(f"frame_step must be at least 1, got {frame_step}")
+        if downscale < 1.0:
+            raise ValueError(f"downscale must be at least 1.0, got {downscale}")
+        if growing_file is not None and start_frame != 0:
+            raise ValueError("growing_file can only be read from the first frame")
+
+        x1, y1, x2, y2 = crop_region or (0, 0, width, height)
+        self.video_path = video_path
+        self.fps = fps
+        self.ffmpeg_path = ffmpeg_path
+        self.width = width
+        self.height = height
+        self.frame_step = frame_step
+        self.origin = (x1, y1)
+        self.downscale = downscale
+        self._crop_size = (x2 - x1, y2 - y1)
+        self._out_width = max(1, round((x2 - x1) / downscale))
+        self._out_height = max(1, round((y2 - y1) / downscale))
+        self.frame_bytes = self._out_width * self._out_height
+        self.growing_file = growing_file
+        self.random_access = growing_file is None
+        self._poll_interval_sec = poll_interval_sec
+        self._full_frame_cap: cv2.VideoCapture | None = None
+        self._process: subprocess.Popen | None = None
+        self._feeder: threading.Thread | None = None
+        self._next_frame_number = start_frame
+        self._start_process(start_frame)
+
+    def _start_process(self, start_frame: int) -> None:
+        """start_frame から出力する ffmpeg プロセスを起動"""
+        x1, y1 = self.origin
+        filters = []
+        if self.frame_step > 1:
+            filters.append(f"select='not(mod(n\\,{self.frame_step}))'")
+        # exact=1: クロマのサブサンプリングに合わせた奇数座標の丸めを行わない（出力サイズを領域と一致させる）
+        filters.append(f"crop={self._crop_size[0]}:{self._crop_size[1]}:{x1}:{y1}:exact=1")
+        filters.append("format=gray")
+        if self.downscale > 1.0:
+            filters.append(f"scale={self._out_width}:{self._out_height}:flags=area")
+
+        cmd = [self.ffmpeg_path, "-hide_banner", "-loglevel", "error"]
+        if self.growing_file is None:
+            cmd.append("-nostdin")
+        if start_frame > 0:
+            # 丸め誤差で対象フレームを取りこぼさないよう、半フレーム手前を指定
+            cmd += ["-ss", f"{(start_frame - 0.5) / self.fps:.6f}"]
+        cmd += [
+            "-i",
+            self.video_path if self.growing_file is None else "pipe:0",
+            "-an",
+            "-sn",
+            "-vf",
+            ",".join(filters),
+            "-fps_mode",
+            "passthrough",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "gray",
+            "pipe:1",
+        ]
+        logger.debug("Starting ffmpeg decoder: %s", " ".join(cmd))
+        self._next_frame_number = start_frame
+        if self.growing_file is None:
+            self._process = subprocess.Popen(cmd, stdout=subprocess.PIPE, bufsize=self.frame_bytes * 4)
+            return
+
+        self._process = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, bufsize=self.frame_bytes * 4
+        )
+        self._feeder = threading.Thread(
+            target=_feed_growing_file,
+            args=(self.growing_file, self._process.stdin, self._poll_interval_sec),
+            name="ffmpeg-stream-feeder",
+            daemon=True,
+        )
+        self._feeder.start()
+
+    def read(self) -> tuple[bool, np.ndarray | None]:
+        data = self._process.stdout.read(self.frame_bytes)
+        if len(data) < self.frame_bytes:
+            return False, None
+        self._next_frame_number += self.frame_step
+        # bytes をそのまま参照する読み取り専用配列（コピーなし）
+        return True, np.frombuffer(data, dtype=np.uint8).reshape(self._out_height, self._out_width)
+
+    def grab(self) -> bool:
+        ret, _ = self.read()
+        return ret
+
+    def seek(self, frame_number: int) -> None:
+        """
+        次に読み込むフレームを指定フレームに移動
+
+        ファイル入力では ffmpeg プロセスを再起動する。ダウンロード中のファイルは
+        前方へのみ移動でき、間のフレームを読み捨てる。
+        """
+        if self.growing_file is None:
+            self._stop_process()
+            self._start_process(frame_number)
+            return
+
+        if frame_number < self._next_frame_number:
+            raise ValueError(
+                f"Cannot seek backward in a growing file (current={self._next_frame_number}, target={frame_number})"
+            )
+        while self._next_frame_number < frame_number:
+            if not self.grab():
+                break
+
+    def read_full_frame(self, frame_number: int) -> np.ndarray | None:
+        """
+        指定フレームのBGR画像を取得（認識用の切り抜きに使用）
+
+        ffmpeg の出力は切り抜き済みグレースケールのため、確定した検出ごとに
+        cv2.VideoCapture でシークして取得する。ダウンロード中のファイルでは
+        ダウンロード完了後にのみ取得できる（random_access を参照）。
+        """
+        if self.growing_file is not None and not self.growing_file.is_finished():
+            return None
+        if self._full_frame_cap is None:
+            self._full_frame_cap = cv2.VideoCapture(self.video_path)
+        self._full_frame_cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+        ret, frame = self._full_frame_cap.read()
+        return frame if ret else None
+
+    def _stop_process(self) -> None:
+        if self._process.poll() is None:
+            self._process.kill()
+        self._process.stdout.close()
+        self._process.wait()
+        if self._feeder is not None:
+            self._feeder.join()
+            self._feeder = None
+
+    def release(self) -> None:
+        self._stop_process()
+        if self._full_frame_cap is not None:
+            self._full_frame_cap.release()
+
+
+def open_frame_source(
+    backend: str,
+    video_path: str,
+    start_frame: int = 0,
+    crop_region: tuple[int, int, int, int] | None = None,
+    frame_step: int = 1,
+    downscale: float = 1.0,
+) -> "OpenCVFrameSource | FfmpegFrameSource":
+    """
+    フレーム供給元を生成
+
+    Args:
+        backend: "opencv" または "ffmpeg"
+        video_path: 動画ファイルのパス
+        start_frame: 読み込み開始フレーム番号
+        crop_region: ffmpeg の切り抜き領域 (x1, y1, x2, y2)
+        frame_step: ffmpeg のフレーム間引き間隔
+        downscale: ffmpeg で切り抜いた領域の縮小率の逆数
+
+    Returns:
+        フレーム供給元
+    """
+    if backend == "opencv":
+        return OpenCVFrameSource(video_path, start_frame=start_frame)
+    if backend == "ffmpeg":
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise OSError(f"Cannot open video: {video_path}")
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        finally:
+            cap.release()
+        return FfmpegFrameSource(
+            video_path,
+            fps=fps,
+            width=width,
+            height=height,
+            start_frame=start_frame,
+            crop_region=crop_region,
+            frame_step=frame_step,
+            downscale=downscale,
+        )
+    raise ValueError(f"frame_source must be one of {FRAME_SOURCES}, got {backend}")
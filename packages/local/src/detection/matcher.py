@@ -3,20 +3,49 @@
 OpenCVを使用してフレームから対戦開始画面を検出
 """
 
-from dataclasses import dataclass
+import math
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
 from typing import TYPE_CHECKING
 
 import cv2
 import numpy as np
 
 from ..utils.logger import get_logger
-from .preprocessing import preprocess_for_matching
+from ..utils.metrics import record
+from .frame_buffer import BufferedFrame, FrameLookaheadBuffer
+from .frame_source import (
+    FRAME_SOURCES,
+    FfmpegFrameSource,
+    GrowingFile,
+    OpenCVFrameSource,
+    open_frame_source,
+    union_region,
+)
+from .preprocessing import preprocess_for_coarse_matching, to_frame_region, to_relative_region
+from .stride import AdaptiveStrideScheduler, ResultCheckScheduler
+from .template_bank import TemplatePyramid
 
 if TYPE_CHECKING:
-    from .result_detector import ResultScreenDetector
+    from .result_detector import ResultDetection, ResultScreenDetector
 
 logger = get_logger()
 
+# 走査モード
+# - "read": 全フレームを cap.read() でデコード（従来動作）
+# - "grab": マッチング対象外のフレームは cap.grab() で読み飛ばし、対象フレームのみ retrieve() でデコード
+SCAN_MODES = ("read", "grab")
+
+# 処理時間を計測する走査の段階（ScanStats の <stage>_sec に累積）
+# - decode: フレームの読み込み・デコード（認識用フレームの取得を含む）
+# - preprocess: 検索領域の切り抜き・エッジ抽出（粗いマッチング用の縮小を含む）
+# - match: Round 1・除外テンプレートとのマッチング（粗いマッチングを含む）
+# - post_check: 後続フレームチェック（先読みしたフレームのデコード・前処理を含む）
+# - result: RESULT画面検出（前処理を含む）
+SCAN_STAGES = ("decode", "preprocess", "match", "post_check", "result")
+
 
 @dataclass
 class MatchDetection:
@@ -27,6 +56,103 @@ class MatchDetection:
     confidence: float  # マッチング信頼度
     frame: np.ndarray  # 検出されたフレーム
     winner_side: str | None = None  # RESULT画面検出による勝者側 ("player1" | "player2" | None)
+    winner_confidence: float | None = None  # 上記の勝敗判定の余裕のスコア（0.0-1.0、較正していない）
+
+
+@dataclass
+class ScanStats:
+    """走査の段階ごとの枝刈り数と処理時間"""
+
+    sampled_frames: int = 0  # マッチング対象としたフレーム数
+    prefilter_rejected: int = 0  # 縮小画像での粗いマッチングで除外
+    threshold_rejected: int = 0  # 等倍のエッジマッチングで閾値未満
+    reject_template_rejected: int = 0  # 除外テンプレート（Round 2, Final Round）にマッチ
+    interval_skipped: int = 0  # 直前の検出から min_interval_sec 以内
+    post_check_rejected: int = 0  # 後続フレームチェックで誤検知と判定
+    detected: int = 0  # 検出として確定
+    match_window_sampled: int = 0  # Round 1検出後の対戦区間内でRESULT検出のみ行ったフレーム数
+    backtracks: int = 0  # 適応的走査で密な走査のために戻った回数
+    jumped_frames: int = 0  # 対戦区間の残りをシークで読み飛ばしたフレーム数
+    result_checks: int = 0  # RESULT画面の検出を行ったフレーム数
+    result_checks_saved: int = 0  # 走査対象フレームごとに検出する場合と比べて省いたRESULT画面の検出数（推定）
+    read_frames: int = 0  # 供給元から読み込んだフレーム数（デコード・読み飛ばしの合計）
+    decoded_frames: int = 0  # 上記のうちデコードしたフレーム数
+    scan_sec: float = 0.0  # 走査全体の処理時間（秒）
+    decode_sec: float = 0.0  # 段階ごとの処理時間（秒、SCAN_STAGES を参照）
+    preprocess_sec: float = 0.0
+    match_sec: float = 0.0
+    post_check_sec: float = 0.0
+    result_sec: float = 0.0
+
+    @contextmanager
+    def timed(self, stage: str) -> Iterator[None]:
+        """with ブロックの処理時間を段階の処理時間に加算"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            name = f"{stage}_sec"
+            setattr(self, name, getattr(self, name) + time.perf_counter() - start)
+
+    def stage_seconds(self) -> dict[str, float]:
+        """段階ごとの処理時間（秒）"""
+        return {stage: getattr(self, f"{stage}_sec") for stage in SCAN_STAGES}
+
+    def record_metrics(self) -> None:
+        """処理パイプラインの計測値（utils.metrics の detection 段階）に記録"""
+        record(
+            "detection",
+            frames=self.decoded_frames,
+            read_frames=self.read_frames,
+            detected=self.detected,
+            result_checks=self.result_checks,
+            result_checks_saved=self.result_checks_saved,
+            **{f"{stage}_sec": sec for stage, sec in self.stage_seconds().items()},
+        )
+
+    def merge(self, other: "ScanStats") -> None:
+        """他の走査結果の集計を加算"""
+        for f in fields(self):
+            setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+
+    def log_summary(self) -> None:
+        """段階ごとの枝刈り数をログ出力"""
+        logger.info(
+            "Stage stats: sampled=%d, prefilter_rejected=%d, threshold_rejected=%d, "
+            "reject_template_rejected=%d, interval_skipped=%d, post_check_rejected=%d, detected=%d, "
+            "match_window_sampled=%d, backtracks=%d, jumped_frames=%d, result_checks=%d (saved %d)",
+            self.sampled_frames,
+            self.prefilter_rejected,
+            self.threshold_rejected,
+            self.reject_template_rejected,
+            self.interval_skipped,
+            self.post_check_rejected,
+            self.detected,
+            self.match_window_sampled,
+            self.backtracks,
+            self.jumped_frames,
+            self.result_checks,
+            self.result_checks_saved,
+        )
+        logger.info(
+            "Stage time: total=%.2fs (%d frames), %s",
+            self.scan_sec,
+            self.read_frames,
+            ", ".join(f"{stage}={sec:.2f}s" for stage, sec in self.stage_seconds().items()),
+        )
+
+
+@dataclass
+class SegmentScanResult:
+    """フレーム区間の走査結果"""
+
+    detections: list[MatchDetection]
+    start_frame: int
+    end_frame: int
+    leading_result_frame: int | None = None  # 区間内の最初のRound 1検出より前に検出したRESULT画面のフレーム番号
+    leading_winner_side: str | None = None  # 上記RESULT画面による勝者側
+    leading_winner_confidence: float | None = None  # 上記の勝敗判定の余裕のスコア
+    stats: ScanStats = field(default_factory=ScanStats)  # 段階ごとの枝刈り数
 
 
 class TemplateMatcher:
@@ -47,6 +173,19 @@ class TemplateMatcher:
         recognize_frame_offset_alt: int = 4,
         recognize_frame_offset_threshold: float = 5.0,
         result_detector: "ResultScreenDetector | None" = None,
+        scan_mode: str = "grab",
+        lookahead_buffer_max_mb: float = 512.0,
+        frame_source: str = "opencv",
+        prefilter_scale: float = 0.5,
+        prefilter_threshold: float = 0.0,
+        adaptive_stride: int = 0,
+        adaptive_dense_threshold: float = 0.2,
+        min_match_duration_sec: float = 0.0,
+        result_min_delay_sec: float = 0.0,
+        result_check_interval_sec: float = 0.0,
+        result_signal_threshold: float = 0.0,
+        reference_height: int | None = None,
+        reference_width: int | None = None,
     ):
         """
         Args:
@@ -59,45 +198,192 @@ class TemplateMatcher:
             search_region: Round 1表示領域の限定 (x1, y1, x2, y2)
             post_check_frames: 検出後に確認するフレーム数
             post_check_reject_limit: この数以上除外マッチがあれば誤検知と判定
+                （フレーム供給元が間引いている場合は frame_step で割って切り上げた数）
             recognize_frame_offset: 認識用フレームのデフォルトオフセット（フレーム数）
             recognize_frame_offset_alt: 認識用フレームの代替オフセット（フレーム数）
             recognize_frame_offset_threshold: 動的オフセット選択の閾値（標準偏差の差分）
             result_detector: RESULT画面検出器（オプション）- None でRESULT検出をスキップ
+            scan_mode: 走査モード（"read": 全フレームデコード / "grab": 対象フレームのみデコード）
+            lookahead_buffer_max_mb: 後続フレームチェック用の先読みバッファのメモリ上限（MB）
+            frame_source: フレーム供給元（"opencv": cv2.VideoCapture / "ffmpeg": ffmpeg パイプで
+                検索領域の切り抜き・グレースケール化・frame_interval 間引きを行ったフレーム）
+            prefilter_scale: プレフィルタの縮小率（0.0-1.0）
+            prefilter_threshold: プレフィルタの閾値。縮小画像でのマッチングがこれ未満のフレームは
+                等倍のエッジマッチングを行わずに除外する（0 でプレフィルタ無効）
+            adaptive_stride: 適応的走査の疎な走査間隔（フレーム数、frame_interval の倍数）。
+                粗いマッチングのスコアが adaptive_dense_threshold 以上になると frame_interval 間隔に戻る（0 で無効）
+            adaptive_dense_threshold: 密な走査に切り替える粗いマッチングのスコア
+            min_match_duration_sec: 最小対戦時間（秒）。Round 1検出後この時間はRound 1のマッチングを行わず、
+                RESULT画面の検出のみを行う（0 で無効）
+            result_min_delay_sec: Round 1検出後にRESULT画面の検出を行わない時間（秒、0 で無効）。
+                対戦区間内のこの時間はシークで読み飛ばす
+            result_check_interval_sec: RESULT画面の検出間隔（秒、0 で走査対象フレームごと）
+            result_signal_threshold: RESULT画面の検索領域の輝度ヒストグラムの変化（Bhattacharyya 距離）が
+                これ以上なら result_check_interval_sec の間は走査対象フレームごとに検出する（0 で無効）
+            reference_height: テンプレート画像・各領域を作成した動画の高さ（ピクセル）。
+                指定時は領域を相対座標に正規化し、テンプレートピラミッドを事前計算して、
+                走査する動画の解像度の段でマッチングする（基準解像度より高い動画は領域を縮小して照合、
+                None で基準解像度のみ）
+            reference_width: テンプレート画像・各領域を作成した動画の幅（None で reference_height から 16:9 として算出）
         """
+        if scan_mode not in SCAN_MODES:
+            raise ValueError(f"scan_mode must be one of {SCAN_MODES}, got {scan_mode}")
+        if frame_source not in FRAME_SOURCES:
+            raise ValueError(f"frame_source must be one of {FRAME_SOURCES}, got {frame_source}")
+        if not 0.0 < prefilter_scale <= 1.0:
+            raise ValueError(f"prefilter_scale must be in (0, 1], got {prefilter_scale}")
+        if adaptive_stride and (adaptive_stride < frame_interval or adaptive_stride % frame_interval != 0):
+            raise ValueError(
+                f"adaptive_stride must be a multiple of frame_interval ({frame_interval}), got {adaptive_stride}"
+            )
+        if min_match_duration_sec < 0:
+            raise ValueError(f"min_match_duration_sec must be non-negative, got {min_match_duration_sec}")
+        if result_min_delay_sec < 0:
+            raise ValueError(f"result_min_delay_sec must be non-negative, got {result_min_delay_sec}")
+        if result_check_interval_sec < 0:
+            raise ValueError(f"result_check_interval_sec must be non-negative, got {result_check_interval_sec}")
+        if not 0.0 <= result_signal_threshold <= 1.0:
+            raise ValueError(f"result_signal_threshold must be between 0.0 and 1.0, got {result_signal_threshold}")
+        if reference_height is not None and reference_height <= 0:
+            raise ValueError(f"reference_height must be positive, got {reference_height}")
+
         self.template = cv2.imread(template_path, cv2.IMREAD_COLOR)
         if self.template is None:
             raise FileNotFoundError(f"Template image not found: {template_path}")
 
-        # テンプレートを前処理（エッジ抽出）
-        self.template_edges = preprocess_for_matching(self.template)
+        # テンプレートを前処理（解像度ごとのエッジ抽出、粗いマッチングは基準解像度で縮小）
+        self.template_pyramid = TemplatePyramid([self.template], reference_height)
+        self.template_coarse_edges = preprocess_for_coarse_matching(self.template, prefilter_scale)
 
         # 除外用テンプレート（Round 2, Final Round）
-        self.reject_templates_edges = []
+        reject_images = []
         if reject_templates:
             for reject_path in reject_templates:
                 reject_img = cv2.imread(reject_path, cv2.IMREAD_COLOR)
                 if reject_img is not None:
-                    reject_edges = preprocess_for_matching(reject_img)
-                    self.reject_templates_edges.append(reject_edges)
+                    reject_images.append(reject_img)
+        self.reject_pyramid = TemplatePyramid(reject_images, reference_height)
 
         self.threshold = threshold
         self.reject_threshold = reject_threshold
         self.min_interval_sec = min_interval_sec
         self.frame_interval = frame_interval
-        self.search_region = search_region
+        self._relative_search_region = to_relative_region(search_region, reference_height, reference_width)
         self.post_check_frames = post_check_frames
         self.post_check_reject_limit = post_check_reject_limit
         self.recognize_frame_offset = recognize_frame_offset
         self.recognize_frame_offset_alt = recognize_frame_offset_alt
         self.recognize_frame_offset_threshold = recognize_frame_offset_threshold
         self.result_detector = result_detector
+        self.scan_mode = scan_mode
+        self.lookahead_buffer_max_mb = lookahead_buffer_max_mb
+        self.frame_source = frame_source
+        self.prefilter_scale = prefilter_scale
+        self.prefilter_threshold = prefilter_threshold
+        self.adaptive_stride = adaptive_stride
+        self.adaptive_dense_threshold = adaptive_dense_threshold
+        self.min_match_duration_sec = min_match_duration_sec
+        self.result_min_delay_sec = result_min_delay_sec
+        self.result_check_interval_sec = result_check_interval_sec
+        self.result_signal_threshold = result_signal_threshold
+        self.reference_height = reference_height
+        self.reference_width = reference_width
+
+        # 基準解像度の段（走査開始時に rescale_for() で動画の解像度の段に切り替える）
+        self.scale = 1.0  # 動画の解像度 / 基準解像度
+        self.search_region = search_region
+        self.template_edges = self.template_pyramid.edges(1.0)[0]
+        self.reject_templates_edges = self.reject_pyramid.edges(1.0)
+        self.reject_bank = self.reject_pyramid.bank(1.0)
+
+    def rescale_for(self, frame_width: int, frame_height: int) -> float:
+        """
+        走査する動画の解像度に合わせてテンプレートピラミッドの段と領域を選択
+
+        Args:
+            frame_width: 動画のフレーム幅
+            frame_height: 動画のフレーム高さ
 
-    def _check_subsequent_frames(self, cap: cv2.VideoCapture, start_frame: int, num_frames: int) -> int:
+        Returns:
+            動画の解像度 / 基準解像度（reference_height が None の場合は 1.0）
+        """
+        scale = frame_height / self.reference_height if self.reference_height else 1.0
+        if scale != self.scale:
+            logger.info("Using template pyramid level for %dp (scale=%.3f)", frame_height, scale)
+        self.scale = scale
+        self.template_edges = self.template_pyramid.edges(scale)[0]
+        self.reject_templates_edges = self.reject_pyramid.edges(scale)
+        self.reject_bank = self.reject_pyramid.bank(scale)
+        self.search_region = to_frame_region(self._relative_search_region, frame_width, frame_height)
+        if self.result_detector is not None:
+            self.result_detector.rescale_for(frame_width, frame_height)
+        return scale
+
+    def frame_region(
+        self, region: tuple[float, float, float, float] | None, frame_width: int, frame_height: int
+    ) -> tuple[int, int, int, int] | None:
+        """
+        基準解像度のピクセル座標または相対座標の領域を動画の解像度のピクセル座標に変換
+
+        Args:
+            region: 領域 (x1, y1, x2, y2)
+            frame_width: 動画のフレーム幅
+            frame_height: 動画のフレーム高さ
+
+        Returns:
+            動画の解像度のピクセル座標の領域
+        """
+        relative_region = to_relative_region(region, self.reference_height, self.reference_width)
+        return to_frame_region(relative_region, frame_width, frame_height)
+
+    def _get_search_edges(self, entry: BufferedFrame) -> np.ndarray:
+        """
+        検索領域のエッジ画像を取得（バッファ内フレームごとにメモ化）
+
+        Args:
+            entry: デコード済みのバッファフレーム
+
+        Returns:
+            検索領域のエッジ画像
+        """
+        # 検索範囲を限定
+        return entry.context.edges("search", self.search_region)
+
+    def _get_coarse_edges(self, entry: BufferedFrame) -> np.ndarray:
+        """
+        縮小した検索領域のエッジ画像を取得（バッファ内フレームごとにメモ化）
+
+        Args:
+            entry: デコード済みのバッファフレーム
+
+        Returns:
+            縮小した検索領域のエッジ画像
+        """
+        return entry.context.coarse_edges("search", self.search_region, self.prefilter_scale)
+
+    def _coarse_score(self, coarse_edges: np.ndarray) -> float:
+        """
+        縮小した検索領域での粗いマッチングのスコアを算出（プレフィルタ・適応的走査に使用）
+
+        Args:
+            coarse_edges: 縮小した検索領域のエッジ画像
+
+        Returns:
+            粗いマッチングの最大スコア
+        """
+        result = cv2.matchTemplate(coarse_edges, self.template_coarse_edges, cv2.TM_CCOEFF_NORMED)
+        _, coarse_max_val, _, _ = cv2.minMaxLoc(result)
+        return coarse_max_val
+
+    def _check_subsequent_frames(self, reader: FrameLookaheadBuffer, start_frame: int, num_frames: int) -> int:
         """
         検出後の後続フレームで除外テンプレートマッチの回数をカウント
 
+        先読みバッファから後続フレームを参照するため、シークは発生しない。
+        フレーム供給元が間引いている場合は、供給されるフレームのみをチェックする。
+
         Args:
-            cap: VideoCapture オブジェクト
+            reader: 先読みバッファ付きフレームリーダー
             start_frame: 開始フレーム番号
             num_frames: チェックするフレーム数
 
@@ -105,37 +391,40 @@ class TemplateMatcher:
             除外テンプレートにマッチしたフレーム数
         """
         reject_count = 0
-        current_pos = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
 
-        for i in range(num_frames):
-            cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame + i)
-            ret, frame = cap.read()
-            if not ret:
+        for frame_number in reader.frame_numbers(start_frame, num_frames):
+            entry = reader.peek(frame_number)
+            if entry is None:
                 break
 
-            # 検索範囲を限定
-            if self.search_region:
-                x1, y1, x2, y2 = self.search_region
-                search_frame = frame[y1:y2, x1:x2]
-            else:
-                search_frame = frame
+            # フレームを前処理（バッファ内でメモ化）
+            frame_edges = self._get_search_edges(entry)
 
-            # フレームを前処理
-            frame_edges = preprocess_for_matching(search_frame)
+            # 除外テンプレートと一括マッチング（1つでもマッチしたらカウント）
+            if (self.reject_bank.max_scores(frame_edges) >= self.reject_threshold).any():
+                reject_count += 1
 
-            # 除外テンプレートとマッチング
-            for reject_template in self.reject_templates_edges:
-                reject_result = cv2.matchTemplate(frame_edges, reject_template, cv2.TM_CCOEFF_NORMED)
-                _, reject_max_val, _, _ = cv2.minMaxLoc(reject_result)
+        return reject_count
 
-                if reject_max_val >= self.reject_threshold:
-                    reject_count += 1
-                    break  # 1つでもマッチしたらカウント
+    @staticmethod
+    def _get_full_frame(reader: FrameLookaheadBuffer, frame_number: int) -> np.ndarray | None:
+        """
+        認識用の元フレーム（BGR全体）を取得
 
-        # 元の位置に戻す
-        cap.set(cv2.CAP_PROP_POS_FRAMES, current_pos)
+        供給元がフル解像度のフレームを供給する場合は先読みバッファから、
+        切り抜き済みのフレームを供給する場合は供給元から個別に取得する。
 
-        return reject_count
+        Args:
+            reader: 先読みバッファ付きフレームリーダー
+            frame_number: フレーム番号（next() で未取得のもの、または供給元から個別取得するもの）
+
+        Returns:
+            BGRフレーム、取得できない場合は None
+        """
+        if not reader.source.has_full_frames:
+            return reader.source.read_full_frame(frame_number)
+        entry = reader.peek(frame_number)
+        return entry.frame if entry is not None else None
 
     @staticmethod
     def _calc_frame_std(frame: np.ndarray) -> float:
@@ -153,7 +442,7 @@ class TemplateMatcher:
 
     def _select_best_offset_frame(
         self,
-        cap: cv2.VideoCapture,
+        reader: FrameLookaheadBuffer,
         base_frame_number: int,
         crop_region: tuple[int, int, int, int] | None,
     ) -> tuple[np.ndarray, int]:
@@ -165,36 +454,25 @@ class TemplateMatcher:
         - それ以外 → offsetを採用（デフォルト）
 
         Args:
-            cap: VideoCapture オブジェクト
+            reader: 先読みバッファ付きフレームリーダー
             base_frame_number: 検出されたフレーム番号
             crop_region: キャラクター名部分の切り抜き領域 (x1, y1, x2, y2)
 
         Returns:
             (選択されたフレーム, 使用したオフセット値)
         """
-        current_pos = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
-
-        # デフォルトオフセットのフレームを取得
-        offset_frame_number = base_frame_number + self.recognize_frame_offset
-        cap.set(cv2.CAP_PROP_POS_FRAMES, offset_frame_number)
-        ret_offset, frame_offset = cap.read()
-
-        # 代替オフセットのフレームを取得
-        offset_alt_frame_number = base_frame_number + self.recognize_frame_offset_alt
-        cap.set(cv2.CAP_PROP_POS_FRAMES, offset_alt_frame_number)
-        ret_alt, frame_alt = cap.read()
-
-        # 元の位置に戻す
-        cap.set(cv2.CAP_PROP_POS_FRAMES, current_pos)
+        # デフォルトオフセット・代替オフセットのフレームを取得
+        frame_offset = self._get_full_frame(reader, base_frame_number + self.recognize_frame_offset)
+        frame_alt = self._get_full_frame(reader, base_frame_number + self.recognize_frame_offset_alt)
 
         # 読み込み失敗時のフォールバック
-        if not ret_offset and not ret_alt:
+        if frame_offset is None and frame_alt is None:
             logger.warning("Failed to read both offset frames")
             return None, 0
-        if not ret_offset:
+        if frame_offset is None:
             logger.warning("Failed to read default offset frame, using alt offset")
             return frame_alt, self.recognize_frame_offset_alt
-        if not ret_alt:
+        if frame_alt is None:
             logger.warning("Failed to read alt offset frame, using default offset")
             return frame_offset, self.recognize_frame_offset
 
@@ -233,12 +511,98 @@ class TemplateMatcher:
             )
             return frame_offset, self.recognize_frame_offset
 
+    def _extract_recognition_frame(
+        self,
+        reader: FrameLookaheadBuffer,
+        frame_number: int,
+        frame: np.ndarray | None,
+        crop_region: tuple[int, int, int, int] | None,
+    ) -> np.ndarray | None:
+        """
+        認識用フレームを取得してキャラクター名領域を切り抜く（動的オフセット選択）
+
+        Args:
+            reader: 先読みバッファ付きフレームリーダー
+            frame_number: 検出されたフレーム番号
+            frame: 検出されたフレーム（切り抜き済みフレームの供給元では None 可）
+            crop_region: キャラクター名部分の切り抜き領域 (x1, y1, x2, y2)
+
+        Returns:
+            切り抜いたフレーム（コピー）、取得できない場合は None
+        """
+        recognize_frame = None
+        if self.recognize_frame_offset > 0:
+            recognize_frame, _ = self._select_best_offset_frame(reader, frame_number, crop_region)
+            if recognize_frame is None:
+                logger.warning("Failed to read offset frames, using original frame")
+        if recognize_frame is None:
+            # 切り抜き済みフレームの供給元では元フレームを個別に取得
+            source = reader.source
+            recognize_frame = frame if source.has_full_frames else source.read_full_frame(frame_number)
+        if recognize_frame is None:
+            return None
+
+        # キャラクター名領域を切り抜き
+        if crop_region:
+            x1, y1, x2, y2 = crop_region
+            recognize_frame = recognize_frame[y1:y2, x1:x2]
+        return recognize_frame.copy()
+
+    def _source_region(self, frame_width: int, frame_height: int) -> tuple[int, int, int, int]:
+        """ffmpeg で切り抜く矩形（Round 1・RESULT画面の検索領域をすべて含む）"""
+        regions = [self.search_region]
+        if self.result_detector is not None:
+            regions += [
+                self.result_detector.result_screen_search_region,
+                self.result_detector.win_text_search_region,
+            ]
+        return union_region(regions, frame_width, frame_height)
+
+    @staticmethod
+    def probe_video(video_path: str) -> tuple[float, int]:
+        """
+        動画のFPSと総フレーム数を取得
+
+        Args:
+            video_path: 動画ファイルのパス
+
+        Returns:
+            (fps, total_frames) のタプル
+        """
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise OSError(f"Cannot open video: {video_path}")
+        try:
+            return cap.get(cv2.CAP_PROP_FPS), int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        finally:
+            cap.release()
+
+    @staticmethod
+    def _probe_frame_size(video_path: str) -> tuple[int, int]:
+        """
+        動画のフレームサイズを取得
+
+        Args:
+            video_path: 動画ファイルのパス
+
+        Returns:
+            (width, height) のタプル
+        """
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise OSError(f"Cannot open video: {video_path}")
+        try:
+            return int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        finally:
+            cap.release()
+
     def detect_matches(
         self,
         video_path: str,
         start_sec: float = 0,
         duration_sec: float | None = None,
         crop_region: tuple[int, int, int, int] | None = None,
+        on_detection: Callable[[MatchDetection], None] | None = None,
     ) -> list[MatchDetection]:
         """
         動画から対戦シーンを検出
@@ -248,157 +612,447 @@ class TemplateMatcher:
             start_sec: 検出開始位置（秒）
             duration_sec: 検出期間（秒、Noneで動画終端まで）
             crop_region: キャラクター名部分の切り抜き領域 (x1, y1, x2, y2)
+            on_detection: 認識用フレームを取得した検出ごとに走査中に呼び出す関数（キャラクター認識の先行開始用）
 
         Returns:
             検出結果のリスト
         """
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            raise OSError(f"Cannot open video: {video_path}")
+        fps, _ = self.probe_video(video_path)
+        start_frame = int(start_sec * fps)
+        end_frame = start_frame + int(duration_sec * fps) if duration_sec is not None else None
+        return self.scan_segment(
+            video_path, start_frame, end_frame, crop_region=crop_region, on_detection=on_detection
+        ).detections
+
+    def scan_segment(
+        self,
+        video_path: str,
+        start_frame: int = 0,
+        end_frame: int | None = None,
+        crop_region: tuple[int, int, int, int] | None = None,
+        detect_leading_result: bool = False,
+        on_detection: Callable[[MatchDetection], None] | None = None,
+    ) -> SegmentScanResult:
+        """
+        動画の指定フレーム区間を走査して対戦シーンを検出
+
+        Args:
+            video_path: 動画ファイルのパス
+            start_frame: 走査開始フレーム番号
+            end_frame: 走査終了フレーム番号（このフレームは含まない、Noneで動画終端まで）
+            crop_region: キャラクター名部分の切り抜き領域 (x1, y1, x2, y2)、reference_height でのピクセル座標または相対座標
+            detect_leading_result: 区間内の最初のRound 1検出より前のRESULT画面も検出するか
+                （並列走査で前区間の最後の対戦に勝敗を付与するために使用）
+            on_detection: 認識用フレームを取得した検出ごとに走査中に呼び出す関数
+
+        Returns:
+            SegmentScanResult
+        """
+        fps, total_frames = self.probe_video(video_path)
+        end_frame = total_frames if end_frame is None else min(end_frame, total_frames)
+        segment = SegmentScanResult(detections=[], start_frame=start_frame, end_frame=end_frame)
+
+        # テンプレート・領域を動画の解像度に合わせる
+        frame_width, frame_height = self._probe_frame_size(video_path)
+        self.rescale_for(frame_width, frame_height)
+        crop_region = self.frame_region(crop_region, frame_width, frame_height)
+
+        # ffmpeg では Round 1・RESULT画面の検索領域を含む矩形のみを切り抜いて基準解像度以下に縮小し、
+        # マッチング対象フレームのみを出力
+        source_region = None
+        frame_step = 1
+        downscale = 1.0
+        if self.frame_source == "ffmpeg":
+            source_region = self._source_region(frame_width, frame_height)
+            frame_step = self.frame_interval
+            downscale = max(1.0, self.scale)
+        source = open_frame_source(
+            self.frame_source,
+            video_path,
+            start_frame=start_frame,
+            crop_region=source_region,
+            frame_step=frame_step,
+            downscale=downscale,
+        )
 
         try:
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            return self._scan(source, fps, segment, crop_region, detect_leading_result, on_detection)
+        finally:
+            source.release()
 
-            start_frame = int(start_sec * fps)
-            cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+    def scan_stream(
+        self,
+        stream: GrowingFile,
+        crop_region: tuple[int, int, int, int] | None = None,
+        duration_sec: float | None = None,
+        on_detection: Callable[[MatchDetection], None] | None = None,
+    ) -> SegmentScanResult:
+        """
+        ダウンロード中の動画を先頭から走査して対戦シーンを検出
 
-            end_frame = start_frame + int(duration_sec * fps) if duration_sec is not None else total_frames
+        ダウンロード済みの範囲を ffmpeg で逐次デコードし、ダウンロードの先端ではダウンロードを待つ。
+        frame_source の設定によらず ffmpeg（検索領域の切り抜き・フレーム間引き）を使用する。
+        ダウンロード中はシークできないため、適応的走査の後戻りは行わず（frame_interval 毎に走査）、
+        認識用フレームの取得はダウンロード完了後にまとめて行う。
 
-            detections: list[MatchDetection] = []
-            frame_count = start_frame
-            prev_timestamp: float | None = None
+        Args:
+            stream: ダウンロード中の動画ファイル
+            crop_region: キャラクター名部分の切り抜き領域 (x1, y1, x2, y2)、reference_height でのピクセル座標または相対座標
+            duration_sec: 動画の長さ（秒、進捗表示に使用）
+            on_detection: 認識用フレームを取得した検出ごとに呼び出す関数（ダウンロード完了後のフレーム取得時）
 
-            logger.info("Scanning video from %.1fs to %.1fs...", start_sec, end_frame / fps)
-            logger.info("Threshold is %.2f", self.threshold)
+        Returns:
+            SegmentScanResult（end_frame は実際に走査したフレーム数）
+        """
+        if self.adaptive_stride > 0:
+            logger.warning("Adaptive stride is disabled while streaming (cannot seek backward)")
+        self.rescale_for(stream.width, stream.height)
+        crop_region = self.frame_region(crop_region, stream.width, stream.height)
+        source = FfmpegFrameSource(
+            stream.path,
+            stream.fps,
+            stream.width,
+            stream.height,
+            crop_region=self._source_region(stream.width, stream.height),
+            frame_step=self.frame_interval,
+            downscale=max(1.0, self.scale),
+            growing_file=stream,
+        )
+        expected_frames = int(duration_sec * stream.fps) if duration_sec else 0
+        segment = SegmentScanResult(detections=[], start_frame=0, end_frame=expected_frames)
 
-            while frame_count < end_frame:
-                ret, frame = cap.read()
-                if not ret:
-                    break
+        try:
+            return self._scan(source, stream.fps, segment, crop_region, on_detection=on_detection)
+        finally:
+            source.release()
 
-                # 進捗表示（10秒ごと）
-                if (frame_count - start_frame) % int(fps * 10) == 0:
-                    progress = 100 * (frame_count - start_frame) / (end_frame - start_frame)
-                    logger.info(
-                        "Progress: %.1f%% (%d/%d frames)", progress, frame_count - start_frame, end_frame - start_frame
-                    )
+    def _scan(
+        self,
+        source: OpenCVFrameSource | FfmpegFrameSource,
+        fps: float,
+        segment: SegmentScanResult,
+        crop_region: tuple[int, int, int, int] | None,
+        detect_leading_result: bool = False,
+        on_detection: Callable[[MatchDetection], None] | None = None,
+    ) -> SegmentScanResult:
+        """
+        フレーム供給元を走査して segment に検出結果を格納
 
-                # frame_interval毎にマッチング
-                if (frame_count - start_frame) % self.frame_interval == 0:
-                    # 検索範囲を限定
-                    if self.search_region:
-                        x1, y1, x2, y2 = self.search_region
-                        search_frame = frame[y1:y2, x1:x2]
-                    else:
-                        search_frame = frame
+        供給元がダウンロード中のファイル（random_access=False）の場合は終端まで走査し、
+        segment.end_frame を走査したフレーム数で更新する。
 
-                    # フレームを前処理（エッジ抽出）
-                    frame_edges = preprocess_for_matching(search_frame)
+        Args:
+            source: フレーム供給元（segment.start_frame の位置から読み込み可能な状態）
+            fps: 動画のフレームレート
+            segment: 走査区間（検出結果の格納先）
+            crop_region: キャラクター名部分の切り抜き領域 (x1, y1, x2, y2)
+            detect_leading_result: 区間内の最初のRound 1検出より前のRESULT画面も検出するか
+            on_detection: 認識用フレームを取得した検出ごとに呼び出す関数
+
+        Returns:
+            segment
+        """
+        start_frame = segment.start_frame
+        end_frame = segment.end_frame
+        streaming = not source.random_access
+        # ダウンロード中は元フレームを取得できないため、認識用フレームの取得を走査後まで保留
+        pending_detections: list[MatchDetection] = []
+
+        # 後続フレームチェック・オフセット選択用の先読みバッファ（メモリ上限から容量を算出）
+        buffer_frames = FrameLookaheadBuffer.capacity_for(source, self.lookahead_buffer_max_mb)
+        required_frames = max(self.post_check_frames, self.recognize_frame_offset, self.recognize_frame_offset_alt) + 1
+        if buffer_frames < required_frames:
+            logger.warning(
+                "Lookahead buffer (%d frames, %.0fMB) is smaller than required (%d frames). "
+                "Post-check and offset selection are limited to buffered frames.",
+                buffer_frames,
+                self.lookahead_buffer_max_mb,
+                required_frames,
+            )
+        reader = FrameLookaheadBuffer(
+            source, start_frame, max_frames=min(buffer_frames, required_frames), context_scale=self.scale
+        )
+        # 供給元が間引いている場合は後続フレームチェックのフレーム数が 1 / frame_step になるため、
+        # 除外の上限も同じ割合にする（OpenCV で全フレームをチェックする場合と同じ割合で除外）
+        post_check_reject_limit = max(1, math.ceil(self.post_check_reject_limit / reader.frame_step))
+
+        detections = segment.detections
+        stats = segment.stats
+        scheduler = AdaptiveStrideScheduler(
+            start_frame,
+            self.frame_interval,
+            sparse_stride=0 if streaming else self.adaptive_stride,
+            dense_threshold=self.adaptive_dense_threshold,
+            match_window_frames=int(self.min_match_duration_sec * fps),
+        )
+        result_scheduler = ResultCheckScheduler(
+            start_frame,
+            self.frame_interval,
+            min_delay_frames=int(self.result_min_delay_sec * fps),
+            check_interval_frames=int(self.result_check_interval_sec * fps),
+            signal_threshold=self.result_signal_threshold,
+        )
+        sampling_stride = scheduler.sparse_stride or self.frame_interval
+        use_coarse_score = self.prefilter_threshold > 0 or scheduler.adaptive
+        prev_timestamp: float | None = None
+        progress_interval = max(1, int(fps * 10))
+        next_progress_frame = start_frame
+
+        if streaming:
+            logger.info("Scanning video while downloading...")
+        else:
+            logger.info("Scanning video from %.1fs to %.1fs...", start_frame / fps, end_frame / fps)
+        logger.info(
+            "Threshold is %.2f (scan_mode=%s, frame_source=%s)",
+            self.threshold,
+            self.scan_mode,
+            "ffmpeg-stream" if streaming else self.frame_source,
+        )
+
+        scan_started = time.perf_counter()
+        while streaming or reader.next_frame_number < end_frame:
+            frame_count = reader.next_frame_number
+            # スケジューラが決めたフレームでマッチング（適応的走査が無効なら frame_interval 毎）
+            is_sample_frame = frame_count == scheduler.next_sample_frame
+
+            # grabモードではマッチング対象外のフレームをデコードせずに読み飛ばす
+            with stats.timed("decode"):
+                entry = reader.next(decode=is_sample_frame or self.scan_mode == "read")
+            if entry is None:
+                break
+            frame = entry.frame
+
+            # 進捗表示（10秒ごと）
+            if frame_count >= next_progress_frame:
+                next_progress_frame += progress_interval
+                if end_frame > start_frame:
+                    # ダウンロード中は動画の長さからの推定値
+                    progress = min(100.0, 100 * (frame_count - start_frame) / (end_frame - start_frame))
+                    logger.info(
+                        "Progress: %.1f%% (%d/%d frames)",
+                        progress,
+                        frame_count - start_frame,
+                        end_frame - start_frame,
+                    )
+                else:
+                    logger.info("Progress: %.1fs scanned", frame_count / fps)
+
+            if is_sample_frame:
+                in_match_window = scheduler.in_match_window(frame_count)
+
+                result_pending = (
+                    self.result_detector is not None and len(detections) > 0 and detections[-1].winner_side is None
+                )
+                if in_match_window:
+                    # 対戦区間内で勝敗が確定済み（またはRESULT検出なし）なら区間の残りを、
+                    # RESULT画面の検出開始前なら検出開始までを読み飛ばす
+                    jump_frame = scheduler.match_window_end
+                    if result_pending:
+                        jump_frame = min(jump_frame, result_scheduler.open_frame)
+                    if jump_frame > frame_count:
+                        if result_pending:
+                            stats.result_checks_saved += -(-(jump_frame - frame_count) // sampling_stride)
+                        stats.jumped_frames += jump_frame - frame_count
+                        reader.seek(jump_frame)
+                        scheduler.jump_to(jump_frame)
+                        continue
+
+                coarse_score = None
+                if use_coarse_score and not in_match_window:
+                    with stats.timed("preprocess"):
+                        coarse_edges = self._get_coarse_edges(entry)
+                    with stats.timed("match"):
+                        coarse_score = self._coarse_score(coarse_edges)
+
+                # 疎な走査中に粗いマッチングのスコアが上昇したら、飛ばした区間を密に走査し直す
+                backtrack_frame = scheduler.observe(frame_count, coarse_score)
+                if backtrack_frame is not None:
+                    stats.backtracks += 1
+                    reader.seek(backtrack_frame)
+                    continue
+
+                stats.sampled_frames += 1
+                max_val = None
+
+                if in_match_window:
+                    # 対戦区間内はRound 1のマッチングを行わない（RESULT検出のみ）
+                    stats.match_window_sampled += 1
+                elif self.prefilter_threshold > 0 and coarse_score < self.prefilter_threshold:
+                    # 縮小画像での粗いマッチングで明らかな対象外フレームを除外
+                    stats.prefilter_rejected += 1
+                else:
+                    # フレームを前処理（エッジ抽出、後続フレームチェックで計算済みなら再利用）
+                    with stats.timed("preprocess"):
+                        frame_edges = self._get_search_edges(entry)
 
                     # エッジ画像同士でマッチング
-                    result = cv2.matchTemplate(frame_edges, self.template_edges, cv2.TM_CCOEFF_NORMED)
-                    min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-
-                    # Round 1テンプレート検出
-                    round1_detected = False
-                    if max_val >= self.threshold:
-                        # 除外テンプレート（Round 2, Final Round）との照合
-                        should_reject = False
-                        reject_reason = ""
-                        for idx, reject_template in enumerate(self.reject_templates_edges):
-                            reject_result = cv2.matchTemplate(frame_edges, reject_template, cv2.TM_CCOEFF_NORMED)
-                            _, reject_max_val, _, _ = cv2.minMaxLoc(reject_result)
-
-                            if reject_max_val >= self.reject_threshold:
-                                should_reject = True
-                                reject_reason = f"reject_template_{idx} (confidence: {reject_max_val:.3f})"
-                                break
-
-                        if should_reject:
-                            logger.info("Rejected match at %.1fs - matched %s", frame_count / fps, reject_reason)
-                            frame_count += 1
-                            continue
-
-                        timestamp = frame_count / fps
-
-                        # 連続マッチのスキップ
-                        if prev_timestamp is None or timestamp - prev_timestamp >= self.min_interval_sec:
-                            # 後続フレームで除外テンプレートマッチをチェック
-                            if self.reject_templates_edges and self.post_check_frames > 0:
+                    with stats.timed("match"):
+                        result = cv2.matchTemplate(frame_edges, self.template_edges, cv2.TM_CCOEFF_NORMED)
+                        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+                    if max_val < self.threshold:
+                        stats.threshold_rejected += 1
+
+                # Round 1テンプレート検出
+                round1_detected = False
+                if max_val is not None and max_val >= self.threshold:
+                    # 除外テンプレート（Round 2, Final Round）との照合
+                    should_reject = False
+                    reject_reason = ""
+                    with stats.timed("match"):
+                        reject_scores = self.reject_bank.max_scores(frame_edges)
+                    for idx, reject_max_val in enumerate(reject_scores):
+                        if reject_max_val >= self.reject_threshold:
+                            should_reject = True
+                            reject_reason = f"reject_template_{idx} (confidence: {reject_max_val:.3f})"
+                            break
+
+                    if should_reject:
+                        logger.info("Rejected match at %.1fs - matched %s", frame_count / fps, reject_reason)
+                        stats.reject_template_rejected += 1
+                        continue
+
+                    timestamp = frame_count / fps
+
+                    # 連続マッチのスキップ
+                    if prev_timestamp is None or timestamp - prev_timestamp >= self.min_interval_sec:
+                        # 後続フレームで除外テンプレートマッチをチェック
+                        if self.reject_templates_edges and self.post_check_frames > 0:
+                            with stats.timed("post_check"):
                                 subsequent_reject_count = self._check_subsequent_frames(
-                                    cap, frame_count + 1, self.post_check_frames
+                                    reader, frame_count + 1, self.post_check_frames
                                 )
 
-                                if subsequent_reject_count >= self.post_check_reject_limit:
-                                    logger.info(
-                                        "Rejected match at %.1fs - subsequent frames have %d reject matches (limit: %d)",
-                                        timestamp,
-                                        subsequent_reject_count,
-                                        self.post_check_reject_limit,
-                                    )
-                                    # 誤検知判定されたら、次のチェックまでスキップ
-                                    prev_timestamp = timestamp
-                                    frame_count += 1
-                                    continue
-
-                            prev_timestamp = timestamp
-
-                            logger.info("Match detected at %.1fs (confidence: %.3f)", timestamp, max_val)
-
-                            # 認識用フレームを取得（動的オフセット選択）
-                            recognize_frame = frame
-                            used_offset = 0
-                            if self.recognize_frame_offset > 0:
-                                selected_frame, used_offset = self._select_best_offset_frame(
-                                    cap, frame_count, crop_region
+                            if subsequent_reject_count >= post_check_reject_limit:
+                                logger.info(
+                                    "Rejected match at %.1fs - subsequent frames have %d reject matches (limit: %d)",
+                                    timestamp,
+                                    subsequent_reject_count,
+                                    post_check_reject_limit,
                                 )
-                                if selected_frame is not None:
-                                    recognize_frame = selected_frame
-                                else:
-                                    logger.warning("Failed to read offset frames, using original frame")
-                                # 現在位置を元に戻す（次のループのため）
-                                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_count + 1)
-
-                            # キャラクター名領域を切り抜き
-                            cropped_frame = recognize_frame
-                            if crop_region:
-                                x1, y1, x2, y2 = crop_region
-                                cropped_frame = recognize_frame[y1:y2, x1:x2]
-
-                            detection = MatchDetection(
-                                timestamp=timestamp,
-                                frame_number=frame_count,
-                                confidence=float(max_val),
-                                frame=cropped_frame.copy(),
-                            )
-                            detections.append(detection)
-                            round1_detected = True
-
-                    # RESULT画面検出（Round 1検出後で、RESULT未検出の場合）
-                    if (
-                        not round1_detected
-                        and self.result_detector is not None
-                        and len(detections) > 0
-                        and detections[-1].winner_side is None
-                    ):
-                        # Round 1フレーム（search_region適用済み）をそのまま使用
-                        result_detection = self.result_detector.detect_result(frame)
-                        if result_detection.winner_side is not None:
-                            detections[-1].winner_side = result_detection.winner_side
-                            logger.info(
-                                "RESULT detected at %.1fs: %s (win_position=%s)",
-                                frame_count / fps,
-                                result_detection.winner_side,
-                                result_detection.win_position,
-                            )
-
-                frame_count += 1
-
-            logger.info("Detection complete. Found %d matches.", len(detections))
-            return detections
-        finally:
-            cap.release()
+                                # 誤検知判定されたら、次のチェックまでスキップ
+                                prev_timestamp = timestamp
+                                stats.post_check_rejected += 1
+                                continue
+
+                        prev_timestamp = timestamp
+
+                        logger.info("Match detected at %.1fs (confidence: %.3f)", timestamp, max_val)
+
+                        # 認識用フレームを取得（ダウンロード中は走査後に取得）
+                        cropped_frame = None
+                        if not streaming:
+                            with stats.timed("decode"):
+                                cropped_frame = self._extract_recognition_frame(reader, frame_count, frame, crop_region)
+                            if cropped_frame is None:
+                                logger.warning("Failed to read frame for recognition at %.1fs, skipping", timestamp)
+                                continue
+
+                        detection = MatchDetection(
+                            timestamp=timestamp,
+                            frame_number=frame_count,
+                            confidence=float(max_val),
+                            frame=cropped_frame,
+                        )
+                        detections.append(detection)
+                        if streaming:
+                            pending_detections.append(detection)
+                        elif on_detection is not None:
+                            on_detection(detection)
+                        stats.detected += 1
+                        round1_detected = True
+                        scheduler.on_detection(frame_count)
+                    else:
+                        stats.interval_skipped += 1
+
+                if round1_detected:
+                    # 次の対戦のRESULT画面は最小の待ち時間の後から検出する
+                    result_scheduler.on_detection(frame_count)
+
+                # RESULT画面検出（Round 1検出後で、RESULT未検出の場合）
+                if not round1_detected and result_pending:
+                    result_detection = self._check_result(result_scheduler, frame_count, entry, source.width, stats)
+                    if result_detection is not None and result_detection.winner_side is not None:
+                        detections[-1].winner_side = result_detection.winner_side
+                        detections[-1].winner_confidence = result_detection.detection_confidence
+                        logger.info(
+                            "RESULT detected at %.1fs: %s (win_position=%s, confidence=%.3f)",
+                            frame_count / fps,
+                            result_detection.winner_side,
+                            result_detection.win_position,
+                            result_detection.detection_confidence,
+                        )
+                # 区間先頭のRESULT画面検出（区間内で最初のRound 1検出より前、前区間の対戦の結果）
+                elif (
+                    detect_leading_result
+                    and not detections
+                    and self.result_detector is not None
+                    and segment.leading_winner_side is None
+                ):
+                    result_detection = self._check_result(result_scheduler, frame_count, entry, source.width, stats)
+                    if result_detection is not None and result_detection.winner_side is not None:
+                        segment.leading_winner_side = result_detection.winner_side
+                        segment.leading_winner_confidence = result_detection.detection_confidence
+                        segment.leading_result_frame = frame_count
+                        logger.info(
+                            "Leading RESULT detected at %.1fs: %s (win_position=%s, confidence=%.3f)",
+                            frame_count / fps,
+                            result_detection.winner_side,
+                            result_detection.win_position,
+                            result_detection.detection_confidence,
+                        )
+
+        if streaming:
+            segment.end_frame = reader.next_frame_number
+            # ダウンロード完了後（供給元の終端）に認識用フレームを取得
+            for detection in pending_detections:
+                with stats.timed("decode"):
+                    detection.frame = self._extract_recognition_frame(reader, detection.frame_number, None, crop_region)
+                if detection.frame is None:
+                    logger.warning("Failed to read frame for recognition at %.1fs, skipping", detection.timestamp)
+                    detections.remove(detection)
+                    stats.detected -= 1
+                elif on_detection is not None:
+                    on_detection(detection)
+
+        stats.scan_sec += time.perf_counter() - scan_started
+        stats.read_frames += reader.decoded_frames + reader.skipped_frames
+        stats.decoded_frames += reader.decoded_frames
+        logger.info(
+            "Detection complete. Found %d matches. (decoded=%d, skipped=%d frames, seeks=%d)",
+            len(detections),
+            reader.decoded_frames,
+            reader.skipped_frames,
+            reader.seeks,
+        )
+        stats.log_summary()
+        stats.record_metrics()
+        return segment
+
+    def _check_result(
+        self,
+        result_scheduler: ResultCheckScheduler,
+        frame_number: int,
+        entry: BufferedFrame,
+        frame_width: int,
+        stats: ScanStats,
+    ) -> "ResultDetection | None":
+        """
+        スケジューラが選んだ走査対象フレームでRESULT画面を検出
+
+        Returns:
+            RESULT画面の検出結果（検出を省いた場合は None）
+        """
+        with stats.timed("result"):
+            # バナー領域の輝度ヒストグラムは検出と同じグレースケール画像から計算（必要な場合のみ）
+            signature = None
+            if result_scheduler.uses_signal and frame_number >= result_scheduler.open_frame:
+                signature = self.result_detector.banner_histogram(entry.context)
+            if not result_scheduler.should_check(frame_number, signature):
+                stats.result_checks_saved += 1
+                return None
+            stats.result_checks += 1
+            # Round 1検出と同じ前処理コンテキストを使用（領域ごとのエッジ画像を共有）
+            return self.result_detector.detect_result(entry.context, frame_width=frame_width)
 
     @staticmethod
     def save_detection_frame(detection: MatchDetection, output_path: str) -> None:
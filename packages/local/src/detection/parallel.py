@@ -0,0 +1,198 @@
+"""
+動画の区間分割による並列走査
+
+動画を重なりのある時間区間に分割し、プロセスプールで各区間を並列に走査する。
+各ワーカーは独自の cv2.VideoCapture を開いて TemplateMatcher.scan_segment を実行し、
+結果は min_interval_sec による重複除去と区間をまたいだ RESULT 画面の付与を行って結合する。
+"""
+
+import math
+import multiprocessing
+import os
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+from ..utils.logger import get_logger
+from .matcher import MatchDetection, ScanStats, SegmentScanResult, TemplateMatcher
+
+logger = get_logger()
+
+
+def _available_cpu_count() -> int:
+    """このプロセスが使用できる CPU コア数（CPU affinity を反映、取得できない場合は os.cpu_count()）"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _scan_segment_worker(
+    matcher: TemplateMatcher,
+    video_path: str,
+    start_frame: int,
+    end_frame: int,
+    crop_region: tuple[int, int, int, int] | None,
+) -> SegmentScanResult:
+    """ワーカープロセスで1区間を走査"""
+    # プロセス数ぶん並列化するため、OpenCV内部のスレッド並列は無効化
+    cv2.setNumThreads(1)
+    return matcher.scan_segment(
+        video_path,
+        start_frame=start_frame,
+        end_frame=end_frame,
+        crop_region=crop_region,
+        detect_leading_result=True,
+    )
+
+
+class ParallelMatchScanner:
+    """区間分割によるプロセス並列の対戦シーン検出器"""
+
+    def __init__(
+        self,
+        matcher: TemplateMatcher,
+        workers: int = 0,
+        segment_overlap_sec: float = 10.0,
+        min_segment_sec: float = 120.0,
+    ):
+        """
+        Args:
+            matcher: 各区間の走査に使用する TemplateMatcher（ワーカーへ pickle で渡される）
+            workers: ワーカープロセス数（0 で使用できる CPU コア数、1 で並列化しない）
+            segment_overlap_sec: 区間の重なり幅（秒）。区間の境界をまたぐRound 1画面や
+                post-check による除外を正しく扱うため、前区間の末尾から走査を開始する
+            min_segment_sec: 区間あたりの最小長（秒）。短い動画は分割数を減らす
+        """
+        if workers < 0:
+            raise ValueError(f"workers must be non-negative, got {workers}")
+        if segment_overlap_sec < 0:
+            raise ValueError(f"segment_overlap_sec must be non-negative, got {segment_overlap_sec}")
+        if min_segment_sec <= 0:
+            raise ValueError(f"min_segment_sec must be positive, got {min_segment_sec}")
+
+        self.matcher = matcher
+        self.workers = workers or _available_cpu_count()
+        self.segment_overlap_sec = segment_overlap_sec
+        self.min_segment_sec = min_segment_sec
+
+    def _split_segments(self, total_frames: int, fps: float) -> list[tuple[int, int]]:
+        """
+        走査区間を算出
+
+        区間の開始フレームは frame_interval の倍数に揃え、逐次走査と同じフレームが
+        マッチング対象になるようにする。
+
+        Returns:
+            (開始フレーム, 終了フレーム) のリスト（重なり込み）
+        """
+        interval = self.matcher.frame_interval
+        duration_sec = total_frames / fps if fps > 0 else 0.0
+        num_segments = max(1, min(self.workers, math.ceil(duration_sec / self.min_segment_sec)))
+        overlap_frames = int(self.segment_overlap_sec * fps)
+
+        segment_length = math.ceil(total_frames / num_segments / interval) * interval
+        segments = []
+        for i in range(num_segments):
+            owned_start = i * segment_length
+            if owned_start >= total_frames:
+                break
+            end = min(total_frames, owned_start + segment_length)
+            # 重なり分だけ手前から走査（frame_interval の倍数に揃える）
+            start = max(0, (owned_start - overlap_frames) // interval * interval)
+            segments.append((start, end))
+        return segments
+
+    def _merge_segments(self, segments: list[SegmentScanResult], fps: float) -> list[MatchDetection]:
+        """
+        区間ごとの検出結果を結合
+
+        1. フレーム番号順に並べ、min_interval_sec 以内の検出は重複として除去
+           （重複側で検出されたRESULTは残した側に引き継ぐ）
+        2. 各区間の先頭で検出したRESULT画面を、それより前の直近の検出に付与
+        """
+        all_detections = sorted(
+            (d for segment in segments for d in segment.detections),
+            key=lambda d: d.frame_number,
+        )
+
+        merged: list[MatchDetection] = []
+        min_interval_frames = self.matcher.min_interval_sec * fps
+        for detection in all_detections:
+            if merged and detection.frame_number - merged[-1].frame_number < min_interval_frames:
+                if merged[-1].winner_side is None and detection.winner_side is not None:
+                    merged[-1].winner_side = detection.winner_side
+                    merged[-1].winner_confidence = detection.winner_confidence
+                continue
+            merged.append(detection)
+
+        for segment in segments:
+            if segment.leading_winner_side is None or segment.leading_result_frame is None:
+                continue
+            previous = [d for d in merged if d.frame_number < segment.leading_result_frame]
+            if previous and previous[-1].winner_side is None:
+                previous[-1].winner_side = segment.leading_winner_side
+                previous[-1].winner_confidence = segment.leading_winner_confidence
+                logger.info(
+                    "Attached RESULT across segment boundary: %.1fs → match at %.1fs (%s)",
+                    segment.leading_result_frame / fps,
+                    previous[-1].timestamp,
+                    segment.leading_winner_side,
+                )
+
+        return merged
+
+    def detect_matches(
+        self,
+        video_path: str,
+        crop_region: tuple[int, int, int, int] | None = None,
+        on_detection: Callable[[MatchDetection], None] | None = None,
+    ) -> list[MatchDetection]:
+        """
+        動画全体を区間分割して並列に対戦シーンを検出
+
+        Args:
+            video_path: 動画ファイルのパス
+            crop_region: キャラクター名部分の切り抜き領域 (x1, y1, x2, y2)
+            on_detection: 検出ごとに呼び出す関数（全区間の走査の完了後に、重なり部分の重複を除去した検出で呼び出す）
+
+        Returns:
+            検出結果のリスト（時刻順）
+        """
+        fps, total_frames = self.matcher.probe_video(video_path)
+        segments = self._split_segments(total_frames, fps)
+
+        if len(segments) <= 1:
+            return self.matcher.detect_matches(video_path, crop_region=crop_region, on_detection=on_detection)
+
+        logger.info(
+            "Parallel scan: %d segments × %d workers (overlap %.1fs)",
+            len(segments),
+            self.workers,
+            self.segment_overlap_sec,
+        )
+
+        # 認識のスレッド（BackgroundRecognizer）の動作中に fork しないよう、ワーカーは spawn で起動
+        with ProcessPoolExecutor(
+            max_workers=min(self.workers, len(segments)), mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            futures = [
+                executor.submit(_scan_segment_worker, self.matcher, video_path, start, end, crop_region)
+                for start, end in segments
+            ]
+            results = [future.result() for future in futures]
+
+        detections = self._merge_segments(results, fps)
+        logger.info("Parallel detection complete. Found %d matches.", len(detections))
+        if on_detection is not None:
+            for detection in detections:
+                on_detection(detection)
+
+        # 区間ごとの集計を合算（重なり部分は重複して数えられる）
+        # ワーカープロセスでの計測値の記録は親プロセスに反映されないため、合算した集計を記録する
+        stats = ScanStats()
+        for result in results:
+            stats.merge(result.stats)
+        stats.log_summary()
+        stats.record_metrics()
+        return detections
@@ -3,9 +3,15 @@
 
 複数のモジュールで共有される画像前処理関数を集約。
 - テンプレートマッチング用: グレースケール化 → ノイズ除去 → エッジ検出
+- フレーム単位の前処理コンテキスト: 名前付き領域ごとに上記の中間結果をメモ化し、
+  Round 1検出・除外テンプレート照合・RESULT画面検出で共有
+- 解像度に依存しない領域指定: 基準解像度のピクセル座標を相対座標（0.0-1.0）に正規化し、
+  走査時に動画の解像度のピクセル座標に戻す
 - キャラクター再認識用: ネガポジ反転（ADR-033）
 """
 
+import math
+
 import cv2
 import numpy as np
 
@@ -32,7 +38,36 @@ def preprocess_for_recognition(image: np.ndarray, method: str = "negative") -> n
     raise ValueError(f"Unsupported preprocessing method: {method}")
 
 
-def preprocess_for_matching(image: np.ndarray) -> np.ndarray:
+def _to_gray(image: np.ndarray) -> np.ndarray:
+    """グレースケール化（グレースケール画像はそのまま返す）"""
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image
+
+
+def blur_kernel_size(scale: float = 1.0) -> int:
+    """
+    マッチング用ブラーのカーネルサイズ（基準解像度で 17、解像度に比例して奇数で縮小・拡大）
+
+    Args:
+        scale: 画像の解像度 / 基準解像度
+
+    Returns:
+        カーネルサイズ（3以上の奇数）
+    """
+    return max(3, int(17 * scale) | 1)
+
+
+def _blur_for_matching(gray: np.ndarray, scale: float = 1.0) -> np.ndarray:
+    """ガウシアンブラーでノイズ除去"""
+    kernel_size = blur_kernel_size(scale)
+    return cv2.GaussianBlur(gray, (kernel_size, kernel_size), 0)
+
+
+def _edges_for_matching(blurred: np.ndarray) -> np.ndarray:
+    """Cannyエッジ検出"""
+    return cv2.Canny(blurred, 50, 150)
+
+
+def preprocess_for_matching(image: np.ndarray, scale: float = 1.0) -> np.ndarray:
     """
     テンプレートマッチング用の画像前処理
 
@@ -40,17 +75,205 @@ def preprocess_for_matching(image: np.ndarray) -> np.ndarray:
 
     Args:
         image: 入力画像 (BGR または グレースケール)
+        scale: 画像の解像度 / 基準解像度（ブラーのカーネルサイズを合わせる）
 
     Returns:
         エッジ抽出済みのグレースケール画像
     """
-    # グレースケール化
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image
+    return _edges_for_matching(_blur_for_matching(_to_gray(image), scale))
+
+
+def preprocess_for_coarse_matching(image: np.ndarray, scale: float, kernel_scale: float | None = None) -> np.ndarray:
+    """
+    粗いテンプレートマッチング（プレフィルタ）用の画像前処理
+
+    縮小してから preprocess_for_matching と同等の処理を行う。
+    ブラーのカーネルサイズも縮小率に合わせて小さくする。
+
+    Args:
+        image: 入力画像 (BGR または グレースケール)
+        scale: 縮小率
+        kernel_scale: ブラーのカーネルサイズの縮小率（None で scale と同じ）。
+            基準解像度と異なる解像度の画像を縮小する場合に、基準解像度に対する縮小率を指定する
+
+    Returns:
+        縮小済みのエッジ抽出画像
+    """
+    # 先に縮小してからグレースケール化（変換する画素数を減らす）
+    interpolation = cv2.INTER_AREA if scale <= 1.0 else cv2.INTER_LINEAR
+    small = cv2.resize(image, None, fx=scale, fy=scale, interpolation=interpolation)
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if len(small.shape) == 3 else small
+
+    kernel_size = blur_kernel_size(scale if kernel_scale is None else kernel_scale)
+    blurred = cv2.GaussianBlur(gray, (kernel_size, kernel_size), 0)
+
+    return cv2.Canny(blurred, 50, 150)
+
+
+# 領域・テンプレートの基準解像度の縦横比（SF6 の画面は 16:9）
+REFERENCE_ASPECT_RATIO = 16 / 9
+
+# 相対座標からピクセル座標への変換で浮動小数点誤差を吸収する幅
+_REGION_EPSILON = 1e-6
+
+
+def is_relative_region(region: tuple[float, float, float, float] | None) -> bool:
+    """領域が相対座標（すべて 0.0-1.0 の範囲で、小数を含む）で指定されているか"""
+    return region is not None and all(0.0 <= v <= 1.0 for v in region) and any(isinstance(v, float) for v in region)
+
+
+def to_relative_region(
+    region: tuple[float, float, float, float] | None,
+    reference_height: int | None,
+    reference_width: int | None = None,
+) -> tuple[float, float, float, float] | None:
+    """
+    基準解像度のピクセル座標の領域を相対座標（0.0-1.0）に正規化
+
+    Args:
+        region: 領域 (x1, y1, x2, y2)。相対座標で指定済みの場合はそのまま返す
+        reference_height: 領域を指定した動画の高さ。None の場合はピクセル座標のまま返す
+        reference_width: 領域を指定した動画の幅（None で高さから 16:9 として算出）
+
+    Returns:
+        相対座標の領域（region が None の場合は None）
+    """
+    if region is None or is_relative_region(region) or reference_height is None:
+        return region
+    if reference_width is None:
+        reference_width = reference_height * REFERENCE_ASPECT_RATIO
+    x1, y1, x2, y2 = region
+    return (x1 / reference_width, y1 / reference_height, x2 / reference_width, y2 / reference_height)
+
+
+def to_frame_region(
+    region: tuple[float, float, float, float] | None, frame_width: int, frame_height: int
+) -> tuple[int, int, int, int] | None:
+    """
+    相対座標の領域を動画の解像度のピクセル座標に変換
+
+    元の領域の内容を含むよう、始点は切り捨て・終点は切り上げる。
+
+    Args:
+        region: 領域 (x1, y1, x2, y2)。ピクセル座標の場合はそのまま返す
+        frame_width: 動画のフレーム幅
+        frame_height: 動画のフレーム高さ
+
+    Returns:
+        ピクセル座標の領域（region が None の場合は None）
+    """
+    if region is None or not is_relative_region(region):
+        return region
+    x1, y1, x2, y2 = region
+    return (
+        math.floor(x1 * frame_width + _REGION_EPSILON),
+        math.floor(y1 * frame_height + _REGION_EPSILON),
+        math.ceil(x2 * frame_width - _REGION_EPSILON),
+        math.ceil(y2 * frame_height - _REGION_EPSILON),
+    )
+
+
+class FramePreprocessContext:
+    """
+    1フレーム分のテンプレートマッチング用前処理のメモ化
+
+    名前付き領域ごとにグレースケール・ブラー・エッジ画像を遅延計算して保持する。
+    同じフレームに対する Round 1検出・除外テンプレート照合・RESULT画面検出で共有することで、
+    各領域のブラーとCannyエッジ検出はフレームあたり1回だけ行われる。
+
+    動画の解像度がテンプレートの基準解像度より低い場合（scale < 1）は、同じ倍率のテンプレート
+    ピラミッドの段と照合できるよう、ブラーのカーネルサイズを解像度に合わせる（画像は拡大しない）。
+    基準解像度より高い場合（scale > 1）は、領域のグレースケール画像を基準解像度に縮小する
+    （エッジ画像の座標は元フレームの 1 / downscale 倍になる）。
+    フレーム供給元が縮小済みのフレームを供給する場合（frame_downscale > 1）は、残りの倍率のみ縮小する。
+    """
+
+    def __init__(
+        self,
+        frame: np.ndarray,
+        origin: tuple[int, int] = (0, 0),
+        scale: float = 1.0,
+        frame_downscale: float = 1.0,
+    ):
+        """
+        Args:
+            frame: フレーム画像 (BGR または グレースケール)
+            origin: frame の左上が元フレーム上のどこに当たるか (x, y)。
+                フレーム供給元が切り抜き済みのフレームを供給する場合に使用
+            scale: 動画の解像度 / テンプレートの基準解像度（ブラーのカーネルサイズに使用）
+            frame_downscale: 元フレームの座標 / frame の座標（フレーム供給元で縮小済みの場合）
+        """
+        self.frame = frame
+        self.origin = origin
+        self.scale = scale
+        self.frame_downscale = frame_downscale
+        self.downscale = max(1.0, scale)  # 元フレームの座標 / エッジ画像の座標
+        self._gray: dict[str, np.ndarray] = {}
+        self._blurred: dict[str, np.ndarray] = {}
+        self._edges: dict[str, np.ndarray] = {}
+        self._coarse_edges: dict[tuple[str, float], np.ndarray] = {}
+
+    def crop(self, region: tuple[int, int, int, int] | None) -> np.ndarray:
+        """
+        元フレーム座標の領域を切り抜く
+
+        Args:
+            region: 切り抜き領域 (x1, y1, x2, y2)、None でフレーム全体
+
+        Returns:
+            切り抜き画像（ビュー）
+        """
+        if not region:
+            return self.frame
+        ox, oy = self.origin
+        x1, y1, x2, y2 = region
+        if self.frame_downscale != 1.0:
+            d = self.frame_downscale
+            x1, y1, x2, y2 = round((x1 - ox) / d), round((y1 - oy) / d), round((x2 - ox) / d), round((y2 - oy) / d)
+            return self.frame[y1:y2, x1:x2]
+        return self.frame[y1 - oy : y2 - oy, x1 - ox : x2 - ox]
+
+    def gray(self, name: str, region: tuple[int, int, int, int] | None) -> np.ndarray:
+        """名前付き領域のグレースケール画像"""
+        if name not in self._gray:
+            gray = _to_gray(self.crop(region))
+            downscale = self.downscale / self.frame_downscale
+            if downscale > 1.0:
+                gray = cv2.resize(gray, None, fx=1 / downscale, fy=1 / downscale, interpolation=cv2.INTER_AREA)
+            self._gray[name] = gray
+        return self._gray[name]
+
+    def blurred(self, name: str, region: tuple[int, int, int, int] | None) -> np.ndarray:
+        """名前付き領域のブラー画像"""
+        if name not in self._blurred:
+            self._blurred[name] = _blur_for_matching(self.gray(name, region), min(self.scale, 1.0))
+        return self._blurred[name]
+
+    def edges(self, name: str, region: tuple[int, int, int, int] | None) -> np.ndarray:
+        """
+        名前付き領域のエッジ画像（scale <= 1 では preprocess_for_matching(..., scale) と同じ結果）
+
+        Args:
+            name: 領域名（同じ名前には常に同じ領域を指定する）
+            region: 領域 (x1, y1, x2, y2)、None でフレーム全体
 
-    # ガウシアンブラーでノイズ除去
-    blurred = cv2.GaussianBlur(gray, (17, 17), 0)
+        Returns:
+            エッジ抽出済みのグレースケール画像
+        """
+        if name not in self._edges:
+            self._edges[name] = _edges_for_matching(self.blurred(name, region))
+        return self._edges[name]
 
-    # Cannyエッジ検出
-    edges = cv2.Canny(blurred, 50, 150)
+    def coarse_edges(self, name: str, region: tuple[int, int, int, int] | None, scale: float) -> np.ndarray:
+        """
+        名前付き領域の縮小エッジ画像（preprocess_for_coarse_matching と同じ結果）
 
-    return edges
+        scale は基準解像度に対する縮小率。動画の解像度が基準解像度と異なる場合も、
+        切り抜いた領域から直接その縮小率になるよう1回だけ縮小する。
+        """
+        key = (name, scale)
+        if key not in self._coarse_edges:
+            self._coarse_edges[key] = preprocess_for_coarse_matching(
+                self.crop(region), scale / self.scale * self.frame_downscale, kernel_scale=scale
+            )
+        return self._coarse_edges[key]
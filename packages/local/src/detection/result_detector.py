@@ -5,23 +5,31 @@ OpenCVテンプレートマッチングを使用して、RESULT画面から
 「Win」テキストの位置を検出し、勝者（player1 or player2）を判定。
 """
 
+import math
 from dataclasses import dataclass
 
 import cv2
 import numpy as np
 
 from ..utils.logger import get_logger
-from .preprocessing import preprocess_for_matching
+from ..utils.scoring import margin_score
+from .preprocessing import FramePreprocessContext, to_frame_region, to_relative_region
+from .template_bank import TemplatePyramid
 
 logger = get_logger()
 
+# RESULT画面の検索領域（バナー）の輝度ヒストグラムの階級数
+BANNER_HISTOGRAM_BINS = 16
+
 
 @dataclass
 class ResultDetection:
     """RESULT画面検出結果"""
 
     winner_side: str | None  # "player1" | "player2" | None
-    detection_confidence: float  # マッチング信頼度 (0.0-1.0)
+    detection_confidence: (
+        float  # 勝敗判定の余裕のスコア (0.0-1.0、較正していない。ResultScreenDetector.margin_score を参照)
+    )
     win_position: str  # "left" | "right" | "unknown"
     detection_method: str  # "image_template_matching"
 
@@ -37,6 +45,8 @@ class ResultScreenDetector:
         win_threshold: float = 0.3,
         result_screen_search_region: tuple[int, int, int, int] | None = None,
         win_text_search_region: tuple[int, int, int, int] | None = None,
+        reference_height: int | None = None,
+        reference_width: int | None = None,
     ):
         """
         初期化
@@ -48,6 +58,9 @@ class ResultScreenDetector:
             win_threshold: Win位置検出の閾値 (0.0-1.0)
             result_screen_search_region: RESULT画面検出の検索領域 (x1, y1, x2, y2)、Noneで全体
             win_text_search_region: Win テキスト検出の検索領域 (x1, y1, x2, y2)、Noneで全体
+            reference_height: テンプレート画像・検索領域を作成した動画の高さ。指定時は検索領域を
+                相対座標に正規化し、テンプレートピラミッドを事前計算する（None で基準解像度のみ）
+            reference_width: テンプレート画像・検索領域を作成した動画の幅（None で高さから 16:9 として算出）
 
         Raises:
             FileNotFoundError: テンプレートファイルが見つからない場合
@@ -59,122 +72,202 @@ class ResultScreenDetector:
             win_template_paths = [win_template_paths]
 
         # RESULT画面テンプレート（複数対応）
-        self.result_templates_edges: list[np.ndarray] = []
+        result_templates: list[np.ndarray] = []
         for template_path in result_template_paths:
             template = cv2.imread(template_path, cv2.IMREAD_COLOR)
             if template is None:
                 raise FileNotFoundError(f"Result template not found: {template_path}")
-            template_edges = preprocess_for_matching(template)
-            self.result_templates_edges.append(template_edges)
+            result_templates.append(template)
 
         # 「Win」テキストテンプレート（複数対応）
-        self.win_templates_edges: list[np.ndarray] = []
+        win_templates: list[np.ndarray] = []
         for template_path in win_template_paths:
             template = cv2.imread(template_path, cv2.IMREAD_COLOR)
             if template is None:
                 raise FileNotFoundError(f"Win template not found: {template_path}")
-            template_edges = preprocess_for_matching(template)
-            self.win_templates_edges.append(template_edges)
+            win_templates.append(template)
+
+        # 解像度ごとに複数テンプレートを一括でマッチングするテンプレートバンク
+        self.result_pyramid = TemplatePyramid(result_templates, reference_height)
+        self.win_pyramid = TemplatePyramid(win_templates, reference_height)
 
         self.result_threshold = result_threshold
         self.win_threshold = win_threshold
+        self.reference_height = reference_height
+        self._relative_result_screen_search_region = to_relative_region(
+            result_screen_search_region, reference_height, reference_width
+        )
+        self._relative_win_text_search_region = to_relative_region(
+            win_text_search_region, reference_height, reference_width
+        )
+
+        # 基準解像度の段（走査開始時に rescale_for() で動画の解像度の段に切り替える）
         self.result_screen_search_region = result_screen_search_region
         self.win_text_search_region = win_text_search_region
+        self._use_level(1.0)
+
+    def _use_level(self, scale: float) -> None:
+        self.result_bank = self.result_pyramid.bank(scale)
+        self.win_bank = self.win_pyramid.bank(scale)
+        self.result_templates_edges = self.result_bank.templates
+        self.win_templates_edges = self.win_bank.templates
+
+    def rescale_for(self, frame_width: int, frame_height: int) -> None:
+        """
+        動画の解像度に合わせてテンプレートピラミッドの段と検索領域を選択
+
+        Args:
+            frame_width: 動画のフレーム幅
+            frame_height: 動画のフレーム高さ
+        """
+        self._use_level(frame_height / self.reference_height if self.reference_height else 1.0)
+        self.result_screen_search_region = to_frame_region(
+            self._relative_result_screen_search_region, frame_width, frame_height
+        )
+        self.win_text_search_region = to_frame_region(self._relative_win_text_search_region, frame_width, frame_height)
 
-    def _has_result_screen(self, frame: np.ndarray) -> bool:
+    def banner_histogram(self, context: FramePreprocessContext) -> np.ndarray:
         """
-        RESULT画面の存在確認（複数テンプレートのいずれかにマッチ）
+        RESULT画面の検索領域（バナー）の正規化済み輝度ヒストグラム
+
+        RESULT画面検出を間引く際の変化の検出に使用する（グレースケール画像は検出と共有）。
 
         Args:
-            frame: フレーム画像 (BGR)
+            context: フレームの前処理コンテキスト
 
         Returns:
-            RESULT画面が検出されたかどうか
+            合計が 1 の輝度ヒストグラム（BANNER_HISTOGRAM_BINS 階級）
         """
-        # 検索領域を適用
-        if self.result_screen_search_region:
-            x1, y1, x2, y2 = self.result_screen_search_region
-            search_frame = frame[y1:y2, x1:x2]
-        else:
-            search_frame = frame
+        gray = context.gray("result_screen", self.result_screen_search_region)
+        hist = cv2.calcHist([gray], [0], None, [BANNER_HISTOGRAM_BINS], [0, 256]).ravel()
+        return hist / max(1.0, float(hist.sum()))
 
-        frame_edges = preprocess_for_matching(search_frame)
+    def _result_screen_score(self, context: FramePreprocessContext) -> float:
+        """
+        RESULT画面テンプレートとの最大マッチングスコア（複数テンプレートの最大値）
+
+        Args:
+            context: フレームの前処理コンテキスト
 
-        # 複数テンプレートのいずれかが閾値を超えたかチェック
-        max_score = 0.0
-        for template_edges in self.result_templates_edges:
-            match_result = cv2.matchTemplate(frame_edges, template_edges, cv2.TM_CCOEFF_NORMED)
-            max_val = match_result.max()
-            max_score = max(max_score, max_val)
+        Returns:
+            最大マッチングスコア（0.0-1.0）
+        """
+        # 検索領域を適用したエッジ画像（コンテキスト内でメモ化）
+        frame_edges = context.edges("result_screen", self.result_screen_search_region)
 
-        is_detected = max_score >= self.result_threshold
+        scores = self.result_bank.max_scores(frame_edges)
+        max_score = max(0.0, float(scores.max())) if len(scores) > 0 else 0.0
 
         logger.debug(
             "🔍 RESULT screen detection: max_match_value=%.3f | threshold=%.3f | templates_count=%d | detected=%s",
             max_score,
             self.result_threshold,
             len(self.result_templates_edges),
-            is_detected,
+            max_score >= self.result_threshold,
         )
 
-        return is_detected
+        return max_score
 
-    def _get_win_position(self, frame: np.ndarray) -> str:
+    def _get_win_position(
+        self, context: FramePreprocessContext, frame_width: int | None = None
+    ) -> tuple[str, float, float]:
         """
         「Win」テキストの左右位置を判定（複数テンプレートのいずれかにマッチ）
 
+        閾値以上の位置の重心で左右を判定する。重心は閾値以上の画素数を列ごとに集計して求め、
+        ヒットごとの座標配列は作らない。
+
         Args:
-            frame: フレーム画像 (BGR)
+            context: フレームの前処理コンテキスト
+            frame_width: 元フレームの幅（None でコンテキストのフレーム幅）
 
         Returns:
-            "left" | "right" | "unknown"
+            ("left" | "right" | "unknown", 判定した側の最大スコア, 反対側の最大スコア)
         """
-        # 検索領域を適用
-        if self.win_text_search_region:
-            x1, y1, x2, y2 = self.win_text_search_region
-            search_frame = frame[y1:y2, x1:x2]
-            region_offset_x = x1
-        else:
-            search_frame = frame
-            region_offset_x = 0
-
-        frame_edges = preprocess_for_matching(search_frame)
-
-        # 複数テンプレートのマッチ結果を集約
-        all_win_matches = np.empty((0, 2), dtype=np.int64)
-        for template_edges in self.win_templates_edges:
-            matches = cv2.matchTemplate(frame_edges, template_edges, cv2.TM_CCOEFF_NORMED)
-            # 閾値以上のマッチ位置を取得
-            win_matches = np.argwhere(matches >= self.win_threshold)
-            all_win_matches = np.vstack([all_win_matches, win_matches]) if len(win_matches) > 0 else all_win_matches
+        # 検索領域を適用したエッジ画像（コンテキスト内でメモ化）
+        frame_edges = context.edges("win_text", self.win_text_search_region)
+        region_offset_x = self.win_text_search_region[0] if self.win_text_search_region else context.origin[0]
+        if frame_width is None:
+            frame_width = context.frame.shape[1]
+        frame_center = frame_width / 2
 
-        if len(all_win_matches) == 0:
+        # 左右の境界（スコアマップの列）。エッジ画像を縮小した場合は元フレームの座標から変換
+        split = (frame_center - region_offset_x) / context.downscale
+
+        hit_count = 0
+        hit_x_sum = 0.0
+        left_max = 0.0
+        right_max = 0.0
+        for matches in self.win_bank.match(frame_edges):
+            if matches is None:
+                continue
+            width = matches.shape[1]
+            column_hits = np.count_nonzero(matches >= self.win_threshold, axis=0)
+            hit_count += int(column_hits.sum())
+            hit_x_sum += float(np.dot(column_hits, np.arange(width)))
+
+            # 左右それぞれの最大スコア（余裕のスコアの算出に使用）
+            split_col = min(max(math.ceil(split), 0), width)
+            if split_col > 0:
+                left_max = max(left_max, cv2.minMaxLoc(matches[:, :split_col])[1])
+            if split_col < width:
+                right_max = max(right_max, cv2.minMaxLoc(matches[:, split_col:])[1])
+
+        if hit_count == 0:
             logger.debug(
                 "🔍 Win text detection: no matches (threshold=%.3f, templates_count=%d)",
                 self.win_threshold,
                 len(self.win_templates_edges),
             )
-            return "unknown"
+            return "unknown", max(left_max, right_max), min(left_max, right_max)
 
-        # 重心計算 (argwhereは(row, col)の順序なので注意)
-        # 検索領域が指定されている場合、オフセットを加算
-        centroid_x = np.mean(all_win_matches[:, 1]) + region_offset_x
-        frame_width = frame.shape[1]
-        frame_center = frame_width / 2
+        # 重心を元フレームの座標に戻し、検索領域が指定されている場合はオフセットを加算
+        centroid_x = hit_x_sum / hit_count * context.downscale + region_offset_x
         position = "left" if centroid_x < frame_center else "right"
 
         logger.debug(
-            "🔍 Win text detection: match_count=%d | templates_count=%d | centroid_x=%.1f | frame_center=%.1f | position=%s",
-            len(all_win_matches),
+            "🔍 Win text detection: match_count=%d | templates_count=%d | centroid_x=%.1f | frame_center=%.1f | "
+            "left_max=%.3f | right_max=%.3f | position=%s",
+            hit_count,
             len(self.win_templates_edges),
             centroid_x,
             frame_center,
+            left_max,
+            right_max,
             position,
         )
 
-        return position
+        if position == "left":
+            return position, left_max, right_max
+        return position, right_max, left_max
+
+    def margin_score(self, result_score: float, winner_score: float, loser_score: float) -> float:
+        """
+        勝敗判定の余裕のスコア（0.0-1.0）
+
+        RESULT画面のスコアの閾値からの余裕と、判定した側の Win スコアの反対側（閾値未満なら閾値）からの
+        余裕のうち小さい方を utils.scoring.margin_score で変換する。余裕 0（閾値ちょうど・左右同点）で 0.5、
+        反対側の方が高いスコアなら 0.5 未満になる。
+        実際の勝敗との対応で較正した確率ではないため、判定どうしの比較にのみ使うこと。
+
+        Args:
+            result_score: RESULT画面テンプレートとの最大マッチングスコア
+            winner_score: 判定した側の Win テンプレートとの最大マッチングスコア
+            loser_score: 反対側の Win テンプレートとの最大マッチングスコア
 
-    def detect_result(self, frame: np.ndarray) -> ResultDetection:
+        Returns:
+            余裕のスコア
+        """
+        return margin_score(
+            min(
+                result_score - self.result_threshold,
+                winner_score - max(loser_score, self.win_threshold),
+            )
+        )
+
+    def detect_result(
+        self, frame: "np.ndarray | FramePreprocessContext", frame_width: int | None = None
+    ) -> ResultDetection:
         """
         RESULT画面から勝敗を検出
 
@@ -184,7 +277,9 @@ class ResultScreenDetector:
         3. 左右判定 → winner_side を決定
 
         Args:
-            frame: 対戦画面フレーム (BGR, 1080p推定)
+            frame: 対戦画面フレーム (BGR またはグレースケール, 1080p推定)、
+                または他の検出器と共有するフレームの前処理コンテキスト
+            frame_width: 元フレームの幅（None で frame の幅）。左右判定の中心に使用
 
         Returns:
             ResultDetection オブジェクト
@@ -196,9 +291,12 @@ class ResultScreenDetector:
             detection_method="image_template_matching",
         )
 
+        context = frame if isinstance(frame, FramePreprocessContext) else FramePreprocessContext(frame)
+
         # ステップ1: RESULT画面の存在確認
         logger.debug("  [Step 1] Checking RESULT screen presence...")
-        if not self._has_result_screen(frame):
+        result_score = self._result_screen_score(context)
+        if result_score < self.result_threshold:
             logger.debug("  [Step 1] ❌ RESULT screen not detected")
             return result
 
@@ -206,15 +304,15 @@ class ResultScreenDetector:
 
         # ステップ2: 「Win」テキスト位置検出
         logger.debug("  [Step 2] Detecting Win text position...")
-        win_position = self._get_win_position(frame)
+        win_position, winner_score, loser_score = self._get_win_position(context, frame_width)
         result.win_position = win_position
 
         if win_position in ["left", "right"]:
             result.winner_side = "player1" if win_position == "left" else "player2"
-            result.detection_confidence = 0.8  # テンプレートマッチング信頼度
+            result.detection_confidence = self.margin_score(result_score, winner_score, loser_score)
 
             logger.debug(
-                "✅ Result detected: winner_side=%s | win_position=%s | confidence=%.1f",
+                "✅ Result detected: winner_side=%s | win_position=%s | confidence=%.3f",
                 result.winner_side,
                 win_position,
                 result.detection_confidence,
@@ -0,0 +1,199 @@
+"""
+適応的なフレーム走査間隔のスケジューラ
+
+対戦中のゲームプレイ区間は疎な間隔（sparse_stride）で走査し、縮小画像での粗いマッチングの
+スコアが上昇したら直前の疎なサンプル位置まで戻って密な間隔（frame_interval）で走査し直す。
+Round 1画面は sparse_stride より長く表示されるため、密な走査と同じフレームで検出される。
+
+Round 1検出後は最小対戦時間（match_window_frames）の間、Round 1のマッチングを行わず
+RESULT画面の検出のみを疎な間隔で行う。
+
+RESULT画面の検出は ResultCheckScheduler で間引く。Round 1検出から min_delay_frames の間は行わず、
+その後は check_interval_frames ごとに行う。RESULT画面のバナー領域の輝度ヒストグラムが直前の
+走査対象フレームから大きく変化したら、check_interval_frames の間は走査対象フレームごとに行う。
+"""
+
+import numpy as np
+
+
+class AdaptiveStrideScheduler:
+    """走査対象フレームの決定（適応的な間隔・検出後の対戦区間スキップ）"""
+
+    def __init__(
+        self,
+        start_frame: int,
+        frame_interval: int,
+        sparse_stride: int = 0,
+        dense_threshold: float = 0.0,
+        match_window_frames: int = 0,
+    ):
+        """
+        Args:
+            start_frame: 走査開始フレーム番号（最初の走査対象フレーム）
+            frame_interval: 密な走査間隔（フレーム数）
+            sparse_stride: 疎な走査間隔（フレーム数、frame_interval の倍数）。0 で適応的走査を無効化
+            dense_threshold: 粗いマッチングのスコアがこれ以上なら密な走査に切り替える
+            match_window_frames: Round 1検出後にRound 1のマッチングを行わないフレーム数（0 で無効）
+        """
+        if sparse_stride and (sparse_stride < frame_interval or sparse_stride % frame_interval != 0):
+            raise ValueError(
+                f"sparse_stride must be a multiple of frame_interval ({frame_interval}), got {sparse_stride}"
+            )
+
+        self.start_frame = start_frame
+        self.frame_interval = frame_interval
+        self.sparse_stride = sparse_stride if sparse_stride > frame_interval else 0
+        self.dense_threshold = dense_threshold
+        self.match_window_frames = match_window_frames
+
+        self.next_sample_frame = start_frame
+        self._last_sample_frame: int | None = None
+        self._dense_until = start_frame  # このフレームより前は密に走査
+        self._match_window_end = start_frame  # このフレームより前は対戦区間（Round 1マッチングなし）
+
+    @property
+    def adaptive(self) -> bool:
+        """適応的走査が有効か"""
+        return self.sparse_stride > 0
+
+    @property
+    def match_window_end(self) -> int:
+        """対戦区間の終了フレーム（frame_interval の格子に揃えた値）"""
+        return self._match_window_end
+
+    def in_match_window(self, frame_number: int) -> bool:
+        """Round 1検出後の対戦区間内か"""
+        return frame_number < self._match_window_end
+
+    def observe(self, frame_number: int, coarse_score: float | None) -> int | None:
+        """
+        走査対象フレームの粗いマッチングのスコアから次の走査対象フレームを決定
+
+        Args:
+            frame_number: 走査対象フレーム番号
+            coarse_score: 粗いマッチングのスコア（対戦区間内など未計算の場合は None）
+
+        Returns:
+            密な走査のために戻る必要がある場合はその開始フレーム番号、それ以外は None
+        """
+        stride = self.sparse_stride or self.frame_interval
+
+        if self.adaptive and coarse_score is not None and coarse_score >= self.dense_threshold:
+            self._dense_until = frame_number + self.sparse_stride
+            if self._last_sample_frame is not None:
+                # 疎な走査で飛ばした区間（対戦区間を除く）を密に走査し直す
+                backtrack_frame = max(self._last_sample_frame + self.frame_interval, self._match_window_end)
+                if backtrack_frame < frame_number:
+                    self._last_sample_frame = None
+                    self.next_sample_frame = backtrack_frame
+                    return backtrack_frame
+
+        if frame_number < self._dense_until and not self.in_match_window(frame_number):
+            stride = self.frame_interval
+
+        self._last_sample_frame = frame_number
+        self.next_sample_frame = frame_number + stride
+        return None
+
+    def on_detection(self, frame_number: int) -> None:
+        """Round 1検出を確定し、最小対戦時間の間をRound 1マッチングの対象外にする"""
+        if self.match_window_frames <= 0:
+            return
+        # frame_interval の格子に揃える
+        offset = frame_number + self.match_window_frames - self.start_frame
+        self._match_window_end = self.start_frame + -(-offset // self.frame_interval) * self.frame_interval
+        self._dense_until = frame_number
+        self.next_sample_frame = frame_number + (self.sparse_stride or self.frame_interval)
+
+    def jump_to(self, frame_number: int) -> None:
+        """次の走査対象フレームを移動（シーク後に呼び出す）"""
+        self._last_sample_frame = None
+        self.next_sample_frame = frame_number
+
+
+def histogram_distance(a: np.ndarray, b: np.ndarray) -> float:
+    """正規化済みヒストグラム同士の Bhattacharyya 距離（0.0: 同一 〜 1.0: 重なりなし）"""
+    return float(np.sqrt(max(0.0, 1.0 - float(np.sum(np.sqrt(a * b))))))
+
+
+class ResultCheckScheduler:
+    """RESULT画面検出を行う走査対象フレームの決定"""
+
+    def __init__(
+        self,
+        start_frame: int,
+        frame_interval: int,
+        min_delay_frames: int = 0,
+        check_interval_frames: int = 0,
+        signal_threshold: float = 0.0,
+    ):
+        """
+        Args:
+            start_frame: 走査開始フレーム番号（frame_interval の格子の基準）
+            frame_interval: 密な走査間隔（フレーム数）
+            min_delay_frames: Round 1検出後にRESULT画面の検出を行わないフレーム数（0 で無効）
+            check_interval_frames: RESULT画面の検出間隔（フレーム数、0 で走査対象フレームごと）
+            signal_threshold: バナー領域の輝度ヒストグラムの変化（Bhattacharyya 距離）がこれ以上なら
+                check_interval_frames の間は走査対象フレームごとに検出する（0 で無効）
+        """
+        self.start_frame = start_frame
+        self.frame_interval = frame_interval
+        self.min_delay_frames = min_delay_frames
+        self.check_interval_frames = check_interval_frames
+        self.signal_threshold = signal_threshold
+
+        self._open_frame = start_frame  # このフレーム以降はRESULT画面の検出を行う
+        self._next_check_frame = start_frame
+        self._dense_until = start_frame
+        self._prev_signature: np.ndarray | None = None
+
+    @property
+    def uses_signal(self) -> bool:
+        """バナー領域の輝度ヒストグラムで検出間隔を切り替えるか"""
+        return self.check_interval_frames > 0 and self.signal_threshold > 0
+
+    @property
+    def open_frame(self) -> int:
+        """RESULT画面の検出を開始するフレーム（frame_interval の格子に揃えた値）"""
+        return self._open_frame
+
+    def open_at(self, frame_number: int) -> None:
+        """frame_number 以降（frame_interval の格子に揃える）をRESULT画面の検出対象にする"""
+        offset = max(0, frame_number - self.start_frame)
+        self._open_frame = self.start_frame + -(-offset // self.frame_interval) * self.frame_interval
+        self._next_check_frame = self._open_frame
+        self._dense_until = self._open_frame
+        self._prev_signature = None
+
+    def on_detection(self, frame_number: int) -> None:
+        """Round 1検出を確定し、min_delay_frames の間はRESULT画面の検出を行わない"""
+        self.open_at(frame_number + self.min_delay_frames)
+
+    def should_check(self, frame_number: int, signature: np.ndarray | None = None) -> bool:
+        """
+        走査対象フレームでRESULT画面の検出を行うか
+
+        Args:
+            frame_number: 走査対象フレーム番号
+            signature: バナー領域の正規化済み輝度ヒストグラム（uses_signal が False なら None）
+
+        Returns:
+            RESULT画面の検出を行う場合は True
+        """
+        if frame_number < self._open_frame:
+            return False
+        if self.check_interval_frames <= 0:
+            return True
+
+        if signature is not None:
+            if (
+                self._prev_signature is not None
+                and histogram_distance(self._prev_signature, signature) >= self.signal_threshold
+            ):
+                self._dense_until = frame_number + self.check_interval_frames
+            self._prev_signature = signature
+
+        if frame_number < self._dense_until or frame_number >= self._next_check_frame:
+            self._next_check_frame = frame_number + self.check_interval_frames
+            return True
+        return False
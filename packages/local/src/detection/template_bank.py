@@ -0,0 +1,191 @@
+"""
+複数テンプレートの一括マッチング
+
+除外テンプレート（Round 2, Final Round）や RESULT / Win テンプレートのように、
+同じ検索領域を複数のテンプレートと照合する場合に、テンプレートのFFTを事前計算しておき
+検索領域のFFTを1回だけ計算して全テンプレートとの相関を一括で求める。
+
+スコアは cv2.matchTemplate(..., cv2.TM_CCOEFF_NORMED) と同じ定義（分散0の窓の扱いを含む）。
+テンプレートが検索画像に比べて小さい場合は cv2.matchTemplate の直接計算の方が速いため、
+検索画像サイズごとに計算方法を切り替える。
+
+TemplatePyramid は基準解像度で作成したテンプレート画像から基準解像度以下の解像度ごとの
+エッジ画像と TemplateBank を事前計算し、走査時に動画の解像度に合った段を選ぶ。
+低解像度の動画はフレームを拡大せずにそのまま照合する。基準解像度より高い動画は
+切り抜いた領域を基準解像度に縮小して基準解像度の段と照合する（FramePreprocessContext を参照）。
+"""
+
+import cv2
+import numpy as np
+
+from .preprocessing import preprocess_for_matching
+
+# FFTで一括計算する最小のテンプレート面積比（最小テンプレート面積 / 検索画像面積）
+# 除外テンプレート（検索領域の約4割）ではFFT、RESULTテンプレート（約1割未満）では直接計算が速い
+FFT_MIN_AREA_RATIO = 0.1
+
+# テンプレートピラミッドで事前計算する動画の高さ（YouTube の標準的な解像度、基準解像度以下のもの）
+PYRAMID_HEIGHTS = (360, 480, 720, 1080)
+
+
+class TemplateBank:
+    """FFTによる複数テンプレートの一括 TM_CCOEFF_NORMED マッチング"""
+
+    def __init__(self, templates: list[np.ndarray]):
+        """
+        Args:
+            templates: 前処理済みのグレースケールテンプレート画像のリスト
+        """
+        self.templates = [np.asarray(t) for t in templates]
+        self._sizes = [t.shape[:2] for t in self.templates]
+
+        # ゼロ平均化したテンプレートとそのノルム（分子・分母の定数項）
+        self._zero_mean = [t.astype(np.float64) - t.mean() for t in self.templates]
+        self._norms = np.array([np.sqrt(np.sum(z * z)) for z in self._zero_mean])
+
+        # 検索画像サイズごとのテンプレートFFT（検索領域は毎フレーム同じサイズのため再利用される）
+        self._fft_cache: dict[tuple[int, int], np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+    def _template_ffts(self, shape: tuple[int, int]) -> np.ndarray:
+        """FFTサイズに合わせてゼロ埋めしたテンプレートFFTの共役（テンプレート数 × FFTサイズ）"""
+        if shape not in self._fft_cache:
+            padded = np.zeros((len(self.templates), *shape), dtype=np.float64)
+            for i, z in enumerate(self._zero_mean):
+                h, w = z.shape
+                if h <= shape[0] and w <= shape[1]:  # 検索画像より大きいテンプレートはスコアを算出しない
+                    padded[i, :h, :w] = z
+            self._fft_cache[shape] = np.conj(np.fft.rfft2(padded))
+        return self._fft_cache[shape]
+
+    def _use_fft(self, height: int, width: int) -> bool:
+        """検索画像サイズに対してFFTで一括計算するか"""
+        if len(self.templates) < 2:
+            return False
+        min_area = min(h * w for h, w in self._sizes)
+        return min_area >= FFT_MIN_AREA_RATIO * height * width
+
+    def match(self, image: np.ndarray) -> list[np.ndarray | None]:
+        """
+        全テンプレートとのスコアマップを一括計算
+
+        Args:
+            image: 前処理済みのグレースケール検索画像
+
+        Returns:
+            テンプレートごとのスコアマップ（cv2.matchTemplate と同じ形状）。
+            テンプレートが検索画像より大きい場合は None
+        """
+        if not self.templates:
+            return []
+
+        height, width = image.shape[:2]
+        if not self._use_fft(height, width):
+            return [
+                cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED) if h <= height and w <= width else None
+                for template, (h, w) in zip(self.templates, self._sizes, strict=True)
+            ]
+
+        # 高速に計算できるFFTサイズにゼロ埋め（検索画像以上のサイズなら有効範囲はラップアラウンドしない）
+        fft_shape = (cv2.getOptimalDFTSize(height), cv2.getOptimalDFTSize(width))
+
+        # 分子: 検索画像とゼロ平均テンプレートの相互相関
+        image_fft = np.fft.rfft2(image.astype(np.float64), s=fft_shape)
+        numerators = np.fft.irfft2(image_fft[None] * self._template_ffts(fft_shape), s=fft_shape)
+
+        # 分母: 窓内の画素値の二乗和と和（積分画像で算出）
+        sums, sq_sums = cv2.integral2(image)
+        sums = sums.astype(np.float64)
+
+        results: list[np.ndarray | None] = []
+        for i, (h, w) in enumerate(self._sizes):
+            if h > height or w > width:
+                results.append(None)
+                continue
+            out_h, out_w = height - h + 1, width - w + 1
+            window_sum = sums[h:, w:] - sums[:out_h, w:] - sums[h:, :out_w] + sums[:out_h, :out_w]
+            window_sq = sq_sums[h:, w:] - sq_sums[:out_h, w:] - sq_sums[h:, :out_w] + sq_sums[:out_h, :out_w]
+            variance = np.maximum(window_sq - window_sum * window_sum / (h * w), 0)
+            denominator = np.sqrt(variance) * self._norms[i]
+            numerator = numerators[i, :out_h, :out_w]
+
+            # cv2.matchTemplate と同じく、分母を超える分子（分散0の窓を含む）は 0 または ±1 に丸める
+            abs_num = np.abs(numerator)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                score = np.where(
+                    abs_num < denominator,
+                    numerator / denominator,
+                    np.where(abs_num < denominator * 1.125, np.sign(numerator), 0.0),
+                )
+            results.append(score.astype(np.float32))
+        return results
+
+    def max_scores(self, image: np.ndarray) -> np.ndarray:
+        """
+        全テンプレートとの最大スコアを一括計算
+
+        Args:
+            image: 前処理済みのグレースケール検索画像
+
+        Returns:
+            テンプレートごとの最大スコア（テンプレートが検索画像より大きい場合は -1）
+        """
+        return np.array([score.max() if score is not None else -1.0 for score in self.match(image)])
+
+
+class TemplatePyramid:
+    """基準解像度のテンプレート画像から解像度ごとのエッジ画像を事前計算したピラミッド"""
+
+    def __init__(
+        self,
+        templates: list[np.ndarray],
+        reference_height: int | None = None,
+        heights: tuple[int, ...] = PYRAMID_HEIGHTS,
+    ):
+        """
+        Args:
+            templates: 基準解像度で作成したテンプレート画像（BGR）のリスト
+            reference_height: テンプレートを作成した動画の高さ（None で基準解像度の段のみ）
+            heights: 事前計算する動画の高さ（それ以外の高さは初回の参照時に計算）
+        """
+        self.templates = templates
+        self._levels: dict[float, TemplateBank] = {}
+
+        self.bank(1.0)
+        if reference_height:
+            for height in heights:
+                if height < reference_height:
+                    self.bank(height / reference_height)
+
+    def bank(self, scale: float) -> TemplateBank:
+        """
+        動画の解像度に合った段のテンプレートバンク
+
+        テンプレート画像を縮小し、同じ倍率のブラーでエッジ抽出する（動画のフレームは拡大しない）。
+        基準解像度より高い動画（scale > 1）には基準解像度の段を返す。
+
+        Args:
+            scale: 動画の解像度 / 基準解像度
+
+        Returns:
+            前処理済みテンプレートの TemplateBank
+        """
+        key = round(min(scale, 1.0), 6)
+        if key not in self._levels:
+            self._levels[key] = TemplateBank([self._preprocess(t, scale) for t in self.templates])
+        return self._levels[key]
+
+    def edges(self, scale: float) -> list[np.ndarray]:
+        """指定倍率の段の前処理済みテンプレート（エッジ画像）のリスト"""
+        return self.bank(scale).templates
+
+    @staticmethod
+    def _preprocess(template: np.ndarray, scale: float) -> np.ndarray:
+        scale = min(scale, 1.0)
+        if scale != 1.0:
+            height, width = template.shape[:2]
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
+            template = cv2.resize(template, size, interpolation=cv2.INTER_AREA)
+        return preprocess_for_matching(template, scale)
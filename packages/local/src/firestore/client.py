@@ -10,6 +10,7 @@ from google.cloud import firestore
 
 from ..auth.oauth import get_oauth_credentials
 from ..utils.logger import get_logger
+from ..utils.metrics import record, timed_stage
 
 logger = get_logger()
 
@@ -55,7 +56,9 @@ class FirestoreClient:
         """
         try:
             doc_ref = self.db.collection(self.COLLECTION_PROCESSED_VIDEOS).document(video_id)
-            doc = doc_ref.get()
+            with timed_stage("firestore"):
+                record("firestore", api_calls=1)
+                doc = doc_ref.get()
 
             if doc.exists:
                 data = doc.to_dict()
@@ -121,7 +124,9 @@ class FirestoreClient:
                 update_data.update(additional_data)
 
             # ドキュメントが存在する場合は更新、存在しない場合は作成
-            doc_ref.set(update_data, merge=True)
+            with timed_stage("firestore"):
+                record("firestore", api_calls=1)
+                doc_ref.set(update_data, merge=True)
 
             logger.info("Updated Firestore status: %s -> %s", video_id, status)
             return True
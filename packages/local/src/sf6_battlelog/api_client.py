@@ -11,6 +11,7 @@ from typing import Any
 import aiohttp
 
 from src.utils.logger import get_logger
+from src.utils.metrics import record
 
 from .battlelog_parser import BattlelogParser
 from .cache import BattlelogCacheManager
@@ -119,6 +120,7 @@ class BattlelogCollector:
             ) as resp,
         ):
             logger.debug("%s %s -> %d", method, url, resp.status)
+            record("battlelog", api_calls=1)
 
             if resp.status == 401:
                 raise self.Unauthorized("Authentication failed (401)")
@@ -129,6 +131,8 @@ class BattlelogCollector:
                 logger.error("HTTP %d: %s", resp.status, text[:200])
                 raise RuntimeError(f"HTTP {resp.status}: {text[:200]}")
 
+            # 本文は aiohttp 内でキャッシュされ、text() / json() で再利用される
+            record("battlelog", bytes=len(await resp.read()))
             if response_type == "text":
                 return await resp.text()
             else:
@@ -330,6 +334,7 @@ class BattlelogCollector:
         player_id: str,
         language: str = "ja-jp",
         max_pages: int = 10,
+        summary: bool = False,
     ) -> list[dict[str, Any]]:
         """
         最新キャッシュ以降のリプレイのみを増分取得
@@ -344,6 +349,8 @@ class BattlelogCollector:
             player_id: プレイヤーID
             language: 言語コード
             max_pages: 最大ページ数（デフォルト: 10、Battlelog API の上限）
+            summary: True の場合、キャッシュ済みのリプレイは照合に使う項目のみで返す
+                （BattlelogCacheManager.get_cached_replays の summary を参照）
 
         Returns:
             キャッシュ + 新規リプレイのマージ結果
@@ -355,7 +362,7 @@ class BattlelogCollector:
             RuntimeError: その他のエラー
         """
         # 1. キャッシュから既存データを取得
-        cached_replays = self.cache.get_cached_replays(player_id)
+        cached_replays = self.cache.get_cached_replays(player_id, summary=summary)
         cached_uploaded_at_set = self.cache.get_cached_uploaded_at_set(player_id)
         latest_cached_at = self.cache.get_latest_uploaded_at(player_id)
 
@@ -402,8 +409,8 @@ class BattlelogCollector:
                     len(new_page_replays) - actual_cached_count,
                 )
 
-                # キャッシュ済みセットを更新（次のページで重複判定を正確にするため）
-                cached_uploaded_at_set = self.cache.get_cached_uploaded_at_set(player_id)
+                # キャッシュ済みセットを更新（次のページで重複判定を正確にするため、DB は再読み込みしない）
+                cached_uploaded_at_set.update(str(r.get("uploaded_at")) for r in new_page_replays)
 
             # 5. キャッシュ境界に到達したか確認（新規リプレイがない = 境界到達）
             if not new_page_replays:
@@ -530,6 +537,7 @@ class BattlelogCollector:
         player_id: str,
         language: str = "ja-jp",
         max_pages: int = 10,
+        summary: bool = False,
     ) -> list[dict[str, Any]]:
         """同期版get_replay_list_incremental（max_pages: 10 に制限）"""
         return asyncio.run(
@@ -537,6 +545,7 @@ class BattlelogCollector:
                 player_id=player_id,
                 language=language,
                 max_pages=max_pages,
+                summary=summary,
             )
         )
 
@@ -3,10 +3,21 @@ BattlelogCacheManager - SQLite ベースのキャッシング機構
 
 Battlelog API のレスポンスをキャッシュして、重複リクエストを削減。
 キャッシュキーは player_id + uploaded_at の組み合わせ。
+
+接続はスレッドごとに1つを使い回し（close() まで開いたまま）、WAL モードで読み込みと書き込みを並行できるようにする。
+SQL は定数の文字列で実行し、接続のステートメントキャッシュでコンパイル済みのものを再利用する。
+一括保存は executemany の INSERT OR IGNORE を1トランザクションで実行する。
+
+スキーマ v2 では照合と Parquet 出力に使う項目（バトルタイプ、キャラクター、入力タイプ、LP/MR、short_id、
+ラウンド結果）を型付きの列に展開し、JSON の展開なしに SQL の射影で読み込めるようにする。
+対戦ログ全体は zlib で圧縮した JSON として保存し、全項目が必要な場合のみ展開する。
+v1（対戦ログを JSON 文字列で保存）のデータベースは初回の接続時に v2 に移行する。
 """
 
 import json
 import sqlite3
+import threading
+import zlib
 from pathlib import Path
 from typing import Any
 
@@ -14,11 +25,129 @@ from src.utils.logger import get_logger
 
 logger = get_logger()
 
+# 列名の接尾辞（p1_ / p2_ の後）→ player{n}_info のキー
+_PLAYER_INFO_KEYS = {
+    "character_id": "character_id",
+    "character_name": "character_name",
+    "playing_character_tool_name": "playing_character_tool_name",
+    "input_type": "battle_input_type",
+    "league_point": "league_point",
+    "league_rank": "league_rank",
+    "master_rating": "master_rating",
+}
+# player{n}_info.player のキー（列名の接尾辞と同じ）
+_PLAYER_KEYS = ("short_id", "fighter_id")
+
+_PLAYER_COLUMNS_DDL = """
+                p{n}_character_id INTEGER,
+                p{n}_character_name TEXT,
+                p{n}_playing_character_tool_name TEXT,
+                p{n}_input_type INTEGER,
+                p{n}_league_point INTEGER,
+                p{n}_league_rank INTEGER,
+                p{n}_master_rating INTEGER,
+                p{n}_short_id INTEGER,
+                p{n}_fighter_id TEXT,
+                p{n}_round_results TEXT,
+                p{n}_round_wins INTEGER,"""
+
+# 対戦ログから展開する列（player_id, uploaded_at, replay_data 以外）
+REPLAY_COLUMNS = (
+    "replay_id",
+    "battle_type",
+    *(
+        f"p{n}_{suffix}"
+        for n in (1, 2)
+        for suffix in (*_PLAYER_INFO_KEYS, *_PLAYER_KEYS, "round_results", "round_wins")
+    ),
+)
+
+
+def extract_replay_columns(replay: dict[str, Any]) -> dict[str, Any]:
+    """
+    対戦ログから列に展開する項目を取り出す
+
+    存在しない項目は None。round_results は JSON 文字列、round_wins は勝利ラウンド数（0 より大きい値の数）。
+
+    Args:
+        replay: 対戦ログオブジェクト
+
+    Returns:
+        REPLAY_COLUMNS の各列の値
+    """
+    columns: dict[str, Any] = {
+        "replay_id": replay.get("replay_id"),
+        "battle_type": replay.get("replay_battle_type"),
+    }
+    for n in (1, 2):
+        info = replay.get(f"player{n}_info") or {}
+        player = info.get("player") or {}
+        round_results = info.get("round_results")
+        for suffix, key in _PLAYER_INFO_KEYS.items():
+            columns[f"p{n}_{suffix}"] = info.get(key)
+        for key in _PLAYER_KEYS:
+            columns[f"p{n}_{key}"] = player.get(key)
+        columns[f"p{n}_round_results"] = None if round_results is None else json.dumps(round_results)
+        columns[f"p{n}_round_wins"] = sum(1 for r in round_results or [] if r > 0)
+    return columns
+
+
+def _replay_summary(row: tuple) -> dict[str, Any]:
+    """_SUMMARY_SQL の1行から照合に使う項目のみの対戦ログを復元（None の項目は含めない）"""
+    replay: dict[str, Any] = {"uploaded_at": row[0]}
+    if row[1] is not None:
+        replay["replay_id"] = row[1]
+    for n, (character_name, tool_name, round_results) in ((1, row[2:5]), (2, row[5:8])):
+        info: dict[str, Any] = {}
+        if character_name is not None:
+            info["character_name"] = character_name
+        if tool_name is not None:
+            info["playing_character_tool_name"] = tool_name
+        if round_results is not None:
+            info["round_results"] = json.loads(round_results)
+        replay[f"player{n}_info"] = info
+    return replay
+
+
+def _compress_replay(replay: dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(replay, ensure_ascii=False).encode("utf-8"))
+
+
+def _decompress_replay(replay_data: bytes) -> dict[str, Any]:
+    return json.loads(zlib.decompress(replay_data))
+
 
 class BattlelogCacheManager:
     """SQLite ベースの Battlelog キャッシュ管理"""
 
-    DB_SCHEMA_VERSION = 1
+    DB_SCHEMA_VERSION = 2
+
+    # 接続ごとにコンパイル済みの SQL を保持する数（sqlite3 のステートメントキャッシュ）
+    CACHED_STATEMENTS = 64
+
+    # v1 からの移行で1回に読み込む行数
+    MIGRATION_BATCH_SIZE = 1000
+
+    # get_cached_uploaded_at_subset の1回の検索で指定する uploaded_at の数
+    SUBSET_QUERY_SIZE = 500
+
+    _INSERT_COLUMNS = ("player_id", "uploaded_at", *REPLAY_COLUMNS, "replay_data")
+    _INSERT_SQL = (
+        f"INSERT OR IGNORE INTO replay_cache ({', '.join(_INSERT_COLUMNS)}) "
+        f"VALUES ({', '.join('?' * len(_INSERT_COLUMNS))})"
+    )
+    _MIGRATE_SQL = (
+        f"INSERT OR IGNORE INTO replay_cache ({', '.join(_INSERT_COLUMNS)}, cached_at) "
+        f"VALUES ({', '.join('?' * (len(_INSERT_COLUMNS) + 1))})"
+    )
+    _SELECT_COLUMNS_SQL = f"SELECT player_id, uploaded_at, {', '.join(REPLAY_COLUMNS)} FROM replay_cache"
+    # 照合（BattlelogMatcher）に使う列のみの射影
+    _SUMMARY_SQL = (
+        "SELECT uploaded_at, replay_id, "
+        "p1_character_name, p1_playing_character_tool_name, p1_round_results, "
+        "p2_character_name, p2_playing_character_tool_name, p2_round_results "
+        "FROM replay_cache WHERE player_id = ? ORDER BY uploaded_at DESC"
+    )
 
     def __init__(self, db_path: str = "./battlelog_cache.db"):
         """
@@ -29,34 +158,128 @@ class BattlelogCacheManager:
         """
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
         self._init_db()
 
+    def __enter__(self) -> "BattlelogCacheManager":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        現在のスレッドの接続（初回に開き、以降は使い回す）
+
+        WAL モード（ファイルに記録され、以降の接続にも適用）と synchronous=NORMAL を設定する。
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # close() を別のスレッドから呼べるよう check_same_thread は無効化（接続自体はスレッドごと）
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False, cached_statements=self.CACHED_STATEMENTS)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """すべてのスレッドの接続を閉じる（以降の操作では接続を開き直す）"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
     def _init_db(self) -> None:
-        """データベースを初期化（テーブル作成）"""
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
+        """データベースを初期化（テーブル作成、v1 からの移行）"""
+        conn = self._connection()
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        has_table = (
+            conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'replay_cache'").fetchone()
+            is not None
+        )
 
-        # テーブルが存在しなければ作成
-        cursor.execute(
-            """
+        if has_table and version < self.DB_SCHEMA_VERSION:
+            self._migrate_from_v1(conn)
+        else:
+            self._create_tables(conn)
+            conn.execute(f"PRAGMA user_version = {self.DB_SCHEMA_VERSION}")
+            conn.commit()
+        logger.debug(f"Database initialized: {self.db_path}")
+
+    def _create_tables(self, conn: sqlite3.Connection) -> None:
+        """テーブルとインデックスを作成（存在しなければ）"""
+        player_columns = "".join(_PLAYER_COLUMNS_DDL.format(n=n) for n in (1, 2))
+        conn.execute(
+            f"""
             CREATE TABLE IF NOT EXISTS replay_cache (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 player_id TEXT NOT NULL,
-                uploaded_at TEXT NOT NULL,
-                replay_data TEXT NOT NULL,
+                uploaded_at INTEGER NOT NULL,
+                replay_id TEXT,
+                battle_type INTEGER,{player_columns}
+                replay_data BLOB NOT NULL,
                 cached_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 UNIQUE(player_id, uploaded_at)
             )
             """
         )
 
-        # インデックスを作成
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_player_id ON replay_cache(player_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_uploaded_at ON replay_cache(uploaded_at)")
+        # インデックスを作成（player_id の検索は UNIQUE(player_id, uploaded_at) のインデックスを使う）
+        # インデックスごとに保存が遅くなるため、キャラクターの組み合わせ（マッチアップの集計）のみ追加する
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_uploaded_at ON replay_cache(uploaded_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_characters ON replay_cache(p1_character_id, p2_character_id)")
 
-        conn.commit()
-        conn.close()
-        logger.debug(f"Database initialized: {self.db_path}")
+    def _migrate_from_v1(self, conn: sqlite3.Connection) -> None:
+        """
+        スキーマ v1（対戦ログを JSON 文字列で保存）のテーブルを v2 に移行
+
+        1トランザクションで実行し、失敗した場合は v1 のまま残す。JSON として読み込めない行は移行しない。
+        """
+        logger.info(f"Migrating battlelog cache to schema v{self.DB_SCHEMA_VERSION}: {self.db_path}")
+        migrated = 0
+        skipped = 0
+        conn.execute("BEGIN")
+        try:
+            conn.execute("ALTER TABLE replay_cache RENAME TO replay_cache_v1")
+            conn.execute("DROP INDEX IF EXISTS idx_player_id")
+            conn.execute("DROP INDEX IF EXISTS idx_uploaded_at")
+            self._create_tables(conn)
+
+            old_rows = conn.execute("SELECT player_id, uploaded_at, replay_data, cached_at FROM replay_cache_v1")
+            while batch := old_rows.fetchmany(self.MIGRATION_BATCH_SIZE):
+                rows = []
+                for player_id, uploaded_at, replay_data, cached_at in batch:
+                    try:
+                        rows.append((*self._row(player_id, int(uploaded_at), json.loads(replay_data)), cached_at))
+                    except (ValueError, TypeError, AttributeError):
+                        logger.warning(
+                            f"Skipped unreadable cached replay: player_id={player_id}, uploaded_at={uploaded_at}"
+                        )
+                        skipped += 1
+                conn.executemany(self._MIGRATE_SQL, rows)
+                migrated += len(rows)
+
+            conn.execute("DROP TABLE replay_cache_v1")
+            conn.execute(f"PRAGMA user_version = {self.DB_SCHEMA_VERSION}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+        # JSON 文字列の分の空き領域を解放
+        conn.execute("VACUUM")
+        logger.info(f"Migrated {migrated} cached replays to schema v{self.DB_SCHEMA_VERSION} (skipped {skipped})")
+
+    @staticmethod
+    def _row(player_id: str, uploaded_at: int, replay: dict[str, Any]) -> tuple:
+        """INSERT する1行（_INSERT_COLUMNS の順）"""
+        columns = extract_replay_columns(replay)
+        return (player_id, uploaded_at, *(columns[name] for name in REPLAY_COLUMNS), _compress_replay(replay))
 
     def cache_replay(self, player_id: str, replay: dict[str, Any]) -> bool:
         """
@@ -71,40 +294,29 @@ class BattlelogCacheManager:
 
         Raises:
             KeyError: replay に uploaded_at がない場合
+            ValueError: uploaded_at が整数でない場合
             sqlite3.Error: データベースエラー
         """
         uploaded_at = replay.get("uploaded_at")
         if uploaded_at is None:
             raise KeyError("replay must have 'uploaded_at' field")
 
-        replay_json = json.dumps(replay, ensure_ascii=False)
+        row = self._row(player_id, int(uploaded_at), replay)
 
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
+        conn = self._connection()
+        with conn:
+            # UNIQUE 制約違反（既に存在）は無視され、変更行数が 0 になる
+            inserted = conn.execute(self._INSERT_SQL, row).rowcount == 1
 
-        try:
-            cursor.execute(
-                """
-                INSERT INTO replay_cache (player_id, uploaded_at, replay_data)
-                VALUES (?, ?, ?)
-                """,
-                (player_id, str(uploaded_at), replay_json),
-            )
-            conn.commit()
+        if inserted:
             logger.debug(f"Cached replay: player_id={player_id}, uploaded_at={uploaded_at}")
-            return True
-
-        except sqlite3.IntegrityError:
-            # UNIQUE 制約違反 = 既に存在
+        else:
             logger.debug(f"Replay already cached: player_id={player_id}, uploaded_at={uploaded_at}")
-            return False
-
-        finally:
-            conn.close()
+        return inserted
 
     def cache_replays(self, player_id: str, replays: list[dict[str, Any]]) -> int:
         """
-        複数の対戦ログを一括キャッシュ
+        複数の対戦ログを一括キャッシュ（1トランザクション）
 
         Args:
             player_id: プレイヤーID
@@ -114,20 +326,43 @@ class BattlelogCacheManager:
             新規追加されたレコード数
 
         Raises:
+            KeyError: replay に uploaded_at がない場合（何も保存しない）
+            ValueError: uploaded_at が整数でない場合（何も保存しない）
             sqlite3.Error: データベースエラー
         """
-        count = 0
+        uploaded_ats = []
         for replay in replays:
-            if self.cache_replay(player_id, replay):
-                count += 1
+            uploaded_at = replay.get("uploaded_at")
+            if uploaded_at is None:
+                raise KeyError("replay must have 'uploaded_at' field")
+            uploaded_ats.append(int(uploaded_at))
+
+        # キャッシュ済みの対戦ログは列の展開と圧縮を省く（並行した保存との重複は INSERT OR IGNORE で無視）
+        cached = self.get_cached_uploaded_at_subset(player_id, {str(uploaded_at) for uploaded_at in uploaded_ats})
+        rows = [
+            self._row(player_id, uploaded_at, replay)
+            for uploaded_at, replay in zip(uploaded_ats, replays, strict=True)
+            if str(uploaded_at) not in cached
+        ]
+        if not rows:
+            return 0
+
+        conn = self._connection()
+        before = conn.total_changes
+        with conn:
+            conn.executemany(self._INSERT_SQL, rows)
+        count = conn.total_changes - before
+        logger.debug(f"Cached {count}/{len(replays)} replays for {player_id}")
         return count
 
-    def get_cached_replays(self, player_id: str) -> list[dict[str, Any]]:
+    def get_cached_replays(self, player_id: str, summary: bool = False) -> list[dict[str, Any]]:
         """
         キャッシュから player_id に一致するすべての対戦ログを取得
 
         Args:
             player_id: プレイヤーID
+            summary: True の場合、照合（BattlelogMatcher）に使う項目（replay_id, uploaded_at, キャラクター名,
+                round_results）のみの対戦ログを列から復元して返す（圧縮した JSON を展開しない）
 
         Returns:
             対戦ログの配列（キャッシュなしの場合は空配列）
@@ -135,26 +370,52 @@ class BattlelogCacheManager:
         Raises:
             sqlite3.Error: データベースエラー
         """
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
+        cursor = self._connection().cursor()
 
         try:
-            cursor.execute(
-                "SELECT replay_data FROM replay_cache WHERE player_id = ? ORDER BY uploaded_at DESC",
-                (player_id,),
-            )
-            rows = cursor.fetchall()
-
-            replays = []
-            for row in rows:
-                replay = json.loads(row[0])
-                replays.append(replay)
+            if summary:
+                cursor.execute(self._SUMMARY_SQL, (player_id,))
+                replays = [_replay_summary(row) for row in cursor.fetchall()]
+            else:
+                cursor.execute(
+                    "SELECT replay_data FROM replay_cache WHERE player_id = ? ORDER BY uploaded_at DESC",
+                    (player_id,),
+                )
+                replays = [_decompress_replay(row[0]) for row in cursor.fetchall()]
 
             logger.debug(f"Retrieved {len(replays)} cached replays for {player_id}")
             return replays
 
         finally:
-            conn.close()
+            cursor.close()
+
+    def get_replay_rows(self, player_id: str | None = None) -> list[dict[str, Any]]:
+        """
+        列に展開した項目を対戦ログごとの行として取得（SQL の射影のみ、圧縮した JSON は展開しない）
+
+        Args:
+            player_id: プレイヤーID（未指定時はキャッシュ全体）
+
+        Returns:
+            player_id, uploaded_at と REPLAY_COLUMNS の各列の辞書の配列（キャッシュした時刻の新しい順）
+
+        Raises:
+            sqlite3.Error: データベースエラー
+        """
+        cursor = self._connection().cursor()
+
+        try:
+            if player_id is None:
+                cursor.execute(f"{self._SELECT_COLUMNS_SQL} ORDER BY cached_at DESC")
+            else:
+                cursor.execute(f"{self._SELECT_COLUMNS_SQL} WHERE player_id = ? ORDER BY cached_at DESC", (player_id,))
+            names = [description[0] for description in cursor.description]
+            rows = [dict(zip(names, row, strict=True)) for row in cursor.fetchall()]
+            logger.debug(f"Retrieved {len(rows)} cached replay rows")
+            return rows
+
+        finally:
+            cursor.close()
 
     def get_cached_uploaded_at_set(self, player_id: str) -> set[str]:
         """
@@ -171,8 +432,7 @@ class BattlelogCacheManager:
         Raises:
             sqlite3.Error: データベースエラー
         """
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
+        cursor = self._connection().cursor()
 
         try:
             cursor.execute(
@@ -185,7 +445,37 @@ class BattlelogCacheManager:
             return result
 
         finally:
-            conn.close()
+            cursor.close()
+
+    def get_cached_uploaded_at_subset(self, player_id: str, uploaded_ats: set[str]) -> set[str]:
+        """
+        uploaded_ats のうちキャッシュ済みのものを取得（UNIQUE(player_id, uploaded_at) のインデックスで検索）
+
+        プレイヤーのキャッシュ全体を読み込まずに、1ページ分の対戦ログのキャッシュの有無を判定する。
+
+        Args:
+            player_id: プレイヤーID
+            uploaded_ats: 判定する uploaded_at 値の集合
+
+        Returns:
+            キャッシュ済みの uploaded_at 値の集合
+
+        Raises:
+            sqlite3.Error: データベースエラー
+        """
+        conn = self._connection()
+        values = list(uploaded_ats)
+        result: set[str] = set()
+        # SQL のパラメータ数の上限を超えないよう分割して検索
+        for start in range(0, len(values), self.SUBSET_QUERY_SIZE):
+            chunk = values[start : start + self.SUBSET_QUERY_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT uploaded_at FROM replay_cache WHERE player_id = ? AND uploaded_at IN ({placeholders})",
+                (player_id, *chunk),
+            ).fetchall()
+            result.update(str(row[0]) for row in rows)
+        return result
 
     def get_all_cached_replays(self) -> list[dict[str, Any]]:
         """
@@ -197,23 +487,17 @@ class BattlelogCacheManager:
         Raises:
             sqlite3.Error: データベースエラー
         """
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
+        cursor = self._connection().cursor()
 
         try:
             cursor.execute("SELECT replay_data FROM replay_cache ORDER BY cached_at DESC")
-            rows = cursor.fetchall()
-
-            replays = []
-            for row in rows:
-                replay = json.loads(row[0])
-                replays.append(replay)
+            replays = [_decompress_replay(row[0]) for row in cursor.fetchall()]
 
             logger.debug(f"Retrieved {len(replays)} total cached replays")
             return replays
 
         finally:
-            conn.close()
+            cursor.close()
 
     def clear_cache(self, player_id: str | None = None) -> int:
         """
@@ -228,22 +512,15 @@ class BattlelogCacheManager:
         Raises:
             sqlite3.Error: データベースエラー
         """
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
-
-        try:
+        conn = self._connection()
+        with conn:
             if player_id:
-                cursor.execute("DELETE FROM replay_cache WHERE player_id = ?", (player_id,))
+                deleted = conn.execute("DELETE FROM replay_cache WHERE player_id = ?", (player_id,)).rowcount
                 logger.info(f"Cleared cache for player_id={player_id}")
             else:
-                cursor.execute("DELETE FROM replay_cache")
+                deleted = conn.execute("DELETE FROM replay_cache").rowcount
                 logger.info("Cleared all cache")
-
-            conn.commit()
-            return cursor.rowcount
-
-        finally:
-            conn.close()
+        return deleted
 
     def get_cache_stats(self) -> dict[str, Any]:
         """
@@ -255,8 +532,7 @@ class BattlelogCacheManager:
         Raises:
             sqlite3.Error: データベースエラー
         """
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
+        cursor = self._connection().cursor()
 
         try:
             # 全レコード数
@@ -285,7 +561,7 @@ class BattlelogCacheManager:
             return stats
 
         finally:
-            conn.close()
+            cursor.close()
 
     def get_latest_uploaded_at(self, player_id: str) -> int | None:
         """
@@ -297,11 +573,10 @@ class BattlelogCacheManager:
         Raises:
             sqlite3.Error: データベースエラー
         """
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
+        cursor = self._connection().cursor()
         try:
             cursor.execute(
-                "SELECT MAX(CAST(uploaded_at AS INTEGER)) FROM replay_cache WHERE player_id = ?",
+                "SELECT MAX(uploaded_at) FROM replay_cache WHERE player_id = ?",
                 (player_id,),
             )
             result = cursor.fetchone()[0]
@@ -309,7 +584,7 @@ class BattlelogCacheManager:
             return result  # None or int
 
         finally:
-            conn.close()
+            cursor.close()
 
     def has_reached_cache_boundary(
         self,
@@ -333,15 +608,9 @@ class BattlelogCacheManager:
             logger.debug(f"Empty page for {player_id}: reached boundary")
             return True  # 空ページ = 終了
 
-        # 現在のページのキャッシュ済みupload_atの集合を取得
-        cached_uploaded_at_set = self.get_cached_uploaded_at_set(player_id)
-        if not cached_uploaded_at_set:
-            logger.debug(f"No cache for {player_id}: continue fetching")
-            return False  # キャッシュなし = まだ続行
-
-        # 現在のページのすべてがキャッシュ済みか確認
+        # 現在のページのすべてがキャッシュ済みか確認（ページの uploaded_at のみ検索）
         page_uploaded_ats = {str(r.get("uploaded_at")) for r in current_page_replays}
-        all_cached = page_uploaded_ats.issubset(cached_uploaded_at_set)
+        all_cached = self.get_cached_uploaded_at_subset(player_id, page_uploaded_ats) == page_uploaded_ats
 
         logger.debug(
             f"Cache boundary check for {player_id}: page_count={len(page_uploaded_ats)}, all_cached={all_cached}"
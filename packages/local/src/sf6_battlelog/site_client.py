@@ -11,6 +11,7 @@ from typing import Any
 import aiohttp
 
 from src.utils.logger import get_logger
+from src.utils.metrics import record
 
 logger = get_logger()
 
@@ -66,6 +67,7 @@ class BattlelogSiteClient:
                         raise RuntimeError(f"HTTP {resp.status} from profile page")
 
                     html = await resp.text()
+                    record("battlelog", api_calls=1, bytes=len(html.encode("utf-8")))
                     logger.debug(f"Retrieved profile page: {len(html)} bytes")
 
                     # __NEXT_DATA__スクリプトタグからJSONを抽出
@@ -13,6 +13,7 @@ import pyarrow.parquet as pq
 from botocore.exceptions import ClientError
 
 from ..utils.logger import get_logger
+from ..utils.metrics import record
 
 logger = get_logger()
 
@@ -70,15 +71,16 @@ class R2Uploader:
         Returns:
             アップロードされたオブジェクトのキー
         """
-        json_str = json.dumps(data, ensure_ascii=False, indent=2)
+        body = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
 
         try:
             self.s3_client.put_object(
                 Bucket=self.bucket_name,
                 Key=key,
-                Body=json_str.encode("utf-8"),
+                Body=body,
                 ContentType="application/json",
             )
+            record("upload", api_calls=1, bytes=len(body))
             logger.info("Uploaded JSON: %s", key)
             return key
         except ClientError:
@@ -149,13 +151,15 @@ class R2Uploader:
         pq.write_table(table, buffer, compression="snappy")
         buffer.seek(0)
 
+        body = buffer.getvalue()
         try:
             self.s3_client.put_object(
                 Bucket=self.bucket_name,
                 Key=key,
-                Body=buffer.getvalue(),
+                Body=body,
                 ContentType="application/octet-stream",
             )
+            record("upload", api_calls=1, bytes=len(body))
             logger.info("Uploaded Parquet: %s", key)
             return key
         except ClientError:
@@ -180,7 +184,9 @@ class R2Uploader:
         try:
             # 既存データを取得
             response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
-            existing_data = json.loads(response["Body"].read().decode("utf-8"))
+            body = response["Body"].read()
+            record("upload", api_calls=1, bytes=len(body))
+            existing_data = json.loads(body.decode("utf-8"))
 
             # 配列でない場合は配列化
             if not isinstance(existing_data, list):
@@ -234,7 +240,9 @@ class R2Uploader:
             response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
             import io
 
-            buffer = io.BytesIO(response["Body"].read())
+            body = response["Body"].read()
+            record("upload", api_calls=1, bytes=len(body))
+            buffer = io.BytesIO(body)
             existing_table = pq.read_table(buffer)
             existing_data = existing_table.to_pylist()
 
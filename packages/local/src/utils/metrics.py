@@ -0,0 +1,254 @@
+"""処理パイプラインの計測モジュール
+
+動画1本の処理について、段階（ダウンロード・検出・認識・Battlelog・YouTube・アップロード・Firestore）
+ごとの実時間・CPU時間と、転送バイト数・デコードしたフレーム数・API呼び出し数・リトライ数を記録する。
+
+各モジュールは record() / timed_stage() で現在の計測対象（PipelineMetrics.activate() で設定）に記録する。
+計測対象が設定されていない場合（テストモードなど）は何もしない。
+常駐モードでは PrometheusExporter で処理済み動画の累計を Prometheus のテキスト形式で公開できる。
+"""
+
+import json
+import resource
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from .logger import get_logger
+
+logger = get_logger()
+
+# 計測する段階（metrics.json・Prometheus の stage ラベル）
+STAGES = ("download", "detection", "recognition", "battlelog", "youtube", "upload", "firestore")
+
+# StageMetrics の標準カウンタ（record() のそれ以外のキーは details に加算）
+COUNTERS = ("bytes", "frames", "api_calls", "retries")
+
+PROMETHEUS_PREFIX = "sf6_chapter"
+
+
+def _cpu_seconds() -> float:
+    """プロセスと終了した子プロセス（ffmpeg・並列走査のワーカー）の CPU 時間の合計"""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime + children.ru_utime + children.ru_stime
+
+
+@dataclass
+class StageMetrics:
+    """段階ごとの計測値"""
+
+    wall_sec: float = 0.0  # 実時間（秒）
+    cpu_sec: float = 0.0  # CPU時間（秒、同じプロセスの並行スレッドと子プロセスを含む）
+    calls: int = 0  # 段階の実行回数
+    errors: int = 0  # 例外で終了した回数
+    bytes: int = 0  # 転送したバイト数（ダウンロード・アップロード・API レスポンス）
+    frames: int = 0  # 読み込んだフレーム数
+    api_calls: int = 0  # 外部 API の呼び出し数
+    retries: int = 0  # 外部 API のリトライ数
+    details: dict[str, float] = field(default_factory=dict)  # 段階固有の計測値（検出の内訳など）
+
+
+class PipelineMetrics:
+    """動画1本の処理の段階ごとの計測値"""
+
+    def __init__(self, video_id: str | None = None):
+        """
+        Args:
+            video_id: YouTube動画ID
+        """
+        self.video_id = video_id
+        self.started_at = datetime.now(UTC).isoformat()
+        self.status: str | None = None
+        self.stages: dict[str, StageMetrics] = {}
+        self._started = time.perf_counter()
+        self._wall_sec: float | None = None
+        self._lock = threading.Lock()
+
+    def stage_metrics(self, stage: str) -> StageMetrics:
+        """段階の計測値（未記録なら作成）"""
+        with self._lock:
+            return self.stages.setdefault(stage, StageMetrics())
+
+    @contextmanager
+    def stage(self, stage: str) -> Iterator[StageMetrics]:
+        """
+        with ブロックの実時間・CPU時間を段階に加算
+
+        Args:
+            stage: 段階名（STAGES を参照）
+
+        Yields:
+            段階の計測値
+        """
+        metrics = self.stage_metrics(stage)
+        wall_start = time.perf_counter()
+        cpu_start = _cpu_seconds()
+        try:
+            yield metrics
+        except BaseException:
+            metrics.errors += 1
+            raise
+        finally:
+            metrics.calls += 1
+            metrics.wall_sec += time.perf_counter() - wall_start
+            metrics.cpu_sec += _cpu_seconds() - cpu_start
+
+    def add(self, stage: str, **counters: float) -> None:
+        """
+        段階のカウンタに加算
+
+        Args:
+            stage: 段階名
+            **counters: 加算する値（bytes / frames / api_calls / retries、それ以外は details）
+        """
+        metrics = self.stage_metrics(stage)
+        with self._lock:
+            for name, value in counters.items():
+                if name in COUNTERS:
+                    setattr(metrics, name, getattr(metrics, name) + int(value))
+                else:
+                    metrics.details[name] = metrics.details.get(name, 0) + value
+
+    def finish(self, status: str) -> None:
+        """処理全体の実時間を確定"""
+        self.status = status
+        self._wall_sec = time.perf_counter() - self._started
+
+    @contextmanager
+    def activate(self) -> Iterator["PipelineMetrics"]:
+        """with ブロック内の record() / timed_stage() の記録先に設定"""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    def to_dict(self) -> dict[str, Any]:
+        """辞書形式に変換（metrics.json の内容）"""
+        wall_sec = self._wall_sec if self._wall_sec is not None else time.perf_counter() - self._started
+        return {
+            "videoId": self.video_id,
+            "startedAt": self.started_at,
+            "status": self.status,
+            "wallSec": wall_sec,
+            "stages": {stage: asdict(metrics) for stage, metrics in self.stages.items()},
+        }
+
+    def save(self, path: Path) -> None:
+        """計測値を JSON で保存"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        logger.info("Saved metrics: %s", path)
+
+    def log_summary(self) -> None:
+        """段階ごとの実時間をログ出力"""
+        logger.info(
+            "Stage metrics: %s",
+            ", ".join(
+                f"{stage}={metrics.wall_sec:.1f}s (cpu={metrics.cpu_sec:.1f}s)"
+                for stage, metrics in self.stages.items()
+            ),
+        )
+
+
+_current: ContextVar[PipelineMetrics | None] = ContextVar("pipeline_metrics", default=None)
+
+
+def current_metrics() -> PipelineMetrics | None:
+    """現在の計測対象（activate() の with ブロック外では None）"""
+    return _current.get()
+
+
+def record(stage: str, **counters: float) -> None:
+    """現在の計測対象の段階のカウンタに加算（計測対象がなければ何もしない）"""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.add(stage, **counters)
+
+
+@contextmanager
+def timed_stage(stage: str) -> Iterator[None]:
+    """現在の計測対象の段階に with ブロックの実時間・CPU時間を加算（計測対象がなければ何もしない）"""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    with metrics.stage(stage):
+        yield
+
+
+class PrometheusExporter:
+    """処理済み動画の計測値の累計を Prometheus のテキスト形式で公開"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: dict[str, StageMetrics] = {}
+        self._videos: dict[str, int] = {}
+        self._server: ThreadingHTTPServer | None = None
+
+    def observe(self, metrics: PipelineMetrics) -> None:
+        """動画1本の計測値を累計に加算"""
+        with self._lock:
+            status = metrics.status or "unknown"
+            self._videos[status] = self._videos.get(status, 0) + 1
+            for stage, values in metrics.stages.items():
+                total = self._stages.setdefault(stage, StageMetrics())
+                for name in ("wall_sec", "cpu_sec", "calls", "errors", *COUNTERS):
+                    setattr(total, name, getattr(total, name) + getattr(values, name))
+
+    def render(self) -> str:
+        """Prometheus のテキスト形式（exposition format）"""
+        series = [
+            ("wall_seconds_total", "wall_sec", "Wall-clock time spent in each stage"),
+            ("cpu_seconds_total", "cpu_sec", "CPU time spent in each stage"),
+            ("stage_calls_total", "calls", "Number of times each stage ran"),
+            ("stage_errors_total", "errors", "Number of times each stage raised"),
+            ("bytes_total", "bytes", "Bytes moved by each stage"),
+            ("frames_total", "frames", "Frames read by each stage"),
+            ("api_calls_total", "api_calls", "External API calls made by each stage"),
+            ("retries_total", "retries", "External API retries made by each stage"),
+        ]
+        lines = []
+        with self._lock:
+            name = f"{PROMETHEUS_PREFIX}_videos_total"
+            lines += [f"# HELP {name} Processed videos by final status", f"# TYPE {name} counter"]
+            lines += [f'{name}{{status="{status}"}} {count}' for status, count in sorted(self._videos.items())]
+            for suffix, attribute, help_text in series:
+                name = f"{PROMETHEUS_PREFIX}_{suffix}"
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                lines += [
+                    f'{name}{{stage="{stage}"}} {getattr(values, attribute):g}'
+                    for stage, values in sorted(self._stages.items())
+                ]
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "0.0.0.0") -> None:
+        """バックグラウンドスレッドで /metrics を公開"""
+        exporter = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        logger.info("Serving Prometheus metrics on http://%s:%d/metrics", host, port)
@@ -0,0 +1,205 @@
+"""処理段階のプロファイラ
+
+`--profile` 指定時に検出・認識の段階をプロファイリングし、動画ごとの中間ファイルディレクトリに保存する。
+
+- "cprofile": cProfile による決定的プロファイル。profile_<段階>.prof（pstats 形式、snakeviz 等で表示）と
+  profile_<段階>.txt（累積時間の上位）を保存する。collapsed stacks は呼び出し元の中で最も時間の長いものを
+  たどって近似する（cProfile は呼び出し元1段分しか記録しないため）。
+- "sampling": 一定間隔で対象スレッドのスタックを採取する低オーバーヘッドのプロファイラ。
+  profile_<段階>.txt（自己時間の上位）を保存する。
+
+どちらも flamegraph.pl / speedscope で読める collapsed stacks（profile_<段階>.collapsed）を保存する。
+プロファイラ無効時は何もしないコンテキストを返すだけで、計測対象の処理に影響しない。
+どちらも呼び出し元のスレッドのみを計測するため、プロファイリング時は区間分割の並列走査を行わず（scan_workers）、
+検出と並行したキャラクター認識（RECOGNITION_OVERLAP）も行わない。
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from pathlib import Path
+from types import FrameType
+from typing import Any
+
+from .logger import get_logger
+
+logger = get_logger()
+
+PROFILERS = ("cprofile", "sampling")
+
+# サンプリング間隔（秒）
+SAMPLING_INTERVAL_SEC = 0.005
+
+# テキストの要約に出力する関数の数
+SUMMARY_LIMIT = 40
+
+# collapsed stacks を近似する際にたどる呼び出し元の最大段数
+MAX_STACK_DEPTH = 64
+
+# 無効時に返すコンテキスト（再利用可能）
+_DISABLED = nullcontext()
+
+
+def _frame_label(filename: str, lineno: int, name: str) -> str:
+    """collapsed stacks のフレーム名（セミコロンを含まないこと）"""
+    return f"{name} ({os.path.basename(filename)}:{lineno})".replace(";", ":")
+
+
+class _StackSampler:
+    """対象スレッドのスタックを一定間隔で採取して集計"""
+
+    def __init__(self, thread_id: int, interval_sec: float):
+        self.thread_id = thread_id
+        self.interval_sec = interval_sec
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_sec):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[self._collapse(frame)] += 1
+                self.samples += 1
+
+    @staticmethod
+    def _collapse(frame: FrameType | None) -> str:
+        labels = []
+        while frame is not None:
+            code = frame.f_code
+            labels.append(_frame_label(code.co_filename, code.co_firstlineno, code.co_name))
+            frame = frame.f_back
+        return ";".join(reversed(labels))
+
+    def summary(self) -> str:
+        """自己時間（スタックの末尾）の上位"""
+        self_counts: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            self_counts[stack.rsplit(";", 1)[-1]] += count
+        lines = [f"{self.samples} samples at {self.interval_sec * 1000:.1f}ms", "", "  samples      %  function"]
+        for label, count in self_counts.most_common(SUMMARY_LIMIT):
+            lines.append(f"{count:9d} {100 * count / max(1, self.samples):6.1f}  {label}")
+        return "\n".join(lines) + "\n"
+
+
+def _collapse_cprofile(stats: pstats.Stats) -> Counter[str]:
+    """
+    cProfile の結果から collapsed stacks を近似（値はマイクロ秒）
+
+    関数ごとの自己時間を、呼び出し元のうち累積時間の最も長いものをたどったスタックに割り当てる。
+    """
+    entries: dict[tuple[str, int, str], Any] = stats.stats  # type: ignore[attr-defined]
+    stacks: Counter[str] = Counter()
+    for func, (_, _, self_time, _, callers) in entries.items():
+        if self_time <= 0:
+            continue
+        labels = [_frame_label(*func)]
+        seen = {func}
+        current = callers
+        while current and len(labels) < MAX_STACK_DEPTH:
+            # callers: {呼び出し元: (呼び出し回数, 再帰以外の呼び出し回数, 自己時間, 累積時間)}
+            parent = max(current, key=lambda f: current[f][3])
+            if parent in seen:
+                break
+            seen.add(parent)
+            labels.append(_frame_label(*parent))
+            current = entries[parent][4] if parent in entries else None
+        stacks[";".join(reversed(labels))] += int(self_time * 1_000_000)
+    return stacks
+
+
+class StageProfiler:
+    """検出・認識の段階を動画ごとにプロファイリング"""
+
+    def __init__(self, kind: str | None = None, interval_sec: float = SAMPLING_INTERVAL_SEC):
+        """
+        Args:
+            kind: プロファイラの種類（"cprofile" / "sampling"、None で無効）
+            interval_sec: サンプリング間隔（秒、"sampling" のみ）
+        """
+        if kind is not None and kind not in PROFILERS:
+            raise ValueError(f"profiler must be one of {PROFILERS}, got {kind}")
+        self.kind = kind
+        self.interval_sec = interval_sec
+
+    @property
+    def enabled(self) -> bool:
+        return self.kind is not None
+
+    def scan_workers(self, workers: int) -> int:
+        """
+        区間分割の並列走査のワーカープロセス数（プロファイリング時は1）
+
+        ワーカープロセスはプロファイリングされないため、有効時は呼び出し元のプロセスで走査させる。
+        """
+        if self.enabled and workers != 1:
+            logger.info("Profiling with %s: scanning serially instead of %s workers", self.kind, workers or "auto")
+            return 1
+        return workers
+
+    def profile(self, stage: str, output_dir: Path | None) -> AbstractContextManager[None]:
+        """
+        with ブロックをプロファイリングして output_dir に保存するコンテキスト
+
+        Args:
+            stage: 段階名（出力ファイル名 profile_<stage>.* に使用）
+            output_dir: 出力先（動画の中間ファイルディレクトリ、None または無効時はプロファイリングしない）
+        """
+        if self.kind is None or output_dir is None:
+            return _DISABLED
+        return self._profile(stage, Path(output_dir))
+
+    @contextmanager
+    def _profile(self, stage: str, output_dir: Path) -> Iterator[None]:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        started = time.perf_counter()
+        if self.kind == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                self._save_cprofile(profiler, stage, output_dir)
+        else:
+            sampler = _StackSampler(threading.get_ident(), self.interval_sec)
+            sampler.start()
+            try:
+                yield
+            finally:
+                sampler.stop()
+                self._save_sampling(sampler, stage, output_dir)
+        logger.info("Saved %s profile of %s (%.1fs) to %s", self.kind, stage, time.perf_counter() - started, output_dir)
+
+    @staticmethod
+    def _write_collapsed(stacks: Counter[str], path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, value in stacks.most_common():
+                f.write(f"{stack} {value}\n")
+
+    def _save_cprofile(self, profiler: cProfile.Profile, stage: str, output_dir: Path) -> None:
+        profiler.dump_stats(str(output_dir / f"profile_{stage}.prof"))
+        summary = io.StringIO()
+        stats = pstats.Stats(profiler, stream=summary)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(SUMMARY_LIMIT)
+        (output_dir / f"profile_{stage}.txt").write_text(summary.getvalue(), encoding="utf-8")
+        self._write_collapsed(_collapse_cprofile(stats), output_dir / f"profile_{stage}.collapsed")
+
+    def _save_sampling(self, sampler: _StackSampler, stage: str, output_dir: Path) -> None:
+        (output_dir / f"profile_{stage}.txt").write_text(sampler.summary(), encoding="utf-8")
+        self._write_collapsed(sampler.stacks, output_dir / f"profile_{stage}.collapsed")
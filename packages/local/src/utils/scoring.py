@@ -0,0 +1,27 @@
+"""テンプレートマッチングの判定の余裕のスコア
+
+RESULT画面の勝敗判定やキャラクター名のローカル認識で、マッチングスコアの閾値からの余裕を
+ロジスティック関数で 0.0-1.0 のスコアに変換する。
+ラベル付きのデータで較正した確率ではなく、判定どうしの余裕の大小を比べるための値として扱うこと。
+"""
+
+import math
+
+# 余裕のスコアのスケール（閾値からの余裕がこの値でスコア 約 0.73、2倍で約 0.88）
+MARGIN_SCORE_SCALE = 0.05
+
+
+def margin_score(margin: float, scale: float = MARGIN_SCORE_SCALE) -> float:
+    """
+    閾値からの余裕を 0.0-1.0 のスコアに変換
+
+    余裕 0（閾値ちょうど）で 0.5、負の余裕（閾値未満）では 0.5 未満になる。
+
+    Args:
+        margin: マッチングスコアの閾値からの余裕
+        scale: ロジスティック関数のスケール
+
+    Returns:
+        余裕のスコア
+    """
+    return 1.0 / (1.0 + math.exp(-margin / scale))
@@ -1,5 +1,5 @@
 """動画関連モジュール"""
 
-from .downloader import VideoDownloader
+from .downloader import DETECTION_FORMAT_SORT, StreamingDownload, VideoDownloader, detection_format
 
-__all__ = ["VideoDownloader"]
+__all__ = ["DETECTION_FORMAT_SORT", "StreamingDownload", "VideoDownloader", "detection_format"]
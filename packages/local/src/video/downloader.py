@@ -3,15 +3,82 @@ YouTube動画ダウンロードモジュール
 yt-dlpを使用して動画をダウンロード
 """
 
+import contextvars
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
 import yt_dlp
 
 from ..utils.logger import get_logger
+from ..utils.metrics import record
 
 logger = get_logger()
 
+# ストリーミング検出用のフォーマット（映像のみの単一ファイル、結合後処理なしで先頭から逐次書き込まれる）
+STREAMING_FORMAT = "bestvideo[ext=mp4]/bestvideo[ext=webm]/best"
+
+# 検出用フォーマットの優先順位（解像度・ファイルサイズ・ビットレートの小さい順）
+DETECTION_FORMAT_SORT = ["+res", "+size", "+br"]
+
+
+def detection_format(min_height: int) -> str:
+    """
+    検出用の映像のみのフォーマット指定を作成
+
+    DETECTION_FORMAT_SORT と組み合わせて、min_height 以上で最小のフォーマットを選択する。
+    デコードの軽い H.264 を優先し、該当がなければ他のコーデック、映像のみのフォーマットが
+    なければ音声付きのフォーマットにフォールバックする。
+
+    Args:
+        min_height: 最小の高さ（ピクセル）
+
+    Returns:
+        yt-dlp のフォーマット指定
+    """
+    h = f"[height>={min_height}]"
+    return f"bestvideo{h}[vcodec^=avc1]/bestvideo{h}/best{h}/best"
+
+
+@dataclass
+class StreamingDownload:
+    """バックグラウンドで進行中のダウンロード（ダウンロード済みの範囲から検出を開始するために使用）"""
+
+    video_id: str
+    path: str  # ダウンロード先のファイルパス（ダウンロード中も追記される）
+    fps: float
+    width: int
+    height: int
+    duration: float | None  # 動画の長さ（秒）
+    _finished: threading.Event = field(default_factory=threading.Event, repr=False)
+    _thread: threading.Thread | None = field(default=None, repr=False)
+    error: Exception | None = None
+
+    def is_finished(self) -> bool:
+        """ダウンロードが終了したか（失敗を含む）"""
+        return self._finished.is_set()
+
+    def wait(self) -> str:
+        """
+        ダウンロードの終了を待つ
+
+        Returns:
+            ダウンロードされたファイルパス
+
+        Raises:
+            RuntimeError: ダウンロードに失敗した場合
+            FileNotFoundError: ダウンロードされたファイルが見つからない場合
+        """
+        if self._thread is not None:
+            self._thread.join()
+        self._finished.wait()
+        if self.error is not None:
+            raise RuntimeError(f"ダウンロードに失敗しました (video_id={self.video_id}): {self.error}") from self.error
+        if not Path(self.path).exists():
+            raise FileNotFoundError(f"Downloaded file not found: {self.path}")
+        return self.path
+
 
 class _YtDlpLogger:
     """yt-dlpの出力をPython loggingに橋渡しするアダプター"""
@@ -50,6 +117,7 @@ class VideoDownloader:
         video_id: str,
         format_option: str | None = None,
         skip_if_exists: bool = False,
+        format_sort: list[str] | None = None,
     ) -> str:
         """
         動画をダウンロード
@@ -58,6 +126,7 @@ class VideoDownloader:
             video_id: YouTube動画ID
             format_option: フォーマット指定（省略時は最高品質）
             skip_if_exists: Trueの場合、既存ファイルがあればダウンロードをスキップ
+            format_sort: フォーマットの優先順位（yt-dlp の -S 相当、例: DETECTION_FORMAT_SORT）
 
         Returns:
             ダウンロードされたファイルパス
@@ -82,6 +151,8 @@ class VideoDownloader:
 
         if format_option:
             ydl_opts["format"] = format_option
+        if format_sort:
+            ydl_opts["format_sort"] = format_sort
 
         fragment_errors: list[str] = []
 
@@ -89,12 +160,15 @@ class VideoDownloader:
             if d.get("status") == "error":
                 msg = str(d.get("error", "unknown fragment error"))
                 fragment_errors.append(msg)
+            elif d.get("status") == "finished":
+                record("download", bytes=d.get("total_bytes") or d.get("downloaded_bytes") or 0)
 
         ydl_opts["progress_hooks"] = [_on_progress]
 
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
             # 動画情報取得
             info_raw = ydl.extract_info(url, download=False)
+            record("download", api_calls=1)
             if not info_raw:
                 raise ValueError(f"Failed to get video info: {video_id}")
 
@@ -128,6 +202,97 @@ class VideoDownloader:
 
         return str(file_path)
 
+    def start_streaming_download(
+        self,
+        video_id: str,
+        format_option: str = STREAMING_FORMAT,
+        format_sort: list[str] | None = None,
+    ) -> StreamingDownload:
+        """
+        動画のダウンロードをバックグラウンドで開始（ダウンロード中の検出用）
+
+        一時ファイル（.part）を使わず最終ファイルへ直接書き込むため、ダウンロード済みの範囲を
+        先頭から読み込める。映像と音声の結合など後処理が必要なフォーマットは指定しないこと。
+
+        Args:
+            video_id: YouTube動画ID
+            format_option: フォーマット指定（単一ファイルとしてダウンロードされるもの）
+            format_sort: フォーマットの優先順位（yt-dlp の -S 相当）
+
+        Returns:
+            StreamingDownload（wait() でダウンロード完了を待つ）
+        """
+        url = f"https://www.youtube.com/watch?v={video_id}"
+
+        ydl_opts: dict[str, Any] = {
+            "outtmpl": str(self.download_dir / "%(upload_date)s[%(id)s].%(ext)s"),
+            "format": format_option,
+            "nopart": True,
+            "logger": _YtDlpLogger(),
+        }
+        if format_sort:
+            ydl_opts["format_sort"] = format_sort
+
+        if self.cookie_path:
+            ydl_opts["cookiefile"] = self.cookie_path
+
+        fragment_errors: list[str] = []
+
+        def _on_progress(d: dict[str, Any]) -> None:
+            if d.get("status") == "error":
+                msg = str(d.get("error", "unknown fragment error"))
+                fragment_errors.append(msg)
+            elif d.get("status") == "finished":
+                record("download", bytes=d.get("total_bytes") or d.get("downloaded_bytes") or 0)
+
+        ydl_opts["progress_hooks"] = [_on_progress]
+
+        ydl = yt_dlp.YoutubeDL(ydl_opts)
+        try:
+            info_raw = ydl.extract_info(url, download=False)
+            record("download", api_calls=1)
+            if not info_raw:
+                raise ValueError(f"Failed to get video info: {video_id}")
+            info = ydl.sanitize_info(info_raw)
+            if not info.get("fps") or not info.get("width") or not info.get("height"):
+                raise ValueError(f"Selected format has no video stream info: {video_id} ({info.get('format_id')})")
+            path = ydl.prepare_filename(info)
+        except BaseException:
+            ydl.close()
+            raise
+
+        stream = StreamingDownload(
+            video_id=video_id,
+            path=path,
+            fps=float(info["fps"]),
+            width=int(info["width"]),
+            height=int(info["height"]),
+            duration=info.get("duration"),
+        )
+
+        def _download() -> None:
+            try:
+                with ydl:
+                    retcode = ydl.download([url])
+                if fragment_errors:
+                    raise RuntimeError(f"フラグメント取得エラー ({len(fragment_errors)}件): {fragment_errors[0]}")
+                if retcode != 0:
+                    raise RuntimeError(f"yt-dlp exited with code {retcode}")
+            except Exception as e:
+                logger.error("Streaming download failed: %s", e)
+                stream.error = e
+            finally:
+                stream._finished.set()
+
+        # 計測対象（utils.metrics）をダウンロードスレッドに引き継ぐ
+        context = contextvars.copy_context()
+        stream._thread = threading.Thread(
+            target=context.run, args=(_download,), name=f"download-{video_id}", daemon=True
+        )
+        stream._thread.start()
+        logger.info("Streaming download started: %s (format=%s)", path, info.get("format_id"))
+        return stream
+
     def _find_existing_file(self, video_id: str) -> Path | None:
         """
         指定されたvideo_idの既存ファイルを検索
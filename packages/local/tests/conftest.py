@@ -0,0 +1,43 @@
+"""
+テスト共通のフィクスチャ
+
+キャラクター名の切り抜き画像（ローカル認識・認識結果キャッシュ・送信画像のエンコードのテストで共有）を提供します。
+"""
+
+from collections.abc import Callable
+
+import cv2
+import numpy as np
+import pytest
+
+# キャラクター名の切り抜き画像の大きさ (width, height)
+NAME_BANNER_SIZE = (1568, 94)
+
+
+def _draw_name_banner(p1: str = "JAMIE", p2: str = "KEN", seed: int = 0, noise_seed: int | None = None) -> np.ndarray:
+    """
+    背景の上に左右のキャラクター名を描いた切り抜き画像
+
+    Args:
+        p1: 左側（1p）のキャラクター名
+        p2: 右側（2p）のキャラクター名（右寄せ）
+        seed: 背景の乱数シード
+        noise_seed: 再エンコード程度のノイズの乱数シード（None でノイズなし）
+    """
+    width, height = NAME_BANNER_SIZE
+    rng = np.random.default_rng(seed)
+    background = rng.integers(0, 256, size=(3, 20, 3), dtype=np.uint8)
+    crop = cv2.resize(background, NAME_BANNER_SIZE, interpolation=cv2.INTER_CUBIC)
+    cv2.putText(crop, p1, (60, 75), cv2.FONT_HERSHEY_DUPLEX, 2.2, (255, 255, 255), 5)
+    text_width = cv2.getTextSize(p2, cv2.FONT_HERSHEY_DUPLEX, 2.2, 5)[0][0]
+    cv2.putText(crop, p2, (width - 60 - text_width, 75), cv2.FONT_HERSHEY_DUPLEX, 2.2, (255, 255, 255), 5)
+    if noise_seed is None:
+        return crop
+    noise = np.random.default_rng(noise_seed).integers(-4, 5, crop.shape)
+    return np.clip(crop.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+@pytest.fixture(scope="session")
+def name_banner() -> Callable[..., np.ndarray]:
+    """キャラクター名の切り抜き画像を作成する関数（_draw_name_banner）"""
+    return _draw_name_banner
@@ -0,0 +1,63 @@
+"""
+検出と並行したキャラクター認識のテスト
+
+BackgroundRecognizer がフレーム数・経過時間のしきい値でバッチを送信し、
+バックグラウンドで認識していないフレームを results() でまとめて認識することをテストします。
+"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("google.genai")
+
+from src.character import BackgroundRecognizer
+
+
+class FakeRecognizer:
+    """フレームの画素値をキャラクター名として返し、バッチごとのフレーム数を記録する"""
+
+    def __init__(self):
+        self.batches: list[list[int]] = []
+        self.threads: list[str] = []
+
+    def recognize_from_frames(self, frames):
+        self.batches.append([int(frame[0, 0]) for frame in frames])
+        self.threads.append(threading.current_thread().name)
+        return [({"1p": f"P{int(frame[0, 0])}", "2p": "KEN"}, {}) for frame in frames]
+
+
+def _frame(value: int) -> np.ndarray:
+    return np.full((2, 2), value, dtype=np.uint8)
+
+
+def test_flushes_by_size_and_recognizes_rest():
+    """flush_frames 枚ごとにバックグラウンドで認識し、未投入のフレームは results() で認識すること"""
+    recognizer = FakeRecognizer()
+    with BackgroundRecognizer(recognizer, flush_frames=2, flush_interval_sec=60.0) as background:
+        for key in range(5):
+            background.submit(key, _frame(key))
+        background.submit(0, _frame(0))  # 同じキーは1回のみ
+        results = background.results([(key, _frame(key)) for key in range(6)])
+
+    assert [normalized["1p"] for normalized, _ in results] == [f"P{key}" for key in range(6)]
+    assert sorted(recognizer.batches) == [[0, 1], [2, 3], [4], [5]]
+    # 未投入のフレームのみ呼び出し元のスレッドで認識
+    assert recognizer.threads.count(threading.current_thread().name) == 1
+
+
+def test_flushes_by_interval():
+    """flush_frames に満たなくても flush_interval_sec が経ったら認識を開始すること"""
+    recognizer = FakeRecognizer()
+    with BackgroundRecognizer(recognizer, flush_frames=10, flush_interval_sec=0.05) as background:
+        background.submit(1, _frame(1))
+        deadline = time.monotonic() + 5.0
+        while not recognizer.batches and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert recognizer.batches == [[1]]
+
+        background.results([(1, _frame(1))])
+
+    assert recognizer.batches == [[1]]
@@ -0,0 +1,172 @@
+"""
+Battlelog キャッシュのテスト
+
+BattlelogCacheManager の一括保存・重複の無視・キャッシュ境界の判定、スレッドごとの接続、
+列に展開した項目の読み込みとスキーマ v1 からの移行をテストします。
+"""
+
+import json
+import sqlite3
+import threading
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from src.sf6_battlelog.cache import BattlelogCacheManager
+
+
+def _replays(start: int, count: int) -> list[dict]:
+    return [{"replay_id": f"R{i}", "uploaded_at": 1_700_000_000 + i} for i in range(start, start + count)]
+
+
+def _replay(uploaded_at: int) -> dict:
+    """Battlelog の replay と同じ構造の対戦ログ"""
+    return {
+        "replay_id": f"R{uploaded_at}",
+        "uploaded_at": uploaded_at,
+        "replay_battle_type": 1,
+        "views": 3,
+        "player1_info": {
+            "player": {"short_id": 1234567890, "fighter_id": "alice"},
+            "character_id": 2,
+            "character_name": "Ken",
+            "playing_character_tool_name": "ken",
+            "battle_input_type": 0,
+            "league_point": 25000,
+            "league_rank": 36,
+            "master_rating": 1600,
+            "round_results": [1, 0, 6],
+        },
+        "player2_info": {
+            "player": {"short_id": 987654321, "fighter_id": "bob"},
+            "character_id": 1,
+            "character_name": "Ryu",
+            "battle_input_type": 1,
+            "league_point": 24000,
+            "league_rank": 35,
+            "master_rating": 1550,
+            "round_results": [0, 1, 0],
+        },
+    }
+
+
+def test_cache_replays_ignores_duplicates(tmp_path):
+    """一括保存は新規の件数を返し、既に保存済みの対戦ログは無視すること"""
+    with BattlelogCacheManager(db_path=str(tmp_path / "cache.db")) as cache:
+        assert cache.cache_replays("p1", _replays(0, 10)) == 10
+        assert cache.cache_replays("p1", _replays(5, 10)) == 5
+        assert cache.cache_replay("p1", _replays(0, 1)[0]) is False
+
+        assert len(cache.get_cached_replays("p1")) == 15
+        assert cache.get_cache_stats()["total_records"] == 15
+
+
+def test_cache_replays_missing_uploaded_at_saves_nothing(tmp_path):
+    """uploaded_at のない対戦ログを含むと何も保存しないこと"""
+    with BattlelogCacheManager(db_path=str(tmp_path / "cache.db")) as cache:
+        with pytest.raises(KeyError):
+            cache.cache_replays("p1", [*_replays(0, 3), {"replay_id": "broken"}])
+
+        assert cache.get_cached_replays("p1") == []
+
+
+def test_cache_boundary_uses_page_subset(tmp_path):
+    """ページの対戦ログがすべてキャッシュ済みの場合のみ境界に到達したと判定すること"""
+    with BattlelogCacheManager(db_path=str(tmp_path / "cache.db")) as cache:
+        cache.cache_replays("p1", _replays(0, 20))
+
+        assert cache.has_reached_cache_boundary("p1", _replays(10, 10)) is True
+        assert cache.has_reached_cache_boundary("p1", _replays(15, 10)) is False
+        assert cache.has_reached_cache_boundary("p2", _replays(0, 10)) is False
+        assert cache.get_cached_uploaded_at_subset("p1", {"1700000019", "1700000020"}) == {"1700000019"}
+
+
+def test_connection_per_thread_and_reopen_after_close(tmp_path):
+    """スレッドごとに1つの接続を使い回し、close() の後も接続を開き直して操作できること"""
+    cache = BattlelogCacheManager(db_path=str(tmp_path / "cache.db"))
+    connections: dict[int, list] = {}
+
+    def worker(start: int) -> None:
+        first = cache._connection()
+        cache.cache_replays("p1", _replays(start, 10))
+        connections[start] = [first, cache._connection()]
+
+    threads = [threading.Thread(target=worker, args=(i * 10,)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(first is second for first, second in connections.values())
+    assert connections[0][0] is not connections[10][0]
+
+    cache.close()
+    assert len(cache.get_cached_uploaded_at_set("p1")) == 20
+    cache.close()
+
+
+def test_replay_columns_and_summary(tmp_path):
+    """項目を型付きの列に展開し、全項目・照合用の項目・列の射影で読み込めること"""
+    replay = _replay(1_700_000_000)
+    with BattlelogCacheManager(db_path=str(tmp_path / "cache.db")) as cache:
+        cache.cache_replay("p1", replay)
+
+        assert cache.get_cached_replays("p1") == [replay]
+        assert cache.get_cached_replays("p1", summary=True) == [
+            {
+                "uploaded_at": 1_700_000_000,
+                "replay_id": "R1700000000",
+                "player1_info": {
+                    "character_name": "Ken",
+                    "playing_character_tool_name": "ken",
+                    "round_results": [1, 0, 6],
+                },
+                "player2_info": {"character_name": "Ryu", "round_results": [0, 1, 0]},
+            }
+        ]
+        (row,) = cache.get_replay_rows()
+
+    assert row["uploaded_at"] == 1_700_000_000
+    assert row["battle_type"] == 1
+    assert (row["p1_character_id"], row["p2_character_name"]) == (2, "Ryu")
+    assert (row["p1_league_point"], row["p2_master_rating"], row["p1_short_id"]) == (25000, 1550, 1234567890)
+    assert row["p2_playing_character_tool_name"] is None
+    assert (row["p1_round_results"], row["p1_round_wins"], row["p2_round_wins"]) == ("[1, 0, 6]", 2, 1)
+
+
+def test_migrates_v1_database(tmp_path):
+    """スキーマ v1（JSON 文字列）のデータベースを v2 に移行し、読み込めない行は移行しないこと"""
+    db_path = tmp_path / "cache.db"
+    with sqlite3.connect(str(db_path)) as conn:
+        conn.execute(
+            """
+            CREATE TABLE replay_cache (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                player_id TEXT NOT NULL,
+                uploaded_at TEXT NOT NULL,
+                replay_data TEXT NOT NULL,
+                cached_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(player_id, uploaded_at)
+            )
+            """
+        )
+        conn.execute("CREATE INDEX idx_player_id ON replay_cache(player_id)")
+        conn.execute("CREATE INDEX idx_uploaded_at ON replay_cache(uploaded_at)")
+        conn.executemany(
+            "INSERT INTO replay_cache (player_id, uploaded_at, replay_data) VALUES (?, ?, ?)",
+            [
+                ("p1", "1700000000", json.dumps(_replay(1_700_000_000))),
+                ("p1", "1700000060", json.dumps(_replay(1_700_000_060))),
+                ("p1", "1700000120", "{broken"),
+            ],
+        )
+    conn.close()
+
+    with BattlelogCacheManager(db_path=str(db_path)) as cache:
+        assert cache.get_cached_replays("p1") == [_replay(1_700_000_060), _replay(1_700_000_000)]
+        assert cache.get_latest_uploaded_at("p1") == 1_700_000_060
+        assert cache.has_reached_cache_boundary("p1", [_replay(1_700_000_000)]) is True
+        version = cache._connection().execute("PRAGMA user_version").fetchone()[0]
+
+    assert version == BattlelogCacheManager.DB_SCHEMA_VERSION
@@ -0,0 +1,140 @@
+"""
+キャラクター名のローカル認識のテスト
+
+NameTemplateBank の保存・読み込みと、LocalCharacterClassifier の左右の照合・余裕のスコア・採用の下限の選択、
+CharacterRecognizer が採用しなかったフレームのみ Gemini API で認識することをテストします。
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+pytest.importorskip("google.genai")
+
+from src.character import CharacterRecognizer, LocalCharacterClassifier, NameTemplateBank
+from src.character.local_classifier import build_template, select_min_confidence, split_sides
+
+CHARACTERS = ["RYU", "KEN", "JP", "JAMIE", "ED", "MANON"]
+
+
+@pytest.fixture(scope="module")
+def bank(name_banner) -> NameTemplateBank:
+    # 背景の異なる切り抜き画像から作成（背景が消えてキャラクター名が残る）
+    templates: dict[str, list[tuple[str, np.ndarray]]] = {"1p": [], "2p": []}
+    for name in CHARACTERS:
+        for side in templates:
+            halves = [split_sides(name_banner(name, name, seed))[side] for seed in range(5)]
+            templates[side].append((name, build_template(halves)))
+    features = {"1p": (CHARACTERS, np.eye(len(CHARACTERS), 8, dtype=np.float16))}
+    # 採用の下限は実際の切り抜き画像のホールドアウト評価で選ぶ（ここでは評価済みとして設定）
+    return NameTemplateBank(crop_size=(1568, 94), templates=templates, features=features, min_confidence=0.8)
+
+
+class TestLocalCharacterClassifier:
+    """LocalCharacterClassifier のテストクラス"""
+
+    def test_save_and_load(self, bank, tmp_path):
+        """保存・読み込みでテンプレートが変わらないこと"""
+        bank.save(tmp_path / "bank.npz")
+        loaded = NameTemplateBank.load(tmp_path / "bank.npz")
+
+        assert loaded.crop_size == bank.crop_size
+        for side in ("1p", "2p"):
+            assert [label for label, _ in loaded.templates[side]] == CHARACTERS
+            for (_, a), (_, b) in zip(loaded.templates[side], bank.templates[side], strict=True):
+                np.testing.assert_array_equal(a, b)
+        assert loaded.features["1p"][0] == CHARACTERS
+        np.testing.assert_array_equal(loaded.features["1p"][1], bank.features["1p"][1])
+        assert "2p" not in loaded.features
+        assert loaded.min_confidence == bank.min_confidence
+
+    def test_template_trimmed_to_name(self, bank):
+        """テンプレートはキャラクター名の周囲に切り詰められること（短い名前ほど小さい）"""
+        sizes = {name: image.shape for name, image in bank.templates["1p"]}
+
+        assert sizes["JP"][1] < sizes["JAMIE"][1] < 784
+        assert sizes["JP"][0] < 94
+
+    def test_classifies_both_sides(self, bank, name_banner):
+        """左右のキャラクター名を認識し、別の解像度の切り抜き画像も照合できること"""
+        classifier = LocalCharacterClassifier(bank)
+        crop = name_banner("JP", "JAMIE", seed=100)
+
+        result = classifier.classify(crop)
+        assert result.characters == {"1p": "JP", "2p": "JAMIE"}
+        assert result.accepted
+
+        # 720p の動画の切り抜き画像（テンプレートの大きさに拡大して照合）
+        result = classifier.classify(cv2.resize(crop, (1045, 63), interpolation=cv2.INTER_AREA))
+        assert result.characters == {"1p": "JP", "2p": "JAMIE"}
+        assert min(result.confidence.values()) > 0.5
+
+    def test_unknown_character_not_accepted(self, bank, name_banner):
+        """テンプレートのないキャラクター名は余裕のスコアが低く、採用しないこと"""
+        result = LocalCharacterClassifier(bank).classify(name_banner("CAMMY", "KEN", seed=100))
+
+        assert result.confidence["1p"] < 0.5
+        assert not result.accepted
+
+    def test_unevaluated_bank_accepts_nothing(self, bank, name_banner):
+        """採用の下限のないテンプレートでは認識できても採用せず、明示した下限があれば採用すること"""
+        unevaluated = NameTemplateBank(crop_size=bank.crop_size, templates=bank.templates)
+        crop = name_banner("JP", "JAMIE", seed=100)
+
+        result = LocalCharacterClassifier(unevaluated).classify(crop)
+        assert result.characters == {"1p": "JP", "2p": "JAMIE"}
+        assert not result.accepted
+        assert LocalCharacterClassifier(unevaluated, min_confidence=0.8).classify(crop).accepted
+
+    def test_select_min_confidence(self):
+        """採用した切り抜き画像の正解率が目標以上になる最小の下限を選ぶこと"""
+        scores = [0.99, 0.97, 0.95, 0.9, 0.85, 0.7, 0.6]
+        correct = [True, True, True, True, False, True, False]
+
+        assert select_min_confidence(scores, correct, target_accuracy=0.99) == 0.86
+        assert select_min_confidence(scores, correct, target_accuracy=0.8) == 0.61
+        assert select_min_confidence([0.9], [False]) is None
+        assert select_min_confidence([], []) is None
+
+    def test_recognizer_falls_through_low_confidence(self, bank, name_banner):
+        """採用しなかったフレームのみ Gemini（recognize）で認識すること"""
+        recognizer = CharacterRecognizer.__new__(CharacterRecognizer)
+        recognizer.valid_characters = [*CHARACTERS, "CAMMY"]
+        recognizer.cache = None
+        recognizer.cluster_distance = 0.0
+        recognizer.local_classifier = LocalCharacterClassifier(bank)
+        sent: list[int] = []
+
+        def recognize(frames):
+            sent.append(len(frames))
+            return [({"1p": "CAMMY", "2p": "KEN"}, {"1p": "CAMMY", "2p": "KEN"}) for _ in frames]
+
+        frames = [name_banner("RYU", "ED", seed=101), name_banner("CAMMY", "KEN", seed=101)]
+        results = recognizer._recognize_local_first(frames, recognize)
+
+        assert sent == [1]
+        assert [normalized for normalized, _ in results] == [{"1p": "RYU", "2p": "ED"}, {"1p": "CAMMY", "2p": "KEN"}]
+
+    def test_rerecognition_bypasses_local_classifier(self, bank, name_banner):
+        """ローカル認識で確定するフレームも、前処理付きの再認識（ADR-033）では Gemini で認識すること"""
+        recognizer = CharacterRecognizer.__new__(CharacterRecognizer)
+        recognizer.valid_characters = [*CHARACTERS, "CAMMY"]
+        recognizer.cache = None
+        recognizer.cluster_distance = 0.0
+        recognizer.local_classifier = LocalCharacterClassifier(bank)
+        sent: list[np.ndarray] = []
+
+        def recognize_single(frame):
+            sent.append(frame)
+            return {"1p": "RYU", "2p": "KEN"}, {"1p": "RYU", "2p": "KEN"}
+
+        recognizer._recognize_single = recognize_single
+        frame = name_banner("RYU", "ED", seed=101)
+        assert recognizer.recognize_from_frame(frame)[0] == {"1p": "RYU", "2p": "ED"}
+        assert sent == []
+
+        normalized, _ = recognizer.recognize_with_preprocessing(frame, method="negative")
+
+        assert normalized == {"1p": "RYU", "2p": "KEN"}
+        assert len(sent) == 1
+        np.testing.assert_array_equal(sent[0], 255 - frame)
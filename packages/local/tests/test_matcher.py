@@ -0,0 +1,504 @@
+"""
+対戦シーン検出器のテスト
+
+TemplateMatcher の走査処理を合成動画でテストします。
+"""
+
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from src.detection import (
+    MatchDetection,
+    ParallelMatchScanner,
+    ResultDetection,
+    SegmentScanResult,
+    TemplateMatcher,
+    load_detection_params,
+)
+from src.detection.stride import AdaptiveStrideScheduler, ResultCheckScheduler
+
+TEMPLATE_DIR = Path(__file__).parent.parent / "template"
+ROUND1_TEMPLATE = TEMPLATE_DIR / "round1_2026_new_monitor.png"
+
+FPS = 30
+FRAME_SIZE = (640, 480)  # (width, height)
+SEARCH_REGION = (250, 40, 450, 440)
+ROUND1_POSITION = (300, 80)  # (x, y)
+REJECT_POSITION = (260, 395)  # (x, y)
+RESULT_MARKER = np.s_[0:40, 0:40]  # RESULT画面の目印（左上の白い矩形）
+
+
+def _make_reject_template() -> np.ndarray:
+    """除外テンプレート（Round 2相当）のダミー画像"""
+    image = np.full((40, 170, 3), 20, dtype=np.uint8)
+    cv2.putText(image, "ROUND 2", (5, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+    return image
+
+
+def _write_synthetic_video(
+    path: Path,
+    duration_sec: float,
+    round1_ranges: list[tuple[float, float]],
+    reject_ranges: list[tuple[float, float]] | None = None,
+    result_ranges: list[tuple[float, float]] | None = None,
+) -> None:
+    """Round 1テンプレート（と除外テンプレート・RESULT画面の目印）を指定区間に合成したテスト動画を作成"""
+    template = cv2.imread(str(ROUND1_TEMPLATE), cv2.IMREAD_COLOR)
+    th, tw = template.shape[:2]
+    reject = _make_reject_template()
+    rh, rw = reject.shape[:2]
+    width, height = FRAME_SIZE
+    rng = np.random.default_rng(0)
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), FPS, FRAME_SIZE)
+    try:
+        for i in range(int(duration_sec * FPS)):
+            t = i / FPS
+            frame = np.full((height, width, 3), 40, dtype=np.uint8)
+            # ゲームプレイ風に動く矩形
+            x = int(50 + 200 * abs(np.sin(t)))
+            cv2.rectangle(frame, (x, 300), (x + 80, 420), tuple(int(v) for v in rng.integers(60, 200, 3)), -1)
+            if any(start <= t < end for start, end in round1_ranges):
+                px, py = ROUND1_POSITION
+                frame[py : py + th, px : px + tw] = template
+            if any(start <= t < end for start, end in reject_ranges or []):
+                px, py = REJECT_POSITION
+                frame[py : py + rh, px : px + rw] = reject
+            if any(start <= t < end for start, end in result_ranges or []):
+                frame[RESULT_MARKER] = 255
+            writer.write(frame)
+    finally:
+        writer.release()
+
+
+@pytest.fixture(scope="module")
+def synthetic_video(tmp_path_factory) -> Path:
+    """3秒地点と9秒地点にRound 1画面を含む12秒の合成動画"""
+    path = tmp_path_factory.mktemp("video") / "synthetic.mp4"
+    _write_synthetic_video(path, duration_sec=12.0, round1_ranges=[(3.0, 4.5), (9.0, 10.5)])
+    return path
+
+
+@pytest.fixture(scope="module")
+def reject_template_path(tmp_path_factory) -> Path:
+    path = tmp_path_factory.mktemp("template") / "reject.png"
+    cv2.imwrite(str(path), _make_reject_template())
+    return path
+
+
+@pytest.fixture(scope="module")
+def post_check_video(tmp_path_factory) -> Path:
+    """3秒地点のRound 1直後に除外テンプレートが続き、9秒地点は通常のRound 1となる動画"""
+    path = tmp_path_factory.mktemp("video") / "post_check.mp4"
+    _write_synthetic_video(
+        path,
+        duration_sec=12.0,
+        round1_ranges=[(3.0, 4.5), (9.0, 10.5)],
+        reject_ranges=[(3.1, 4.5)],
+    )
+    return path
+
+
+@pytest.fixture(scope="module")
+def short_match_video(tmp_path_factory) -> Path:
+    """3秒地点のRound 1の2秒後にRESULT画面が表示される短い対戦の動画"""
+    path = tmp_path_factory.mktemp("video") / "short_match.mp4"
+    _write_synthetic_video(path, duration_sec=8.0, round1_ranges=[(3.0, 4.5)], result_ranges=[(5.0, 6.0)])
+    return path
+
+
+class _FakeResultDetector:
+    """左上の白い矩形をRESULT画面（1P勝利）として検出する RESULT画面検出器"""
+
+    result_screen_search_region = None
+    win_text_search_region = None
+
+    def rescale_for(self, frame_width: int, frame_height: int) -> None:
+        pass
+
+    def banner_histogram(self, context) -> np.ndarray:
+        return np.array([1.0])
+
+    def detect_result(self, context, frame_width: int) -> ResultDetection | None:
+        if context.frame[RESULT_MARKER].mean() < 200:
+            return None
+        return ResultDetection(
+            winner_side="player1", detection_confidence=0.9, win_position="left", detection_method="fake"
+        )
+
+
+class _GrowingCopy:
+    """ファイルを少しずつ書き込んでダウンロード中のファイルを再現する"""
+
+    def __init__(self, source: Path, path: Path, chunk_bytes: int = 64 * 1024):
+        self.source = source
+        self.path = str(path)
+        self.fps = float(FPS)
+        self.width, self.height = FRAME_SIZE
+        self.chunk_bytes = chunk_bytes
+        self._finished = threading.Event()
+
+    def start(self) -> None:
+        threading.Thread(target=self._copy, daemon=True).start()
+
+    def _copy(self) -> None:
+        with open(self.source, "rb") as src, open(self.path, "wb") as dst:
+            while chunk := src.read(self.chunk_bytes):
+                dst.write(chunk)
+                dst.flush()
+                time.sleep(0.01)
+        self._finished.set()
+
+    def is_finished(self) -> bool:
+        return self._finished.is_set()
+
+
+def _build_matcher(**kwargs) -> TemplateMatcher:
+    params = {
+        "template_path": str(ROUND1_TEMPLATE),
+        "threshold": 0.55,
+        "min_interval_sec": 2.0,
+        "frame_interval": 2,
+        "search_region": SEARCH_REGION,
+        "post_check_frames": 0,
+        "recognize_frame_offset": 6,
+        "recognize_frame_offset_alt": 4,
+    }
+    params.update(kwargs)
+    return TemplateMatcher(**params)
+
+
+class TestTemplateMatcher:
+    """TemplateMatcher のテストクラス"""
+
+    def test_detects_round1_screens(self, synthetic_video):
+        """合成したRound 1画面が検出されること"""
+        detections = _build_matcher().detect_matches(str(synthetic_video))
+
+        assert [round(d.timestamp) for d in detections] == [3, 9]
+        assert all(d.confidence >= 0.55 for d in detections)
+
+    def test_on_detection_called_during_scan(self, synthetic_video):
+        """確定した検出ごとに認識用フレーム付きで on_detection が呼び出されること"""
+        notified = []
+        detections = _build_matcher().detect_matches(str(synthetic_video), on_detection=notified.append)
+
+        assert notified == detections
+        assert all(d.frame is not None for d in notified)
+
+    def test_stage_times_are_recorded(self, synthetic_video):
+        """段階ごとの処理時間が走査全体の処理時間の内訳として記録されること"""
+        stats = _build_matcher().scan_segment(str(synthetic_video)).stats
+
+        assert stats.read_frames == 12 * FPS
+        assert stats.decode_sec > 0 and stats.preprocess_sec > 0 and stats.match_sec > 0
+        assert sum(stats.stage_seconds().values()) <= stats.scan_sec
+
+    @pytest.mark.parametrize("frame_interval", [1, 2, 5])
+    def test_grab_mode_matches_read_mode(self, synthetic_video, frame_interval):
+        """grabモードとreadモードで検出結果が一致すること"""
+        read_detections = _build_matcher(scan_mode="read", frame_interval=frame_interval).detect_matches(
+            str(synthetic_video)
+        )
+        grab_detections = _build_matcher(scan_mode="grab", frame_interval=frame_interval).detect_matches(
+            str(synthetic_video)
+        )
+
+        assert [d.frame_number for d in grab_detections] == [d.frame_number for d in read_detections]
+        assert [d.confidence for d in grab_detections] == pytest.approx([d.confidence for d in read_detections])
+        for grab_det, read_det in zip(grab_detections, read_detections, strict=True):
+            assert np.array_equal(grab_det.frame, read_det.frame)
+
+    def test_post_check_rejects_from_lookahead_buffer(self, post_check_video, reject_template_path):
+        """後続フレームの除外テンプレートマッチで誤検知が除外されること"""
+        matcher = _build_matcher(
+            reject_templates=[str(reject_template_path)],
+            reject_threshold=0.5,
+            post_check_frames=10,
+            post_check_reject_limit=2,
+        )
+
+        detections = matcher.detect_matches(str(post_check_video))
+
+        assert [round(d.timestamp) for d in detections] == [9]
+
+    def test_short_match_gets_result_with_production_schedule(self, short_match_video):
+        """production の RESULT画面検出の間隔設定で、Round 1の2秒後に終わる短い対戦も勝者側が付与されること"""
+        params = load_detection_params("production")
+        matcher = _build_matcher(
+            result_detector=_FakeResultDetector(),
+            result_min_delay_sec=params.result_min_delay_sec,
+            result_check_interval_sec=params.result_check_interval_sec,
+            result_signal_threshold=params.result_signal_threshold,
+        )
+        detections = matcher.detect_matches(str(short_match_video))
+
+        assert [round(d.timestamp) for d in detections] == [3]
+        assert detections[0].winner_side == "player1"
+
+    def test_small_lookahead_buffer(self, synthetic_video):
+        """先読みバッファが小さくても走査が完了すること（オフセット選択は可能な範囲で実施）"""
+        detections = _build_matcher(lookahead_buffer_max_mb=0.1).detect_matches(str(synthetic_video))
+
+        assert [round(d.timestamp) for d in detections] == [3, 9]
+
+    @pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+    @pytest.mark.parametrize("frame_interval", [1, 3])
+    def test_ffmpeg_source_matches_opencv_source(self, synthetic_video, frame_interval):
+        """ffmpeg パイプ（切り抜き・グレースケール・間引き）と OpenCV で検出結果が一致すること"""
+        opencv_detections = _build_matcher(frame_interval=frame_interval).detect_matches(str(synthetic_video))
+        ffmpeg_detections = _build_matcher(frame_source="ffmpeg", frame_interval=frame_interval).detect_matches(
+            str(synthetic_video)
+        )
+
+        assert [d.frame_number for d in ffmpeg_detections] == [d.frame_number for d in opencv_detections]
+        assert [d.confidence for d in ffmpeg_detections] == pytest.approx(
+            [d.confidence for d in opencv_detections], abs=0.05
+        )
+        assert all(d.frame.shape == (FRAME_SIZE[1], FRAME_SIZE[0], 3) for d in ffmpeg_detections)
+
+    @pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+    def test_ffmpeg_source_post_check(self, post_check_video, reject_template_path):
+        """ffmpeg パイプでも間引き後のフレームで後続フレームチェックが行われること"""
+        matcher = _build_matcher(
+            frame_source="ffmpeg",
+            reject_templates=[str(reject_template_path)],
+            reject_threshold=0.5,
+            post_check_frames=10,
+            post_check_reject_limit=2,
+        )
+
+        detections = matcher.detect_matches(str(post_check_video))
+
+        assert [round(d.timestamp) for d in detections] == [9]
+
+    @pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+    def test_scan_stream_matches_file_scan(self, synthetic_video, tmp_path):
+        """ダウンロード中のファイルを走査しても、ダウンロード済みファイルと検出結果が一致すること"""
+        # パイプ入力で読めるよう moov を先頭に置いた fragmented MP4 に変換（YouTube の DASH と同じ構成）
+        source = tmp_path / "fragmented.mp4"
+        subprocess.run(
+            ["ffmpeg", "-loglevel", "error", "-i", str(synthetic_video), "-c", "copy"]
+            + ["-movflags", "frag_keyframe+empty_moov", str(source)],
+            check=True,
+        )
+        stream = _GrowingCopy(source, tmp_path / "downloading.mp4")
+
+        expected = _build_matcher(frame_source="ffmpeg", adaptive_stride=20).scan_segment(str(source))
+        stream.start()
+        streamed = _build_matcher(adaptive_stride=20).scan_stream(stream, duration_sec=12.0)
+
+        assert [round(d.timestamp) for d in streamed.detections] == [3, 9]
+        assert [d.frame_number for d in streamed.detections] == [d.frame_number for d in expected.detections]
+        assert all(d.frame.shape == (FRAME_SIZE[1], FRAME_SIZE[0], 3) for d in streamed.detections)
+        assert streamed.end_frame == 12 * FPS
+
+    @pytest.mark.parametrize("scale", [2 / 3, 1.5])  # 1080p 基準での 720p・1620p 相当
+    @pytest.mark.parametrize(
+        "frame_source",
+        [
+            "opencv",
+            pytest.param("ffmpeg", marks=pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="no ffmpeg")),
+        ],
+    )
+    def test_detects_at_other_resolutions(self, synthetic_video, tmp_path, scale, frame_source):
+        """基準解像度と異なる解像度の動画でも、相対座標の領域とテンプレートピラミッドで同じ場面を検出すること"""
+        resized = tmp_path / "resized.mp4"
+        size = (int(FRAME_SIZE[0] * scale), int(FRAME_SIZE[1] * scale))
+        cap = cv2.VideoCapture(str(synthetic_video))
+        writer = cv2.VideoWriter(str(resized), cv2.VideoWriter_fourcc(*"mp4v"), FPS, size)
+        while (frame := cap.read()[1]) is not None:
+            writer.write(cv2.resize(frame, size, interpolation=cv2.INTER_AREA))
+        writer.release()
+        cap.release()
+
+        crop_region = (0, 300, 640, 480)
+        matcher = _build_matcher(
+            reference_height=FRAME_SIZE[1], reference_width=FRAME_SIZE[0], frame_source=frame_source
+        )
+        detections = matcher.detect_matches(str(resized), crop_region=crop_region)
+
+        assert [round(d.timestamp) for d in detections] == [3, 9]
+        assert all(d.frame.shape == (size[1] - int(300 * scale), size[0], 3) for d in detections)
+
+    def test_prefilter_matches_full_matching(self, post_check_video, reject_template_path):
+        """プレフィルタ有無で検出結果が一致し、段階ごとの枝刈り数が集計されること"""
+        params = {
+            "reject_templates": [str(reject_template_path)],
+            "reject_threshold": 0.5,
+            "post_check_frames": 10,
+            "post_check_reject_limit": 2,
+        }
+        full = _build_matcher(**params).scan_segment(str(post_check_video))
+        prefiltered = _build_matcher(prefilter_threshold=0.4, **params).scan_segment(str(post_check_video))
+
+        assert [d.frame_number for d in prefiltered.detections] == [d.frame_number for d in full.detections]
+        assert full.stats.prefilter_rejected == 0
+        assert prefiltered.stats.prefilter_rejected > 0
+        assert prefiltered.stats.sampled_frames == full.stats.sampled_frames
+        assert prefiltered.stats.post_check_rejected == full.stats.post_check_rejected == 1
+        assert prefiltered.stats.detected == 1
+
+    @pytest.mark.parametrize("min_match_duration_sec", [0.0, 3.0])
+    def test_adaptive_stride_matches_dense_scan(self, post_check_video, reject_template_path, min_match_duration_sec):
+        """適応的走査（と検出後の対戦区間スキップ）で密な走査と検出結果が一致すること"""
+        params = {
+            "reject_templates": [str(reject_template_path)],
+            "reject_threshold": 0.5,
+            "post_check_frames": 10,
+            "post_check_reject_limit": 2,
+        }
+        dense = _build_matcher(**params).scan_segment(str(post_check_video))
+        adaptive = _build_matcher(
+            adaptive_stride=20,
+            adaptive_dense_threshold=0.4,
+            min_match_duration_sec=min_match_duration_sec,
+            **params,
+        ).scan_segment(str(post_check_video))
+
+        assert [d.frame_number for d in adaptive.detections] == [d.frame_number for d in dense.detections]
+        assert adaptive.stats.sampled_frames < dense.stats.sampled_frames
+        assert adaptive.stats.backtracks > 0
+
+    def test_invalid_adaptive_stride(self):
+        """frame_interval の倍数でない疎な走査間隔はエラーになること"""
+        with pytest.raises(ValueError):
+            _build_matcher(frame_interval=2, adaptive_stride=15)
+
+    def test_invalid_frame_source(self):
+        """不正なフレーム供給元はエラーになること"""
+        with pytest.raises(ValueError):
+            _build_matcher(frame_source="unknown")
+
+    def test_invalid_scan_mode(self):
+        """不正な走査モードはエラーになること"""
+        with pytest.raises(ValueError):
+            _build_matcher(scan_mode="unknown")
+
+
+class TestParallelMatchScanner:
+    """ParallelMatchScanner のテストクラス"""
+
+    @pytest.mark.parametrize("workers", [2, 3])
+    def test_parallel_matches_serial(self, synthetic_video, workers):
+        """区間分割した並列走査と逐次走査で検出結果が一致すること"""
+        matcher = _build_matcher()
+        serial = matcher.detect_matches(str(synthetic_video))
+
+        scanner = ParallelMatchScanner(matcher, workers=workers, segment_overlap_sec=3.0, min_segment_sec=1.0)
+        notified = []
+        parallel = scanner.detect_matches(str(synthetic_video), on_detection=notified.append)
+
+        assert [d.frame_number for d in parallel] == [d.frame_number for d in serial]
+        # 重なり部分の重複を除去した検出で1回ずつ呼び出される
+        assert notified == parallel
+
+    def test_merge_attaches_result_across_boundary(self):
+        """区間先頭のRESULTが前区間の最後の対戦に付与され、重なりによる重複が除去されること"""
+        scanner = ParallelMatchScanner(_build_matcher(), workers=2, min_segment_sec=1.0)
+        frame = np.zeros((1, 1, 3), dtype=np.uint8)
+
+        def detection(frame_number: int) -> MatchDetection:
+            return MatchDetection(timestamp=frame_number / FPS, frame_number=frame_number, confidence=0.6, frame=frame)
+
+        first = SegmentScanResult(detections=[detection(90), detection(270)], start_frame=0, end_frame=300)
+        second = SegmentScanResult(
+            detections=[detection(270), detection(600)],
+            start_frame=240,
+            end_frame=660,
+            leading_result_frame=250,
+            leading_winner_side="player1",
+        )
+        second.detections[0].winner_side = "player2"
+
+        merged = scanner._merge_segments([first, second], FPS)
+
+        assert [d.frame_number for d in merged] == [90, 270, 600]
+        assert [d.winner_side for d in merged] == ["player1", "player2", None]
+
+
+class TestAdaptiveStrideScheduler:
+    """AdaptiveStrideScheduler のテストクラス"""
+
+    def test_backtracks_when_coarse_score_rises(self):
+        """疎な走査中にスコアが上昇したら直前のサンプル位置の次まで戻ること"""
+        scheduler = AdaptiveStrideScheduler(0, frame_interval=2, sparse_stride=10, dense_threshold=0.5)
+
+        assert scheduler.observe(0, 0.1) is None
+        assert scheduler.next_sample_frame == 10
+        assert scheduler.observe(10, 0.7) == 2
+        # 戻った区間は密に走査し、元のフレームではもう戻らない
+        for frame_number in range(2, 10, 2):
+            assert scheduler.observe(frame_number, 0.1) is None
+            assert scheduler.next_sample_frame == frame_number + 2
+        assert scheduler.observe(10, 0.7) is None
+        assert scheduler.next_sample_frame == 12
+
+    def test_returns_to_sparse_stride(self):
+        """スコアが下がって sparse_stride 分経過したら疎な走査に戻ること"""
+        scheduler = AdaptiveStrideScheduler(0, frame_interval=2, sparse_stride=10, dense_threshold=0.5)
+        scheduler.observe(0, 0.7)
+
+        scheduler.observe(8, 0.1)
+        assert scheduler.next_sample_frame == 10
+        scheduler.observe(10, 0.1)
+        assert scheduler.next_sample_frame == 20
+
+    def test_match_window_after_detection(self):
+        """Round 1検出後は対戦区間の終端（frame_interval の格子）まで疎に走査し、戻らないこと"""
+        scheduler = AdaptiveStrideScheduler(
+            1, frame_interval=2, sparse_stride=10, dense_threshold=0.5, match_window_frames=100
+        )
+        scheduler.observe(41, 0.9)
+        scheduler.on_detection(41)
+
+        assert scheduler.match_window_end == 141
+        assert scheduler.in_match_window(131)
+        assert not scheduler.in_match_window(141)
+        assert scheduler.next_sample_frame == 51
+        assert scheduler.observe(51, None) is None
+        assert scheduler.next_sample_frame == 61
+        # 対戦区間の後でスコアが上昇しても対戦区間内には戻らない
+        scheduler.observe(131, None)
+        assert scheduler.observe(141, 0.9) is None
+
+
+class TestResultCheckScheduler:
+    """ResultCheckScheduler のテストクラス"""
+
+    def test_delay_and_sparse_interval(self):
+        """Round 1検出から min_delay_frames の間は検出せず、その後は check_interval_frames ごとに検出すること"""
+        scheduler = ResultCheckScheduler(1, frame_interval=2, min_delay_frames=100, check_interval_frames=30)
+        scheduler.on_detection(41)
+
+        assert scheduler.open_frame == 141
+        assert not scheduler.should_check(131)
+        checked = [frame for frame in range(141, 241, 10) if scheduler.should_check(frame)]
+        assert checked == [141, 171, 201, 231]
+
+    def test_densifies_on_banner_change(self):
+        """バナー領域の輝度ヒストグラムが大きく変化したら check_interval_frames の間は毎回検出すること"""
+        scheduler = ResultCheckScheduler(0, frame_interval=2, check_interval_frames=30, signal_threshold=0.3)
+        gameplay = np.array([0.5, 0.5, 0.0, 0.0])
+        banner = np.array([0.0, 0.1, 0.1, 0.8])
+
+        assert scheduler.should_check(0, gameplay)
+        assert not scheduler.should_check(10, gameplay)
+        assert scheduler.should_check(20, banner)
+        assert scheduler.should_check(30, banner)
+        assert scheduler.should_check(40, banner)
+        assert not scheduler.should_check(50, banner)
+
+    def test_next_detection_restarts_delay(self):
+        """次のRound 1検出で検出開始が延期されること"""
+        scheduler = ResultCheckScheduler(0, frame_interval=2, min_delay_frames=50)
+        assert scheduler.should_check(0)
+        scheduler.on_detection(10)
+        assert not scheduler.should_check(20)
+        assert scheduler.should_check(60)
@@ -0,0 +1,82 @@
+"""
+処理パイプラインの計測のテスト
+
+PipelineMetrics の段階ごとの記録と Prometheus 形式の出力をテストします。
+"""
+
+import json
+import urllib.request
+
+import pytest
+
+from src.utils.metrics import PipelineMetrics, PrometheusExporter, current_metrics, record, timed_stage
+
+
+class TestPipelineMetrics:
+    """PipelineMetrics のテストクラス"""
+
+    def test_records_only_while_active(self):
+        """activate() の with ブロック内の記録のみが計測対象に加算されること"""
+        metrics = PipelineMetrics("video")
+        record("upload", api_calls=1, bytes=100)
+
+        with metrics.activate():
+            assert current_metrics() is metrics
+            with timed_stage("upload"):
+                record("upload", api_calls=2, bytes=50, retries=1)
+            record("detection", frames=10, decode_sec=0.5)
+
+        assert current_metrics() is None
+        upload = metrics.stages["upload"]
+        assert (upload.calls, upload.api_calls, upload.bytes, upload.retries) == (1, 2, 50, 1)
+        assert upload.wall_sec >= 0 and upload.cpu_sec >= 0
+        assert metrics.stages["detection"].frames == 10
+        assert metrics.stages["detection"].details == {"decode_sec": 0.5}
+
+    def test_counts_errors_and_saves_json(self, tmp_path):
+        """例外で終了した段階がエラーとして数えられ、metrics.json に保存されること"""
+        metrics = PipelineMetrics("video")
+        with metrics.activate(), pytest.raises(RuntimeError), timed_stage("recognition"):
+            raise RuntimeError("quota")
+        metrics.finish("failed")
+
+        path = tmp_path / "metrics.json"
+        metrics.save(path)
+        data = json.loads(path.read_text(encoding="utf-8"))
+
+        assert data["videoId"] == "video"
+        assert data["status"] == "failed"
+        assert data["stages"]["recognition"]["errors"] == 1
+        assert data["stages"]["recognition"]["calls"] == 1
+
+
+class TestPrometheusExporter:
+    """PrometheusExporter のテストクラス"""
+
+    def test_render_accumulates_videos(self):
+        """処理済み動画の計測値が段階ごとに累計されること"""
+        exporter = PrometheusExporter()
+        for status in ("completed", "completed", "failed"):
+            metrics = PipelineMetrics("video")
+            metrics.add("download", bytes=1000, api_calls=1)
+            metrics.finish(status)
+            exporter.observe(metrics)
+
+        text = exporter.render()
+
+        assert 'sf6_chapter_videos_total{status="completed"} 2' in text
+        assert 'sf6_chapter_videos_total{status="failed"} 1' in text
+        assert 'sf6_chapter_bytes_total{stage="download"} 3000' in text
+        assert "# TYPE sf6_chapter_api_calls_total counter" in text
+
+    def test_serves_metrics_endpoint(self):
+        """/metrics で Prometheus のテキスト形式を返すこと"""
+        exporter = PrometheusExporter()
+        exporter.serve(0, host="127.0.0.1")
+        port = exporter._server.server_address[1]
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+                assert response.headers["Content-Type"].startswith("text/plain")
+                assert "sf6_chapter_videos_total" in response.read().decode("utf-8")
+        finally:
+            exporter._server.shutdown()
@@ -0,0 +1,70 @@
+"""
+Gemini API に送信する切り抜き画像のエンコードのテスト
+
+PayloadEncoder の縮小・グレースケール化・圧縮、認識結果キャッシュのキーと、モザイク画像へのまとめ方をテストします。
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+pytest.importorskip("google.genai")
+
+from src.character import PayloadEncoder
+from src.character.payload import LABEL_WIDTH, TILE_SIZE
+
+
+def test_default_encoding_is_full_color_png(name_banner):
+    """既定では従来と同じフル解像度のカラー PNG（可逆）になること"""
+    crop = name_banner()
+    encoded = PayloadEncoder().encode(crop)
+
+    assert encoded.mime_type == "image/png"
+    np.testing.assert_array_equal(cv2.imdecode(np.frombuffer(encoded.data, np.uint8), cv2.IMREAD_UNCHANGED), crop)
+
+
+def test_tile_encoding_fits_one_tile(name_banner):
+    """1タイルの幅に縮小したグレースケール JPEG は、フル解像度の PNG より小さいこと"""
+    crop = name_banner()
+    encoded = PayloadEncoder(max_width=TILE_SIZE, grayscale=True, image_format="jpeg").encode(crop)
+    decoded = cv2.imdecode(np.frombuffer(encoded.data, np.uint8), cv2.IMREAD_UNCHANGED)
+
+    assert encoded.mime_type == "image/jpeg"
+    assert decoded.shape == (46, TILE_SIZE)
+    assert len(encoded.data) * 10 < len(PayloadEncoder().encode(crop).data)
+
+
+def test_cache_key_changes_with_settings():
+    """送信する画像の設定が変わると認識結果キャッシュのキーが変わること"""
+    keys = {
+        PayloadEncoder().cache_key,
+        PayloadEncoder(max_width=TILE_SIZE).cache_key,
+        PayloadEncoder(grayscale=True).cache_key,
+        PayloadEncoder(binarize=True).cache_key,
+        PayloadEncoder(image_format="jpeg").cache_key,
+        PayloadEncoder(image_format="jpeg", quality=70).cache_key,
+        PayloadEncoder(mosaic_rows=4).cache_key,
+    }
+
+    assert len(keys) == 7
+    # PNG は品質の設定を使わない
+    assert PayloadEncoder(quality=70).cache_key == PayloadEncoder().cache_key
+
+
+def test_binarize_produces_two_levels(name_banner):
+    """2値化すると画素値が 0 と 255 のみになること"""
+    prepared = PayloadEncoder(binarize=True, image_format="png").prepare(name_banner())
+
+    assert set(np.unique(prepared)) <= {0, 255}
+
+
+def test_mosaic_groups_rows(name_banner):
+    """mosaic_rows 枚ずつ縦に並べた1枚の画像にまとめ、幅は番号欄を含めて1タイルに収まること"""
+    encoder = PayloadEncoder(max_width=TILE_SIZE, mosaic_rows=4)
+    encoded = encoder.encode_batch([name_banner(seed=seed) for seed in range(10)])
+
+    assert [image.frames for image in encoded] == [4, 4, 2]
+    mosaic = cv2.imdecode(np.frombuffer(encoded[0].data, np.uint8), cv2.IMREAD_UNCHANGED)
+    assert mosaic.shape[1] == TILE_SIZE
+    # 番号欄に番号が書かれていること
+    assert mosaic[:, :LABEL_WIDTH].max() == 255
@@ -0,0 +1,91 @@
+"""
+画像前処理のテスト
+
+FramePreprocessContext のメモ化・切り抜き・縮小済みフレームの扱いをテストします。
+"""
+
+import cv2
+import numpy as np
+
+from src.detection.preprocessing import (
+    FramePreprocessContext,
+    preprocess_for_matching,
+    to_frame_region,
+    to_relative_region,
+)
+
+REGION = (40, 30, 200, 150)
+
+
+def _make_frame() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, (240, 320, 3), dtype=np.uint8)
+
+
+class TestFramePreprocessContext:
+    """FramePreprocessContext のテストクラス"""
+
+    def test_edges_match_preprocess_for_matching(self):
+        """領域ごとのエッジ画像が preprocess_for_matching と一致すること"""
+        frame = _make_frame()
+        context = FramePreprocessContext(frame)
+
+        x1, y1, x2, y2 = REGION
+        assert np.array_equal(context.edges("search", REGION), preprocess_for_matching(frame[y1:y2, x1:x2]))
+        assert np.array_equal(context.edges("full", None), preprocess_for_matching(frame))
+
+    def test_edges_are_memoized_per_region(self):
+        """同じ名前の領域は1回だけ計算され、異なる名前は別に計算されること"""
+        context = FramePreprocessContext(_make_frame())
+
+        first = context.edges("search", REGION)
+        assert context.edges("search", REGION) is first
+        assert context.blurred("search", REGION) is context.blurred("search", REGION)
+        assert context.edges("other", (0, 0, 100, 100)) is not first
+
+    def test_origin_offsets_region(self):
+        """切り抜き済みフレームでも元フレーム座標の領域で同じエッジ画像が得られること"""
+        frame = _make_frame()
+        origin = (20, 10)
+        cropped = frame[origin[1] :, origin[0] :]
+
+        full_context = FramePreprocessContext(frame)
+        cropped_context = FramePreprocessContext(cropped, origin=origin)
+
+        assert np.array_equal(cropped_context.edges("search", REGION), full_context.edges("search", REGION))
+
+    def test_prescaled_frame_matches_downscaled_region(self):
+        """供給元で基準解像度に縮小済みのフレームでも、元フレームの座標の領域で同じグレースケール画像が得られること"""
+        frame = cv2.resize(_make_frame(), (640, 480), interpolation=cv2.INTER_NEAREST)  # 基準解像度の2倍
+        origin = (40, 20)
+        region = tuple(2 * v for v in REGION)
+        cropped = frame[origin[1] :, origin[0] :]
+        prescaled = cv2.resize(cropped, (cropped.shape[1] // 2, cropped.shape[0] // 2), interpolation=cv2.INTER_AREA)
+
+        full_context = FramePreprocessContext(frame, scale=2.0)
+        prescaled_context = FramePreprocessContext(prescaled, origin=origin, scale=2.0, frame_downscale=2.0)
+
+        assert np.array_equal(prescaled_context.gray("search", region), full_context.gray("search", region))
+        assert (
+            prescaled_context.coarse_edges("search", region, 0.5).shape
+            == full_context.coarse_edges("search", region, 0.5).shape
+        )
+
+
+class TestRegionNormalization:
+    """相対座標への正規化のテストクラス"""
+
+    def test_round_trip_to_other_resolution(self):
+        """基準解像度のピクセル座標が相対座標を経て各解像度のピクセル座標になること"""
+        relative = to_relative_region((1095, 227, 1365, 700), reference_height=1080)
+
+        assert to_frame_region(relative, 1920, 1080) == (1095, 227, 1365, 700)
+        assert to_frame_region(relative, 1280, 720) == (730, 151, 910, 467)
+
+    def test_relative_and_pixel_passthrough(self):
+        """相対座標で指定した領域は正規化せず、基準解像度なしのピクセル座標はそのまま使うこと"""
+        relative = (0.5, 0.25, 1.0, 0.75)
+
+        assert to_relative_region(relative, reference_height=1080) == relative
+        assert to_frame_region(relative, 640, 480) == (320, 120, 640, 360)
+        assert to_frame_region(to_relative_region(REGION, reference_height=None), 640, 480) == REGION
@@ -0,0 +1,57 @@
+"""
+段階プロファイラのテスト
+
+StageProfiler のプロファイル・collapsed stacks の保存と、プロファイリング時の走査のワーカー数をテストします。
+"""
+
+import time
+
+import pytest
+
+from src.utils.profiler import StageProfiler
+
+
+def _busy(seconds: float) -> int:
+    total = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        total += sum(range(100))
+    return total
+
+
+class TestStageProfiler:
+    """StageProfiler のテストクラス"""
+
+    def test_disabled_writes_nothing(self, tmp_path):
+        """無効時は何も保存しないこと"""
+        with StageProfiler().profile("detection", tmp_path):
+            _busy(0.01)
+
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.parametrize("kind", ["cprofile", "sampling"])
+    def test_saves_collapsed_stacks(self, tmp_path, kind):
+        """プロファイルと flamegraph 形式の collapsed stacks を保存すること"""
+        with StageProfiler(kind, interval_sec=0.001).profile("detection", tmp_path):
+            _busy(0.2)
+
+        assert (tmp_path / "profile_detection.txt").exists()
+        assert (tmp_path / "profile_detection.prof").exists() == (kind == "cprofile")
+        lines = (tmp_path / "profile_detection.collapsed").read_text(encoding="utf-8").splitlines()
+        assert lines
+        for line in lines:
+            stack, value = line.rsplit(" ", 1)
+            assert stack and int(value) >= 0
+        assert any("_busy (test_profiler.py" in line for line in lines)
+
+    def test_scan_workers_serial_when_enabled(self):
+        """有効時は並列走査のワーカー数を1にし（ワーカープロセスは計測されない）、無効時はそのままにすること"""
+        assert StageProfiler("sampling").scan_workers(0) == 1
+        assert StageProfiler("cprofile").scan_workers(4) == 1
+        assert StageProfiler().scan_workers(0) == 0
+        assert StageProfiler().scan_workers(4) == 4
+
+    def test_rejects_unknown_profiler(self):
+        """未知のプロファイラ名はエラーになること"""
+        with pytest.raises(ValueError):
+            StageProfiler("perf")
@@ -0,0 +1,183 @@
+"""
+認識結果キャッシュ・近似重複クラスタリングのテスト
+
+RecognitionCache の保存・LRU 削除と、CharacterRecognizer がキャッシュにヒットしたフレーム・
+近似重複のフレームを API に送信しないことをテストします。
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("google.genai")
+
+from src.character import UNKNOWN_CHARACTER, CharacterRecognizer, PayloadEncoder, RecognitionCache, perceptual_hash
+from src.character.clustering import cluster_near_duplicates
+
+# 近似重複クラスタリングで別の組み合わせをまとめないことを確認するキャラクター名
+ROSTER = [
+    "RYU",
+    "KEN",
+    "JP",
+    "JAMIE",
+    "ED",
+    "MANON",
+    "MARISA",
+    "LILY",
+    "LUKE",
+    "KIMBERLY",
+    "JURI",
+    "DEE JAY",
+    "GUILE",
+    "CHUN-LI",
+    "CAMMY",
+    "ZANGIEF",
+    "BLANKA",
+    "DHALSIM",
+    "E.HONDA",
+    "RASHID",
+    "A.K.I.",
+    "AKUMA",
+    "M.BISON",
+    "TERRY",
+]
+
+
+def _name_crop(seed: int) -> np.ndarray:
+    """キャラクター名の表示領域に相当する横長の画像"""
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, size=(94, 1568, 3), dtype=np.uint8)
+
+
+def _result(p1: str, p2: str) -> tuple[dict[str, str], dict[str, str]]:
+    return {"1p": p1, "2p": p2}, {"1p": p1, "2p": p2}
+
+
+class TestRecognitionCache:
+    """RecognitionCache のテストクラス"""
+
+    def test_perceptual_hash_tolerates_noise(self):
+        """再エンコード程度のノイズでは同じハッシュになること"""
+        crop = np.zeros((94, 1568, 3), dtype=np.uint8)
+        crop[:, ::40] = 255
+        noisy = np.clip(crop.astype(np.int16) + np.random.default_rng(0).integers(-3, 4, crop.shape), 0, 255)
+
+        assert perceptual_hash(noisy.astype(np.uint8)) == perceptual_hash(crop)
+        assert perceptual_hash(_name_crop(1)) != perceptual_hash(_name_crop(2))
+
+    def test_keyed_by_model_and_prompt_version(self, tmp_path):
+        """モデル名・プロンプトのバージョンが異なればヒットしないこと"""
+        cache = RecognitionCache(db_path=str(tmp_path / "cache.db"))
+        cache.put_many({"abc": _result("RYU", "KEN")}, "model-a", "v1")
+
+        assert cache.get_many(["abc"], "model-a", "v1") == {"abc": _result("RYU", "KEN")}
+        assert cache.get_many(["abc"], "model-b", "v1") == {}
+        assert cache.get_many(["abc"], "model-a", "v2") == {}
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """上限を超えたら最終参照が古いものから削除すること"""
+        cache = RecognitionCache(db_path=str(tmp_path / "cache.db"), max_bytes=10**6)
+        for key in ("a", "b", "c"):
+            cache.put_many({key: _result("RYU", "KEN")}, "model", "v1")
+        cache.get_many(["a"], "model", "v1")
+
+        entry_size = cache.stats()["bytes"] // 3
+        cache.max_bytes = entry_size * 3
+        cache.put_many({"d": _result("JP", "ED")}, "model", "v1")
+
+        assert set(cache.get_many(["a", "b", "c", "d"], "model", "v1")) == {"a", "c", "d"}
+
+
+class TestRecognizerCache:
+    """CharacterRecognizer の認識結果キャッシュのテストクラス"""
+
+    @pytest.fixture
+    def recognizer(self, tmp_path):
+        # API クライアントを作らずにキャッシュ処理のみを使う
+        recognizer = CharacterRecognizer.__new__(CharacterRecognizer)
+        recognizer.model_name = "test-model"
+        recognizer.prompt_version = "test"
+        recognizer.payload_encoder = PayloadEncoder()
+        recognizer.cache = RecognitionCache(db_path=str(tmp_path / "cache.db"))
+        recognizer.cluster_distance = 0.0
+        return recognizer
+
+    def test_hits_skip_api(self, recognizer):
+        """ヒットしたフレームは送信せず、同じ画像は1回だけ送信すること"""
+        unknown_crop = _name_crop(2)
+        sent: list[int] = []
+
+        def recognize(frames):
+            sent.append(len(frames))
+            return [
+                _result(UNKNOWN_CHARACTER, "KEN") if np.array_equal(f, unknown_crop) else _result("RYU", "KEN")
+                for f in frames
+            ]
+
+        frames = [_name_crop(1), unknown_crop, _name_crop(1)]
+        first = recognizer._recognize_cached(frames, recognize)
+        second = recognizer._recognize_cached(frames, recognize)
+
+        assert first == second == [_result("RYU", "KEN"), _result(UNKNOWN_CHARACTER, "KEN"), _result("RYU", "KEN")]
+        # 1回目: 重複を除いた2枚、2回目: UNKNOWN を含む結果はキャッシュしないためその1枚のみ再送
+        assert sent == [2, 1]
+
+    def test_payload_settings_change_misses(self, recognizer):
+        """送信する画像の設定が変わったら、以前の設定で認識した結果を使わないこと"""
+        sent: list[int] = []
+
+        def recognize(frames):
+            sent.append(len(frames))
+            return [_result("RYU", "KEN") for _ in frames]
+
+        frames = [_name_crop(1)]
+        recognizer._recognize_cached(frames, recognize)
+        recognizer.payload_encoder = PayloadEncoder(max_width=768, grayscale=True, image_format="jpeg")
+        recognizer._recognize_cached(frames, recognize)
+        recognizer._recognize_cached(frames, recognize)
+
+        assert sent == [1, 1]
+
+
+class TestNearDuplicateClustering:
+    """近似重複クラスタリングのテストクラス"""
+
+    def test_clusters_same_pairing_only(self, name_banner):
+        """同じ組み合わせ・背景の画像のみまとめ、1文字違いのキャラクター名はまとめないこと"""
+        frames = [
+            name_banner("RYU", "KEN", seed=1),
+            name_banner("JP", "KEN", seed=1),
+            name_banner("RYU", "KEN", seed=2),
+            name_banner("ED", "KEN", seed=1),
+            name_banner("RYU", "KEN", seed=1, noise_seed=1),
+        ]
+
+        assert cluster_near_duplicates(frames, 0.03) == [0, 1, 2, 3, 0]
+        assert cluster_near_duplicates(frames, 0.0) == [0, 1, 2, 3, 4]
+
+    @pytest.mark.parametrize("seed", [1, 2, 3])
+    def test_distinct_pairings_on_same_background_never_merge(self, name_banner, seed):
+        """同じ背景でも、左右どちらかのキャラクター名が異なる組み合わせは1組もまとめないこと"""
+        frames = [name_banner(name, "KEN", seed=seed) for name in ROSTER]
+        frames += [name_banner("KEN", name, seed=seed) for name in ROSTER if name != "KEN"]
+
+        assert cluster_near_duplicates(frames, 0.03) == list(range(len(frames)))
+
+    def test_recognizer_sends_representatives(self, name_banner, tmp_path):
+        """近似重複のフレームは代表のみ送信し、結果を全員に割り当てること"""
+        recognizer = CharacterRecognizer.__new__(CharacterRecognizer)
+        recognizer.cache = None
+        recognizer.cluster_distance = 0.03
+        sent: list[int] = []
+
+        def recognize(frames):
+            sent.append(len(frames))
+            return [_result(f"P{i}", "KEN") for i in range(len(frames))]
+
+        frames = [
+            name_banner(p1, "KEN", seed=1, noise_seed=noise_seed) for noise_seed in range(3) for p1 in ("RYU", "JP")
+        ]
+        results = recognizer._recognize_cached(frames, recognize)
+
+        assert sent == [2]
+        assert [r[0]["1p"] for r in results] == ["P0", "P1"] * 3
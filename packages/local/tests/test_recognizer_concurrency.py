@@ -0,0 +1,95 @@
+"""
+キャラクター認識のチャンク分割・並行送信のテスト
+
+CharacterRecognizer がフレームを batch_chunk_size 枚ごとのバッチに分割し、最大 max_concurrency
+リクエストを並行して送信すること、index 欠損時の個別送信も並行して行うことをテストします。
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+
+pytest.importorskip("google.genai")
+
+from src.character import CharacterRecognizer
+from src.character.payload import PayloadEncoder
+
+CHARACTERS = ["RYU", "KEN", "JP", "JAMIE", "ED", "MANON"]
+
+
+class FakeModels:
+    """generate_content の同時実行数を記録し、指定したフレームをバッチのレスポンスから欠損させる"""
+
+    def __init__(self, missing_frame_ids: set[int]):
+        self.missing_frame_ids = missing_frame_ids
+        self.batch_sizes: list[int] = []
+        self.single_calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate_content(self, model, contents, config):
+        frame_ids = [
+            int(cv2.imdecode(np.frombuffer(part.inline_data.data, np.uint8), cv2.IMREAD_GRAYSCALE)[0, 0])
+            for part in contents[1:]
+        ]
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+
+        name = CHARACTERS[frame_ids[0] % len(CHARACTERS)]
+        if len(contents) == 2 and "index" not in contents[0]:
+            self.single_calls += 1
+            return SimpleNamespace(text=json.dumps({"1p": name, "2p": "KEN"}))
+
+        self.batch_sizes.append(len(frame_ids))
+        results = [
+            {"index": i, "1p": CHARACTERS[frame_id % len(CHARACTERS)], "2p": "KEN"}
+            for i, frame_id in enumerate(frame_ids, 1)
+            if frame_id not in self.missing_frame_ids
+        ]
+        return SimpleNamespace(text=json.dumps({"results": results}))
+
+
+def _recognizer(models: FakeModels, batch_chunk_size: int, max_concurrency: int) -> CharacterRecognizer:
+    # 認証・API クライアントを作らずに送信処理のみを使う
+    recognizer = CharacterRecognizer.__new__(CharacterRecognizer)
+    recognizer.model_name = "test-model"
+    recognizer.use_flex = False
+    recognizer.flex_client = None
+    recognizer.standard_client = SimpleNamespace(aio=SimpleNamespace(models=models))
+    recognizer.valid_characters = CHARACTERS
+    recognizer.aliases_map = {name.lower(): name for name in CHARACTERS}
+    recognizer.batch_chunk_size = batch_chunk_size
+    recognizer.max_concurrency = max_concurrency
+    recognizer.payload_encoder = PayloadEncoder(image_format="png")
+    return recognizer
+
+
+def test_chunks_run_concurrently_with_parallel_fallbacks():
+    """チャンクごとに並行してバッチ送信し、欠損したフレームのみ並行して個別送信すること"""
+    models = FakeModels(missing_frame_ids={1, 5, 6})
+    recognizer = _recognizer(models, batch_chunk_size=4, max_concurrency=2)
+    frames = [np.full((4, 8, 3), i, dtype=np.uint8) for i in range(10)]
+
+    results = recognizer._recognize_frames_uncached(frames)
+
+    assert sorted(models.batch_sizes) == [2, 4, 4]
+    assert models.single_calls == 3
+    assert models.max_in_flight == 2
+    assert [normalized["1p"] for normalized, _ in results] == [CHARACTERS[i % len(CHARACTERS)] for i in range(10)]
+
+
+def test_zero_chunk_size_sends_single_batch():
+    """batch_chunk_size=0 では全フレームを1リクエストで送信すること"""
+    models = FakeModels(missing_frame_ids=set())
+    recognizer = _recognizer(models, batch_chunk_size=0, max_concurrency=4)
+
+    recognizer._recognize_frames_uncached([np.full((4, 8, 3), i, dtype=np.uint8) for i in range(10)])
+
+    assert models.batch_sizes == [10]
+    assert models.single_calls == 0
@@ -179,3 +179,47 @@ class TestResultScreenDetector:
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
+
+
+class TestWinPosition:
+    """Win テキストの左右判定と信頼度のテストクラス"""
+
+    @pytest.fixture
+    def detector(self, tmp_path):
+        rng = np.random.default_rng(0)
+        result_template = np.zeros((60, 220, 3), dtype=np.uint8)
+        cv2.putText(result_template, "RESULT", (10, 45), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
+        win_template = np.zeros((60, 120, 3), dtype=np.uint8)
+        cv2.putText(win_template, "Win", (10, 45), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
+        result_path = tmp_path / "result.png"
+        win_path = tmp_path / "win.png"
+        cv2.imwrite(str(result_path), result_template)
+        cv2.imwrite(str(win_path), win_template)
+
+        detector = ResultScreenDetector(
+            result_template_paths=[str(result_path)],
+            win_template_paths=[str(win_path)],
+            result_screen_search_region=(0, 0, 400, 150),
+            win_text_search_region=(200, 400, 1080, 560),
+        )
+        background = rng.integers(0, 60, (720, 1280, 3), dtype=np.uint8)
+        return detector, background, result_template, win_template
+
+    @pytest.mark.parametrize(("win_x", "expected"), [(300, "player1"), (800, "player2")])
+    def test_detects_winner_side_with_margin_score(self, detector, win_x, expected):
+        """Win テキストのある側が勝者と判定され、閾値を十分超えていれば余裕のスコアが高くなること"""
+        detector, frame, result_template, win_template = detector
+        frame[40:100, 60:280] = result_template
+        frame[450:510, win_x : win_x + 120] = win_template
+
+        result = detector.detect_result(frame)
+
+        assert result.winner_side == expected
+        assert 0.8 < result.detection_confidence <= 1.0
+
+    def test_margin_score_is_low_when_ambiguous(self, detector):
+        """左右に同程度の Win がある場合は余裕のスコアが 0.5 付近以下になること"""
+        detector, *_ = detector
+        assert detector.margin_score(0.9, 0.6, 0.6) == pytest.approx(0.5)
+        assert detector.margin_score(0.9, 0.5, 0.6) < 0.5
+        assert detector.margin_score(0.9, 0.9, 0.1) > detector.margin_score(0.35, 0.9, 0.1)
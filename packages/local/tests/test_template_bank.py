@@ -0,0 +1,76 @@
+"""
+テンプレートバンクのテスト
+
+TemplateBank の一括マッチングが cv2.matchTemplate と一致すること、
+TemplatePyramid が解像度ごとの段を選ぶことをテストします。
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from src.detection.preprocessing import preprocess_for_matching
+from src.detection.template_bank import TemplateBank, TemplatePyramid
+
+
+def _make_edges(shape: tuple[int, int], seed: int) -> np.ndarray:
+    """図形を描いた画像のエッジ画像"""
+    rng = np.random.default_rng(seed)
+    image = np.zeros((*shape, 3), dtype=np.uint8)
+    for _ in range(6):
+        center = (int(rng.integers(0, shape[1])), int(rng.integers(0, shape[0])))
+        color = tuple(int(v) for v in rng.integers(80, 256, 3))
+        cv2.circle(image, center, int(rng.integers(5, 40)), color, -1)
+    cv2.putText(image, "ROUND", (10, shape[0] // 2), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
+    return preprocess_for_matching(image)
+
+
+class TestTemplateBank:
+    """TemplateBank のテストクラス"""
+
+    @pytest.mark.parametrize("template_shapes", [[(120, 160), (150, 90), (100, 200)], [(30, 20), (25, 40)]])
+    def test_matches_cv2_match_template(self, template_shapes):
+        """FFT一括計算・直接計算のどちらでも cv2.matchTemplate と一致すること"""
+        image = _make_edges((240, 300), seed=0)
+        templates = [image[10 : 10 + h, 20 : 20 + w].copy() for h, w in template_shapes[:1]]
+        templates += [_make_edges(shape, seed=i + 1) for i, shape in enumerate(template_shapes[1:])]
+        bank = TemplateBank(templates)
+
+        for score, template in zip(bank.match(image), templates, strict=True):
+            expected = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+            assert score.shape == expected.shape
+            np.testing.assert_allclose(score, expected, atol=1e-4)
+
+        expected_max = [cv2.matchTemplate(image, t, cv2.TM_CCOEFF_NORMED).max() for t in templates]
+        np.testing.assert_allclose(bank.max_scores(image), expected_max, atol=1e-4)
+        assert bank.max_scores(image)[0] == pytest.approx(1.0, abs=1e-4)
+
+    def test_flat_image(self):
+        """エッジのない（分散0の）画像では cv2.matchTemplate と同じく 0 になること"""
+        bank = TemplateBank([_make_edges((100, 120), seed=1), _make_edges((90, 100), seed=2)])
+
+        assert np.array_equal(bank.max_scores(np.zeros((200, 200), dtype=np.uint8)), [0.0, 0.0])
+
+    def test_template_larger_than_image(self):
+        """検索画像より大きいテンプレートはスコア -1 となること"""
+        bank = TemplateBank([_make_edges((100, 100), seed=1), _make_edges((300, 50), seed=2)])
+
+        scores = bank.max_scores(_make_edges((200, 200), seed=0))
+
+        assert scores[1] == -1.0
+        assert bank.match(np.zeros((200, 200), dtype=np.uint8))[1] is None
+
+
+class TestTemplatePyramid:
+    """TemplatePyramid のテストクラス"""
+
+    def test_levels_match_resolution(self):
+        """基準解像度以下の段は縮小したテンプレート、基準解像度より高い動画は基準解像度の段を使うこと"""
+        template = np.zeros((90, 120, 3), dtype=np.uint8)
+        cv2.putText(template, "R1", (10, 70), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 4)
+        pyramid = TemplatePyramid([template], reference_height=1080)
+
+        assert np.array_equal(pyramid.edges(1.0)[0], preprocess_for_matching(template))
+        assert pyramid.edges(720 / 1080)[0].shape == (60, 80)
+        assert pyramid.bank(1440 / 1080) is pyramid.bank(1.0)
+        assert pyramid.bank(720 / 1080) is pyramid.bank(720 / 1080)